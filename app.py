@@ -1184,11 +1184,13 @@ def _init_app() -> None:
                 cleanup_old_payloads,
                 cleanup_old_signal_history,
                 cleanup_old_timeline_entries,
+                run_db_maintenance,
             )
             cleanup_manager.register_db_cleanup(cleanup_old_signal_history, interval_multiplier=1440)
             cleanup_manager.register_db_cleanup(cleanup_old_timeline_entries, interval_multiplier=1440)
             cleanup_manager.register_db_cleanup(cleanup_old_dsc_alerts, interval_multiplier=1440)
             cleanup_manager.register_db_cleanup(cleanup_old_payloads, interval_multiplier=1440)
+            cleanup_manager.register_db_cleanup(run_db_maintenance, interval_multiplier=360)
             cleanup_manager.start()
         except Exception as e:
             logger.warning(f"Cleanup manager init failed: {e}")
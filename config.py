@@ -447,6 +447,14 @@ ADSB_DB_PASSWORD = _get_env('ADSB_DB_PASSWORD', 'intercept')
 ADSB_HISTORY_BATCH_SIZE = _get_env_int('ADSB_HISTORY_BATCH_SIZE', 500)
 ADSB_HISTORY_FLUSH_INTERVAL = _get_env_float('ADSB_HISTORY_FLUSH_INTERVAL', 1.0)
 ADSB_HISTORY_QUEUE_SIZE = _get_env_int('ADSB_HISTORY_QUEUE_SIZE', 50000)
+ADSB_HISTORY_HIGH_WATER = _get_env_float('ADSB_HISTORY_HIGH_WATER', 0.8)
+ADSB_HISTORY_RETRY_INTERVAL = _get_env_float('ADSB_HISTORY_RETRY_INTERVAL', 2.0)
+# Days of history kept; older daily partitions are dropped (0 keeps everything)
+ADSB_HISTORY_RETENTION_DAYS = _get_env_int('ADSB_HISTORY_RETENTION_DAYS', 0)
+ADSB_SPILL_DIR = _get_env('ADSB_SPILL_DIR', '')
+ADSB_SPILL_MAX_MB = _get_env_float('ADSB_SPILL_MAX_MB', 512.0)
+ADSB_SPILL_SEGMENT_MB = _get_env_float('ADSB_SPILL_SEGMENT_MB', 4.0)
+ADSB_EXPORT_BATCH_SIZE = _get_env_int('ADSB_EXPORT_BATCH_SIZE', 5000)
 
 # Observer location settings
 SHARED_OBSERVER_LOCATION_ENABLED = _get_env_bool('SHARED_OBSERVER_LOCATION', True)
@@ -495,6 +503,13 @@ GITHUB_REPO = _get_env('GITHUB_REPO', 'smittix/intercept')
 UPDATE_CHECK_ENABLED = _get_env_bool('UPDATE_CHECK_ENABLED', True)
 UPDATE_CHECK_INTERVAL_HOURS = _get_env_int('UPDATE_CHECK_INTERVAL_HOURS', 6)
 
+# Temporal pattern detection (per-device event history)
+PATTERN_MEMORY_LIMIT_MB = _get_env_float('PATTERN_MEMORY_LIMIT_MB', 32.0)
+PATTERN_DEVICE_TTL = _get_env_int('PATTERN_DEVICE_TTL', 86400)
+
+# TSCM repeat-detection history (sightings per identifier over 24 h)
+TSCM_REPEAT_MAX_IDENTIFIERS = _get_env_int('TSCM_REPEAT_MAX_IDENTIFIERS', 100000)
+
 # Alerting
 ALERT_WEBHOOK_URL = _get_env('ALERT_WEBHOOK_URL', '')
 ALERT_WEBHOOK_SECRET = _get_env('ALERT_WEBHOOK_SECRET', '')
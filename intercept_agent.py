@@ -1813,21 +1813,42 @@ class ModeManager:
             return {'status': 'error', 'message': str(e)}
 
     def _wifi_csv_reader(self, csv_path: str):
-        """Periodically parse airodump-ng CSV and GPS output."""
+        """Periodically ingest new or changed rows from airodump-ng CSV and GPS output."""
         mode = 'wifi'
         stop_event = self.stop_events.get(mode)
         csv_file = csv_path + '-01.csv'
         gps_file = csv_path + '-01.gps'
 
+        try:
+            from utils.wifi.parsers.airodump import AirodumpCSVReader
+            csv_reader = AirodumpCSVReader(csv_file)
+        except ImportError:
+            csv_reader = None
+
         while not (stop_event and stop_event.is_set()):
             if os.path.exists(csv_file):
                 try:
-                    # Parse GPS file for accurate coordinates (if available)
-                    gps_data = self._parse_airodump_gps(gps_file) if os.path.exists(gps_file) else None
-
-                    networks, clients = self._parse_airodump_csv(csv_file, gps_data)
-                    self.wifi_networks = networks
-                    self.wifi_clients = clients
+                    if csv_reader is None:
+                        # Standalone agent: full re-parse with the fallback parser
+                        gps_data = self._parse_airodump_gps(gps_file) if os.path.exists(gps_file) else None
+                        networks, clients = self._parse_airodump_csv(csv_file, gps_data)
+                        self.wifi_networks = networks
+                        self.wifi_clients = clients
+                    else:
+                        network_obs, client_list = csv_reader.read_changes()
+                        if network_obs or client_list:
+                            # Parse GPS file for accurate coordinates (if available)
+                            gps_data = self._parse_airodump_gps(gps_file) if os.path.exists(gps_file) else None
+
+                            networks = {obs.bssid: self._airodump_network_entry(obs) for obs in network_obs}
+                            clients = {c['mac']: self._airodump_client_entry(c) for c in client_list if c.get('mac')}
+                            self._apply_airodump_gps(networks, clients, gps_data)
+
+                            # Merge only the changed entries. dict.update() and the
+                            # readers' list(d.values()) each run under the GIL, so
+                            # readers never see a dict mid-update
+                            self.wifi_networks.update(networks)
+                            self.wifi_clients.update(clients)
                 except Exception as e:
                     logger.error(f"CSV parse error: {e}")
 
@@ -1886,34 +1907,13 @@ class ModeManager:
 
             # Convert WiFiObservation objects to dicts for agent format
             for obs in network_obs:
-                networks[obs.bssid] = {
-                    'bssid': obs.bssid,
-                    'essid': obs.essid or 'Hidden',
-                    'channel': obs.channel,
-                    'frequency_mhz': obs.frequency_mhz,
-                    'signal': obs.rssi,
-                    'security': obs.security,
-                    'cipher': obs.cipher,
-                    'auth': obs.auth,
-                    'vendor': obs.vendor,
-                    'beacon_count': obs.beacon_count,
-                    'data_count': obs.data_count,
-                    'band': obs.band,
-                    'last_seen': datetime.now(timezone.utc).isoformat(),
-                }
+                networks[obs.bssid] = self._airodump_network_entry(obs)
 
             # Convert client dicts (already in dict format from parser)
             for client in client_list:
                 mac = client.get('mac')
                 if mac:
-                    clients[mac] = {
-                        'mac': mac,
-                        'signal': client.get('rssi'),
-                        'bssid': client.get('bssid'),
-                        'probes': ','.join(client.get('probed_essids', [])),
-                        'packets': client.get('packets', 0),
-                        'last_seen': datetime.now(timezone.utc).isoformat(),
-                    }
+                    clients[mac] = self._airodump_client_entry(client)
 
             logger.debug(f"Parsed {len(networks)} networks, {len(clients)} clients")
 
@@ -1957,7 +1957,43 @@ class ModeManager:
         except Exception as e:
             logger.error(f"Error parsing CSV: {e}")
 
-        # Add GPS to all entries
+        self._apply_airodump_gps(networks, clients, gps_data)
+
+        return networks, clients
+
+    @staticmethod
+    def _airodump_network_entry(obs) -> dict:
+        """Convert a WiFiObservation into the agent's network dict format."""
+        return {
+            'bssid': obs.bssid,
+            'essid': obs.essid or 'Hidden',
+            'channel': obs.channel,
+            'frequency_mhz': obs.frequency_mhz,
+            'signal': obs.rssi,
+            'security': obs.security,
+            'cipher': obs.cipher,
+            'auth': obs.auth,
+            'vendor': obs.vendor,
+            'beacon_count': obs.beacon_count,
+            'data_count': obs.data_count,
+            'band': obs.band,
+            'last_seen': datetime.now(timezone.utc).isoformat(),
+        }
+
+    @staticmethod
+    def _airodump_client_entry(client: dict) -> dict:
+        """Convert a parsed airodump client dict into the agent's client format."""
+        return {
+            'mac': client.get('mac'),
+            'signal': client.get('rssi'),
+            'bssid': client.get('bssid'),
+            'probes': ','.join(client.get('probed_essids', [])),
+            'packets': client.get('packets', 0),
+            'last_seen': datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _apply_airodump_gps(self, networks: dict, clients: dict, gps_data: dict | None) -> None:
+        """Attach the current GPS position to network and client entries."""
         # Prefer GPS from airodump's .gps file (more accurate timestamp)
         # Fall back to GPSManager if no .gps file data
         if gps_data:
@@ -1979,8 +2015,6 @@ class ModeManager:
             for client in clients.values():
                 client['agent_gps'] = gps_pos
 
-        return networks, clients
-
     # -------------------------------------------------------------------------
     # BLUETOOTH MODE
     # -------------------------------------------------------------------------
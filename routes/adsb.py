@@ -13,7 +13,7 @@ import subprocess
 import threading
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Iterator
 
 from flask import Blueprint, Response, jsonify, make_response, render_template, request
 
@@ -39,6 +39,7 @@ from config import (
     ADSB_DB_PASSWORD,
     ADSB_DB_PORT,
     ADSB_DB_USER,
+    ADSB_EXPORT_BATCH_SIZE,
     ADSB_HISTORY_ENABLED,
     DEFAULT_LATITUDE,
     DEFAULT_LONGITUDE,
@@ -46,12 +47,22 @@ from config import (
 )
 from utils import aircraft_db
 from utils.acars_translator import translate_message
-from utils.adsb_history import _ensure_adsb_schema, adsb_history_writer, adsb_snapshot_writer
+from utils.adsb_history import (
+    _ensure_adsb_schema,
+    _hour_sql,
+    adsb_history_migrated,
+    adsb_history_writer,
+    adsb_snapshot_writer,
+    prune_history,
+    rollup_span,
+    start_adsb_history_migration,
+)
 from utils.constants import (
     ADSB_SBS_PORT,
     ADSB_TERMINATE_TIMEOUT,
     ADSB_UPDATE_INTERVAL,
     DUMP1090_START_WAIT,
+    MAX_AIRCRAFT_AGE_SECONDS,
     PROCESS_TERMINATE_TIMEOUT,
     SBS_RECONNECT_DELAY,
     SBS_SOCKET_TIMEOUT,
@@ -65,7 +76,8 @@ from utils.flight_correlator import get_flight_correlator
 from utils.logging import adsb_logger as logger
 from utils.process import cleanup_stale_dump1090, clear_dump1090_pid, write_dump1090_pid
 from utils.sdr import SDRFactory, SDRType
-from utils.sse import format_sse
+from utils.sse import DeltaSubscriber, EntityRevisions, format_sse
+from utils.stream_codec import KeyDictionary, negotiate_codec
 from utils.validation import validate_device_index, validate_gain, validate_rtl_tcp_host, validate_rtl_tcp_port
 
 adsb_bp = Blueprint('adsb', __name__, url_prefix='/adsb')
@@ -89,6 +101,15 @@ _adsb_stream_subscribers: set[queue.Queue] = set()
 _adsb_stream_subscribers_lock = threading.Lock()
 _ADSB_STREAM_CLIENT_QUEUE_SIZE = 500
 
+# Field revisions of broadcast aircraft, for clients streaming deltas
+adsb_revisions = EntityRevisions('icao', max_age_seconds=MAX_AIRCRAFT_AGE_SECONDS)
+
+# Key numbering for clients streaming a binary codec
+adsb_stream_keys = KeyDictionary([
+    'type', 'icao', 'callsign', 'altitude', 'speed', 'heading', 'vertical_rate',
+    'lat', 'lon', 'squawk', 'registration', 'type_code', 'type_desc', 'rev', 'since',
+])
+
 # Load aircraft database at module init
 aircraft_db.load_database()
 
@@ -179,6 +200,8 @@ def _build_history_record(
 
 
 _history_schema_checked = False
+# Rollups hold all history only once the one-time migration has run
+_history_rollups_ready = False
 
 
 def _get_history_connection():
@@ -192,17 +215,29 @@ def _get_history_connection():
 
 
 def _ensure_history_schema() -> None:
-    global _history_schema_checked
-    if _history_schema_checked:
+    """Create missing history tables; the slow migration runs in the background."""
+    global _history_schema_checked, _history_rollups_ready
+    if _history_schema_checked and _history_rollups_ready:
         return
     try:
         with _get_history_connection() as conn:
-            _ensure_adsb_schema(conn)
-        _history_schema_checked = True
+            if not _history_schema_checked:
+                _history_schema_checked = _ensure_adsb_schema(conn)
+            with conn.cursor() as cur:
+                _history_rollups_ready = adsb_history_migrated(cur)
+        if not _history_rollups_ready:
+            start_adsb_history_migration()
     except Exception as exc:
         logger.warning("ADS-B schema check failed: %s", exc)
 
 
+def _history_rollup_span(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """Whole hours to read from the rollups; none until they are backfilled."""
+    if not _history_rollups_ready:
+        return start, start
+    return rollup_span(start, end)
+
+
 MILITARY_ICAO_RANGES = [
     (0xADF7C0, 0xADFFFF),  # US
     (0xAE0000, 0xAEFFFF),  # US
@@ -306,78 +341,190 @@ def _serialize_export_value(value: Any) -> Any:
     return value
 
 
-def _rows_to_serializable(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    return [{key: _serialize_export_value(value) for key, value in row.items()} for row in rows]
+def _serialize_export_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {key: _serialize_export_value(value) for key, value in row.items()}
+
+
+# Export sections in output order: table, timestamp column and exported columns
+_EXPORT_SECTIONS: dict[str, tuple[str, str, list[str]]] = {
+    'messages': (
+        'adsb_messages',
+        'received_at',
+        [
+            'received_at', 'msg_time', 'logged_time', 'icao', 'msg_type', 'callsign',
+            'altitude', 'speed', 'heading', 'vertical_rate', 'lat', 'lon', 'squawk',
+            'session_id', 'aircraft_id', 'flight_id', 'source_host', 'raw_line',
+        ],
+    ),
+    'snapshots': (
+        'adsb_snapshots',
+        'captured_at',
+        [
+            'captured_at', 'icao', 'callsign', 'registration', 'type_code', 'type_desc',
+            'altitude', 'speed', 'heading', 'vertical_rate', 'lat', 'lon', 'squawk',
+            'source_host',
+        ],
+    ),
+    'sessions': (
+        'adsb_sessions',
+        'started_at',
+        [
+            'id', 'started_at', 'ended_at', 'device_index', 'sdr_type', 'remote_host',
+            'remote_port', 'start_source', 'stop_source', 'started_by', 'stopped_by', 'notes',
+        ],
+    ),
+}
+
+
+def _add_classification_filter(*, where_parts: list[str], params: list[Any], classification: str) -> None:
+    """Restrict rows to military or civilian aircraft in SQL.
+
+    Mirrors _is_military_aircraft: a six-digit hex ICAO inside one of the
+    military ranges, or a callsign starting with a military prefix.
+    """
+    if classification not in {'military', 'civilian'}:
+        return
+    hex_icao = 'upper(btrim(icao)) COLLATE "C"'
+    ranges = ' OR '.join(f'{hex_icao} BETWEEN %s AND %s' for _ in MILITARY_ICAO_RANGES)
+    military = (
+        f"(COALESCE({hex_icao} ~ '^[0-9A-F]{{6}}$' AND ({ranges}), FALSE)"
+        " OR COALESCE(upper(btrim(callsign)) LIKE ANY(%s), FALSE))"
+    )
+    where_parts.append(military if classification == 'military' else f'NOT {military}')
+    for start, end in MILITARY_ICAO_RANGES:
+        params.extend([f'{start:06X}', f'{end:06X}'])
+    params.append([f'{prefix}%' for prefix in MILITARY_CALLSIGN_PREFIXES])
 
 
-def _build_export_csv(
+def _build_export_query(
+    section: str,
     *,
-    exported_at: str,
     scope: str,
-    since_minutes: int | None,
+    since_minutes: int,
+    start: datetime | None,
+    end: datetime | None,
     icao: str,
     search: str,
     classification: str,
-    messages: list[dict[str, Any]],
-    snapshots: list[dict[str, Any]],
-    sessions: list[dict[str, Any]],
-    export_type: str,
-) -> str:
+) -> tuple[str, list[Any]]:
+    table, timestamp_field, columns = _EXPORT_SECTIONS[section]
+    where_parts: list[str] = []
+    params: list[Any] = []
+
+    if section == 'sessions':
+        if scope == 'custom' and start is not None and end is not None:
+            where_parts.append("COALESCE(ended_at, %s) >= %s AND started_at < %s")
+            params.extend([end, start, end])
+        elif scope == 'window':
+            where_parts.append("COALESCE(ended_at, NOW()) >= NOW() - INTERVAL %s")
+            params.append(f'{since_minutes} minutes')
+    else:
+        _add_time_filter(
+            where_parts=where_parts,
+            params=params,
+            scope=scope,
+            timestamp_field=timestamp_field,
+            since_minutes=since_minutes,
+            start=start,
+            end=end,
+        )
+        if icao:
+            where_parts.append("icao = %s")
+            params.append(icao)
+        if search:
+            pattern = f'%{search}%'
+            if section == 'snapshots':
+                where_parts.append("(icao ILIKE %s OR callsign ILIKE %s OR registration ILIKE %s)")
+                params.extend([pattern, pattern, pattern])
+            else:
+                where_parts.append("(icao ILIKE %s OR callsign ILIKE %s)")
+                params.extend([pattern, pattern])
+        _add_classification_filter(where_parts=where_parts, params=params, classification=classification)
+
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where_parts:
+        sql += " WHERE " + " AND ".join(where_parts)
+    sql += f" ORDER BY {timestamp_field} DESC"
+    return sql, params
+
+
+def _iter_export_rows(conn: Any, section: str, sql: str, params: list[Any]) -> Iterator[list[dict[str, Any]]]:
+    """Fetch a query in batches through a server-side (named) cursor."""
+    with conn.cursor(name=f'adsb_export_{section}', cursor_factory=RealDictCursor) as cur:
+        cur.itersize = ADSB_EXPORT_BATCH_SIZE
+        cur.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(ADSB_EXPORT_BATCH_SIZE)
+            if not rows:
+                return
+            yield rows
+
+
+def _iter_export_csv(
+    conn: Any,
+    queries: dict[str, tuple[str, list[Any]]],
+    header_rows: list[list[Any]],
+) -> Iterator[str]:
     output = io.StringIO()
     writer = csv.writer(output)
 
-    writer.writerow(['Exported At', exported_at])
-    writer.writerow(['Scope', scope])
-    if since_minutes is not None:
-        writer.writerow(['Since Minutes', since_minutes])
-    if icao:
-        writer.writerow(['ICAO Filter', icao])
-    if search:
-        writer.writerow(['Search Filter', search])
-    if classification != 'all':
-        writer.writerow(['Classification', classification])
+    def drain() -> str:
+        chunk = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return chunk
+
+    writer.writerows(header_rows)
     writer.writerow([])
+    yield drain()
 
-    def write_section(title: str, rows: list[dict[str, Any]], columns: list[str]) -> None:
-        writer.writerow([title])
+    for section, (sql, params) in queries.items():
+        columns = _EXPORT_SECTIONS[section][2]
+        writer.writerow([section.title()])
         writer.writerow(columns)
-        for row in rows:
-            writer.writerow([_serialize_export_value(row.get(col)) for col in columns])
+        for rows in _iter_export_rows(conn, section, sql, params):
+            writer.writerows([_serialize_export_value(row.get(col)) for col in columns] for row in rows)
+            yield drain()
         writer.writerow([])
+        yield drain()
+
+
+def _iter_export_json(conn: Any, queries: dict[str, tuple[str, list[Any]]], meta: dict[str, Any]) -> Iterator[str]:
+    """One JSON document written section by section; counts come last."""
+    yield json.dumps(meta, default=str)[:-1]
+    counts = dict.fromkeys(_EXPORT_SECTIONS, 0)
+    for section in _EXPORT_SECTIONS:
+        yield f',\n"{section}": ['
+        if section in queries:
+            sql, params = queries[section]
+            for rows in _iter_export_rows(conn, section, sql, params):
+                separator = ',\n' if counts[section] else '\n'
+                counts[section] += len(rows)
+                yield separator + ',\n'.join(json.dumps(_serialize_export_row(row), default=str) for row in rows)
+        yield '\n]'
+    yield f',\n"counts": {json.dumps(counts)}}}\n'
+
+
+def _iter_export_ndjson(conn: Any, queries: dict[str, tuple[str, list[Any]]], meta: dict[str, Any]) -> Iterator[str]:
+    """One JSON object per line: export metadata, tagged rows, then counts."""
+    yield json.dumps({'section': 'export', **meta}, default=str) + '\n'
+    counts = dict.fromkeys(_EXPORT_SECTIONS, 0)
+    for section, (sql, params) in queries.items():
+        for rows in _iter_export_rows(conn, section, sql, params):
+            counts[section] += len(rows)
+            yield ''.join(
+                json.dumps({'section': section, **_serialize_export_row(row)}, default=str) + '\n'
+                for row in rows
+            )
+    yield json.dumps({'section': 'counts', **counts}) + '\n'
 
-    if export_type in {'messages', 'all'}:
-        write_section(
-            'Messages',
-            messages,
-            [
-                'received_at', 'msg_time', 'logged_time', 'icao', 'msg_type', 'callsign',
-                'altitude', 'speed', 'heading', 'vertical_rate', 'lat', 'lon', 'squawk',
-                'session_id', 'aircraft_id', 'flight_id', 'source_host', 'raw_line',
-            ],
-        )
-
-    if export_type in {'snapshots', 'all'}:
-        write_section(
-            'Snapshots',
-            snapshots,
-            [
-                'captured_at', 'icao', 'callsign', 'registration', 'type_code', 'type_desc',
-                'altitude', 'speed', 'heading', 'vertical_rate', 'lat', 'lon', 'squawk',
-                'source_host',
-            ],
-        )
-
-    if export_type in {'sessions', 'all'}:
-        write_section(
-            'Sessions',
-            sessions,
-            [
-                'id', 'started_at', 'ended_at', 'device_index', 'sdr_type', 'remote_host',
-                'remote_port', 'start_source', 'stop_source', 'started_by', 'stopped_by', 'notes',
-            ],
-        )
 
-    return output.getvalue()
+def _log_export_errors(chunks: Iterator[str]) -> Iterator[str]:
+    try:
+        yield from chunks
+    except Exception as exc:
+        # Headers are already sent; the client sees a truncated download
+        logger.warning("ADS-B history export aborted: %s", exc)
 
 
 def _broadcast_adsb_update(payload: dict[str, Any]) -> None:
@@ -562,6 +709,7 @@ def parse_sbs_stream(service_addr):
                 for update_icao in tuple(pending_updates):
                     if update_icao in app_module.adsb_aircraft:
                         snapshot = app_module.adsb_aircraft[update_icao]
+                        adsb_revisions.update(snapshot)
                         _broadcast_adsb_update({
                             'type': 'aircraft',
                             **snapshot
@@ -799,7 +947,11 @@ def adsb_status():
         'queue_size': _adsb_stream_queue_depth(),
         'dump1090_path': find_dump1090(),
         'dump1090_running': dump1090_running,
-        'port_30003_open': check_dump1090_service() is not None
+        'port_30003_open': check_dump1090_service() is not None,
+        'history_writers': {
+            'messages': adsb_history_writer.stats(),
+            'snapshots': adsb_snapshot_writer.stats(),
+        },
     })
 
 
@@ -1136,6 +1288,7 @@ def stop_adsb():
         adsb_active_sdr_type = None
 
     app_module.adsb_aircraft.clear()
+    adsb_revisions.clear()
     _looked_up_icaos.clear()
     session = _record_session_stop(stop_source=stop_source, stopped_by=stopped_by)
     return jsonify({'status': 'stopped', 'session': session})
@@ -1143,24 +1296,41 @@ def stop_adsb():
 
 @adsb_bp.route('/stream')
 def stream_adsb():
-    """SSE stream for ADS-B aircraft."""
+    """SSE stream for ADS-B aircraft.
+
+    With ``?delta=1`` each aircraft message carries only the fields changed
+    since the last one this client received, plus ``rev``/``since``
+    revisions; a full keyframe of every aircraft is sent on connect and
+    every SSE_DELTA_KEYFRAME_INTERVAL seconds. ``?codec=cbor`` or
+    ``?codec=msgpack`` selects a binary encoding (see utils.stream_codec).
+    """
     client_queue: queue.Queue = queue.Queue(maxsize=_ADSB_STREAM_CLIENT_QUEUE_SIZE)
     with _adsb_stream_subscribers_lock:
         _adsb_stream_subscribers.add(client_queue)
 
+    codec = negotiate_codec(request.args.get('codec'), adsb_stream_keys)
+    delta = (
+        DeltaSubscriber(adsb_revisions, 'aircraft', codec=codec)
+        if request.args.get('delta') in ('1', 'true') else None
+    )
+
     # Prime new clients with current known aircraft so they don't wait for the
     # next positional update before rendering.
-    for snapshot in list(app_module.adsb_aircraft.values()):
-        try:
-            client_queue.put_nowait({'type': 'aircraft', **snapshot})
-        except queue.Full:
-            break
+    if delta is None:
+        for snapshot in list(app_module.adsb_aircraft.values()):
+            try:
+                client_queue.put_nowait({'type': 'aircraft', **snapshot})
+            except queue.Full:
+                break
 
     def generate():
         last_keepalive = time.time()
         # Send immediate keepalive so Werkzeug dev server flushes response
         # headers right away (it buffers until first body byte is written).
-        yield format_sse({'type': 'keepalive'})
+        yield format_sse({'type': 'keepalive'}, codec=codec)
+        if delta is not None:
+            for out in delta.tick():
+                yield format_sse(out, codec=codec)
 
         try:
             while True:
@@ -1169,11 +1339,18 @@ def stream_adsb():
                     last_keepalive = time.time()
                     with contextlib.suppress(Exception):
                         process_event('adsb', msg, msg.get('type'))
-                    yield format_sse(msg)
+                    if delta is None:
+                        yield format_sse(msg, codec=codec)
+                        continue
+                    for out in delta.feed(msg):
+                        yield format_sse(out, codec=codec)
                 except queue.Empty:
+                    if delta is not None:
+                        for out in delta.tick():
+                            yield format_sse(out, codec=codec)
                     now = time.time()
                     if now - last_keepalive >= SSE_KEEPALIVE_INTERVAL:
-                        yield format_sse({'type': 'keepalive'})
+                        yield format_sse({'type': 'keepalive'}, codec=codec)
                         last_keepalive = now
         finally:
             with _adsb_stream_subscribers_lock:
@@ -1208,6 +1385,48 @@ def adsb_history():
     return resp
 
 
+def _summary_query(now: datetime, since_minutes: int) -> tuple[str, dict[str, Any]]:
+    """Summary SQL reading hourly rollups for whole hours, raw rows at the edges."""
+    start = now - timedelta(minutes=since_minutes)
+    full_start, full_end = _history_rollup_span(start, now)
+    sql = """
+        WITH edges AS (
+            SELECT icao, captured_at
+            FROM adsb_snapshots
+            WHERE (captured_at >= %(start)s AND captured_at < %(full_start)s)
+               OR captured_at >= %(full_end)s
+        ),
+        rollup AS (
+            SELECT
+                COALESCE(SUM(message_count), 0) AS message_count,
+                COALESCE(SUM(snapshot_count), 0) AS snapshot_count,
+                MIN(first_seen) AS first_seen,
+                MAX(last_seen) AS last_seen
+            FROM adsb_rollup_hourly
+            WHERE hour >= %(full_start)s AND hour < %(full_end)s
+        )
+        SELECT
+            (rollup.message_count + (
+                SELECT COUNT(*) FROM adsb_messages
+                WHERE (received_at >= %(start)s AND received_at < %(full_start)s)
+                   OR received_at >= %(full_end)s
+            ))::bigint AS message_count,
+            (rollup.snapshot_count + (SELECT COUNT(*) FROM edges))::bigint AS snapshot_count,
+            (
+                SELECT COUNT(*) FROM (
+                    SELECT icao FROM adsb_rollup_aircraft
+                    WHERE hour >= %(full_start)s AND hour < %(full_end)s
+                    UNION
+                    SELECT icao FROM edges
+                ) seen
+            ) AS aircraft_count,
+            LEAST(rollup.first_seen, (SELECT MIN(captured_at) FROM edges)) AS first_seen,
+            GREATEST(rollup.last_seen, (SELECT MAX(captured_at) FROM edges)) AS last_seen
+        FROM rollup
+    """
+    return sql, {'start': start, 'full_start': full_start, 'full_end': full_end}
+
+
 @adsb_bp.route('/history/summary')
 def adsb_history_summary():
     """Summary stats for ADS-B history window."""
@@ -1216,20 +1435,11 @@ def adsb_history_summary():
     _ensure_history_schema()
 
     since_minutes = _parse_int_param(request.args.get('since_minutes'), 1440, 1, 10080)
-    window = f'{since_minutes} minutes'
-
-    sql = """
-        SELECT
-            (SELECT COUNT(*) FROM adsb_messages WHERE received_at >= NOW() - INTERVAL %s) AS message_count,
-            (SELECT COUNT(*) FROM adsb_snapshots WHERE captured_at >= NOW() - INTERVAL %s) AS snapshot_count,
-            (SELECT COUNT(DISTINCT icao) FROM adsb_snapshots WHERE captured_at >= NOW() - INTERVAL %s) AS aircraft_count,
-            (SELECT MIN(captured_at) FROM adsb_snapshots WHERE captured_at >= NOW() - INTERVAL %s) AS first_seen,
-            (SELECT MAX(captured_at) FROM adsb_snapshots WHERE captured_at >= NOW() - INTERVAL %s) AS last_seen
-    """
+    sql, params = _summary_query(datetime.now(timezone.utc), since_minutes)
 
     try:
         with _get_history_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, (window, window, window, window, window))
+            cur.execute(sql, params)
             row = cur.fetchone() or {}
         return jsonify(row)
     except Exception as exc:
@@ -1299,22 +1509,39 @@ def adsb_history_timeline():
 
     since_minutes = _parse_int_param(request.args.get('since_minutes'), 1440, 1, 10080)
     limit = _parse_int_param(request.args.get('limit'), 2000, 1, 20000)
-    window = f'{since_minutes} minutes'
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(minutes=since_minutes)
+    full_start, full_end = _history_rollup_span(start, now)
 
     sql = """
         SELECT captured_at, altitude, speed, heading, vertical_rate, lat, lon, squawk
         FROM adsb_snapshots
         WHERE icao = %s
-          AND captured_at >= NOW() - INTERVAL %s
+          AND captured_at >= %s
         ORDER BY captured_at ASC
         LIMIT %s
     """
+    # Snapshots per hour over the whole window, not cut off by the limit
+    hours_sql = f"""
+        SELECT hour, snapshot_count, first_seen, last_seen
+        FROM adsb_rollup_aircraft
+        WHERE icao = %(icao)s AND hour >= %(full_start)s AND hour < %(full_end)s
+        UNION ALL
+        SELECT {_hour_sql('captured_at')}, COUNT(*), MIN(captured_at), MAX(captured_at)
+        FROM adsb_snapshots
+        WHERE icao = %(icao)s
+          AND ((captured_at >= %(start)s AND captured_at < %(full_start)s) OR captured_at >= %(full_end)s)
+        GROUP BY 1
+        ORDER BY hour
+    """
 
     try:
         with _get_history_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, (icao, window, limit))
+            cur.execute(sql, (icao, start, limit))
             rows = cur.fetchall()
-        return jsonify({'icao': icao, 'timeline': rows, 'count': len(rows)})
+            cur.execute(hours_sql, {'icao': icao, 'start': start, 'full_start': full_start, 'full_end': full_end})
+            hours = cur.fetchall()
+        return jsonify({'icao': icao, 'timeline': rows, 'count': len(rows), 'hours': hours})
     except Exception as exc:
         logger.warning("ADS-B history timeline query failed: %s", exc)
         return api_error('History database unavailable', 503)
@@ -1353,15 +1580,15 @@ def adsb_history_messages():
 
 @adsb_bp.route('/history/export')
 def adsb_history_export():
-    """Export ADS-B history data in CSV or JSON format."""
+    """Export ADS-B history data as CSV, JSON or NDJSON, streamed as rows arrive."""
     if not ADSB_HISTORY_ENABLED or not PSYCOPG2_AVAILABLE:
         return api_error('ADS-B history is disabled', 503)
     _ensure_history_schema()
 
     export_format = str(request.args.get('format') or 'csv').strip().lower()
     export_type = str(request.args.get('type') or 'all').strip().lower()
-    if export_format not in {'csv', 'json'}:
-        return api_error('format must be csv or json', 400)
+    if export_format not in {'csv', 'json', 'ndjson'}:
+        return api_error('format must be csv, json, or ndjson', 400)
     if export_type not in {'messages', 'snapshots', 'sessions', 'all'}:
         return api_error('type must be messages, snapshots, sessions, or all', 400)
 
@@ -1371,108 +1598,24 @@ def adsb_history_export():
     classification = str(request.args.get('classification') or 'all').strip().lower()
     if classification not in {'all', 'military', 'civilian'}:
         classification = 'all'
-    pattern = f'%{search}%'
 
-    snapshots: list[dict[str, Any]] = []
-    messages: list[dict[str, Any]] = []
-    sessions: list[dict[str, Any]] = []
-
-    def _filter_by_classification(
-        rows: list[dict[str, Any]],
-        icao_key: str = 'icao',
-        callsign_key: str = 'callsign',
-    ) -> list[dict[str, Any]]:
-        if classification == 'all':
-            return rows
-        want_military = classification == 'military'
-        return [
-            r for r in rows
-            if _is_military_aircraft(r.get(icao_key, ''), r.get(callsign_key)) == want_military
-        ]
+    queries = {
+        section: _build_export_query(
+            section,
+            scope=scope,
+            since_minutes=since_minutes,
+            start=start,
+            end=end,
+            icao=icao,
+            search=search,
+            classification=classification,
+        )
+        for section in _EXPORT_SECTIONS
+        if export_type in {section, 'all'}
+    }
 
     try:
-        with _get_history_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
-            if export_type in {'snapshots', 'all'}:
-                snapshot_where: list[str] = []
-                snapshot_params: list[Any] = []
-                _add_time_filter(
-                    where_parts=snapshot_where,
-                    params=snapshot_params,
-                    scope=scope,
-                    timestamp_field='captured_at',
-                    since_minutes=since_minutes,
-                    start=start,
-                    end=end,
-                )
-                if icao:
-                    snapshot_where.append("icao = %s")
-                    snapshot_params.append(icao)
-                if search:
-                    snapshot_where.append("(icao ILIKE %s OR callsign ILIKE %s OR registration ILIKE %s)")
-                    snapshot_params.extend([pattern, pattern, pattern])
-
-                snapshot_sql = """
-                        SELECT captured_at, icao, callsign, registration, type_code, type_desc,
-                               altitude, speed, heading, vertical_rate, lat, lon, squawk, source_host
-                        FROM adsb_snapshots
-                    """
-                if snapshot_where:
-                    snapshot_sql += " WHERE " + " AND ".join(snapshot_where)
-                snapshot_sql += " ORDER BY captured_at DESC"
-                cur.execute(snapshot_sql, tuple(snapshot_params))
-                snapshots = _filter_by_classification(cur.fetchall())
-
-            if export_type in {'messages', 'all'}:
-                message_where: list[str] = []
-                message_params: list[Any] = []
-                _add_time_filter(
-                    where_parts=message_where,
-                    params=message_params,
-                    scope=scope,
-                    timestamp_field='received_at',
-                    since_minutes=since_minutes,
-                    start=start,
-                    end=end,
-                )
-                if icao:
-                    message_where.append("icao = %s")
-                    message_params.append(icao)
-                if search:
-                    message_where.append("(icao ILIKE %s OR callsign ILIKE %s)")
-                    message_params.extend([pattern, pattern])
-
-                message_sql = """
-                        SELECT received_at, msg_time, logged_time, icao, msg_type, callsign,
-                               altitude, speed, heading, vertical_rate, lat, lon, squawk,
-                               session_id, aircraft_id, flight_id, source_host, raw_line
-                        FROM adsb_messages
-                    """
-                if message_where:
-                    message_sql += " WHERE " + " AND ".join(message_where)
-                message_sql += " ORDER BY received_at DESC"
-                cur.execute(message_sql, tuple(message_params))
-                messages = _filter_by_classification(cur.fetchall())
-
-            if export_type in {'sessions', 'all'}:
-                session_where: list[str] = []
-                session_params: list[Any] = []
-                if scope == 'custom' and start is not None and end is not None:
-                    session_where.append("COALESCE(ended_at, %s) >= %s AND started_at < %s")
-                    session_params.extend([end, start, end])
-                elif scope == 'window':
-                    session_where.append("COALESCE(ended_at, NOW()) >= NOW() - INTERVAL %s")
-                    session_params.append(f'{since_minutes} minutes')
-
-                session_sql = """
-                        SELECT id, started_at, ended_at, device_index, sdr_type, remote_host,
-                               remote_port, start_source, stop_source, started_by, stopped_by, notes
-                        FROM adsb_sessions
-                    """
-                if session_where:
-                    session_sql += " WHERE " + " AND ".join(session_where)
-                session_sql += " ORDER BY started_at DESC"
-                cur.execute(session_sql, tuple(session_params))
-                sessions = cur.fetchall()
+        conn = _get_history_connection()
     except Exception as exc:
         logger.warning("ADS-B history export failed: %s", exc)
         return api_error('History database unavailable', 503)
@@ -1482,8 +1625,20 @@ def adsb_history_export():
     filename_scope = 'all' if scope == 'all' else ('custom' if scope == 'custom' else f'{since_minutes}m')
     filename = f'adsb_history_{export_type}_{filename_scope}_{timestamp}.{export_format}'
 
-    if export_format == 'json':
-        payload = {
+    if export_format == 'csv':
+        header_rows: list[list[Any]] = [['Exported At', exported_at], ['Scope', scope]]
+        if scope == 'window':
+            header_rows.append(['Since Minutes', since_minutes])
+        if icao:
+            header_rows.append(['ICAO Filter', icao])
+        if search:
+            header_rows.append(['Search Filter', search])
+        if classification != 'all':
+            header_rows.append(['Classification', classification])
+        chunks = _iter_export_csv(conn, queries, header_rows)
+        mimetype = 'text/csv'
+    else:
+        meta = {
             'exported_at': exported_at,
             'format': export_format,
             'type': export_type,
@@ -1496,36 +1651,20 @@ def adsb_history_export():
                 'start': start.isoformat() if start else None,
                 'end': end.isoformat() if end else None,
             },
-            'counts': {
-                'messages': len(messages),
-                'snapshots': len(snapshots),
-                'sessions': len(sessions),
-            },
-            'messages': _rows_to_serializable(messages),
-            'snapshots': _rows_to_serializable(snapshots),
-            'sessions': _rows_to_serializable(sessions),
         }
-        response = Response(
-            json.dumps(payload, indent=2, default=str),
-            mimetype='application/json',
-        )
-        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-        return response
-
-    csv_data = _build_export_csv(
-        exported_at=exported_at,
-        scope=scope,
-        since_minutes=since_minutes if scope == 'window' else None,
-        icao=icao,
-        search=search,
-        classification=classification,
-        messages=messages,
-        snapshots=snapshots,
-        sessions=sessions,
-        export_type=export_type,
-    )
-    response = Response(csv_data, mimetype='text/csv')
+        if export_format == 'json':
+            chunks = _iter_export_json(conn, queries, meta)
+            mimetype = 'application/json'
+        else:
+            chunks = _iter_export_ndjson(conn, queries, meta)
+            mimetype = 'application/x-ndjson'
+
+    response = Response(_log_export_errors(chunks), mimetype=mimetype)
+    # The body may never be iterated (HEAD, client gone before the first
+    # chunk), so the connection is released with the response, not the body
+    response.call_on_close(conn.close)
     response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'
     return response
 
 
@@ -1541,15 +1680,23 @@ def adsb_history_prune():
     if mode not in {'range', 'all'}:
         return api_error('mode must be range or all', 400)
 
+    start = end = None
+    if mode == 'range':
+        start = _parse_iso_datetime(payload.get('start'))
+        end = _parse_iso_datetime(payload.get('end'))
+        if start is None or end is None:
+            return api_error('start and end ISO datetime values are required', 400)
+        if end <= start:
+            return api_error('end must be after start', 400)
+        if end - start > timedelta(days=31):
+            return api_error('range cannot exceed 31 days', 400)
+
     try:
         with _get_history_connection() as conn, conn.cursor() as cur:
-            deleted = {'messages': 0, 'snapshots': 0}
+            removed = prune_history(cur, start, end)
+            deleted = {'messages': removed['adsb_messages'], 'snapshots': removed['adsb_snapshots']}
 
             if mode == 'all':
-                cur.execute("DELETE FROM adsb_messages")
-                deleted['messages'] = max(0, cur.rowcount or 0)
-                cur.execute("DELETE FROM adsb_snapshots")
-                deleted['snapshots'] = max(0, cur.rowcount or 0)
                 return jsonify({
                     'status': 'ok',
                     'mode': 'all',
@@ -1557,35 +1704,6 @@ def adsb_history_prune():
                     'total_deleted': deleted['messages'] + deleted['snapshots'],
                 })
 
-            start = _parse_iso_datetime(payload.get('start'))
-            end = _parse_iso_datetime(payload.get('end'))
-            if start is None or end is None:
-                return api_error('start and end ISO datetime values are required', 400)
-            if end <= start:
-                return api_error('end must be after start', 400)
-            if end - start > timedelta(days=31):
-                return api_error('range cannot exceed 31 days', 400)
-
-            cur.execute(
-                """
-                    DELETE FROM adsb_messages
-                    WHERE received_at >= %s
-                      AND received_at < %s
-                    """,
-                (start, end),
-            )
-            deleted['messages'] = max(0, cur.rowcount or 0)
-
-            cur.execute(
-                """
-                    DELETE FROM adsb_snapshots
-                    WHERE captured_at >= %s
-                      AND captured_at < %s
-                    """,
-                (start, end),
-            )
-            deleted['snapshots'] = max(0, cur.rowcount or 0)
-
             return jsonify({
                 'status': 'ok',
                 'mode': 'range',
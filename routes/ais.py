@@ -22,6 +22,7 @@ from utils.constants import (
     AIS_TCP_PORT,
     AIS_TERMINATE_TIMEOUT,
     AIS_UPDATE_INTERVAL,
+    MAX_VESSEL_AGE_SECONDS,
     PROCESS_TERMINATE_TIMEOUT,
     SOCKET_BUFFER_SIZE,
     SSE_KEEPALIVE_INTERVAL,
@@ -31,13 +32,24 @@ from utils.event_pipeline import process_event
 from utils.logging import get_logger
 from utils.responses import api_error, api_success
 from utils.sdr import SDRFactory, SDRType
-from utils.sse import sse_stream_fanout
+from utils.sse import DeltaSubscriber, EntityRevisions, sse_stream_fanout
+from utils.stream_codec import KeyDictionary, negotiate_codec
 from utils.validation import validate_device_index, validate_gain
 
 logger = get_logger('intercept.ais')
 
 ais_bp = Blueprint('ais', __name__, url_prefix='/ais')
 
+# Field revisions of queued vessels, for clients streaming deltas
+ais_revisions = EntityRevisions('mmsi', max_age_seconds=MAX_VESSEL_AGE_SECONDS)
+
+# Key numbering for clients streaming a binary codec
+ais_stream_keys = KeyDictionary([
+    'type', 'mmsi', 'lat', 'lon', 'speed', 'course', 'heading', 'nav_status', 'nav_status_text',
+    'name', 'callsign', 'ship_type', 'ship_type_text', 'destination', 'eta', 'length', 'width',
+    'draught', 'rate_of_turn', 'last_msg_type', 'last_seen', 'rev', 'since',
+])
+
 # Track AIS state
 ais_running = False
 ais_connected = False
@@ -127,6 +139,7 @@ def parse_ais_stream(port: int):
                         for mmsi in pending_updates:
                             if mmsi in app_module.ais_vessels:
                                 _vessel_snap = app_module.ais_vessels[mmsi]
+                                ais_revisions.update(_vessel_snap)
                                 with contextlib.suppress(queue.Full):
                                     app_module.ais_queue.put_nowait({
                                         'type': 'vessel',
@@ -494,15 +507,27 @@ def stop_ais():
         ais_active_sdr_type = None
 
     app_module.ais_vessels.clear()
+    ais_revisions.clear()
     return jsonify({'status': 'stopped'})
 
 
 @ais_bp.route('/stream')
 def stream_ais():
-    """SSE stream for AIS vessels."""
+    """SSE stream for AIS vessels.
+
+    With ``?delta=1`` vessel messages carry only changed fields, as for
+    the ADS-B stream, with a full keyframe on connect and periodically.
+    ``?codec=cbor`` or ``?codec=msgpack`` selects a binary encoding.
+    """
     def _on_msg(msg: dict[str, Any]) -> None:
         process_event('ais', msg, msg.get('type'))
 
+    codec = negotiate_codec(request.args.get('codec'), ais_stream_keys)
+    delta = (
+        DeltaSubscriber(ais_revisions, 'vessel', codec=codec)
+        if request.args.get('delta') in ('1', 'true') else None
+    )
+
     response = Response(
         sse_stream_fanout(
             source_queue=app_module.ais_queue,
@@ -510,6 +535,8 @@ def stream_ais():
             timeout=SSE_QUEUE_TIMEOUT,
             keepalive_interval=SSE_KEEPALIVE_INTERVAL,
             on_message=_on_msg,
+            delta=delta,
+            codec=codec,
         ),
         mimetype='text/event-stream',
     )
@@ -15,7 +15,7 @@ import logging
 import threading
 import time
 from collections.abc import Generator
-from datetime import datetime
+from datetime import datetime, timezone
 
 from flask import Blueprint, Response, jsonify, request
 
@@ -24,10 +24,12 @@ from utils.bluetooth import (
     check_capabilities,
     get_bluetooth_scanner,
 )
-from utils.database import get_db
+from utils.constants import MAX_BT_DEVICE_AGE_SECONDS
+from utils.database import get_db, get_write_behind_buffer
 from utils.event_pipeline import process_event
 from utils.responses import api_error
-from utils.sse import format_sse
+from utils.sse import DeltaSubscriber, EntityRevisions, format_sse
+from utils.stream_codec import KeyDictionary, negotiate_codec
 
 logger = logging.getLogger('intercept.bluetooth_v2')
 
@@ -39,6 +41,12 @@ _bt_seen_cache: set[str] = set()
 _bt_session_seen: set[str] = set()
 _bt_seen_lock = threading.Lock()
 
+# Field revisions of device summaries, for delta polling and streaming
+bt_revisions = EntityRevisions('device_id', max_age_seconds=MAX_BT_DEVICE_AGE_SECONDS)
+
+# Key numbering for clients streaming a binary codec; filled as fields appear
+bt_stream_keys = KeyDictionary()
+
 # =============================================================================
 # DATABASE FUNCTIONS
 # =============================================================================
@@ -169,17 +177,23 @@ def get_all_baselines() -> list[dict]:
         return [dict(row) for row in cursor]
 
 
+_observation_buffer = get_write_behind_buffer('bt_observation_history', '''
+    INSERT INTO bt_observation_history (device_id, rssi, seen_count, timestamp)
+    VALUES (?, ?, ?, ?)
+''')
+
+
 def save_observation_history(device: BTDeviceAggregate) -> None:
-    """Save device observation to history."""
-    with get_db() as conn:
-        conn.execute('''
-            INSERT INTO bt_observation_history (device_id, rssi, seen_count)
-            VALUES (?, ?, ?)
-        ''', (device.device_id, device.rssi_current, device.seen_count))
+    """Queue device observation for the batched history writer."""
+    _observation_buffer.append((
+        device.device_id, device.rssi_current, device.seen_count,
+        datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+    ))
 
 
 def load_seen_device_ids() -> set[str]:
     """Load distinct device IDs from history for seen-before tracking."""
+    _observation_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('SELECT DISTINCT device_id FROM bt_observation_history')
         return {row['device_id'] for row in cursor}
@@ -338,9 +352,14 @@ def list_devices():
         - protocol: Protocol filter ('ble', 'classic')
         - max_age: Maximum age in seconds
         - heuristic: Filter by heuristic flag ('new', 'persistent', etc.)
+        - since: Revision from a previous response; only devices changed
+          after it are returned, with only their changed fields, and the
+          ids of devices the scanner stopped tracking since are listed in
+          ``removed``. If that history is no longer available the full
+          list is returned with ``reset`` set.
 
     Returns:
-        JSON array of device summaries.
+        JSON array of device summaries and the current revision.
     """
     scanner = get_bluetooth_scanner()
 
@@ -351,6 +370,7 @@ def list_devices():
     protocol = request.args.get('protocol')
     max_age = request.args.get('max_age', 300, type=float)
     heuristic_filter = request.args.get('heuristic')
+    since = request.args.get('since', 0, type=int)
 
     # Get devices
     devices = scanner.get_devices(
@@ -365,9 +385,39 @@ def list_devices():
     if heuristic_filter:
         devices = [d for d in devices if heuristic_filter in d.heuristic_flags]
 
+    summaries = [d.to_summary_dict() for d in devices]
+    for summary in summaries:
+        bt_revisions.update(summary)
+    if since <= 0:
+        return jsonify({
+            'count': len(summaries),
+            'devices': summaries,
+            'revision': bt_revisions.revision,
+        })
+
+    tracked = scanner.get_devices(max_age_seconds=MAX_BT_DEVICE_AGE_SECONDS)
+    bt_revisions.retain(d.device_id for d in tracked)
+    removed = bt_revisions.removed_since(since)
+    if removed is None:
+        return jsonify({
+            'count': len(summaries),
+            'devices': summaries,
+            'removed': [],
+            'reset': True,
+            'revision': bt_revisions.revision,
+        })
+
+    changed = []
+    for summary in summaries:
+        current = bt_revisions.delta(summary['device_id'], since)
+        if current and current[0] > since:
+            changed.append({**current[1], 'device_id': summary['device_id'], 'rev': current[0]})
+
     return jsonify({
-        'count': len(devices),
-        'devices': [d.to_summary_dict() for d in devices],
+        'count': len(changed),
+        'devices': changed,
+        'removed': [device_id for device_id, _ in removed],
+        'revision': bt_revisions.revision,
     })
 
 
@@ -865,10 +915,21 @@ def stream_events():
     """
     SSE event stream for real-time device updates.
 
+    With ``?delta=1`` device_update events carry only the fields changed
+    since this client's last event for the device, with a full keyframe
+    of every device on connect and periodically, and devices that expire
+    are sent as ``{'device_id': ..., 'removed': true}``. ``?codec=cbor`` or
+    ``?codec=msgpack`` selects a binary encoding.
+
     Returns:
         Server-Sent Events stream.
     """
     scanner = get_bluetooth_scanner()
+    codec = negotiate_codec(request.args.get('codec'), bt_stream_keys)
+    if request.args.get('delta') in ('1', 'true'):
+        delta = DeltaSubscriber(bt_revisions, None, codec=codec, removals=True)
+    else:
+        delta = None
 
     def map_event_type(event: dict) -> tuple[str, dict]:
         """Map internal event types to SSE event names."""
@@ -899,7 +960,17 @@ def stream_events():
             event_name, event_data = map_event_type(event)
             with contextlib.suppress(Exception):
                 process_event('bluetooth', event_data, event_name)
-            yield format_sse(event_data, event=event_name)
+            if delta is None:
+                yield format_sse(event_data, event=event_name, codec=codec)
+                continue
+            for keyframe in delta.tick():
+                yield format_sse(keyframe, event='device_update', codec=codec)
+            if event_name == 'device_update' and 'device_id' in event_data:
+                bt_revisions.update(event_data)
+                event_data = delta.encode(event_data)
+                if event_data is None:
+                    continue
+            yield format_sse(event_data, event=event_name, codec=codec)
 
     return Response(
         event_generator(),
@@ -922,6 +993,7 @@ def clear_devices():
     """
     scanner = get_bluetooth_scanner()
     scanner.clear_devices()
+    bt_revisions.clear()
 
     return jsonify({'status': 'cleared'})
 
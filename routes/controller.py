@@ -597,6 +597,9 @@ def ingest_push_data():
 
     Expected header:
         X-API-Key: shared-secret (if agent has api_key configured)
+
+    Responds 202 with the ``payload_id`` the payload will be stored under;
+    the row itself is written with the next batch.
     """
     data = request.json
     if not data:
@@ -625,7 +628,8 @@ def ingest_push_data():
             scan_type=data.get('scan_type', 'unknown'),
             payload=data.get('payload', {}),
             interface=data.get('interface'),
-            received_at=data.get('received_at')
+            received_at=data.get('received_at'),
+            defer=True
         )
 
         # Emit to SSE stream (fanout to all connected clients)
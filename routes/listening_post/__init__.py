@@ -82,6 +82,7 @@ scanner_config = {
     'bias_t': False,  # Bias-T power for external LNA
     'sdr_type': 'rtlsdr',  # SDR type: rtlsdr, hackrf, airspy, limesdr, sdrplay
     'scan_method': 'power',  # power (rtl_power) or classic (rtl_fm hop)
+    'power_handoff': True,  # Demodulate power-scan hits for the dwell time
     'snr_threshold': 8,
 }
 
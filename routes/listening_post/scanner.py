@@ -288,230 +288,457 @@ def scanner_loop():
         logger.info("Scanner thread stopped")
 
 
-def scanner_loop_power():
-    """Power sweep scanner using rtl_power to detect peaks."""
-    logger.info("Power sweep scanner thread started")
-    add_activity_log('scanner_start', scanner_config['start_freq'],
-                     f"Power sweep {scanner_config['start_freq']}-{scanner_config['end_freq']} MHz")
+# Seconds of integration per rtl_power sweep
+POWER_MIN_INTEGRATION = 0.3
+POWER_MAX_INTEGRATION = 1.0
 
-    rtl_power_path = find_rtl_power()
-    if not rtl_power_path:
-        logger.error("rtl_power not found")
-        add_activity_log('error', 0, 'rtl_power not found')
-        _state.scanner_running = False
-        return
+# Consecutive sweeps a channel may be missing before it counts as lost
+POWER_HOLD_SWEEPS = 2
 
-    try:
-        while _state.scanner_running:
-            if _state.scanner_paused:
-                time.sleep(0.1)
-                continue
+# Seconds between scan_cycle log entries / scan_stats events
+POWER_STATS_INTERVAL = 30.0
 
-            start_mhz = scanner_config['start_freq']
-            end_mhz = scanner_config['end_freq']
-            step_khz = scanner_config['step']
-            gain = scanner_config['gain']
-            device = scanner_config['device']
-            scanner_config['squelch']
-            mod = scanner_config['modulation']
 
-            # Configure sweep
-            bin_hz = max(1000, int(step_khz * 1000))
-            start_hz = int(start_mhz * 1e6)
-            end_hz = int(end_mhz * 1e6)
-            # Integration time per sweep (seconds)
-            integration = max(0.3, min(1.0, scanner_config.get('scan_delay', 0.5)))
-
-            cmd = [
-                rtl_power_path,
-                '-f', f'{start_hz}:{end_hz}:{bin_hz}',
-                '-i', f'{integration}',
-                '-1',
-                '-g', str(gain),
-                '-d', str(device),
-            ]
+def _parse_power_segment(line: str) -> tuple[str, float, float, float, list[float]] | None:
+    """Parse one rtl_power CSV line into (timestamp, start_hz, end_hz, bin_hz, dB values)."""
+    if not line or line.startswith('#'):
+        return None
 
-            try:
-                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-                _state.scanner_power_process = proc
-                stdout, _ = proc.communicate(timeout=15)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                stdout = b''
-            finally:
-                _state.scanner_power_process = None
+    parts = [p.strip() for p in line.split(',')]
+    # Find start_hz token
+    start_idx = None
+    for i, tok in enumerate(parts):
+        try:
+            val = float(tok)
+        except ValueError:
+            continue
+        if val > 1e5:
+            start_idx = i
+            break
+    if start_idx is None or len(parts) < start_idx + 6:
+        return None
 
-            if not _state.scanner_running:
-                break
+    try:
+        seg_start = float(parts[start_idx])
+        seg_end = float(parts[start_idx + 1])
+        seg_bin = float(parts[start_idx + 2])
+    except ValueError:
+        return None
+
+    raw_values = []
+    for v in parts[start_idx + 3:]:
+        try:
+            raw_values.append(float(v))
+        except ValueError:
+            continue
+    # rtl_power may include a samples field before the power list
+    if raw_values and raw_values[0] >= 0 and any(val < 0 for val in raw_values[1:]):
+        raw_values = raw_values[1:]
+    if not raw_values:
+        return None
+
+    return ','.join(parts[:start_idx]), seg_start, seg_end, seg_bin, raw_values
+
+
+def _find_peaks(bin_values: list[float], noise_floor: float, snr_threshold: float) -> list[tuple[int, float]]:
+    """Strongest bin of each cluster of bins above the SNR threshold."""
+    peaks = []
+    peak_idx = None
+    peak_val = 0.0
+    for idx, val in enumerate(bin_values):
+        if val - noise_floor >= snr_threshold:
+            if peak_idx is None or val > peak_val:
+                peak_idx, peak_val = idx, val
+        elif peak_idx is not None:
+            peaks.append((peak_idx, peak_val))
+            peak_idx = None
+    if peak_idx is not None:
+        peaks.append((peak_idx, peak_val))
+    return peaks
+
+
+class PowerSweepEngine:
+    """Continuous rtl_power scanner.
+
+    Keeps a single rtl_power process streaming sweeps, assembles its CSV
+    output into sweeps as lines arrive and runs a per-channel squelch over
+    the bins. A channel crossing the SNR threshold is handed to the
+    demodulator for the dwell time; sweeping resumes afterwards and the time
+    spent away is counted as blind time in the stats.
+    """
+
+    def __init__(self, rtl_power_path: str | None = None):
+        self.rtl_power_path = rtl_power_path
+        self.process: subprocess.Popen | None = None
+
+        # Sweep assembly
+        self._segments: list[tuple[float, float, float, list[float]]] = []
+        self._sweep_ts: str | None = None
+        self._last_seg_start: float | None = None
+        self._sweep_started: float | None = None
+
+        # Channel -> detection state for signals currently above squelch
+        self._active: dict[int, dict[str, Any]] = {}
+
+        # Counters
+        self.sweeps = 0
+        self.hops = 0
+        self.hits = 0
+        self.transient_hits = 0
+        self.handoffs = 0
+        self.blind_seconds = 0.0
+        self._timed_sweeps = 0
+        self._timed_hops = 0
+        self._timed_seconds = 0.0
+        self._last_stats_report = time.monotonic()
+
+    # ---- Incremental parsing ----
+
+    def feed_line(self, line: str, now: float | None = None) -> list[dict[str, Any]] | None:
+        """Consume one line of rtl_power output.
+
+        A line that starts the next sweep completes the previous one; the
+        new hits of that sweep are returned. Returns None while a sweep is
+        still being assembled.
+        """
+        parsed = _parse_power_segment(line)
+        if parsed is None:
+            return None
+        now = time.monotonic() if now is None else now
+        ts, seg_start, seg_end, seg_bin, values = parsed
+
+        hits = None
+        new_sweep = (
+            self._segments
+            and (ts != self._sweep_ts or (self._last_seg_start is not None and seg_start <= self._last_seg_start))
+        )
+        if new_sweep:
+            hits = self._complete_sweep(now)
+        if not self._segments:
+            self._sweep_ts = ts
+            if self._sweep_started is None:
+                self._sweep_started = now
+
+        self._segments.append((seg_start, seg_end, seg_bin, values))
+        self._last_seg_start = seg_start
+        return hits
+
+    def flush(self, now: float | None = None) -> list[dict[str, Any]] | None:
+        """Process a partially assembled sweep (end of stream)."""
+        if not self._segments:
+            return None
+        return self._complete_sweep(time.monotonic() if now is None else now, timed=False)
+
+    def _complete_sweep(self, now: float, timed: bool = True) -> list[dict[str, Any]]:
+        segments = sorted(self._segments, key=lambda seg: seg[0])
+        self._segments = []
+        self._last_seg_start = None
+
+        self.sweeps += 1
+        self.hops += len(segments)
+        if timed and self._sweep_started is not None:
+            self._timed_sweeps += 1
+            self._timed_hops += len(segments)
+            self._timed_seconds += now - self._sweep_started
+        self._sweep_started = now if timed else None
+
+        return self._process_sweep(segments, now)
+
+    # ---- Detection ----
+
+    def _process_sweep(self, segments: list[tuple[float, float, float, list[float]]],
+                       now: float) -> list[dict[str, Any]]:
+        """Emit progress for a sweep and update the squelch state of each channel."""
+        snr_threshold = float(scanner_config.get('snr_threshold', 12))
+        threshold = int(snr_threshold * 100)
+        total_bins = sum(len(seg[3]) for seg in segments)
+        segment_offset = 0
+        seen: set[int] = set()
+        hits = []
+
+        for seg_start, _seg_end, seg_bin, bin_values in segments:
+            # Noise floor (median)
+            noise_floor = sorted(bin_values)[len(bin_values) // 2]
+
+            # Emit progress updates (throttled)
+            emit_stride = max(1, len(bin_values) // 60)
+            for idx in range(0, len(bin_values), emit_stride):
+                self._emit_level(seg_start + seg_bin * idx, bin_values[idx] - noise_floor,
+                                 snr_threshold, (segment_offset + idx) / max(1, total_bins - 1))
+            last = len(bin_values) - 1
+            if last % emit_stride:
+                self._emit_level(seg_start + seg_bin * last, bin_values[last] - noise_floor,
+                                 snr_threshold, (segment_offset + last) / max(1, total_bins - 1))
+            segment_offset += len(bin_values)
+
+            for idx, val in _find_peaks(bin_values, noise_floor, snr_threshold):
+                freq_hz = seg_start + seg_bin * (idx + 0.5)
+                channel = int(round(freq_hz / seg_bin)) if seg_bin > 0 else int(freq_hz)
+                snr = val - noise_floor
+                # A signal drifting by a bin is still the same signal
+                key = next((c for c in (channel, channel - 1, channel + 1) if c in self._active), None)
+                if key is not None:
+                    state = self._active[key]
+                    state.update(last_seen=now, missed=0, snr=snr)
+                    state['sweeps'] += 1
+                    seen.add(key)
+                    continue
 
-            if not stdout:
-                add_activity_log('error', start_mhz, 'Power sweep produced no data')
+                self.hits += 1
+                state = {
+                    'frequency': freq_hz / 1e6,
+                    'first_seen': now,
+                    'last_seen': now,
+                    'sweeps': 1,
+                    'missed': 0,
+                    'snr': snr,
+                    'threshold': threshold,
+                }
+                self._active[channel] = state
+                seen.add(channel)
+                hits.append(state)
+
+        for channel in [c for c in self._active if c not in seen]:
+            state = self._active[channel]
+            state['missed'] += 1
+            if state['missed'] >= POWER_HOLD_SWEEPS:
+                del self._active[channel]
+                self._signal_lost(state)
+
+        return hits
+
+    def _emit_level(self, freq_hz: float, snr: float, snr_threshold: float, progress: float) -> None:
+        _state.scanner_current_freq = freq_hz / 1e6
+        with contextlib.suppress(queue.Full):
+            scanner_queue.put_nowait({
+                'type': 'scan_update',
+                'frequency': _state.scanner_current_freq,
+                'level': int(max(0, snr) * 100),
+                'threshold': int(snr_threshold * 100),
+                'detected': snr >= snr_threshold,
+                'progress': min(1.0, progress),
+                'range_start': scanner_config['start_freq'],
+                'range_end': scanner_config['end_freq']
+            })
+
+    def signal_found(self, hit: dict[str, Any], audio_streaming: bool = False) -> None:
+        """Log and announce a new hit."""
+        mod = scanner_config['modulation']
+        freq_mhz = hit['frequency']
+        add_activity_log('signal_found', freq_mhz,
+                         f'Peak detected at {freq_mhz:.3f} MHz ({mod.upper()})')
+        with contextlib.suppress(queue.Full):
+            scanner_queue.put_nowait({
+                'type': 'signal_found',
+                'frequency': freq_mhz,
+                'modulation': mod,
+                'audio_streaming': audio_streaming,
+                'level': int(max(0, hit['snr']) * 100),
+                'threshold': hit['threshold'],
+                'snr': round(hit['snr'], 1),
+                'range_start': scanner_config['start_freq'],
+                'range_end': scanner_config['end_freq']
+            })
+
+    def _signal_lost(self, state: dict[str, Any]) -> None:
+        # Seen on a single sweep: the activity was shorter than the revisit
+        # time, so most of it fell between visits
+        if state['sweeps'] == 1:
+            self.transient_hits += 1
+        duration = state['last_seen'] - state['first_seen']
+        add_activity_log('signal_lost', state['frequency'],
+                         f"Signal lost after {duration:.1f}s ({state['sweeps']} sweeps)")
+        with contextlib.suppress(queue.Full):
+            scanner_queue.put_nowait({
+                'type': 'signal_lost',
+                'frequency': state['frequency'],
+                'range_start': scanner_config['start_freq'],
+                'range_end': scanner_config['end_freq']
+            })
+
+    # ---- Stats ----
+
+    def stats(self) -> dict[str, Any]:
+        """Hop rate, revisit time and missed-activity counters."""
+        revisit = self._timed_seconds / self._timed_sweeps if self._timed_sweeps else 0.0
+        return {
+            'sweeps': self.sweeps,
+            'hops': self.hops,
+            'sweep_rate': round(1.0 / revisit, 3) if revisit else 0.0,
+            'hop_rate': round(self._timed_hops / self._timed_seconds, 2) if self._timed_seconds else 0.0,
+            'revisit_s': round(revisit, 3),
+            'hits': self.hits,
+            'active': len(self._active),
+            'transient_hits': self.transient_hits,
+            'missed_activity_rate': round(self.transient_hits / self.hits, 3) if self.hits else 0.0,
+            'handoffs': self.handoffs,
+            'blind_s': round(self.blind_seconds, 1),
+            'missed_sweeps': int(self.blind_seconds / revisit) if revisit else 0,
+        }
+
+    def _report_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._last_stats_report < POWER_STATS_INTERVAL:
+            return
+        self._last_stats_report = now
+        stats = self.stats()
+        add_activity_log('scan_cycle', scanner_config['start_freq'],
+                         f"{stats['sweeps']} sweeps, {stats['hop_rate']} hops/s, "
+                         f"revisit {stats['revisit_s']}s, {stats['missed_sweeps']} sweeps missed")
+        with contextlib.suppress(queue.Full):
+            scanner_queue.put_nowait({'type': 'scan_stats', **stats})
+
+    # ---- Process management ----
+
+    @staticmethod
+    def _config_key() -> tuple:
+        return tuple(scanner_config.get(k) for k in (
+            'start_freq', 'end_freq', 'step', 'gain', 'device', 'scan_delay', 'bias_t'))
+
+    def _command(self) -> list[str]:
+        bin_hz = max(1000, int(scanner_config['step'] * 1000))
+        start_hz = int(scanner_config['start_freq'] * 1e6)
+        end_hz = int(scanner_config['end_freq'] * 1e6)
+        integration = max(POWER_MIN_INTEGRATION,
+                          min(POWER_MAX_INTEGRATION, scanner_config.get('scan_delay', 0.5)))
+        cmd = [
+            self.rtl_power_path,
+            '-f', f'{start_hz}:{end_hz}:{bin_hz}',
+            '-i', f'{integration}',
+            '-g', str(scanner_config['gain']),
+            '-d', str(scanner_config['device']),
+        ]
+        if scanner_config.get('bias_t', False):
+            cmd.append('-T')
+        return cmd
+
+    def _start_process(self) -> subprocess.Popen:
+        self._segments = []
+        self._last_seg_start = None
+        self._sweep_started = None
+        proc = subprocess.Popen(
+            self._command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=1,
+            text=True,
+        )
+        self.process = proc
+        _state.scanner_power_process = proc
+        return proc
+
+    def _stop_process(self) -> None:
+        proc = self.process
+        self.process = None
+        _state.scanner_power_process = None
+        if proc and proc.poll() is None:
+            try:
+                proc.terminate()
+                proc.wait(timeout=1)
+            except Exception:
+                with contextlib.suppress(Exception):
+                    proc.kill()
+
+    def _handoff(self, hit: dict[str, Any]) -> None:
+        """Release the tuner to the demodulator for the dwell time."""
+        self._stop_process()
+        started = time.monotonic()
+        self.handoffs += 1
+        freq_mhz = hit['frequency']
+        mod = scanner_config['modulation']
+        _state.scanner_current_freq = freq_mhz
+        logger.info(f"Signal found at {freq_mhz:.3f} MHz, demodulating")
+        _start_audio_stream(freq_mhz, mod)
+
+        while (time.monotonic() - started) < scanner_config['dwell_time'] and _state.scanner_running:
+            if _state.scanner_skip_signal:
+                _state.scanner_skip_signal = False
                 with contextlib.suppress(queue.Full):
                     scanner_queue.put_nowait({
-                        'type': 'scan_update',
-                        'frequency': end_mhz,
-                        'level': 0,
-                        'threshold': int(float(scanner_config.get('snr_threshold', 12)) * 100),
-                        'detected': False,
-                        'range_start': scanner_config['start_freq'],
-                        'range_end': scanner_config['end_freq']
+                        'type': 'signal_skipped',
+                        'frequency': freq_mhz
                     })
-                time.sleep(0.2)
-                continue
+                break
+            time.sleep(0.2)
 
-            lines = stdout.decode(errors='ignore').splitlines()
-            segments = []
-            for line in lines:
-                if not line or line.startswith('#'):
-                    continue
+        _stop_audio_stream()
+        self.blind_seconds += time.monotonic() - started
 
-                parts = [p.strip() for p in line.split(',')]
-                # Find start_hz token
-                start_idx = None
-                for i, tok in enumerate(parts):
-                    try:
-                        val = float(tok)
-                    except ValueError:
+    def run(self) -> None:
+        """Stream sweeps until the scanner is stopped."""
+        while _state.scanner_running:
+            if _state.scanner_paused:
+                time.sleep(0.1)
+                continue
+
+            config_key = self._config_key()
+            proc = self._start_process()
+            received = False
+            try:
+                for line in proc.stdout:
+                    if not _state.scanner_running or _state.scanner_paused:
+                        break
+                    hits = self.feed_line(line)
+                    if hits is None:
                         continue
-                    if val > 1e5:
-                        start_idx = i
+                    received = True
+                    self._report_stats()
+
+                    target = None
+                    if hits and scanner_config.get('power_handoff', True):
+                        target = max(hits, key=lambda h: h['snr'])
+                    for hit in hits:
+                        self.signal_found(hit, audio_streaming=hit is target)
+                    if target is not None and _state.scanner_running:
+                        self._handoff(target)
                         break
-                if start_idx is None or len(parts) < start_idx + 6:
-                    continue
-
-                try:
-                    sweep_start = float(parts[start_idx])
-                    sweep_end = float(parts[start_idx + 1])
-                    sweep_bin = float(parts[start_idx + 2])
-                    raw_values = []
-                    for v in parts[start_idx + 3:]:
-                        try:
-                            raw_values.append(float(v))
-                        except ValueError:
-                            continue
-                    # rtl_power may include a samples field before the power list
-                    if raw_values and raw_values[0] >= 0 and any(val < 0 for val in raw_values[1:]):
-                        raw_values = raw_values[1:]
-                    bin_values = raw_values
-                except ValueError:
-                    continue
-
-                if not bin_values:
-                    continue
-
-                segments.append((sweep_start, sweep_end, sweep_bin, bin_values))
+                    if config_key != self._config_key():
+                        break  # Retune: restart with the new range/gain
+            finally:
+                self._stop_process()
 
-            if not segments:
-                add_activity_log('error', start_mhz, 'Power sweep bins missing')
+            if _state.scanner_running and not _state.scanner_paused and not received:
+                add_activity_log('error', scanner_config['start_freq'], 'Power sweep produced no data')
                 with contextlib.suppress(queue.Full):
                     scanner_queue.put_nowait({
                         'type': 'scan_update',
-                        'frequency': end_mhz,
+                        'frequency': scanner_config['end_freq'],
                         'level': 0,
                         'threshold': int(float(scanner_config.get('snr_threshold', 12)) * 100),
                         'detected': False,
                         'range_start': scanner_config['start_freq'],
                         'range_end': scanner_config['end_freq']
                     })
-                time.sleep(0.2)
-                continue
+                time.sleep(1.0)
 
-            # Process segments in ascending frequency order to avoid backtracking in UI
-            segments.sort(key=lambda s: s[0])
-            total_bins = sum(len(seg[3]) for seg in segments)
-            if total_bins <= 0:
-                time.sleep(0.2)
-                continue
-            segment_offset = 0
 
-            for sweep_start, sweep_end, sweep_bin, bin_values in segments:
-                # Noise floor (median)
-                sorted_vals = sorted(bin_values)
-                mid = len(sorted_vals) // 2
-                noise_floor = sorted_vals[mid]
+_power_engine: PowerSweepEngine | None = None
 
-                # SNR threshold (dB)
-                snr_threshold = float(scanner_config.get('snr_threshold', 12))
 
-                # Emit progress updates (throttled)
-                emit_stride = max(1, len(bin_values) // 60)
-                for idx, val in enumerate(bin_values):
-                    if idx % emit_stride != 0 and idx != len(bin_values) - 1:
-                        continue
-                    freq_hz = sweep_start + sweep_bin * idx
-                    _state.scanner_current_freq = freq_hz / 1e6
-                    snr = val - noise_floor
-                    level = int(max(0, snr) * 100)
-                    threshold = int(snr_threshold * 100)
-                    progress = min(1.0, (segment_offset + idx) / max(1, total_bins - 1))
-                    with contextlib.suppress(queue.Full):
-                        scanner_queue.put_nowait({
-                            'type': 'scan_update',
-                            'frequency': _state.scanner_current_freq,
-                            'level': level,
-                            'threshold': threshold,
-                            'detected': snr >= snr_threshold,
-                            'progress': progress,
-                            'range_start': scanner_config['start_freq'],
-                            'range_end': scanner_config['end_freq']
-                        })
-                segment_offset += len(bin_values)
-
-                # Detect peaks (clusters above threshold)
-                peaks = []
-                in_cluster = False
-                peak_idx = None
-                peak_val = None
-                for idx, val in enumerate(bin_values):
-                    snr = val - noise_floor
-                    if snr >= snr_threshold:
-                        if not in_cluster:
-                            in_cluster = True
-                            peak_idx = idx
-                            peak_val = val
-                        else:
-                            if val > peak_val:
-                                peak_val = val
-                                peak_idx = idx
-                    else:
-                        if in_cluster and peak_idx is not None:
-                            peaks.append((peak_idx, peak_val))
-                        in_cluster = False
-                        peak_idx = None
-                        peak_val = None
-                if in_cluster and peak_idx is not None:
-                    peaks.append((peak_idx, peak_val))
-
-                for idx, val in peaks:
-                    freq_hz = sweep_start + sweep_bin * (idx + 0.5)
-                    freq_mhz = freq_hz / 1e6
-                    snr = val - noise_floor
-                    level = int(max(0, snr) * 100)
-                    threshold = int(snr_threshold * 100)
-                    add_activity_log('signal_found', freq_mhz,
-                                     f'Peak detected at {freq_mhz:.3f} MHz ({mod.upper()})')
-                    with contextlib.suppress(queue.Full):
-                        scanner_queue.put_nowait({
-                            'type': 'signal_found',
-                            'frequency': freq_mhz,
-                            'modulation': mod,
-                            'audio_streaming': False,
-                            'level': level,
-                            'threshold': threshold,
-                            'snr': round(snr, 1),
-                            'range_start': scanner_config['start_freq'],
-                            'range_end': scanner_config['end_freq']
-                        })
+def scanner_loop_power():
+    """Power sweep scanner using a continuously running rtl_power."""
+    global _power_engine
+    logger.info("Power sweep scanner thread started")
+    add_activity_log('scanner_start', scanner_config['start_freq'],
+                     f"Power sweep {scanner_config['start_freq']}-{scanner_config['end_freq']} MHz")
 
-            add_activity_log('scan_cycle', start_mhz, 'Power sweep complete')
-            time.sleep(max(0.1, scanner_config.get('scan_delay', 0.5)))
+    rtl_power_path = find_rtl_power()
+    if not rtl_power_path:
+        logger.error("rtl_power not found")
+        add_activity_log('error', 0, 'rtl_power not found')
+        _state.scanner_running = False
+        return
 
+    engine = PowerSweepEngine(rtl_power_path)
+    _power_engine = engine
+    try:
+        engine.run()
     except Exception as e:
         logger.error(f"Power sweep scanner error: {e}")
     finally:
         _state.scanner_running = False
         add_activity_log('scanner_stop', _state.scanner_current_freq, 'Scanner stopped')
-        logger.info("Power sweep scanner thread stopped")
+        logger.info(f"Power sweep scanner thread stopped: {engine.stats()}")
 
 
 # ============================================
@@ -551,6 +778,7 @@ def start_scanner() -> Response:
         scanner_config['bias_t'] = bool(data.get('bias_t', False))
         scanner_config['sdr_type'] = str(data.get('sdr_type', 'rtlsdr')).lower()
         scanner_config['scan_method'] = str(data.get('scan_method', '')).lower().strip()
+        scanner_config['power_handoff'] = bool(data.get('power_handoff', True))
         if data.get('snr_threshold') is not None:
             scanner_config['snr_threshold'] = float(data.get('snr_threshold'))
     except (ValueError, TypeError) as e:
@@ -744,7 +972,8 @@ def scanner_status() -> Response:
         'current_freq': _state.scanner_current_freq,
         'config': scanner_config,
         'audio_streaming': _state.audio_running,
-        'audio_frequency': _state.audio_frequency
+        'audio_frequency': _state.audio_frequency,
+        'stats': _power_engine.stats() if _power_engine else None,
     })
 
 
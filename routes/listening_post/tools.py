@@ -47,6 +47,9 @@ def check_tools() -> Response:
 # SIGNAL IDENTIFICATION ENDPOINT
 # ============================================
 
+# Upper bound on signals classified by one batch request
+MAX_GUESS_BATCH = 500
+
 @receiver_bp.route('/signal/guess', methods=['POST'])
 def guess_signal() -> Response:
     """Identify a signal based on frequency, modulation, and other parameters."""
@@ -88,3 +91,46 @@ def guess_signal() -> Response:
     except Exception as e:
         logger.error(f"Signal guess error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@receiver_bp.route('/signal/guess/batch', methods=['POST'])
+def guess_signals_batch() -> Response:
+    """Identify many signals (e.g. every peak of a sweep) in one request."""
+    data = request.json or {}
+
+    signals = data.get('signals')
+    if not isinstance(signals, list):
+        return jsonify({'status': 'error', 'message': 'signals must be a list'}), 400
+    if len(signals) > MAX_GUESS_BATCH:
+        return jsonify({'status': 'error', 'message': f'At most {MAX_GUESS_BATCH} signals per request'}), 400
+
+    parsed = []
+    for i, signal in enumerate(signals):
+        try:
+            freq_mhz = float(signal['frequency_mhz'])
+        except (KeyError, ValueError, TypeError):
+            return jsonify({'status': 'error', 'message': f'Invalid frequency_mhz in signal {i}'}), 400
+        if freq_mhz <= 0:
+            return jsonify({'status': 'error', 'message': f'frequency_mhz must be positive in signal {i}'}), 400
+
+        bandwidth_hz = signal.get('bandwidth_hz')
+        if bandwidth_hz is not None:
+            try:
+                bandwidth_hz = int(bandwidth_hz)
+            except (ValueError, TypeError):
+                bandwidth_hz = None
+
+        parsed.append({
+            'frequency_hz': int(freq_mhz * 1e6),
+            'modulation': signal.get('modulation'),
+            'bandwidth_hz': bandwidth_hz,
+        })
+
+    region = data.get('region', 'UK/EU')
+
+    try:
+        from utils.signal_guess import guess_signal_types_dict
+        return jsonify({'status': 'ok', 'results': guess_signal_types_dict(parsed, region=region)})
+    except Exception as e:
+        logger.error(f"Signal guess batch error: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -24,6 +24,7 @@ from utils.meshtastic import (
 )
 from utils.responses import api_error
 from utils.sse import sse_stream_fanout
+from utils.stream_codec import KeyDictionary, negotiate_codec
 
 logger = get_logger('intercept.meshtastic')
 
@@ -32,6 +33,12 @@ meshtastic_bp = Blueprint('meshtastic', __name__, url_prefix='/meshtastic')
 # Queue for SSE message streaming
 _mesh_queue: queue.Queue = queue.Queue(maxsize=500)
 
+# Key numbering for clients streaming a binary codec
+mesh_stream_keys = KeyDictionary([
+    'type', 'from', 'from_name', 'to', 'to_name', 'message', 'text', 'portnum',
+    'channel', 'rssi', 'snr', 'hop_limit', 'timestamp',
+])
+
 # Store recent messages for history
 _recent_messages: list[dict] = []
 MAX_HISTORY = 500
@@ -464,16 +471,19 @@ def stream_messages():
         data: {"type": "meshtastic", "from": "!a1b2c3d4", "message": "Hello", ...}
 
     Keepalive events are sent every 30 seconds to maintain the connection.
+    ``?codec=cbor`` or ``?codec=msgpack`` selects a binary encoding.
 
     Returns:
         SSE stream (text/event-stream)
     """
+    codec = negotiate_codec(request.args.get('codec'), mesh_stream_keys)
     response = Response(
         sse_stream_fanout(
             source_queue=_mesh_queue,
             channel_key='meshtastic',
             timeout=1.0,
             keepalive_interval=30.0,
+            codec=codec,
         ),
         mimetype='text/event-stream',
     )
@@ -35,6 +35,7 @@ from utils.process import register_process, safe_terminate, unregister_process
 from utils.sdr import SDRFactory, SDRType
 from utils.sdr.base import SDRCapabilities, SDRDevice
 from utils.sse import sse_stream_fanout
+from utils.stream_codec import KeyDictionary, negotiate_codec, ws_message_frames
 from utils.validation import validate_device_index, validate_frequency, validate_gain
 from utils.waterfall_fft import (
     build_binary_frame,
@@ -56,6 +57,9 @@ _state: dict[str, Any] = {
 _detector: MeteorDetector | None = None
 _sse_queue: queue.Queue = queue.Queue(maxsize=500)
 
+# Key numbering for side messages to clients that negotiated a binary codec
+_side_message_keys = KeyDictionary()
+
 # Maximum bandwidth per SDR type (Hz)
 MAX_BANDWIDTH = {
     SDRType.RTL_SDR: 2400000,
@@ -227,6 +231,13 @@ def init_meteor_websocket(app: Flask):
         claimed_device = None
         claimed_sdr_type = 'rtlsdr'
         send_queue: queue.Queue = queue.Queue(maxsize=120)
+        # Side messages are JSON unless a 'start' command asks for a codec;
+        # only this loop encodes them, the reader queues plain dicts
+        side_codec = None
+
+        def send_side(payload: dict[str, Any]) -> None:
+            for frame in ws_message_frames(payload, side_codec):
+                ws.send(frame)
 
         try:
             while True:
@@ -237,7 +248,10 @@ def init_meteor_websocket(app: Flask):
                     except queue.Empty:
                         break
                     try:
-                        ws.send(outgoing)
+                        if isinstance(outgoing, dict):
+                            send_side(outgoing)
+                        else:
+                            ws.send(outgoing)
                     except Exception:
                         stop_event.set()
                         break
@@ -267,6 +281,7 @@ def init_meteor_websocket(app: Flask):
                 cmd = data.get('cmd')
 
                 if cmd == 'start':
+                    side_codec = negotiate_codec(data.get('codec'), _side_message_keys)
                     # Stop any existing capture
                     was_restarting = iq_process is not None
                     stop_event.set()
@@ -316,10 +331,10 @@ def init_meteor_websocket(app: Flask):
                         cooldown = float(data.get('cooldown_ms', 200.0))
                         freq_drift = float(data.get('freq_drift_tolerance_hz', 500.0))
                     except (TypeError, ValueError) as exc:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Invalid configuration: {exc}',
-                        }))
+                        })
                         continue
 
                     # Clamp values
@@ -348,11 +363,11 @@ def init_meteor_websocket(app: Flask):
                         if _attempt < max_claim_attempts - 1:
                             time.sleep(0.4)
                     if claim_err:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': claim_err,
                             'error_type': 'DEVICE_BUSY',
-                        }))
+                        })
                         continue
                     claimed_device = device_index
                     claimed_sdr_type = sdr_type_str
@@ -371,17 +386,17 @@ def init_meteor_websocket(app: Flask):
                     except NotImplementedError as e:
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
-                        ws.send(json.dumps({'status': 'error', 'message': str(e)}))
+                        send_side({'status': 'error', 'message': str(e)})
                         continue
 
                     # Check binary exists
                     if not shutil.which(iq_cmd[0]):
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Required tool "{iq_cmd[0]}" not found.',
-                        }))
+                        })
                         continue
 
                     # Spawn I/Q capture
@@ -422,10 +437,10 @@ def init_meteor_websocket(app: Flask):
                             iq_process = None
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Failed to start I/Q capture: {e}',
-                        }))
+                        })
                         continue
 
                     # Initialize detector
@@ -443,7 +458,7 @@ def init_meteor_websocket(app: Flask):
                         _state['sample_rate'] = sample_rate
 
                     # Send confirmation
-                    ws.send(json.dumps({
+                    send_side({
                         'status': 'started',
                         'frequency_mhz': frequency_mhz,
                         'start_freq': start_freq,
@@ -451,7 +466,7 @@ def init_meteor_websocket(app: Flask):
                         'fft_size': fft_size,
                         'sample_rate': sample_rate,
                         'span_mhz': span_mhz,
-                    }))
+                    })
 
                     # Start FFT reader + detection thread
                     def fft_reader(
@@ -514,11 +529,11 @@ def init_meteor_websocket(app: Flask):
                                         'type': 'event',
                                         'event': event.to_dict(),
                                     })
-                                    # Also send as JSON via WS for immediate UI update
-                                    event_msg = json.dumps({
+                                    # Also send via WS for immediate UI update
+                                    event_msg = {
                                         'type': 'detection',
                                         'event': event.to_dict(),
-                                    })
+                                    }
                                     with suppress(queue.Full):
                                         _send_q.put_nowait(event_msg)
 
@@ -556,7 +571,7 @@ def init_meteor_websocket(app: Flask):
                             cooldown_ms=data.get('cooldown_ms'),
                             freq_drift_tolerance_hz=data.get('freq_drift_tolerance_hz'),
                         )
-                        ws.send(json.dumps({'status': 'threshold_updated'}))
+                        send_side({'status': 'threshold_updated'})
 
                 elif cmd == 'stop':
                     stop_event.set()
@@ -574,7 +589,7 @@ def init_meteor_websocket(app: Flask):
                         _state['running'] = False
                         _state['device'] = None
                     stop_event.clear()
-                    ws.send(json.dumps({'status': 'stopped'}))
+                    send_side({'status': 'stopped'})
 
         except Exception as e:
             logger.info(f"WebSocket meteor closed: {e}")
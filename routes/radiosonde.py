@@ -36,6 +36,7 @@ from utils.logging import get_logger
 from utils.responses import api_error, api_success
 from utils.sdr import SDRFactory, SDRType
 from utils.sse import sse_stream_fanout
+from utils.stream_codec import KeyDictionary, negotiate_codec
 from utils.validation import (
     validate_device_index,
     validate_gain,
@@ -57,6 +58,12 @@ radiosonde_active_sdr_type: str | None = None
 radiosonde_balloons: dict[str, dict[str, Any]] = {}
 _balloons_lock = threading.Lock()
 
+# Key numbering for clients streaming a binary codec
+radiosonde_stream_keys = KeyDictionary([
+    'type', 'id', 'sonde_type', 'datetime', 'lat', 'lon', 'alt', 'temp', 'humidity',
+    'pressure', 'vel_h', 'vel_v', 'heading', 'sats', 'batt', 'freq', 'last_seen',
+])
+
 # UDP listener socket reference (so /stop can close it)
 _udp_socket: socket.socket | None = None
 
@@ -799,13 +806,18 @@ def stop_radiosonde():
 
 @radiosonde_bp.route('/stream')
 def stream_radiosonde():
-    """SSE stream for radiosonde telemetry."""
+    """SSE stream for radiosonde telemetry.
+
+    ``?codec=cbor`` or ``?codec=msgpack`` selects a binary encoding.
+    """
+    codec = negotiate_codec(request.args.get('codec'), radiosonde_stream_keys)
     response = Response(
         sse_stream_fanout(
             source_queue=app_module.radiosonde_queue,
             channel_key='radiosonde',
             timeout=SSE_QUEUE_TIMEOUT,
             keepalive_interval=SSE_KEEPALIVE_INTERVAL,
+            codec=codec,
         ),
         mimetype='text/event-stream',
     )
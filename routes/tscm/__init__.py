@@ -63,6 +63,7 @@ from utils.tscm.device_identity import (
     ingest_wifi_dict,
     reset_identity_engine,
 )
+from utils.tscm.power_sweep import PowerSweepEngine
 
 # Import unified Bluetooth scanner helper for TSCM integration
 try:
@@ -886,45 +887,16 @@ def _scan_bluetooth_devices(interface: str, duration: int = 10) -> list[dict]:
     return devices
 
 
-def _scan_rf_signals(
-    sdr_device: int | None,
-    duration: int = 30,
-    stop_check: callable | None = None,
-    sweep_ranges: list[dict] | None = None
-) -> list[dict]:
+def _select_sweep_tool() -> tuple[str | None, str | None]:
     """
-    Scan for RF signals using SDR (rtl_power or hackrf_sweep).
+    Pick the best available SDR and sweep tool.
 
-    Scans common surveillance frequency bands:
-    - 88-108 MHz: FM broadcast (potential FM bugs)
-    - 315 MHz: Common ISM band (wireless devices)
-    - 433 MHz: ISM band (European wireless devices, car keys)
-    - 868 MHz: European ISM band
-    - 915 MHz: US ISM band
-    - 1.2 GHz: Video transmitters
-    - 2.4 GHz: WiFi, Bluetooth, video transmitters
-
-    Args:
-        sdr_device: SDR device index
-        duration: Scan duration per band
-        stop_check: Optional callable that returns True if scan should stop.
-                   Defaults to checking module-level _sweep_running.
-        sweep_ranges: Optional preset ranges (MHz) from SWEEP_PRESETS.
+    Returns:
+        (sdr_type, sweep_tool_path); both None when no tool is installed,
+        after emitting an rf_status error.
     """
-    # Default stop check uses module-level _sweep_running
-    if stop_check is None:
-        def stop_check():
-            return not _sweep_running
-    import os
     import shutil
-    import subprocess
-    import tempfile
-
-    signals = []
-
-    logger.info(f"Starting RF scan (device={sdr_device})")
 
-    # Detect available SDR devices and sweep tools
     rtl_power_path = shutil.which('rtl_power')
     hackrf_sweep_path = shutil.which('hackrf_sweep')
 
@@ -966,10 +938,16 @@ def _scan_rf_signals(
             'status': 'error',
             'message': 'No SDR sweep tool installed. Install rtl-sdr (rtl_power) or HackRF (hackrf_sweep) for RF scanning.',
         })
-        return signals
+    return sdr_type, sweep_tool_path
 
-    # Define frequency bands to scan (in Hz)
-    # Format: (start_freq, end_freq, bin_size, description)
+
+def _sweep_bands(sweep_ranges: list[dict] | None = None) -> list[tuple[int, int, int, str]]:
+    """
+    Frequency bands to sweep, in Hz, from preset ranges in MHz.
+
+    Returns:
+        List of (start_freq, end_freq, bin_size, description).
+    """
     scan_bands: list[tuple[int, int, int, str]] = []
 
     if sweep_ranges:
@@ -1002,6 +980,73 @@ def _scan_rf_signals(
             (2400000000, 2500000000, 500000, '2.4 GHz ISM'),     # WiFi/BT/Video
         ]
 
+    return scan_bands
+
+
+def _start_power_sweep(
+    sdr_device: int | None,
+    sweep_ranges: list[dict] | None = None,
+    baseline_rf: list[dict] | None = None,
+) -> PowerSweepEngine | None:
+    """Start a continuous power sweep for a TSCM sweep; None without a sweep tool."""
+    sdr_type, sweep_tool_path = _select_sweep_tool()
+    if not sweep_tool_path:
+        return None
+    engine = PowerSweepEngine(
+        _sweep_bands(sweep_ranges),
+        tool_path=sweep_tool_path,
+        sdr_type=sdr_type,
+        device_index=sdr_device if sdr_device is not None else 0,
+        baseline_frequencies=[entry.get('frequency') for entry in baseline_rf or []],
+    )
+    engine.start()
+    logger.info(f"Started continuous RF sweep over {len(engine.bands)} bands")
+    return engine
+
+
+def _scan_rf_signals(
+    sdr_device: int | None,
+    duration: int = 30,
+    stop_check: callable | None = None,
+    sweep_ranges: list[dict] | None = None
+) -> list[dict]:
+    """
+    Scan for RF signals using SDR (rtl_power or hackrf_sweep).
+
+    Scans common surveillance frequency bands:
+    - 88-108 MHz: FM broadcast (potential FM bugs)
+    - 315 MHz: Common ISM band (wireless devices)
+    - 433 MHz: ISM band (European wireless devices, car keys)
+    - 868 MHz: European ISM band
+    - 915 MHz: US ISM band
+    - 1.2 GHz: Video transmitters
+    - 2.4 GHz: WiFi, Bluetooth, video transmitters
+
+    Args:
+        sdr_device: SDR device index
+        duration: Scan duration per band
+        stop_check: Optional callable that returns True if scan should stop.
+                   Defaults to checking module-level _sweep_running.
+        sweep_ranges: Optional preset ranges (MHz) from SWEEP_PRESETS.
+    """
+    # Default stop check uses module-level _sweep_running
+    if stop_check is None:
+        def stop_check():
+            return not _sweep_running
+    import os
+    import subprocess
+    import tempfile
+
+    signals = []
+
+    logger.info(f"Starting RF scan (device={sdr_device})")
+
+    sdr_type, sweep_tool_path = _select_sweep_tool()
+    if not sweep_tool_path:
+        return signals
+
+    scan_bands = _sweep_bands(sweep_ranges)
+
     # Create temp file for output
     with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as tmp:
         tmp_path = tmp.name
@@ -1137,6 +1182,7 @@ def _run_sweep(
     """
     global _sweep_running, _current_sweep_id
 
+    rf_engine = None
     try:
         # Get baseline for comparison if specified
         baseline = None
@@ -1214,14 +1260,92 @@ def _run_sweep(
         all_wifi_clients = {}  # Use dict for deduplication by client MAC
         all_bt = {}    # Use dict for deduplication by MAC
         all_rf = []
+        rf_seen: set[str] = set()
+        rf_quiet_reported = False
+
+        def _process_rf_signals(rf_signals: list[dict]) -> None:
+            nonlocal threats_found
+            for signal in rf_signals:
+                freq_key = f"{signal['frequency']:.3f}"
+                try:
+                    power_val = int(float(signal.get('power', signal.get('level'))))
+                except (ValueError, TypeError):
+                    power_val = None
+                try:
+                    timeline_manager.add_observation(
+                        identifier=freq_key,
+                        protocol='rf',
+                        rssi=power_val,
+                        frequency=signal.get('frequency'),
+                        name=f"{freq_key} MHz",
+                        attributes={'band': signal.get('band')}
+                    )
+                except Exception as e:
+                    logger.debug(f"RF timeline observation error: {e}")
+                _maybe_store_timeline(
+                    identifier=freq_key,
+                    protocol='rf',
+                    rssi=power_val,
+                    frequency=signal.get('frequency'),
+                    attributes={'band': signal.get('band')}
+                )
+                if freq_key in rf_seen:
+                    continue
+                rf_seen.add(freq_key)
+                all_rf.append(signal)
+                is_threat = False
+                # Analyze RF signal for threats
+                threat = detector.analyze_rf_signal(signal)
+                if threat:
+                    _handle_threat(threat)
+                    threats_found += 1
+                    is_threat = True
+                    sev = threat.get('severity', 'low').lower()
+                    if sev in severity_counts:
+                        severity_counts[sev] += 1
+                # Classify signal and get correlation profile
+                classification = detector.classify_rf_signal(signal)
+                profile = correlation.analyze_rf_signal(signal)
+                # Send signal to frontend
+                _emit_event('rf_signal', {
+                    'frequency': signal['frequency'],
+                    'power': signal['power'],
+                    'band': signal['band'],
+                    'signal_strength': signal.get('signal_strength', 0),
+                    'is_threat': is_threat,
+                    'is_new': not classification.get('in_baseline', False),
+                    'classification': profile.risk_level.value,
+                    'reasons': classification.get('reasons', []),
+                    'score': profile.total_score,
+                    'score_modifier': profile.score_modifier,
+                    'known_device': profile.known_device,
+                    'known_device_name': profile.known_device_name,
+                    'indicators': [{'type': i.type.value, 'desc': i.description} for i in profile.indicators],
+                    'recommended_action': profile.recommended_action,
+                    'revisit_seconds': signal.get('revisit_seconds'),
+                })
 
         start_time = time.time()
         last_wifi_scan = 0
         last_bt_scan = 0
-        last_rf_scan = 0
         wifi_scan_interval = 15  # Scan WiFi every 15 seconds
         bt_scan_interval = 20   # Scan Bluetooth every 20 seconds
-        rf_scan_interval = 30   # Scan RF every 30 seconds
+
+        # RF runs as one continuous power sweep for the whole sweep
+        if rf_enabled:
+            _emit_event('sweep_progress', {
+                'progress': 0,
+                'status': 'Starting RF spectrum sweep...',
+                'wifi_count': 0,
+                'bt_count': 0,
+                'rf_count': 0,
+            })
+            # Try RF sweep even if sdr_device is None (will use device 0)
+            rf_engine = _start_power_sweep(
+                sdr_device,
+                sweep_ranges=preset.get('ranges'),
+                baseline_rf=(baseline or {}).get('rf_frequencies'),
+            )
 
         while _sweep_running and (time.time() - start_time) < duration:
             current_time = time.time()
@@ -1493,83 +1617,19 @@ def _run_sweep(
                     import traceback
                     logger.error(f"Bluetooth scan error: {e}\n{traceback.format_exc()}")
 
-            # Perform RF scan using SDR
-            if rf_enabled and (current_time - last_rf_scan) >= rf_scan_interval:
+            # Collect detections from the RF sweep
+            if rf_engine is not None:
                 try:
-                    _emit_event('sweep_progress', {
-                        'progress': min(100, int(((current_time - start_time) / duration) * 100)),
-                        'status': 'Scanning RF spectrum...',
-                        'wifi_count': len(all_wifi),
-                        'bt_count': len(all_bt),
-                        'rf_count': len(all_rf),
-                    })
-                    # Try RF scan even if sdr_device is None (will use device 0)
-                    rf_signals = _scan_rf_signals(sdr_device, sweep_ranges=preset.get('ranges'))
-
-                    # If no signals and this is first RF scan, send info event
-                    if not rf_signals and last_rf_scan == 0:
+                    _process_rf_signals(rf_engine.poll())
+                    # Report a quiet spectrum once every band has been swept
+                    if not all_rf and not rf_quiet_reported and all(
+                        band['passes'] > 0 for band in rf_engine.stats()['bands']
+                    ):
+                        rf_quiet_reported = True
                         _emit_event('rf_status', {
                             'status': 'no_signals',
                             'message': 'RF scan completed - no signals above threshold. This may be normal in a quiet RF environment.',
                         })
-
-                    for signal in rf_signals:
-                        freq_key = f"{signal['frequency']:.3f}"
-                        try:
-                            power_val = int(float(signal.get('power', signal.get('level'))))
-                        except (ValueError, TypeError):
-                            power_val = None
-                        try:
-                            timeline_manager.add_observation(
-                                identifier=freq_key,
-                                protocol='rf',
-                                rssi=power_val,
-                                frequency=signal.get('frequency'),
-                                name=f"{freq_key} MHz",
-                                attributes={'band': signal.get('band')}
-                            )
-                        except Exception as e:
-                            logger.debug(f"RF timeline observation error: {e}")
-                        _maybe_store_timeline(
-                            identifier=freq_key,
-                            protocol='rf',
-                            rssi=power_val,
-                            frequency=signal.get('frequency'),
-                            attributes={'band': signal.get('band')}
-                        )
-                        if freq_key not in [f"{s['frequency']:.3f}" for s in all_rf]:
-                            all_rf.append(signal)
-                            is_threat = False
-                            # Analyze RF signal for threats
-                            threat = detector.analyze_rf_signal(signal)
-                            if threat:
-                                _handle_threat(threat)
-                                threats_found += 1
-                                is_threat = True
-                                sev = threat.get('severity', 'low').lower()
-                                if sev in severity_counts:
-                                    severity_counts[sev] += 1
-                            # Classify signal and get correlation profile
-                            classification = detector.classify_rf_signal(signal)
-                            profile = correlation.analyze_rf_signal(signal)
-                            # Send signal to frontend
-                            _emit_event('rf_signal', {
-                                'frequency': signal['frequency'],
-                                'power': signal['power'],
-                                'band': signal['band'],
-                                'signal_strength': signal.get('signal_strength', 0),
-                                'is_threat': is_threat,
-                                'is_new': not classification.get('in_baseline', False),
-                                'classification': profile.risk_level.value,
-                                'reasons': classification.get('reasons', []),
-                                'score': profile.total_score,
-                                'score_modifier': profile.score_modifier,
-                                'known_device': profile.known_device,
-                                'known_device_name': profile.known_device_name,
-                                'indicators': [{'type': i.type.value, 'desc': i.description} for i in profile.indicators],
-                                'recommended_action': profile.recommended_action,
-                            })
-                    last_rf_scan = current_time
                 except Exception as e:
                     logger.error(f"RF scan error: {e}")
 
@@ -1584,12 +1644,21 @@ def _run_sweep(
                 'wifi_count': len(all_wifi),
                 'bt_count': len(all_bt),
                 'rf_count': len(all_rf),
+                'rf_revisit_seconds': rf_engine.revisit_seconds() if rf_engine is not None else None,
                 'threats_found': threats_found,
                 'severity_counts': severity_counts,
             })
 
             time.sleep(2)  # Update every 2 seconds
 
+        # Stop the RF sweep and take the passes it had in progress
+        if rf_engine is not None:
+            rf_engine.stop()
+            try:
+                _process_rf_signals(rf_engine.poll())
+            except Exception as e:
+                logger.error(f"RF scan error: {e}")
+
         # Complete sweep (run even if stopped by user so correlations/clusters are computed)
         if _current_sweep_id:
             # Run cross-protocol correlation analysis
@@ -1749,6 +1818,8 @@ def _run_sweep(
             update_tscm_sweep(_current_sweep_id, status='error', completed=True)
 
     finally:
+        if rf_engine is not None:
+            rf_engine.stop()
         _sweep_running = False
 
 
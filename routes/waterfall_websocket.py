@@ -26,6 +26,7 @@ from utils.logging import get_logger
 from utils.process import register_process, safe_terminate, unregister_process
 from utils.sdr import SDRFactory, SDRType
 from utils.sdr.base import SDRCapabilities, SDRDevice
+from utils.stream_codec import KeyDictionary, negotiate_codec, ws_message_frames
 from utils.waterfall_fft import (
     build_binary_frame,
     compute_power_spectrum,
@@ -54,6 +55,9 @@ _shared_state: dict[str, Any] = {
 # running after a new connection has already started capture).
 _capture_generation: int = 0
 
+# Key numbering for side messages to clients that negotiated a binary codec
+_side_message_keys = KeyDictionary()
+
 # Maximum bandwidth per SDR type (Hz)
 MAX_BANDWIDTH = {
     SDRType.RTL_SDR: 2400000,
@@ -374,6 +378,12 @@ def init_waterfall_websocket(app: Flask):
         capture_end_freq = 0.0
         # Queue for outgoing messages — only the main loop touches ws.send()
         send_queue = queue.Queue(maxsize=120)
+        # Side messages are JSON unless a 'start' command asks for a codec
+        side_codec = None
+
+        def send_side(payload: dict[str, Any]) -> None:
+            for frame in ws_message_frames(payload, side_codec):
+                ws.send(frame)
 
         try:
             while True:
@@ -416,6 +426,7 @@ def init_waterfall_websocket(app: Flask):
                 cmd = data.get('cmd')
 
                 if cmd == 'start':
+                    side_codec = negotiate_codec(data.get('codec'), _side_message_keys)
                     shared_before = get_shared_capture_status()
                     keep_monitor_enabled = bool(shared_before.get('monitor_enabled'))
                     keep_monitor_modulation = str(shared_before.get('monitor_modulation', 'wfm'))
@@ -477,10 +488,10 @@ def init_waterfall_websocket(app: Flask):
                         if db_max is not None:
                             db_max = float(db_max)
                     except (TypeError, ValueError) as exc:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Invalid waterfall configuration: {exc}',
-                        }))
+                        })
                         continue
 
                     # Clamp and normalize runtime settings
@@ -488,10 +499,10 @@ def init_waterfall_websocket(app: Flask):
                     fps = max(2, min(60, fps))
                     avg_count = max(1, min(32, avg_count))
                     if center_freq_mhz <= 0 or span_mhz <= 0:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': 'center_freq_mhz and span_mhz must be > 0',
-                        }))
+                        })
                         continue
 
                     # Resolve SDR type and choose a valid sample rate
@@ -520,11 +531,11 @@ def init_waterfall_websocket(app: Flask):
                         if _claim_attempt < max_claim_attempts - 1:
                             time.sleep(0.4)
                     if claim_err:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': claim_err,
                             'error_type': 'DEVICE_BUSY',
-                        }))
+                        })
                         continue
                     claimed_device = device_index
                     claimed_sdr_type = sdr_type_str
@@ -544,10 +555,10 @@ def init_waterfall_websocket(app: Flask):
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
                         claimed_sdr_type = 'rtlsdr'
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': str(e),
-                        }))
+                        })
                         continue
 
                     # Pre-flight: check the capture binary exists
@@ -555,10 +566,10 @@ def init_waterfall_websocket(app: Flask):
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
                         claimed_sdr_type = 'rtlsdr'
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Required tool "{iq_cmd[0]}" not found. Install SoapySDR tools (rx_sdr).',
-                        }))
+                        })
                         continue
 
                     # Spawn I/Q capture process (retry to handle USB release lag)
@@ -609,10 +620,10 @@ def init_waterfall_websocket(app: Flask):
                         app_module.release_sdr_device(device_index, sdr_type_str)
                         claimed_device = None
                         claimed_sdr_type = 'rtlsdr'
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Failed to start I/Q capture: {e}',
-                        }))
+                        })
                         continue
 
                     capture_center_mhz = center_freq_mhz
@@ -634,7 +645,7 @@ def init_waterfall_websocket(app: Flask):
                     )
 
                     # Send started confirmation
-                    ws.send(json.dumps({
+                    send_side({
                         'status': 'started',
                         'center_mhz': center_freq_mhz,
                         'start_freq': start_freq,
@@ -645,7 +656,7 @@ def init_waterfall_websocket(app: Flask):
                         'db_min': db_min,
                         'db_max': db_max,
                         'vfo_freq_mhz': target_vfo_mhz,
-                    }))
+                    })
 
                     # Start reader thread — puts frames on queue, never calls ws.send()
                     def fft_reader(
@@ -753,10 +764,10 @@ def init_waterfall_websocket(app: Flask):
 
                 elif cmd in ('tune', 'set_vfo'):
                     if not iq_process or claimed_device is None or iq_process.poll() is not None:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': 'Waterfall capture is not running',
-                        }))
+                        })
                         continue
                     try:
                         shared = get_shared_capture_status()
@@ -769,20 +780,20 @@ def init_waterfall_websocket(app: Flask):
                         squelch = int(data.get('squelch', shared.get('monitor_squelch', 0)))
                         modulation = str(data.get('modulation', shared.get('monitor_modulation', 'wfm')))
                     except (TypeError, ValueError) as exc:
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'error',
                             'message': f'Invalid tune request: {exc}',
-                        }))
+                        })
                         continue
 
                     if not (capture_start_freq <= vfo_freq_mhz <= capture_end_freq):
-                        ws.send(json.dumps({
+                        send_side({
                             'status': 'retune_required',
                             'message': 'Frequency outside current capture span',
                             'capture_start_freq': capture_start_freq,
                             'capture_end_freq': capture_end_freq,
                             'vfo_freq_mhz': vfo_freq_mhz,
-                        }))
+                        })
                         continue
 
                     monitor_enabled = bool(shared.get('monitor_enabled'))
@@ -792,13 +803,13 @@ def init_waterfall_websocket(app: Flask):
                         modulation=modulation,
                         squelch=squelch,
                     )
-                    ws.send(json.dumps({
+                    send_side({
                         'status': 'tuned',
                         'vfo_freq_mhz': vfo_freq_mhz,
                         'start_freq': capture_start_freq,
                         'end_freq': capture_end_freq,
                         'center_mhz': capture_center_mhz,
-                    }))
+                    })
 
                 elif cmd == 'stop':
                     stop_event.set()
@@ -816,7 +827,7 @@ def init_waterfall_websocket(app: Flask):
                     _set_shared_capture_state(running=False, generation=my_generation)
                     my_generation = None
                     stop_event.clear()
-                    ws.send(json.dumps({'status': 'stopped'}))
+                    send_side({'status': 'stopped'})
 
         except Exception as e:
             logger.info(f"WebSocket waterfall closed: {e}")
@@ -15,7 +15,7 @@ import app as app_module
 from utils.logging import get_logger
 from utils.responses import api_error
 from utils.sdr import SDRType
-from utils.sse import sse_stream_fanout
+from utils.sse import format_sse, sse_stream_fanout
 from utils.validation import validate_frequency
 from utils.wefax import get_wefax_decoder
 from utils.wefax_stations import (
@@ -212,18 +212,33 @@ def stop_decoder():
     return jsonify({'status': 'stopped'})
 
 
+def _stream_with_keyframe():
+    """Fan out progress, starting with a keyframe of any image in progress.
+
+    Preview strips only carry new rows, so a subscriber joining mid-chart
+    first gets the rows decoded so far. The keyframe is taken after
+    subscribing so no strip falls between it and the live updates.
+    """
+    stream = sse_stream_fanout(
+        source_queue=_wefax_queue,
+        channel_key='wefax',
+        timeout=1.0,
+        keepalive_interval=30.0,
+    )
+    try:
+        yield next(stream)
+        keyframe = get_wefax_decoder().preview_keyframe()
+        if keyframe:
+            yield format_sse(keyframe)
+        yield from stream
+    finally:
+        stream.close()
+
+
 @wefax_bp.route('/stream')
 def stream_progress():
     """SSE stream of WeFax decode progress."""
-    response = Response(
-        sse_stream_fanout(
-            source_queue=_wefax_queue,
-            channel_key='wefax',
-            timeout=1.0,
-            keepalive_interval=30.0,
-        ),
-        mimetype='text/event-stream',
-    )
+    response = Response(_stream_with_keyframe(), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
     response.headers['X-Accel-Buffering'] = 'no'
     response.headers['Connection'] = 'keep-alive'
@@ -31,6 +31,7 @@ from utils.process import is_valid_channel, is_valid_mac
 from utils.responses import api_error, api_success
 from utils.sse import format_sse, sse_stream_fanout
 from utils.validation import validate_network_interface, validate_wifi_channel
+from utils.wifi.parsers.airodump import AirodumpCSVReader
 
 wifi_bp = Blueprint('wifi', __name__, url_prefix='/wifi')
 
@@ -274,6 +275,49 @@ def _get_interface_details(iface_name):
     return details
 
 
+def _legacy_network_entry(parts: list[str]) -> dict | None:
+    """Build a legacy network dict from a split airodump AP row."""
+    if len(parts) < 14:
+        return None
+    bssid = parts[0]
+    if not bssid or ':' not in bssid:
+        return None
+    return {
+        'bssid': bssid,
+        'first_seen': parts[1],
+        'last_seen': parts[2],
+        'channel': parts[3],
+        'speed': parts[4],
+        'privacy': parts[5],
+        'cipher': parts[6],
+        'auth': parts[7],
+        'power': parts[8],
+        'beacons': parts[9],
+        'ivs': parts[10],
+        'lan_ip': parts[11],
+        'essid': parts[13] or 'Hidden'
+    }
+
+
+def _legacy_client_entry(parts: list[str]) -> dict | None:
+    """Build a legacy client dict from a split airodump station row."""
+    if len(parts) < 6:
+        return None
+    station = parts[0]
+    if not station or ':' not in station:
+        return None
+    return {
+        'mac': station,
+        'first_seen': parts[1],
+        'last_seen': parts[2],
+        'power': parts[3],
+        'packets': parts[4],
+        'bssid': parts[5],
+        'probes': parts[6] if len(parts) > 6 else '',
+        'vendor': get_manufacturer(station)
+    }
+
+
 def parse_airodump_csv(csv_path):
     """Parse airodump-ng CSV output file."""
     networks = {}
@@ -283,54 +327,17 @@ def parse_airodump_csv(csv_path):
         with open(csv_path, errors='replace') as f:
             content = f.read()
 
-        sections = content.split('\n\n')
-
-        for section in sections:
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-
-            header = lines[0] if lines else ''
-
-            if 'BSSID' in header and 'ESSID' in header:
-                for line in lines[1:]:
-                    parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 14:
-                        bssid = parts[0]
-                        if bssid and ':' in bssid:
-                            networks[bssid] = {
-                                'bssid': bssid,
-                                'first_seen': parts[1],
-                                'last_seen': parts[2],
-                                'channel': parts[3],
-                                'speed': parts[4],
-                                'privacy': parts[5],
-                                'cipher': parts[6],
-                                'auth': parts[7],
-                                'power': parts[8],
-                                'beacons': parts[9],
-                                'ivs': parts[10],
-                                'lan_ip': parts[11],
-                                'essid': parts[13] or 'Hidden'
-                            }
-
-            elif 'Station MAC' in header:
-                for line in lines[1:]:
-                    parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 6:
-                        station = parts[0]
-                        if station and ':' in station:
-                            vendor = get_manufacturer(station)
-                            clients[station] = {
-                                'mac': station,
-                                'first_seen': parts[1],
-                                'last_seen': parts[2],
-                                'power': parts[3],
-                                'packets': parts[4],
-                                'bssid': parts[5],
-                                'probes': parts[6] if len(parts) > 6 else '',
-                                'vendor': vendor
-                            }
+        ap_rows, client_rows = AirodumpCSVReader(csv_path).diff_rows(content)
+
+        for parts in ap_rows:
+            net = _legacy_network_entry(parts)
+            if net:
+                networks[net['bssid']] = net
+
+        for parts in client_rows:
+            client = _legacy_client_entry(parts)
+            if client:
+                clients[client['mac']] = client
     except Exception as e:
         logger.error(f"Error parsing CSV: {e}")
 
@@ -344,6 +351,7 @@ def stream_airodump_output(process, csv_path):
         last_parse = 0
         start_time = time.time()
         csv_found = False
+        csv_reader = AirodumpCSVReader(csv_path + '-01.csv')
 
         while process.poll() is None:
             try:
@@ -364,26 +372,28 @@ def stream_airodump_output(process, csv_path):
 
             current_time = time.time()
             if current_time - last_parse >= 2:
-                csv_file = csv_path + '-01.csv'
-                if os.path.exists(csv_file):
+                if os.path.exists(csv_reader.filepath):
                     csv_found = True
-                    networks, clients = parse_airodump_csv(csv_file)
-
-                    for bssid, net in networks.items():
-                        if bssid not in app_module.wifi_networks:
-                            app_module.wifi_queue.put({
-                                'type': 'network',
-                                'action': 'new',
-                                **net
-                            })
-                        else:
-                            app_module.wifi_queue.put({
-                                'type': 'network',
-                                'action': 'update',
-                                **net
-                            })
-
-                    for mac, client in clients.items():
+                    # Only rows that are new or changed since the last pass
+                    ap_rows, client_rows = csv_reader.read_changed_rows()
+
+                    for parts in ap_rows:
+                        net = _legacy_network_entry(parts)
+                        if not net:
+                            continue
+                        bssid = net['bssid']
+                        app_module.wifi_queue.put({
+                            'type': 'network',
+                            'action': 'update' if bssid in app_module.wifi_networks else 'new',
+                            **net
+                        })
+                        app_module.wifi_networks[bssid] = net
+
+                    for parts in client_rows:
+                        client = _legacy_client_entry(parts)
+                        if not client:
+                            continue
+                        mac = client['mac']
                         if mac not in app_module.wifi_clients:
                             app_module.wifi_queue.put({
                                 'type': 'client',
@@ -404,9 +414,8 @@ def stream_airodump_output(process, csv_path):
                                     'action': 'update',
                                     **client
                                 })
+                        app_module.wifi_clients[mac] = client
 
-                    app_module.wifi_networks = networks
-                    app_module.wifi_clients = clients
                     last_parse = current_time
 
                 if current_time - start_time > 5 and not csv_found:
@@ -0,0 +1,192 @@
+// Decoder for streams negotiated with ?codec=cbor or ?codec=msgpack.
+// SSE streams send a 'codec' event with the key table, then base64 payloads;
+// WebSocket side messages are binary frames starting with type byte 0x02.
+window.StreamCodec = (function() {
+    const WS_MESSAGE_TYPE = 0x02;
+    const textDecoder = new TextDecoder();
+
+    function base64ToBytes(text) {
+        const binary = atob(text);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        return bytes;
+    }
+
+    function halfToFloat(half) {
+        const exp = (half >> 10) & 0x1f;
+        const mant = half & 0x3ff;
+        const sign = half & 0x8000 ? -1 : 1;
+        if (exp === 0) return sign * Math.pow(2, -14) * (mant / 1024);
+        if (exp === 31) return mant ? NaN : sign * Infinity;
+        return sign * Math.pow(2, exp - 15) * (1 + mant / 1024);
+    }
+
+    function decodeCbor(bytes) {
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let pos = 0;
+
+        function argument(info) {
+            if (info < 24) return info;
+            if (info === 24) return view.getUint8(pos++);
+            if (info === 25) { pos += 2; return view.getUint16(pos - 2); }
+            if (info === 26) { pos += 4; return view.getUint32(pos - 4); }
+            if (info === 27) { pos += 8; return Number(view.getBigUint64(pos - 8)); }
+            throw new Error('Unsupported CBOR length');
+        }
+
+        function item() {
+            const initial = view.getUint8(pos++);
+            const major = initial >> 5;
+            const info = initial & 0x1f;
+            if (major === 7) {
+                if (info === 20) return false;
+                if (info === 21) return true;
+                if (info === 22 || info === 23) return null;
+                if (info === 25) { pos += 2; return halfToFloat(view.getUint16(pos - 2)); }
+                if (info === 26) { pos += 4; return view.getFloat32(pos - 4); }
+                if (info === 27) { pos += 8; return view.getFloat64(pos - 8); }
+                throw new Error('Unsupported CBOR simple value');
+            }
+            const value = argument(info);
+            switch (major) {
+                case 0: return value;
+                case 1: return -1 - value;
+                case 2: pos += value; return bytes.subarray(pos - value, pos);
+                case 3: pos += value; return textDecoder.decode(bytes.subarray(pos - value, pos));
+                case 4: {
+                    const out = new Array(value);
+                    for (let i = 0; i < value; i++) out[i] = item();
+                    return out;
+                }
+                case 5: {
+                    const out = new Map();
+                    for (let i = 0; i < value; i++) {
+                        const key = item();
+                        out.set(key, item());
+                    }
+                    return out;
+                }
+                default: throw new Error('Unsupported CBOR type');
+            }
+        }
+
+        return item();
+    }
+
+    function decodeMsgpack(bytes) {
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let pos = 0;
+
+        function str(length) { pos += length; return textDecoder.decode(bytes.subarray(pos - length, pos)); }
+        function bin(length) { pos += length; return bytes.subarray(pos - length, pos); }
+        function array(length) {
+            const out = new Array(length);
+            for (let i = 0; i < length; i++) out[i] = item();
+            return out;
+        }
+        function map(length) {
+            const out = new Map();
+            for (let i = 0; i < length; i++) {
+                const key = item();
+                out.set(key, item());
+            }
+            return out;
+        }
+        function read(getter, size) { pos += size; return view[getter](pos - size); }
+
+        function item() {
+            const type = view.getUint8(pos++);
+            if (type < 0x80) return type;
+            if (type < 0x90) return map(type & 0x0f);
+            if (type < 0xa0) return array(type & 0x0f);
+            if (type < 0xc0) return str(type & 0x1f);
+            if (type >= 0xe0) return type - 0x100;
+            switch (type) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: return bin(read('getUint8', 1));
+                case 0xc5: return bin(read('getUint16', 2));
+                case 0xc6: return bin(read('getUint32', 4));
+                case 0xca: return read('getFloat32', 4);
+                case 0xcb: return read('getFloat64', 8);
+                case 0xcc: return read('getUint8', 1);
+                case 0xcd: return read('getUint16', 2);
+                case 0xce: return read('getUint32', 4);
+                case 0xcf: return Number(read('getBigUint64', 8));
+                case 0xd0: return read('getInt8', 1);
+                case 0xd1: return read('getInt16', 2);
+                case 0xd2: return read('getInt32', 4);
+                case 0xd3: return Number(read('getBigInt64', 8));
+                case 0xd9: return str(read('getUint8', 1));
+                case 0xda: return str(read('getUint16', 2));
+                case 0xdb: return str(read('getUint32', 4));
+                case 0xdc: return array(read('getUint16', 2));
+                case 0xdd: return array(read('getUint32', 4));
+                case 0xde: return map(read('getUint16', 2));
+                case 0xdf: return map(read('getUint32', 4));
+                default: throw new Error('Unsupported MessagePack type 0x' + type.toString(16));
+            }
+        }
+
+        return item();
+    }
+
+    // Decoded maps become plain objects with numbered keys named again
+    function restoreKeys(value, keys) {
+        if (value instanceof Map) {
+            const out = {};
+            value.forEach((item, key) => {
+                out[typeof key === 'number' && key < keys.length ? keys[key] : key] = restoreKeys(item, keys);
+            });
+            return out;
+        }
+        if (Array.isArray(value)) return value.map(item => restoreKeys(item, keys));
+        return value;
+    }
+
+    // One decoder per stream connection; feed it every 'codec' update
+    function createDecoder() {
+        let codec = null;
+        const keys = [];
+
+        function update(info) {
+            if (typeof info === 'string') info = JSON.parse(info);
+            codec = info.codec;
+            keys.length = info.offset || 0;
+            keys.push(...(info.keys || []));
+        }
+
+        function decodeBytes(bytes) {
+            const value = codec === 'msgpack' ? decodeMsgpack(bytes) : decodeCbor(bytes);
+            return restoreKeys(value, keys);
+        }
+
+        // SSE event data: JSON text, or base64 once a codec was announced
+        function decode(data) {
+            if (!codec || data.charAt(0) === '{' || data.charAt(0) === '[') return JSON.parse(data);
+            return decodeBytes(base64ToBytes(data));
+        }
+
+        // WebSocket binary frame; null when it is not a codec side message
+        function decodeFrame(buffer) {
+            const bytes = new Uint8Array(buffer);
+            if (!codec || bytes.length < 1 || bytes[0] !== WS_MESSAGE_TYPE) return null;
+            return decodeBytes(bytes.subarray(1));
+        }
+
+        return {
+            update,
+            decode,
+            decodeFrame,
+            get codec() { return codec; }
+        };
+    }
+
+    return {
+        WS_MESSAGE_TYPE,
+        createDecoder,
+        decodeCbor,
+        decodeMsgpack
+    };
+})();
@@ -1040,7 +1040,7 @@ const BluetoothMode = (function() {
             streamUrl = '/controller/stream/all';
             console.log('[BT] Starting multi-agent event stream...');
         } else {
-            streamUrl = '/api/bluetooth/stream';
+            streamUrl = '/api/bluetooth/stream?delta=1';
             console.log('[BT] Starting local event stream...');
         }
 
@@ -1167,7 +1167,15 @@ const BluetoothMode = (function() {
         }, pollInterval);
     }
 
-    function handleDeviceUpdate(device) {
+    function handleDeviceUpdate(update) {
+        if (update.removed) {
+            devices.delete(update.device_id);
+            pendingDeviceIds.add(update.device_id);
+            scheduleDeviceFlush();
+            return;
+        }
+        // Local stream updates carry only the fields that changed
+        const device = { ...devices.get(update.device_id), ...update };
         devices.set(device.device_id, device);
         pendingDeviceIds.add(device.device_id);
         if (selectedDeviceId === device.device_id) {
@@ -1187,6 +1195,9 @@ const BluetoothMode = (function() {
                 const device = devices.get(deviceId);
                 if (device) {
                     renderDevice(device, false);
+                } else if (deviceContainer) {
+                    const card = deviceContainer.querySelector('[data-bt-device-id="' + CSS.escape(deviceId) + '"]');
+                    if (card) card.remove();
                 }
             });
             pendingDeviceIds.clear();
@@ -40,6 +40,10 @@ var WeFax = (function () {
     var scopeLastWaveAt = 0;
     var scopeLastInputSample = 0;
     var scopeImageBurst = 0;
+    var previewChain = Promise.resolve();
+    var previewRows = 0;  // rows painted without a gap from the top
+    var previewHeight = 0;  // rows in use; the canvas itself is grown geometrically
+    var PREVIEW_MIN_ROWS = 256;
 
     // ---- Initialisation ----
 
@@ -333,15 +337,12 @@ var WeFax = (function () {
             if (lineEl) lineEl.textContent = String(data.line_count);
         }
 
-        // Live preview
-        if (data.partial_image) {
-            var previewEl = document.getElementById('wefaxLivePreview');
-            if (previewEl) {
-                previewEl.src = data.partial_image;
-                previewEl.style.display = 'block';
-            }
-            var idleEl = document.getElementById('wefaxIdleState');
-            if (idleEl) idleEl.style.display = 'none';
+        // Live preview; a keyframe covers the rows before this update's strip
+        if (data.keyframe) {
+            drawPreviewKeyframe(data.keyframe, data.keyframe_rows || 0, data.image_width);
+        }
+        if (data.partial_strip) {
+            drawPreviewStrip(data.partial_strip, data.strip_row || 0, data.image_width);
         }
 
         // Image complete
@@ -371,6 +372,108 @@ var WeFax = (function () {
         }
     }
 
+    // ---- Live Preview ----
+
+    /**
+     * Paint a strip of newly decoded rows onto the preview canvas.
+     * The server only sends rows decoded since its last update, so the
+     * canvas is grown in place and earlier rows are never re-sent.
+     */
+    function drawPreviewStrip(url, row, width) {
+        queuePreview(url, function (canvas, img) {
+            paintStrip(canvas, img, row, width);
+        });
+    }
+
+    /**
+     * Paint a downscaled image of the first `rows` rows, stretched to full
+     * size. Sent on connect and periodically so a preview that joined late
+     * or missed strips catches up; an up-to-date preview ignores it.
+     */
+    function drawPreviewKeyframe(url, rows, width) {
+        queuePreview(url, function (canvas, img) {
+            if (previewRows >= rows && canvas.width === width) return;
+            growPreview(canvas, width, rows);
+            canvas.getContext('2d').drawImage(img, 0, 0, width, rows);
+            previewRows = rows;
+            showPreview(canvas);
+        });
+    }
+
+    function queuePreview(url, paint) {
+        var canvas = document.getElementById('wefaxLivePreview');
+        if (!canvas) return;
+
+        // Images decode asynchronously; chain them so they paint in order
+        previewChain = previewChain.then(function () {
+            return new Promise(function (resolve) {
+                var img = new Image();
+                img.onload = function () {
+                    paint(canvas, img);
+                    resolve();
+                };
+                img.onerror = resolve;
+                img.src = url;
+            });
+        });
+    }
+
+    function paintStrip(canvas, img, row, width) {
+        var needed = row + img.height;
+        var w = width || img.width;
+        if (row === 0 || canvas.width !== w) {
+            // New image: start from a blank canvas
+            resetPreview(canvas, w, needed);
+        } else {
+            growPreview(canvas, w, needed);
+        }
+        canvas.getContext('2d').drawImage(img, 0, row);
+        // A strip past the painted rows leaves a gap until the next keyframe
+        if (row <= previewRows) previewRows = Math.max(previewRows, needed);
+        showPreview(canvas);
+    }
+
+    function resetPreview(canvas, width, height) {
+        // Assigning the size clears the canvas even when it is unchanged
+        canvas.width = width;
+        canvas.height = Math.max(height, PREVIEW_MIN_ROWS);
+        previewRows = 0;
+        setPreviewHeight(canvas, height);
+    }
+
+    function growPreview(canvas, width, height) {
+        if (canvas.width !== width) {
+            resetPreview(canvas, width, height);
+            return;
+        }
+        if (height > canvas.height) {
+            // Resizing clears a canvas, so carry the existing rows over.
+            // Doubling keeps the total copied across an image linear.
+            var keep = null;
+            if (previewHeight > 0) {
+                keep = document.createElement('canvas');
+                keep.width = canvas.width;
+                keep.height = previewHeight;
+                keep.getContext('2d').drawImage(canvas, 0, 0);
+            }
+            canvas.height = Math.max(height, canvas.height * 2);
+            if (keep) canvas.getContext('2d').drawImage(keep, 0, 0);
+        }
+        setPreviewHeight(canvas, Math.max(previewHeight, height));
+    }
+
+    function setPreviewHeight(canvas, height) {
+        // Only the rows in use are shown; the unused tail is cropped by CSS
+        previewHeight = height;
+        canvas.style.aspectRatio = canvas.width + ' / ' + Math.max(1, height);
+    }
+
+    function showPreview(canvas) {
+        canvas.style.display = 'block';
+        var idleEl = document.getElementById('wefaxIdleState');
+        if (idleEl) idleEl.style.display = 'none';
+    }
+
     // ---- Audio Waveform Scope ----
 
     function initScope() {
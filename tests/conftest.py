@@ -1,7 +1,11 @@
 """Pytest configuration and fixtures."""
 
 import contextlib
+import os
+import shutil
+import socket
 import sqlite3
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -132,3 +136,40 @@ def test_db(tmp_path):
     conn.execute('PRAGMA journal_mode = WAL')
     yield conn
     conn.close()
+
+
+def _start_postgres(tmp_path):
+    """Throwaway PostgreSQL cluster from initdb, or None if unavailable."""
+    initdb = shutil.which('initdb')
+    pg_ctl = shutil.which('pg_ctl')
+    if not initdb or not pg_ctl:
+        return None
+    data = tmp_path / 'pgdata'
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    subprocess.run([initdb, '-D', str(data), '-U', 'intercept', '--auth=trust'], check=True, capture_output=True)
+    subprocess.run(
+        [pg_ctl, '-D', str(data), '-w', '-l', str(tmp_path / 'pg.log'),
+         '-o', f'-p {port} -k {tmp_path} -h 127.0.0.1', 'start'],
+        check=True, capture_output=True,
+    )
+    return pg_ctl, data, f'host=127.0.0.1 port={port} dbname=postgres user=intercept'
+
+
+@pytest.fixture
+def pg_dsn(tmp_path):
+    """DSN for a real PostgreSQL: ADSB_TEST_DSN or a throwaway local cluster."""
+    pytest.importorskip('psycopg2')
+    dsn = os.environ.get('ADSB_TEST_DSN')
+    if dsn:
+        yield dsn
+        return
+    cluster = _start_postgres(tmp_path)
+    if cluster is None:
+        pytest.skip('PostgreSQL not available (set ADSB_TEST_DSN or install initdb)')
+    pg_ctl, data, dsn = cluster
+    try:
+        yield dsn
+    finally:
+        subprocess.run([pg_ctl, '-D', str(data), '-m', 'immediate', 'stop'], capture_output=True)
@@ -2,7 +2,8 @@
 
 import queue
 import threading
-from datetime import datetime, timezone
+import time
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -274,3 +275,717 @@ class TestWriterThreadSafety:
             assert len(errors) == 0
             # Should have queued 500 records (5 threads * 100 each)
             assert writer._queue.qsize() == 500
+
+
+class FakeHistoryConnection:
+    """Connection double recording inserts and COPY replays."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.store.setdefault('sql', []).append(sql)
+
+    def fetchone(self):
+        # Schema lock is free and the migration has run
+        sql = self.store['sql'][-1]
+        if 'advisory' in sql or 'adsb_history_migrations' in sql:
+            return (True,)
+        return None
+
+    def fetchall(self):
+        return []
+
+    def copy_expert(self, sql, fh):
+        if self.store.get('copy_error'):
+            raise self.store['copy_error']
+        data = fh.read().decode('utf-8')
+        reject = self.store.get('reject')
+        if reject and reject[0] in data:
+            raise reject[1]
+        self.store['copies'].append(data)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestSpillToDisk:
+    """Batches spill to segment files and replay in order via COPY."""
+
+    @pytest.fixture
+    def db(self, tmp_path, monkeypatch):
+        import utils.adsb_history as adsb_history
+
+        store = {'up': False, 'inserts': [], 'copies': []}
+
+        def connect(dsn):
+            if not store['up']:
+                raise adsb_history.psycopg2.OperationalError('connection refused')
+            return FakeHistoryConnection(store)
+
+        def execute_values(cur, sql, values):
+            if store.get('insert_error'):
+                raise store['insert_error']
+            reject = store.get('reject')
+            if reject and any(reject[0] in row for row in values):
+                raise reject[1]
+            store['inserts'].append(values)
+
+        monkeypatch.setattr(adsb_history.psycopg2, 'connect', connect)
+        monkeypatch.setattr(adsb_history, 'execute_values', execute_values)
+        with patch.multiple(
+            'utils.adsb_history',
+            ADSB_HISTORY_ENABLED=True,
+            ADSB_HISTORY_QUEUE_SIZE=100,
+            ADSB_HISTORY_HIGH_WATER=0.8,
+            ADSB_HISTORY_RETRY_INTERVAL=0.0,
+            ADSB_SPILL_DIR=str(tmp_path / 'spill'),
+            ADSB_SPILL_MAX_MB=1.0,
+            ADSB_SPILL_SEGMENT_MB=0.001,
+        ):
+            yield store
+
+    @staticmethod
+    def _writer():
+        from utils.adsb_history import AdsbHistoryWriter
+
+        writer = AdsbHistoryWriter()
+        writer.enabled = True
+        return writer
+
+    @staticmethod
+    def _batch(start, count):
+        received = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        return [{'received_at': received, 'icao': f'{start + i:06X}', 'altitude': start + i} for i in range(count)]
+
+    @staticmethod
+    def _replayed_icaos(store):
+        return [line.split('\t')[3] for copy in store['copies'] for line in copy.splitlines()]
+
+    def test_db_down_spills_batch(self, db):
+        writer = self._writer()
+        assert writer._flush(self._batch(0, 10)) is False
+
+        stats = writer.stats()
+        assert stats['spilled'] == 10
+        assert stats['spill_records'] == 10
+        assert stats['spill_segments'] == 1
+        assert stats['dropped'] == 0
+
+    def test_replay_in_order_after_recovery(self, db):
+        writer = self._writer()
+        writer._flush(self._batch(0, 20))
+        db['up'] = True
+        # The backlog is not empty, so this batch queues behind it
+        writer._flush(self._batch(20, 20))
+        assert db['inserts'] == []
+
+        while len(writer._spill):
+            writer._replay_segment()
+
+        assert self._replayed_icaos(db) == [f'{i:06X}' for i in range(40)]
+        assert writer.stats()['replayed'] == 40
+        assert not list((writer._spill.directory).glob('*.seg'))
+
+        writer._flush(self._batch(40, 5))
+        assert len(db['inserts']) == 1
+
+    def test_copy_text_format(self, db):
+        from utils.adsb_history import AdsbSnapshotWriter
+
+        writer = AdsbSnapshotWriter()
+        writer._flush([{
+            'captured_at': datetime(2025, 1, 1, tzinfo=timezone.utc),
+            'icao': 'ABC123',
+            'callsign': 'A\tB\\C\nD',
+            'snapshot': {'alt': 1000},
+        }])
+        db['up'] = True
+        writer._replay_segment()
+
+        fields = db['copies'][0].rstrip('\n').split('\t')
+        assert fields[0] == '2025-01-01T00:00:00+00:00'
+        assert fields[2] == 'A\\tB\\\\C\\nD'
+        assert fields[3] == '\\N'
+        assert fields[-1] == '{"alt": 1000}'
+
+    def test_high_water_spills_while_db_is_up(self, db):
+        db['up'] = True
+        writer = self._writer()
+        for i in range(writer._high_water):
+            writer._queue.put_nowait({'icao': str(i)})
+        writer._flush(self._batch(0, 5))
+
+        assert db['inserts'] == []
+        assert writer.stats()['spill_records'] == 5
+
+    def test_disk_cap_drops_batches(self, db):
+        writer = self._writer()
+        writer._spill.max_bytes = 2000
+        for i in range(20):
+            writer._flush(self._batch(i * 10, 10))
+
+        stats = writer.stats()
+        assert stats['spill_bytes'] <= 2000
+        assert stats['dropped'] == 200 - stats['spill_records']
+        assert stats['dropped'] > 0
+
+    def test_recover_trims_torn_write(self, db):
+        writer = self._writer()
+        writer._flush(self._batch(0, 3))
+        segment = writer._spill.oldest()
+        with open(segment.path, 'ab') as fh:
+            fh.write(b'2025-01-01\tpartial')
+
+        restarted = self._writer()
+        restarted._spill.recover()
+        assert restarted.stats()['spill_records'] == 3
+        db['up'] = True
+        restarted._replay_segment()
+        assert self._replayed_icaos(db) == ['000000', '000001', '000002']
+
+    def test_rejected_segment_is_quarantined(self, db):
+        import utils.adsb_history as adsb_history
+
+        writer = self._writer()
+        writer._flush(self._batch(0, 3))
+        db['up'] = True
+        db['copy_error'] = adsb_history.psycopg2.DataError('invalid input syntax')
+        writer._replay_segment()
+
+        assert len(writer._spill) == 0
+        assert len(list(writer._spill.directory.glob('*.bad'))) == 1
+        assert writer.stats()['dropped'] == 3
+        assert writer.stats()['rejected'] == 3
+
+    def test_rejected_row_in_batch_is_set_aside(self, db):
+        import utils.adsb_history as adsb_history
+
+        db['up'] = True
+        db['reject'] = ('000002', adsb_history.psycopg2.DataError('integer out of range'))
+        writer = self._writer()
+        assert writer._flush(self._batch(0, 5)) is True
+        # Later batches still go straight in
+        assert writer._flush(self._batch(5, 2)) is True
+
+        assert self._replayed_icaos(db) == ['000000', '000001', '000003', '000004']
+        assert [row[3] for row in db['inserts'][0]] == ['000005', '000006']
+        stats = writer.stats()
+        assert (stats['rejected'], stats['dropped'], stats['spill_records']) == (1, 1, 0)
+        bad = (writer._spill.directory / 'rejected.bad').read_text()
+        assert bad.count('\n') == 1 and '000002' in bad
+
+    def test_connection_loss_still_spills(self, db):
+        import utils.adsb_history as adsb_history
+
+        db['up'] = True
+        db['insert_error'] = adsb_history.psycopg2.OperationalError('server closed the connection')
+        writer = self._writer()
+        assert writer._flush(self._batch(0, 5)) is False
+        stats = writer.stats()
+        assert (stats['spill_records'], stats['rejected'], stats['dropped']) == (5, 0, 0)
+
+    def test_rejected_row_in_segment_is_set_aside(self, db):
+        import utils.adsb_history as adsb_history
+
+        writer = self._writer()
+        writer._flush(self._batch(0, 4))
+        db['up'] = True
+        db['reject'] = ('000001', adsb_history.psycopg2.DataError('integer out of range'))
+        writer._replay_segment()
+
+        assert self._replayed_icaos(db) == ['000000', '000002', '000003']
+        stats = writer.stats()
+        assert (stats['replayed'], stats['rejected'], stats['dropped']) == (3, 1, 1)
+        assert len(writer._spill) == 0
+
+    def test_connection_lost_during_row_by_row_replay(self, db):
+        import utils.adsb_history as adsb_history
+
+        writer = self._writer()
+        writer._flush(self._batch(0, 4))
+        db['up'] = True
+        db['reject'] = ('000000', adsb_history.psycopg2.DataError('integer out of range'))
+        original = FakeHistoryConnection.copy_expert
+
+        def copy_expert(self, sql, fh):
+            data = fh.getvalue() if hasattr(fh, 'getvalue') else b''
+            if b'000002' in data:
+                raise adsb_history.psycopg2.OperationalError('server closed the connection')
+            return original(self, sql, fh)
+
+        with patch.object(FakeHistoryConnection, 'copy_expert', copy_expert):
+            writer._replay_segment()
+
+        # Only the rows not yet tried stay spilled
+        assert self._replayed_icaos(db) == ['000001']
+        assert writer.stats()['spill_records'] == 2
+        db['reject'] = None
+        writer._replay_segment()
+        assert self._replayed_icaos(db) == ['000001', '000002', '000003']
+        assert writer.stats()['replayed'] == 3
+
+    def test_run_loop_end_to_end(self, db):
+        with patch.multiple('utils.adsb_history', ADSB_HISTORY_FLUSH_INTERVAL=0.01, ADSB_HISTORY_BATCH_SIZE=10):
+            writer = self._writer()
+            writer.start()
+            try:
+                for record in self._batch(0, 50):
+                    writer.enqueue(record)
+                deadline = time.time() + 5
+                while writer.stats()['spilled'] < 50 and time.time() < deadline:
+                    time.sleep(0.01)
+                db['up'] = True
+                for record in self._batch(50, 50):
+                    writer.enqueue(record)
+                while time.time() < deadline:
+                    inserted = sum(len(values) for values in db['inserts'])
+                    if len(self._replayed_icaos(db)) + inserted == 100:
+                        break
+                    time.sleep(0.01)
+            finally:
+                writer.stop()
+
+        assert not writer._thread.is_alive()
+        inserted = [row[3] for values in db['inserts'] for row in values]
+        assert self._replayed_icaos(db) + inserted == [f'{i:06X}' for i in range(100)]
+        assert writer.stats()['dropped'] == 0
+
+    def test_stop_spills_pending_batch(self, db):
+        # Long flush interval: records only leave the queue when stopping
+        with patch.multiple('utils.adsb_history', ADSB_HISTORY_FLUSH_INTERVAL=60.0, ADSB_HISTORY_BATCH_SIZE=10):
+            writer = self._writer()
+            writer.start()
+            for record in self._batch(0, 25):
+                writer.enqueue(record)
+            writer.stop()
+
+        assert not writer._thread.is_alive()
+        assert writer.stats()['queue_depth'] == 0
+        assert writer.stats()['spill_records'] == 25
+        db['up'] = True
+        while len(writer._spill):
+            writer._replay_segment()
+        assert self._replayed_icaos(db) == [f'{i:06X}' for i in range(25)]
+
+    def test_stop_flushes_pending_batch(self, db):
+        db['up'] = True
+        with patch.multiple('utils.adsb_history', ADSB_HISTORY_FLUSH_INTERVAL=60.0, ADSB_HISTORY_BATCH_SIZE=10):
+            writer = self._writer()
+            writer.start()
+            for record in self._batch(0, 25):
+                writer.enqueue(record)
+            writer.stop()
+
+        inserted = [row[3] for values in db['inserts'] for row in values]
+        assert inserted == [f'{i:06X}' for i in range(25)]
+        assert writer.stats()['spill_records'] == 0
+        assert writer._conn is None
+
+
+class TestSpillReplayPostgres:
+    """Catch-up replay against a real server."""
+
+    def test_copy_replay_large_backlog(self, pg_dsn, tmp_path):
+        import psycopg2
+
+        from utils.adsb_history import AdsbHistoryWriter, _ensure_adsb_schema
+
+        conn = psycopg2.connect(pg_dsn)
+        _ensure_adsb_schema(conn)
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE adsb_messages")
+        conn.commit()
+
+        with patch.multiple('utils.adsb_history', ADSB_SPILL_DIR=str(tmp_path), ADSB_SPILL_MAX_MB=256.0,
+                            ADSB_SPILL_SEGMENT_MB=4.0, ADSB_HISTORY_RETRY_INTERVAL=0.0):
+            writer = AdsbHistoryWriter()
+        writer._conn = conn
+        received = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for start in range(0, 100_000, 500):
+            writer._spill_batch([
+                {'received_at': received, 'icao': f'{i:06X}', 'raw_line': f'MSG,3,{i}'}
+                for i in range(start, start + 500)
+            ])
+
+        while len(writer._spill):
+            writer._replay_segment()
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*), MIN(icao), MAX(icao) FROM adsb_messages")
+            assert cur.fetchone() == (100_000, '000000', '01869F')
+        conn.close()
+
+
+class FakePruneCursor:
+    """Cursor double for partition pruning: daily partitions and rollup counts."""
+
+    def __init__(self, partitions, rollup_count=7, rowcount=3):
+        self.partitions = partitions
+        self.rollup_count = rollup_count
+        self.rowcount_value = rowcount
+        self.executed = []
+        self._result = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        self.executed.append((sql, params))
+        self.rowcount = self.rowcount_value if sql.startswith('DELETE FROM adsb_') else -1
+        if 'pg_inherits' in sql:
+            table = params[0]
+            self._result = [(name,) for name in self.partitions if name.startswith(table)]
+        elif 'FROM adsb_rollup_hourly WHERE hour' in sql and sql.startswith('SELECT'):
+            self._result = [(self.rollup_count,)]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+    def statements(self, prefix):
+        return [(sql, params) for sql, params in self.executed if sql.startswith(prefix)]
+
+
+class TestPartitionsAndRollups:
+    """Daily partitions, hourly rollups and partition-aware pruning."""
+
+    def test_rollup_span_whole_hours(self):
+        from utils.adsb_history import rollup_span
+
+        start = datetime(2025, 1, 1, 10, 17, 5, tzinfo=timezone.utc)
+        end = datetime(2025, 1, 2, 9, 42, 0, tzinfo=timezone.utc)
+        assert rollup_span(start, end) == (
+            datetime(2025, 1, 1, 11, tzinfo=timezone.utc),
+            datetime(2025, 1, 2, 9, tzinfo=timezone.utc),
+        )
+        # Aligned edges are whole hours themselves
+        aligned = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+        assert rollup_span(aligned, aligned.replace(hour=12)) == (aligned, aligned.replace(hour=12))
+
+    def test_rollup_span_without_whole_hour(self):
+        from utils.adsb_history import rollup_span
+
+        start = datetime(2025, 1, 1, 10, 17, tzinfo=timezone.utc)
+        assert rollup_span(start, start.replace(minute=59)) == (start, start)
+        assert rollup_span(start, start.replace(hour=11, minute=5)) == (start, start)
+
+    def test_partition_names_and_bounds(self):
+        from utils.adsb_history import _bound_literal, _partition_name
+
+        day = datetime(2025, 3, 9, tzinfo=timezone.utc)
+        assert _partition_name('adsb_messages', day.date()) == 'adsb_messages_p20250309'
+        assert _bound_literal(day) == "'2025-03-09 00:00:00+00'"
+
+    def test_prune_drops_whole_days_and_deletes_edges(self):
+        from utils.adsb_history import _known_partitions, prune_history
+
+        partitions = [f'adsb_messages_p2025010{d}' for d in range(1, 6)] + ['adsb_messages_default']
+        cur = FakePruneCursor(partitions)
+        _known_partitions.add('adsb_messages_p20250103')
+        start = datetime(2025, 1, 2, 6, 30, tzinfo=timezone.utc)
+        end = datetime(2025, 1, 4, 0, 0, tzinfo=timezone.utc)
+
+        removed = prune_history(cur, start, end, tables=('adsb_messages',))
+
+        assert [sql for sql, _ in cur.statements('DROP TABLE')] == ['DROP TABLE adsb_messages_p20250103']
+        assert 'adsb_messages_p20250103' not in _known_partitions
+        (delete_sql, delete_params), = cur.statements('DELETE FROM adsb_messages')
+        assert delete_params == [start, end]
+        # Dropped rows are counted from the rollups, edge rows from the DELETE
+        assert removed == {'adsb_messages': 7 + 3}
+
+        # Only the message rollups of the pruned hours are rebuilt
+        (reset_sql, reset_params), = cur.statements('UPDATE adsb_rollup_hourly')
+        assert 'SET message_count = 0 WHERE' in reset_sql
+        assert reset_params == [start.replace(minute=0), end]
+        assert cur.statements('DELETE FROM adsb_rollup_aircraft') == []
+        inserts = cur.statements('INSERT INTO adsb_rollup')
+        assert len(inserts) == 1
+        assert 'FROM adsb_messages WHERE received_at >= %s AND received_at < %s' in inserts[0][0]
+
+    def test_prune_everything(self):
+        from utils.adsb_history import prune_history
+
+        cur = FakePruneCursor(['adsb_messages_p20250101', 'adsb_snapshots_p20250101'])
+        removed = prune_history(cur, None, None)
+
+        assert len(cur.statements('DROP TABLE')) == 2
+        assert ('DELETE FROM adsb_messages', None) in cur.executed
+        assert ('DELETE FROM adsb_rollup_hourly', []) in cur.executed
+        assert removed == {'adsb_messages': 10, 'adsb_snapshots': 10}
+
+    def test_retention_prunes_before_cutoff(self):
+        import utils.adsb_history as adsb_history
+
+        cur = FakePruneCursor(['adsb_snapshots_p20250101'])
+        adsb_history._known_partitions.update(
+            f'adsb_snapshots_p202501{d:02d}' for d in range(9, 14)
+        )
+        with patch.object(adsb_history, 'ADSB_HISTORY_RETENTION_DAYS', 7):
+            adsb_history.maintain_partitions(cur, 'adsb_snapshots', now=datetime(2025, 1, 10, 15, tzinfo=timezone.utc))
+
+        assert [sql for sql, _ in cur.statements('DROP TABLE')] == ['DROP TABLE adsb_snapshots_p20250101']
+        (_, params), = cur.statements('DELETE FROM adsb_snapshots')
+        assert params == [datetime(2025, 1, 3, tzinfo=timezone.utc)]
+
+    def test_failed_partition_is_retried(self):
+        import utils.adsb_history as adsb_history
+
+        cur = FakePruneCursor([])
+        day = date(2025, 1, 5)
+        name = 'adsb_messages_p20250105'
+        adsb_history._known_partitions.discard(name)
+        execute = cur.execute
+
+        def failing_execute(sql, params=None):
+            if sql.startswith('CREATE TABLE'):
+                raise adsb_history.psycopg2.OperationalError('lock timeout')
+            execute(sql, params)
+
+        cur.fetchone = lambda: (None,)
+        with patch.object(cur, 'execute', failing_execute):
+            adsb_history._ensure_partitions(cur, 'adsb_messages', [day])
+        assert name not in adsb_history._known_partitions
+
+        adsb_history._ensure_partitions(cur, 'adsb_messages', [day])
+        assert name in adsb_history._known_partitions
+        assert any(sql.startswith('ALTER TABLE adsb_messages ATTACH') for sql, _ in cur.executed)
+        adsb_history._known_partitions.discard(name)
+
+    def test_flush_publishes_through_stage(self):
+        import utils.adsb_history as adsb_history
+
+        store = {'inserts': [], 'copies': [], 'sql': []}
+        with patch.object(adsb_history, 'execute_values', lambda cur, sql, values: store['inserts'].append(sql)):
+            writer = adsb_history.AdsbSnapshotWriter()
+            writer._conn = FakeHistoryConnection(store)
+            assert writer._flush([{'captured_at': datetime(2025, 1, 1, tzinfo=timezone.utc), 'icao': 'ABC123'}])
+
+        assert store['inserts'] == ['INSERT INTO adsb_snapshots_stage (' + ', '.join(writer.fields) + ') VALUES %s']
+        statements = [' '.join(sql.split()) for sql in store['sql']]
+        assert statements[0].startswith('CREATE TEMP TABLE IF NOT EXISTS adsb_snapshots_stage ON COMMIT DELETE ROWS')
+        assert statements[2].startswith('INSERT INTO adsb_snapshots (')
+        assert statements[3].startswith('INSERT INTO adsb_rollup_hourly')
+        assert statements[4].startswith('INSERT INTO adsb_rollup_aircraft')
+
+
+class TestPartitionedHistoryPostgres:
+    """Partitioning, rollups and pruning against a real server."""
+
+    T0 = datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+    @pytest.fixture
+    def conn(self, pg_dsn):
+        import psycopg2
+
+        import utils.adsb_history as adsb_history
+
+        conn = psycopg2.connect(pg_dsn)
+        with conn.cursor() as cur:
+            cur.execute(
+                "DROP TABLE IF EXISTS adsb_messages, adsb_snapshots, adsb_messages_legacy, "
+                "adsb_snapshots_legacy, adsb_rollup_hourly, adsb_rollup_aircraft, adsb_history_migrations CASCADE"
+            )
+            cur.execute("DROP SEQUENCE IF EXISTS adsb_messages_id_seq, adsb_snapshots_id_seq")
+        conn.commit()
+        adsb_history._known_partitions.clear()
+        yield conn
+        conn.close()
+        adsb_history._known_partitions.clear()
+
+    def _snapshots(self, days, per_hour=6):
+        rows = []
+        for hour in range(days * 24):
+            for i in range(per_hour):
+                captured = self.T0 + timedelta(hours=hour, minutes=i * 10 + 3)
+                rows.append({'captured_at': captured, 'icao': f'{(hour + i) % 9:06X}', 'snapshot': {'h': hour}})
+        return rows
+
+    def _writer(self, conn, cls_name='AdsbSnapshotWriter'):
+        import utils.adsb_history as adsb_history
+
+        writer = getattr(adsb_history, cls_name)()
+        writer._conn = conn
+        return writer
+
+    def test_migrates_plain_table(self, conn):
+        from utils.adsb_history import _ensure_adsb_schema, adsb_history_migrated, migrate_adsb_history
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE adsb_messages (id BIGSERIAL PRIMARY KEY, received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(), "
+                "msg_time TIMESTAMPTZ, logged_time TIMESTAMPTZ, icao TEXT NOT NULL, msg_type SMALLINT, "
+                "callsign TEXT, altitude INTEGER, speed INTEGER, heading INTEGER, vertical_rate INTEGER, "
+                "lat DOUBLE PRECISION, lon DOUBLE PRECISION, squawk TEXT, session_id TEXT, aircraft_id TEXT, "
+                "flight_id TEXT, raw_line TEXT, source_host TEXT)"
+            )
+            cur.execute(
+                "INSERT INTO adsb_messages (received_at, icao) VALUES (%s, 'ABC123'), (%s, 'ABC124')",
+                (self.T0, self.T0 + timedelta(hours=30)),
+            )
+        conn.commit()
+
+        # The request-path check leaves the plain table alone
+        assert _ensure_adsb_schema(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE relname = 'adsb_messages'")
+            assert cur.fetchone() == ('r',)
+            assert not adsb_history_migrated(cur)
+        conn.commit()
+
+        migrate_adsb_history(conn)
+        with conn.cursor() as cur:
+            assert adsb_history_migrated(cur)
+        conn.commit()
+        # Running it again is a no-op
+        migrate_adsb_history(conn)
+        writer = self._writer(conn, 'AdsbHistoryWriter')
+        assert writer._flush([{'received_at': self.T0 + timedelta(days=3), 'icao': 'ABC125'}])
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE relname = 'adsb_messages'")
+            assert cur.fetchone() == ('p',)
+            cur.execute("SELECT tableoid::regclass::text, id FROM adsb_messages ORDER BY received_at")
+            rows = cur.fetchall()
+            cur.execute("SELECT SUM(message_count) FROM adsb_rollup_hourly")
+            assert cur.fetchone() == (3,)
+        assert [r[0] for r in rows] == ['adsb_messages_legacy', 'adsb_messages_legacy', 'adsb_messages_p20250104']
+        # Ids continue from the legacy sequence
+        assert rows[2][1] > rows[1][1]
+
+    def test_summary_skips_rollups_until_migrated(self, monkeypatch):
+        import routes.adsb as adsb
+
+        now = self.T0 + timedelta(hours=5, minutes=10)
+        monkeypatch.setattr(adsb, '_history_rollups_ready', False)
+        _, params = adsb._summary_query(now, since_minutes=180)
+        assert params['full_start'] == params['full_end'] == params['start']
+
+    def test_concurrent_migrations_run_once(self, conn, pg_dsn):
+        import threading
+
+        import psycopg2
+
+        from utils.adsb_history import migrate_adsb_history
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE adsb_snapshots (id BIGSERIAL PRIMARY KEY, captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(), "
+                "icao TEXT NOT NULL, callsign TEXT, registration TEXT, type_code TEXT, type_desc TEXT, "
+                "altitude INTEGER, speed INTEGER, heading INTEGER, vertical_rate INTEGER, lat DOUBLE PRECISION, "
+                "lon DOUBLE PRECISION, squawk TEXT, source_host TEXT, snapshot JSONB)"
+            )
+            cur.execute("INSERT INTO adsb_snapshots (captured_at, icao) VALUES (%s, 'ABC123')", (self.T0,))
+        conn.commit()
+
+        errors = []
+
+        def migrate():
+            other = psycopg2.connect(pg_dsn)
+            try:
+                migrate_adsb_history(other)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                other.close()
+
+        threads = [threading.Thread(target=migrate) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        assert errors == []
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE relname = 'adsb_snapshots'")
+            assert cur.fetchone() == ('p',)
+            cur.execute("SELECT SUM(snapshot_count) FROM adsb_rollup_hourly")
+            assert cur.fetchone() == (1,)
+
+    def test_rollups_match_raw_and_prune(self, conn, monkeypatch):
+        import routes.adsb as adsb
+        from utils.adsb_history import _ensure_adsb_schema, prune_history
+
+        _ensure_adsb_schema(conn)
+        writer = self._writer(conn)
+        rows = self._snapshots(days=3)
+        for i in range(0, len(rows), 50):
+            assert writer._flush(rows[i:i + 50])
+
+        now = self.T0 + timedelta(days=2, hours=20, minutes=35)
+        monkeypatch.setattr(adsb, '_history_rollups_ready', True)
+        sql, params = adsb._summary_query(now, since_minutes=1500)
+        assert params['full_start'] < params['full_end']
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            summary = cur.fetchone()
+            cur.execute(
+                "SELECT 0::bigint, COUNT(*), COUNT(DISTINCT icao), MIN(captured_at), MAX(captured_at) "
+                "FROM adsb_snapshots WHERE captured_at >= %s",
+                (params['start'],),
+            )
+            assert summary == cur.fetchone()
+
+            removed = prune_history(cur, self.T0 + timedelta(hours=12, minutes=30), self.T0 + timedelta(days=2))
+            cur.execute("SELECT COUNT(*) FROM adsb_snapshots")
+            remaining = cur.fetchone()[0]
+            cur.execute("SELECT SUM(snapshot_count) FROM adsb_rollup_hourly")
+            assert cur.fetchone()[0] == remaining
+            cur.execute("SELECT to_regclass('adsb_snapshots_p20250102')")
+            assert cur.fetchone() == (None,)
+        conn.commit()
+        # 12:30-24:00 on day one (69 rows) and all of day two
+        assert removed == {'adsb_messages': 0, 'adsb_snapshots': 69 + 144}
+        assert remaining == len(rows) - 69 - 144
+
+    def test_prune_one_table_keeps_other_rollups(self, conn):
+        from utils.adsb_history import _ensure_adsb_schema, prune_history
+
+        _ensure_adsb_schema(conn)
+        snapshots = self._snapshots(days=2)
+        messages = [{'received_at': row['captured_at'], 'icao': row['icao']} for row in snapshots]
+        assert self._writer(conn)._flush(snapshots)
+        assert self._writer(conn, 'AdsbHistoryWriter')._flush(messages)
+
+        rollup_sql = (
+            "SELECT hour, message_count, snapshot_count, first_seen, last_seen FROM adsb_rollup_hourly ORDER BY hour"
+        )
+        with conn.cursor() as cur:
+            cur.execute(rollup_sql)
+            before = cur.fetchall()
+            cur.execute("SELECT * FROM adsb_rollup_aircraft ORDER BY hour, icao")
+            aircraft_before = cur.fetchall()
+
+            removed = prune_history(cur, None, self.T0 + timedelta(days=1, hours=6, minutes=30), tables=('adsb_messages',))
+            assert removed == {'adsb_messages': 24 * 6 + 6 * 6 + 3}
+
+            cur.execute(rollup_sql)
+            after = cur.fetchall()
+            cur.execute("SELECT * FROM adsb_rollup_aircraft ORDER BY hour, icao")
+            assert cur.fetchall() == aircraft_before
+            cur.execute(
+                "SELECT date_trunc('hour', received_at), COUNT(*) FROM adsb_messages GROUP BY 1 ORDER BY 1"
+            )
+            message_counts = dict(cur.fetchall())
+        conn.commit()
+
+        # Snapshot columns are untouched and message counts match the rows left
+        assert [row[:1] + row[2:] for row in after] == [row[:1] + row[2:] for row in before]
+        assert {row[0]: row[1] for row in after if row[1]} == message_counts
@@ -0,0 +1,281 @@
+"""Tests for the streaming ADS-B history export."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import routes.adsb as adsb
+
+T0 = datetime(2025, 3, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+# ICAO/callsign pairs on both sides of every classification rule
+AIRCRAFT = [
+    ('ADF7C0', 'UAL12'),    # first US military address
+    ('ADF7BF', 'UAL13'),    # just below the range
+    ('AEFFFF', None),       # last US military address
+    ('43C123', 'BAW1'),     # UK military
+    ('4CA123', 'RCH405'),   # civil address, military callsign
+    ('4CA124', ' reach1 '), # callsign with padding and lower case
+    ('4CA125', 'RYR4AB'),
+    ('3d0010', 'DLH1'),     # lower-case hex
+    ('ADF7C01', 'TEST'),    # too long to be an ICAO address
+    ('XYZ', ''),
+]
+
+
+def _message(i: int) -> dict:
+    icao, callsign = AIRCRAFT[i % len(AIRCRAFT)]
+    return {
+        'received_at': T0 - timedelta(seconds=i),
+        'msg_time': None,
+        'logged_time': None,
+        'icao': icao,
+        'msg_type': 3,
+        'callsign': callsign,
+        'altitude': 30000 + i,
+        'speed': 420,
+        'heading': 90,
+        'vertical_rate': 0,
+        'lat': 51.5,
+        'lon': -0.1,
+        'squawk': '7000',
+        'session_id': '1',
+        'aircraft_id': '1',
+        'flight_id': '1',
+        'source_host': 'localhost',
+        'raw_line': f'MSG,3,1,1,{icao},1',
+    }
+
+
+class FakeCursor:
+    """Named cursor serving rows in fetchmany batches."""
+
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.itersize = None
+        self._rows = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.conn.executed.append((self.name, sql, params))
+        section = self.name.rsplit('_', 1)[1]
+        self._rows = iter(self.conn.factories.get(section, lambda: iter(()))())
+
+    def fetchmany(self, size):
+        self.conn.batch_sizes.append(size)
+        return [row for _, row in zip(range(size), self._rows)]
+
+    def fetchall(self):
+        raise AssertionError('export must not buffer whole result sets')
+
+
+class FakeConnection:
+    def __init__(self, **factories):
+        self.factories = factories
+        self.executed = []
+        self.batch_sizes = []
+        self.closed = False
+
+    def cursor(self, name=None, cursor_factory=None):
+        assert name, 'export must use a server-side cursor'
+        return FakeCursor(self, name)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def auth_client(client):
+    """Client with logged-in session."""
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+    return client
+
+
+@pytest.fixture
+def history(monkeypatch):
+    monkeypatch.setattr(adsb, 'ADSB_HISTORY_ENABLED', True)
+    monkeypatch.setattr(adsb, 'PSYCOPG2_AVAILABLE', True)
+    monkeypatch.setattr(adsb, '_history_schema_checked', True)
+    monkeypatch.setattr(adsb, '_history_rollups_ready', True)
+    monkeypatch.setattr(adsb, 'ADSB_EXPORT_BATCH_SIZE', 100)
+
+    def install(conn):
+        monkeypatch.setattr(adsb, '_get_history_connection', lambda: conn)
+        return conn
+
+    return install
+
+
+def _messages(count: int):
+    return lambda: (_message(i) for i in range(count))
+
+
+class TestExportQuery:
+    """SQL built for each export section."""
+
+    def test_classification_pushed_into_sql(self):
+        sql, params = adsb._build_export_query(
+            'messages', scope='all', since_minutes=60, start=None, end=None,
+            icao='', search='', classification='military',
+        )
+        assert 'ORDER BY received_at DESC' in sql
+        assert sql.count('BETWEEN %s AND %s') == len(adsb.MILITARY_ICAO_RANGES)
+        assert params[:2] == ['ADF7C0', 'ADFFFF']
+        assert 'REACH%' in params[-1]
+
+        civilian_sql, civilian_params = adsb._build_export_query(
+            'snapshots', scope='all', since_minutes=60, start=None, end=None,
+            icao='', search='', classification='civilian',
+        )
+        assert ' NOT (COALESCE(' in civilian_sql
+        assert civilian_params == params
+
+    def test_sessions_ignore_aircraft_filters(self):
+        sql, params = adsb._build_export_query(
+            'sessions', scope='window', since_minutes=90, start=None, end=None,
+            icao='ABC123', search='x', classification='military',
+        )
+        assert 'icao' not in sql
+        assert params == ['90 minutes']
+
+
+class TestStreamingExport:
+    """Responses are produced batch by batch from server-side cursors."""
+
+    def test_csv_streams_batches(self, auth_client, history):
+        conn = history(FakeConnection(messages=_messages(250)))
+        resp = auth_client.get('/adsb/history/export?type=messages&format=csv&scope=all')
+
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.headers['Content-Disposition'].startswith('attachment; filename=adsb_history_messages_all_')
+        rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+        assert rows[0][0] == 'Exported At'
+        header = rows.index(['Messages']) + 1
+        assert rows[header][0] == 'received_at'
+        assert len(rows[header + 1:-1]) == 250
+        assert conn.batch_sizes == [100, 100, 100, 100]
+        assert [name for name, _, _ in conn.executed] == ['adsb_export_messages']
+        resp.close()
+        assert conn.closed
+
+    def test_json_document(self, auth_client, history):
+        history(FakeConnection(messages=_messages(3), sessions=lambda: iter([{'id': 1, 'started_at': T0}])))
+        resp = auth_client.get('/adsb/history/export?format=json&scope=all&classification=civilian')
+
+        data = json.loads(resp.get_data(as_text=True))
+        assert data['counts'] == {'messages': 3, 'snapshots': 0, 'sessions': 1}
+        assert data['filters']['classification'] == 'civilian'
+        assert data['messages'][0]['received_at'] == T0.isoformat()
+        assert data['sessions'] == [{'id': 1, 'started_at': T0.isoformat()}]
+
+    def test_ndjson_lines(self, auth_client, history):
+        history(FakeConnection(snapshots=lambda: iter([{'icao': 'ABC123', 'captured_at': T0}] * 2)))
+        resp = auth_client.get('/adsb/history/export?format=ndjson&type=snapshots')
+
+        assert resp.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert lines[0]['section'] == 'export' and lines[0]['type'] == 'snapshots'
+        assert lines[1] == {'section': 'snapshots', 'icao': 'ABC123', 'captured_at': T0.isoformat()}
+        assert lines[-1] == {'section': 'counts', 'messages': 0, 'snapshots': 2, 'sessions': 0}
+
+    @pytest.mark.parametrize('method', ['get', 'head'])
+    def test_connection_closed_without_reading_body(self, auth_client, history, method):
+        conn = history(FakeConnection(messages=_messages(250)))
+        resp = getattr(auth_client, method)('/adsb/history/export?type=messages&format=csv')
+
+        assert resp.status_code == 200
+        assert not conn.closed
+        resp.close()
+        assert conn.closed
+        assert conn.executed == []
+
+    def test_connection_failure_is_503(self, auth_client, history, monkeypatch):
+        history(None)
+
+        def fail():
+            raise OSError('connection refused')
+
+        monkeypatch.setattr(adsb, '_get_history_connection', fail)
+        resp = auth_client.get('/adsb/history/export?format=csv')
+        assert resp.status_code == 503
+
+    def test_rejects_unknown_format(self, auth_client, history):
+        history(FakeConnection())
+        assert auth_client.get('/adsb/history/export?format=xml').status_code == 400
+
+    def test_memory_is_constant(self, auth_client, history):
+        # Only count allocations made by the export and the row source;
+        # background threads of the app allocate on their own schedule
+        own = [tracemalloc.Filter(True, adsb.__file__), tracemalloc.Filter(True, __file__)]
+
+        def held_during(count: int) -> int:
+            history(FakeConnection(messages=_messages(count)))
+            resp = auth_client.get('/adsb/history/export?type=messages&format=ndjson&scope=all')
+            tracemalloc.start()
+            held = lines = 0
+            every = max(1, count // 1000)
+            for i, chunk in enumerate(resp.response):
+                lines += chunk.count(b'\n')
+                if i % every == 1:
+                    snapshot = tracemalloc.take_snapshot().filter_traces(own)
+                    held = max(held, sum(stat.size for stat in snapshot.statistics('filename')))
+            tracemalloc.stop()
+            assert lines == count + 2
+            return held
+
+        small = held_during(2_000)
+        large = held_during(20_000)
+        assert large < 2 * small
+
+
+class TestPostgresExport:
+    """Against a real server: named cursors and SQL classification."""
+
+    @pytest.fixture
+    def db(self, pg_dsn, history, monkeypatch):
+        import psycopg2
+        from psycopg2.extras import execute_values
+
+        from utils.adsb_history import _ensure_adsb_schema
+
+        conn = psycopg2.connect(pg_dsn)
+        _ensure_adsb_schema(conn)
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE adsb_messages")
+            columns = adsb._EXPORT_SECTIONS['messages'][2]
+            execute_values(
+                cur,
+                f"INSERT INTO adsb_messages ({', '.join(columns)}) VALUES %s",
+                [tuple(_message(i)[c] for c in columns) for i in range(1_000)],
+            )
+        conn.commit()
+        conn.close()
+        history(None)
+        monkeypatch.setattr(adsb, '_get_history_connection', lambda: psycopg2.connect(pg_dsn))
+
+    @pytest.mark.parametrize('classification', ['military', 'civilian'])
+    def test_sql_classification_matches_python(self, auth_client, db, classification):
+        resp = auth_client.get(f'/adsb/history/export?type=messages&format=ndjson&scope=all'
+                               f'&classification={classification}')
+        rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()[1:-1]]
+
+        want_military = classification == 'military'
+        expected = [
+            _message(i)['icao'] for i in range(1_000)
+            if adsb._is_military_aircraft(_message(i)['icao'], _message(i)['callsign']) == want_military
+        ]
+        assert [r['icao'] for r in rows] == expected
@@ -325,6 +325,43 @@ class TestDataSnapshots:
 
         assert test_queue.qsize() <= 100
 
+    def test_wifi_csv_changes_merge_in_place(self, mode_manager, tmp_path):
+        """Changed airodump rows update the existing dicts instead of copying them."""
+        import threading
+        from types import SimpleNamespace
+
+        csv_path = str(tmp_path / 'scan')
+        open(csv_path + '-01.csv', 'w').close()
+        stop_event = threading.Event()
+        mode_manager.stop_events['wifi'] = stop_event
+
+        def network(bssid, rssi):
+            return SimpleNamespace(
+                bssid=bssid, essid='Net', channel=6, frequency_mhz=2437, rssi=rssi, security='WPA2',
+                cipher='CCMP', auth='PSK', vendor=None, beacon_count=1, data_count=0, band='2.4',
+            )
+
+        changes = iter([
+            ([network('AA:AA:AA:AA:AA:01', -50), network('AA:AA:AA:AA:AA:02', -60)], [{'mac': '11:11:11:11:11:11'}]),
+            ([network('AA:AA:AA:AA:AA:02', -40)], []),
+        ])
+
+        def read_changes(self):
+            result = next(changes, ([], []))
+            if result == ([], []):
+                stop_event.set()
+            return result
+
+        networks = mode_manager.wifi_networks
+        with patch('utils.wifi.parsers.airodump.AirodumpCSVReader.read_changes', read_changes), \
+                patch('intercept_agent.time.sleep'):
+            mode_manager._wifi_csv_reader(csv_path)
+
+        assert mode_manager.wifi_networks is networks
+        assert networks['AA:AA:AA:AA:AA:01']['signal'] == -50
+        assert networks['AA:AA:AA:AA:AA:02']['signal'] == -40
+        assert list(mode_manager.wifi_clients) == ['11:11:11:11:11:11']
+
 
 # =============================================================================
 # Mode Status Tests
@@ -0,0 +1,143 @@
+"""Tests for the memory-mapped aircraft registry."""
+
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from utils import aircraft_db
+
+AIRCRAFT = {
+    '4CA87C': ['EI-DEO', 'A320', '00'],
+    'a1b2c3': ['N123AB', 'B738', '00'],
+    '3C6444': {'r': 'D-AIBD', 't': 'A319'},
+    '000001': ['', '', '00'],
+    '~12ABCD': ['TISB', 'C172', '00'],
+}
+TYPES = {
+    'A320': ['AIRBUS A-320', 'L2J', 'M'],
+    'B738': 'BOEING 737-800',
+}
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    """Point the module at a temporary data directory and reset its state."""
+    monkeypatch.setattr(aircraft_db, 'DB_FILE', str(tmp_path / 'aircraft_db.json'))
+    monkeypatch.setattr(aircraft_db, 'DB_BIN_FILE', str(tmp_path / 'aircraft_db.bin'))
+    monkeypatch.setattr(aircraft_db, 'DB_META_FILE', str(tmp_path / 'aircraft_db_meta.json'))
+    monkeypatch.setattr(aircraft_db, '_registry', None)
+    monkeypatch.setattr(aircraft_db, '_db_loaded', False)
+    return tmp_path
+
+
+class TestBinaryRegistry:
+    """Build and lookup round trips."""
+
+    def test_lookup_round_trip(self, registry_dir):
+        assert aircraft_db.build_binary_database(AIRCRAFT, TYPES) == 4
+        assert aircraft_db.load_database()
+
+        assert aircraft_db.lookup('4ca87c') == {
+            'registration': 'EI-DEO',
+            'type_code': 'A320',
+            'type_desc': 'AIRBUS A-320',
+        }
+        assert aircraft_db.lookup('A1B2C3')['type_desc'] == 'BOEING 737-800'
+        assert aircraft_db.lookup('3C6444') == {
+            'registration': 'D-AIBD',
+            'type_code': 'A319',
+            'type_desc': '',
+        }
+        assert aircraft_db.lookup('000001') == {'registration': '', 'type_code': '', 'type_desc': ''}
+
+    def test_lookup_misses(self, registry_dir):
+        aircraft_db.build_binary_database(AIRCRAFT, TYPES)
+        aircraft_db.load_database()
+
+        assert aircraft_db.lookup('FFFFFF') is None
+        assert aircraft_db.lookup('000000') is None
+        assert aircraft_db.lookup('not-hex') is None
+        assert aircraft_db.lookup('') is None
+
+    def test_lookup_before_load(self, registry_dir):
+        assert aircraft_db.lookup('4CA87C') is None
+        assert aircraft_db.get_db_status()['aircraft_count'] == 0
+
+    def test_legacy_json_is_converted(self, registry_dir):
+        with open(aircraft_db.DB_FILE, 'w') as f:
+            json.dump({'aircraft': AIRCRAFT, 'types': TYPES}, f)
+
+        assert aircraft_db.load_database()
+        assert (registry_dir / 'aircraft_db.bin').exists()
+        assert aircraft_db.lookup('4CA87C')['registration'] == 'EI-DEO'
+        assert aircraft_db.get_db_status()['aircraft_count'] == 4
+
+    def test_rejects_foreign_file(self, registry_dir):
+        (registry_dir / 'aircraft_db.bin').write_bytes(b'not a registry' * 4)
+        assert aircraft_db.load_database() is False
+        assert aircraft_db.lookup('4CA87C') is None
+
+    def test_delete_database(self, registry_dir):
+        aircraft_db.build_binary_database(AIRCRAFT, TYPES)
+        aircraft_db.load_database()
+
+        assert aircraft_db.delete_database()['success']
+        assert aircraft_db.lookup('4CA87C') is None
+        assert not (registry_dir / 'aircraft_db.bin').exists()
+
+    def test_concurrent_lookups(self, registry_dir):
+        aircraft_db.build_binary_database(AIRCRAFT, TYPES)
+        aircraft_db.load_database()
+        errors = []
+
+        def worker():
+            for _ in range(2000):
+                if aircraft_db.lookup('4CA87C')['registration'] != 'EI-DEO':
+                    errors.append('mismatch')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+
+
+class TestRegistryFootprint:
+    """Memory use and lookup results of the binary registry versus JSON."""
+
+    COUNT = 100_000
+
+    def _dataset(self):
+        aircraft = {f'{i * 97:06X}': [f'N{i:05d}', f'T{i % 500:03d}', '00'] for i in range(self.COUNT)}
+        types = {f'T{i:03d}': [f'TYPE {i}', 'L2J', 'M'] for i in range(500)}
+        return aircraft, types
+
+    def test_binary_registry_vs_json(self, registry_dir):
+        aircraft, types = self._dataset()
+        with open(aircraft_db.DB_FILE, 'w') as f:
+            json.dump({'aircraft': aircraft, 'types': types}, f, separators=(',', ':'))
+        aircraft_db.build_binary_database(aircraft, types)
+        keys = list(aircraft)[::10]
+        del aircraft, types
+
+        # Previous path: parse the whole JSON file into dicts
+        tracemalloc.start()
+        with open(aircraft_db.DB_FILE) as f:
+            data = json.load(f)
+        json_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        assert aircraft_db.load_database()
+        bin_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        assert bin_bytes * 100 < json_bytes
+        for key in keys:
+            registration, type_code, _ = data['aircraft'][key]
+            result = aircraft_db.lookup(key)
+            assert result['registration'] == registration
+            assert result['type_code'] == type_code
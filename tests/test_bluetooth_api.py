@@ -8,6 +8,7 @@ from flask import Flask
 
 from routes.bluetooth_v2 import bluetooth_v2_bp
 from utils.bluetooth.models import BTDeviceAggregate, SystemCapabilities
+from utils.sse import EntityRevisions
 
 
 @pytest.fixture
@@ -178,6 +179,37 @@ class TestDeviceEndpoints:
             new_only=True,
         )
 
+    def test_list_devices_since_revision(self, client, mock_scanner, sample_device):
+        """Test polling with a revision returns only changed fields."""
+        mock_scanner.get_devices.return_value = [sample_device]
+
+        with patch('routes.bluetooth_v2.bt_revisions', EntityRevisions('device_id')):
+            first = client.get('/api/bluetooth/devices').get_json()
+            sample_device.rssi_current = -70
+            changed = client.get(f"/api/bluetooth/devices?since={first['revision']}").get_json()
+
+        assert first['devices'][0]['address'] == 'AA:BB:CC:DD:EE:FF'
+        assert changed['revision'] > first['revision']
+        device = changed['devices'][0]
+        assert device['device_id'] == sample_device.device_id
+        assert device['rssi_current'] == -70
+        assert 'address' not in device and 'name' not in device
+
+    def test_list_devices_since_reports_expired_devices(self, client, mock_scanner, sample_device):
+        """Test a device that expires between two polls is listed as removed."""
+        mock_scanner.get_devices.return_value = [sample_device]
+
+        with patch('routes.bluetooth_v2.bt_revisions', EntityRevisions('device_id')):
+            first = client.get('/api/bluetooth/devices').get_json()
+            mock_scanner.get_devices.return_value = []
+            expired = client.get(f"/api/bluetooth/devices?since={first['revision']}").get_json()
+            unchanged = client.get(f"/api/bluetooth/devices?since={expired['revision']}").get_json()
+
+        assert expired['devices'] == []
+        assert expired['removed'] == [sample_device.device_id]
+        assert expired['revision'] > first['revision']
+        assert unchanged['removed'] == []
+
     def test_get_device_detail(self, client, mock_scanner, sample_device):
         """Test getting device details."""
         mock_scanner.get_device.return_value = sample_device
@@ -0,0 +1,254 @@
+"""Tests for the striped, heap-expiring DataStore."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import utils.cleanup as cleanup
+from utils.cleanup import DataStore
+
+
+class LegacyDataStore:
+    """Single-lock store with a full scan in cleanup, as before striping."""
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.data = {}
+        self.timestamps = {}
+        self.max_age = max_age_seconds
+        self._lock = threading.Lock()
+
+    def set(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self.timestamps[key] = time.time()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self.data.get(key, default)
+
+    def all(self):
+        with self._lock:
+            return dict(self.data)
+
+    def cleanup(self):
+        now = time.time()
+        with self._lock:
+            expired = [k for k, ts in self.timestamps.items() if now - ts > self.max_age]
+            for key in expired:
+                del self.data[key]
+                del self.timestamps[key]
+        return len(expired)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for expiry tests."""
+    now = [1000.0]
+    monkeypatch.setattr(cleanup.time, 'time', lambda: now[0])
+    return now
+
+
+def _heap_size(store: DataStore) -> int:
+    return sum(len(stripe.heap) for stripe in store._stripes)
+
+
+class TestDataStoreApi:
+    """Behaviour callers rely on is unchanged."""
+
+    def test_point_operations(self):
+        store = DataStore(stripes=4)
+        store.set('a', {'x': 1})
+        store['b'] = 2
+        store.update('a', {'y': 2})
+        store.update('b', {'z': 3})
+        store.update('c', {'new': True})
+
+        assert store.get('a') == {'x': 1, 'y': 2}
+        assert store['b'] == {'z': 3}
+        assert store.get('missing', 'dflt') == 'dflt'
+        assert 'c' in store and len(store) == 3
+        assert store.delete('c') and not store.delete('c')
+        del store['b']
+        with pytest.raises(KeyError):
+            del store['b']
+        with pytest.raises(KeyError):
+            store['b']
+        assert store.all() == {'a': {'x': 1, 'y': 2}}
+
+    def test_bulk_reads_cover_every_stripe(self):
+        store = DataStore(stripes=8)
+        for i in range(200):
+            store.set(f'k{i}', i)
+
+        assert store.snapshot() == {f'k{i}': i for i in range(200)}
+        assert sorted(store.values()) == list(range(200))
+        assert sorted(store.keys()) == sorted(f'k{i}' for i in range(200))
+        assert len(store.items()) == len(store) == 200
+        store.clear()
+        assert len(store) == 0 and _heap_size(store) == 0
+
+    def test_bulk_reads_keep_insertion_order(self):
+        store = DataStore(stripes=8)
+        expected = {}
+        for i in range(200):
+            store.set(f'k{i}', i)
+            expected[f'k{i}'] = i
+        # Refreshing keeps a key's place; deleting and re-adding moves it last
+        store.set('k5', 'refreshed')
+        expected['k5'] = 'refreshed'
+        store.update('k7', {'x': 1})
+        expected['k7'] = {'x': 1}
+        store.delete('k3')
+        store.set('k3', 'back')
+        del expected['k3']
+        expected['k3'] = 'back'
+
+        assert list(store.keys()) == list(expected)
+        assert store.values() == list(expected.values())
+        assert store.items() == list(expected.items())
+
+    def test_snapshot_is_consistent(self):
+        # A writer moves one token between keys in different stripes; a
+        # consistent snapshot always sees exactly one holder
+        store = DataStore(stripes=16)
+        keys = [f'holder{i}' for i in range(32)]
+        store.set(keys[0], True)
+        stop = threading.Event()
+
+        def move():
+            i = 0
+            while not stop.is_set():
+                src, dst = keys[i % 32], keys[(i + 1) % 32]
+                with store._all_locked():
+                    store._stripe(src).remove(src)
+                    store._stripe(dst).data[dst] = True
+                    store._stripe(dst).order[dst] = next(store._sequence)
+                    store._stripe(dst).stamp(dst, time.time())
+                i += 1
+
+        thread = threading.Thread(target=move)
+        thread.start()
+        try:
+            for _ in range(500):
+                assert len(store.snapshot()) == 1
+        finally:
+            stop.set()
+            thread.join()
+
+
+class TestExpiry:
+    """Cleanup removes exactly the stale entries and only visits due ones."""
+
+    def test_expires_only_stale_entries(self, clock):
+        store = DataStore(max_age_seconds=60, stripes=4)
+        store.set('old', 1)
+        store.set('touched', 2)
+        clock[0] += 40
+        store.set('new', 3)
+        store.touch('touched')
+        store.touch('absent')
+        clock[0] += 30
+
+        assert store.cleanup() == 1
+        assert sorted(store.keys()) == ['new', 'touched']
+        clock[0] += 45
+        assert store.cleanup() == 2
+        assert len(store) == 0 and _heap_size(store) == 0
+
+    def test_matches_full_scan(self, clock):
+        store = DataStore(max_age_seconds=10, stripes=8)
+        legacy = LegacyDataStore(max_age_seconds=10)
+        for step in range(300):
+            clock[0] += 0.5
+            key = f'k{(step * 7) % 90}'
+            if step % 11 == 0:
+                store.delete(key)
+                legacy.data.pop(key, None)
+                legacy.timestamps.pop(key, None)
+            else:
+                store.set(key, step)
+                legacy.set(key, step)
+            if step % 5 == 0:
+                assert store.cleanup() == legacy.cleanup()
+                assert list(store.all().items()) == list(legacy.all().items())
+
+    def test_refreshes_do_not_grow_heap(self, clock):
+        store = DataStore(max_age_seconds=60, stripes=2)
+        for i in range(10_000):
+            clock[0] += 0.01
+            store.set(f'k{i % 10}', i)
+        assert _heap_size(store) == 10
+
+    def test_delete_and_readd_keeps_heap_bounded(self, clock):
+        store = DataStore(max_age_seconds=60, stripes=1)
+        for _ in range(1_000):
+            clock[0] += 0.01
+            store.set('flap', 1)
+            store.delete('flap')
+        store.set('flap', 1)
+        assert _heap_size(store) <= 2 * len(store) + 65
+
+        clock[0] += 61
+        assert store.cleanup() == 1
+
+    def test_cleanup_visits_only_due_entries(self, clock, mocker):
+        store = DataStore(max_age_seconds=60)
+        for i in range(5_000):
+            store.set(f'k{i}', i)
+        clock[0] += 30
+        store.set('fresh', 1)
+
+        pop = mocker.spy(cleanup.heapq, 'heappop')
+        assert store.cleanup() == 0
+        assert pop.call_count == 0
+
+        clock[0] += 31
+        assert store.cleanup() == 5_000
+        assert pop.call_count == 5_000
+        assert list(store.keys()) == ['fresh']
+
+
+class TestContention:
+    """Writers and readers racing a busy janitor."""
+
+    KEYS = 5_000
+
+    def test_concurrent_writers_readers_and_cleanup(self):
+        store = DataStore(300)
+        for i in range(self.KEYS):
+            store.set(f'{i:06X}', {'icao': i})
+        stop = threading.Event()
+        errors = []
+
+        def run(fn):
+            try:
+                while not stop.is_set():
+                    fn()
+            except Exception as e:
+                errors.append(e)
+
+        def writer(n):
+            counter = iter(range(n, 1 << 62, 4))
+            return lambda: store.set(f'{next(counter) % self.KEYS:06X}', {'icao': n})
+
+        def reader():
+            snapshot = store.snapshot()
+            assert len(snapshot) == self.KEYS
+
+        threads = [threading.Thread(target=run, args=(writer(n),)) for n in range(4)]
+        threads.append(threading.Thread(target=run, args=(reader,)))
+        threads.append(threading.Thread(target=run, args=(store.cleanup,)))
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        # Nothing is stale, and refreshes never reorder or duplicate keys
+        assert list(store.keys()) == [f'{i:06X}' for i in range(self.KEYS)]
+        assert _heap_size(store) == self.KEYS
@@ -1,8 +1,61 @@
 """Tests for device correlation engine."""
 
+import random
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
+BASE_MS = 1_700_000_000_000
+
+
+def _population(n_wifi, n_bt, span_s, seed=1):
+    """Synthetic passers-by: each device present for 30 s - 10 min."""
+    rng = random.Random(seed)
+    ouis = ['AA:BB:CC', '11:22:33', 'DE:AD:BE', 'F0:0D:00']
+    makers = ['Apple', 'Samsung', 'Google', None]
+
+    def device(i):
+        start = BASE_MS + rng.randrange(span_s) * 1000
+        oui = rng.randrange(len(ouis))
+        return f'{ouis[oui]}:{i // 65536:02X}:{i // 256 % 256:02X}:{i % 256:02X}', {
+            'first_seen': start,
+            'last_seen': start + rng.randrange(30, 600) * 1000,
+            'rssi': rng.randrange(-90, -40),
+            'manufacturer': makers[oui],
+            'name': f'dev{i}' if rng.random() < 0.5 else None,
+        }
+
+    wifi = dict(device(i) for i in range(n_wifi))
+    bt = dict(device(i + n_wifi) for i in range(n_bt))
+    return wifi, bt
+
+
+def _count_scored(correlator):
+    """Count the pairs a correlator scores; returns a one-item list."""
+    scored = [0]
+    score = correlator._calculate_confidence
+
+    def counting(*args, **kwargs):
+        scored[0] += 1
+        return score(*args, **kwargs)
+
+    correlator._calculate_confidence = counting
+    return scored
+
+
+def _all_pairs(correlator, wifi_devices, bt_devices):
+    """Reference: score every co-located pair by brute force."""
+    results = set()
+    for wifi_mac, wifi_data in wifi_devices.items():
+        wifi = correlator._to_observation(wifi_mac, wifi_data, 'wifi')
+        for bt_mac, bt_data in bt_devices.items():
+            bt = correlator._to_observation(bt_mac, bt_data, 'bluetooth')
+            if not correlator._co_located(wifi, bt):
+                continue
+            confidence = correlator._calculate_confidence(wifi, bt)
+            if confidence >= correlator.min_confidence:
+                results.add((wifi_mac, bt_mac, round(confidence, 2)))
+    return results
+
 
 class TestDeviceCorrelator:
     """Tests for DeviceCorrelator class."""
@@ -337,3 +390,125 @@ class TestCorrelationReason:
         # If correlation found, should mention timing
         if correlations and correlations[0]['confidence'] > 0.3:
             assert 'appeared' in correlations[0]['reason'] or 'timing' in correlations[0]['reason']
+
+
+class TestBucketedCorrelation:
+    """Time-bucket candidate generation and incremental counters."""
+
+    @patch('utils.correlation.add_correlations')
+    def test_matches_all_pairs(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        wifi, bt = _population(300, 150, span_s=1800)
+        correlator = DeviceCorrelator(min_confidence=0.3)
+
+        found = {(c['wifi_mac'], c['bt_mac'], c['confidence']) for c in correlator.correlate(wifi, bt)}
+        assert found
+        assert found == _all_pairs(correlator, wifi, bt)
+
+    @patch('utils.correlation.add_correlations')
+    def test_arrival_within_window_without_overlap(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        correlator = DeviceCorrelator(time_window_seconds=30, min_confidence=0.05)
+        wifi = {'11:22:33:44:55:66': {'first_seen': BASE_MS, 'last_seen': BASE_MS}}
+        bt = {'77:88:99:AA:BB:CC': {'first_seen': BASE_MS + 25_000, 'last_seen': BASE_MS + 25_000}}
+
+        correlations = correlator.correlate(wifi, bt)
+        assert len(correlations) == 1
+        assert correlations[0]['co_occurrences'] == 0
+        assert 'appeared within 25s' in correlations[0]['reason']
+
+    @patch('utils.correlation.add_correlations')
+    def test_co_occurrences_accumulate_between_runs(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        correlator = DeviceCorrelator(min_confidence=0.0, bucket_seconds=10)
+        wifi = {'11:22:33:44:55:66': {'first_seen': BASE_MS, 'last_seen': BASE_MS + 15_000}}
+        bt = {'77:88:99:AA:BB:CC': {'first_seen': BASE_MS, 'last_seen': BASE_MS + 15_000}}
+        assert correlator.correlate(wifi, bt)[0]['co_occurrences'] == 2
+
+        # A later refresh only files the newly covered buckets
+        wifi['11:22:33:44:55:66']['last_seen'] = BASE_MS + 45_000
+        bt['77:88:99:AA:BB:CC']['last_seen'] = BASE_MS + 45_000
+        assert correlator.correlate(wifi, bt)[0]['co_occurrences'] == 5
+        assert correlator.correlate(wifi, bt)[0]['co_occurrences'] == 5
+
+    @patch('utils.correlation.add_correlations')
+    def test_changed_device_is_rescored(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        correlator = DeviceCorrelator(min_confidence=0.0)
+        wifi = {'11:22:33:44:55:66': {'first_seen': BASE_MS, 'last_seen': BASE_MS, 'rssi': -60}}
+        bt = {'77:88:99:AA:BB:CC': {'first_seen': BASE_MS, 'last_seen': BASE_MS, 'rssi': -90}}
+        before = correlator.correlate(wifi, bt)[0]['confidence']
+
+        bt['77:88:99:AA:BB:CC']['rssi'] = -60
+        after = correlator.correlate(wifi, bt)[0]
+        assert after['confidence'] == round(before + 0.1, 2)
+        assert 'similar signal strength' in after['reason']
+
+    @patch('utils.correlation.add_correlations')
+    def test_history_is_pruned(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        correlator = DeviceCorrelator(min_confidence=0.0, bucket_seconds=10, history_seconds=60)
+        wifi = {'11:22:33:44:55:66': {'first_seen': BASE_MS, 'last_seen': BASE_MS}}
+        bt = {'77:88:99:AA:BB:CC': {'first_seen': BASE_MS, 'last_seen': BASE_MS}}
+        correlator.correlate(wifi, bt)
+        assert correlator._pairs
+
+        later = BASE_MS + 600_000
+        correlator.correlate(
+            {'AA:AA:AA:AA:AA:AA': {'first_seen': later, 'last_seen': later}},
+            {'BB:BB:BB:BB:BB:BB': {'first_seen': later, 'last_seen': later}},
+        )
+        assert list(correlator._pairs) == ['AA:AA:AA:AA:AA:AA']
+        assert min(correlator._presence) >= later // 10_000 - 6
+        assert (0, '11:22:33:44:55:66') not in correlator._spans
+
+    @patch('utils.correlation.add_correlations')
+    def test_high_confidence_written_in_one_batch(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        correlator = DeviceCorrelator(min_confidence=0.5)
+        wifi = {
+            'AA:BB:CC:11:11:11': {'first_seen': BASE_MS, 'last_seen': BASE_MS, 'manufacturer': 'Apple'},
+            'AA:BB:CC:11:11:12': {'first_seen': BASE_MS, 'last_seen': BASE_MS, 'manufacturer': 'Apple'},
+        }
+        bt = {'AA:BB:CC:22:22:22': {'first_seen': BASE_MS, 'last_seen': BASE_MS, 'manufacturer': 'Apple'}}
+
+        assert len(correlator.correlate(wifi, bt)) == 2
+        mock_persist.assert_called_once()
+        rows = mock_persist.call_args[0][0]
+        assert sorted(r[0] for r in rows) == ['AA:BB:CC:11:11:11', 'AA:BB:CC:11:11:12']
+        assert all(r[1] == 'AA:BB:CC:22:22:22' and r[2] >= 0.7 for r in rows)
+
+
+class TestCorrelationScalability:
+    """Bucketed engine versus all-pairs scoring on synthetic populations."""
+
+    @patch('utils.correlation.add_correlations')
+    def test_scaling(self, mock_persist):
+        from utils.correlation import DeviceCorrelator
+
+        # Same density at each size: the population grows with the time span
+        scored = {}
+        for scale in (1, 2, 4):
+            wifi, bt = _population(500 * scale, 250 * scale, span_s=3600 * scale, seed=scale)
+            correlator = DeviceCorrelator(min_confidence=0.3, history_seconds=4 * 3600 * scale)
+            counter = _count_scored(correlator)
+            first = correlator.correlate(wifi, bt)
+            scored[scale] = counter[0]
+            # Unchanged devices are not scored again
+            assert correlator.correlate(wifi, bt) == first
+            assert counter[0] == scored[scale]
+
+        # Pair work grows with the population, not its square (16x here)
+        assert scored[4] < 8 * scored[1]
+        assert scored[4] < 2000 * 1000 // 10
+
+        wifi, bt = _population(1000, 500, span_s=7200, seed=2)
+        correlator = DeviceCorrelator(min_confidence=0.3, history_seconds=4 * 3600)
+        reference = _all_pairs(correlator, wifi, bt)
+        assert {(c['wifi_mac'], c['bt_mac'], c['confidence']) for c in correlator.correlate(wifi, bt)} == reference
@@ -255,3 +255,170 @@ class TestDeviceCorrelations:
                    if c['wifi_mac'] == 'AA:AA:AA:AA:AA:AA']
         assert len(matching) == 1
         assert matching[0]['confidence'] == 0.9
+
+
+class TestSettingsCache:
+    """Tests for the settings read-through cache."""
+
+    def test_cached_read_skips_database(self, temp_db):
+        """A second read is served without touching the database."""
+        import utils.database as database
+
+        database.set_setting('cached_key', 'value')
+        assert database.get_setting('cached_key') == 'value'
+
+        with patch.object(database, 'get_db', side_effect=AssertionError('db hit')):
+            assert database.get_setting('cached_key') == 'value'
+
+    def test_write_invalidates_cache(self, temp_db):
+        """set_setting and delete_setting are visible immediately."""
+        from utils.database import delete_setting, get_setting, set_setting
+
+        assert get_setting('flip', 'default') == 'default'
+        set_setting('flip', 'one')
+        assert get_setting('flip') == 'one'
+        set_setting('flip', 'two')
+        assert get_setting('flip') == 'two'
+        delete_setting('flip')
+        assert get_setting('flip', 'gone') == 'gone'
+
+    def test_cached_dict_is_not_shared(self, temp_db):
+        """Mutating a returned dict does not corrupt the cached value."""
+        from utils.database import get_setting, set_setting
+
+        set_setting('dict_key', {'a': 1})
+        first = get_setting('dict_key')
+        first['a'] = 99
+        assert get_setting('dict_key') == {'a': 1}
+
+
+class TestWriteBehind:
+    """Tests for batched write-behind inserts."""
+
+    def test_readings_batched_until_read(self, temp_db):
+        """Queued readings are flushed before a read."""
+        from utils.database import add_signal_reading, get_db, get_signal_history, get_write_behind_stats
+
+        for i in range(10):
+            add_signal_reading('wifi', 'AA:BB', -50 - i)
+
+        assert get_write_behind_stats()['signal_history']['pending'] == 10
+        with get_db() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM signal_history').fetchone()[0] == 0
+
+        history = get_signal_history('wifi', 'AA:BB')
+        assert len(history) == 10
+        assert get_write_behind_stats()['signal_history']['pending'] == 0
+
+    def test_close_flushes_pending_rows(self, temp_db):
+        """close_db writes out anything still queued."""
+        from utils.database import add_signal_reading, close_db, get_db
+
+        add_signal_reading('bluetooth', 'CC:DD', -70)
+        close_db()
+
+        with get_db() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM signal_history').fetchone()[0] == 1
+
+    def test_bad_row_does_not_drop_batch(self, temp_db):
+        """Rows violating a constraint are skipped, the rest are written."""
+        from utils.database import flush_write_behind, get_db, get_write_behind_buffer
+
+        buffer = get_write_behind_buffer(
+            'test_not_null',
+            'INSERT INTO signal_history (mode, device_id, signal_strength) VALUES (?, ?, ?)',
+        )
+        buffer.append(('wifi', 'AA', -40))
+        buffer.append(('wifi', None, -41))
+        buffer.append(('wifi', 'BB', -42))
+
+        assert flush_write_behind('test_not_null') == 2
+        assert buffer.rows_dropped == 1
+        with get_db() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM signal_history').fetchone()[0] == 2
+
+    def test_failed_flush_requeues_rows(self, temp_db):
+        """Rows survive a locked database and are written by the next flush."""
+        import sqlite3
+
+        import utils.database as database
+
+        buffer = database.get_write_behind_buffer(
+            'test_locked',
+            'INSERT INTO signal_history (mode, device_id, signal_strength) VALUES (?, ?, ?)',
+        )
+        buffer.append(('wifi', 'AA', -40))
+        buffer.append(('wifi', 'BB', -41))
+
+        with patch.object(database, 'get_db', side_effect=sqlite3.OperationalError('database is locked')):
+            with pytest.raises(sqlite3.OperationalError):
+                buffer.flush()
+        buffer.append(('wifi', 'CC', -42))
+
+        assert len(buffer) == 3
+        assert buffer.rows_dropped == 0
+        assert buffer.is_due(float('inf'))
+        assert buffer.flush() == 3
+        with database.get_db() as conn:
+            rows = conn.execute('SELECT device_id FROM signal_history ORDER BY id').fetchall()
+        assert [row[0] for row in rows] == ['AA', 'BB', 'CC']
+
+    def test_requeue_is_bounded(self, temp_db):
+        """A database that stays unwritable drops the oldest rows, counted."""
+        import sqlite3
+
+        import utils.database as database
+
+        buffer = database.WriteBehindBuffer(
+            'test_bounded',
+            'INSERT INTO signal_history (mode, device_id, signal_strength) VALUES (?, ?, ?)',
+            max_rows=2,
+        )
+        with patch.object(database, 'get_db', side_effect=sqlite3.OperationalError('database is locked')), \
+             patch.object(database, '_wake_write_behind_flusher'), \
+             patch.object(database, '_ensure_write_behind_flusher'):
+            for i in range(25):
+                buffer.append(('wifi', str(i), -40))
+
+        assert len(buffer) == 20
+        assert buffer.rows_dropped == 5
+
+    def test_deferred_push_payload(self, temp_db):
+        """Deferred payloads appear in get_recent_payloads."""
+        from utils.database import create_agent, get_recent_payloads, store_push_payload
+
+        agent_id = create_agent('sensor-1', 'http://127.0.0.1:8020')
+        payload_id = store_push_payload(agent_id, 'wifi', {'networks': []}, defer=True)
+
+        payloads = get_recent_payloads(agent_id=agent_id)
+        assert len(payloads) == 1
+        assert payloads[0]['scan_type'] == 'wifi'
+        assert payloads[0]['id'] == payload_id
+
+    def test_deferred_payload_ids_are_unique(self, temp_db):
+        """IDs handed out before the write never collide with direct inserts."""
+        import utils.database as database
+        from utils.database import create_agent, get_recent_payloads, store_push_payload
+
+        agent_id = create_agent('sensor-1', 'http://127.0.0.1:8020')
+        ids = [store_push_payload(agent_id, 'wifi', {'n': i}, defer=True) for i in range(3)]
+        ids.append(store_push_payload(agent_id, 'wifi', {'n': 3}))
+        ids += [
+            store_push_payload(agent_id, 'wifi', {'n': i}, defer=True)
+            for i in range(4, database.PUSH_PAYLOAD_ID_BLOCK + 8)
+        ]
+
+        assert len(set(ids)) == len(ids)
+        payloads = get_recent_payloads(agent_id=agent_id, limit=len(ids) + 1)
+        assert {p['id'] for p in payloads} == set(ids)
+
+    def test_agent_reads_flush_last_seen(self, temp_db):
+        """get_agent and list_agents see the last_seen of a queued push."""
+        from utils.database import create_agent, get_agent, list_agents, store_push_payload
+
+        agent_id = create_agent('sensor-1', 'http://127.0.0.1:8020')
+        assert get_agent(agent_id)['last_seen'] is None
+        store_push_payload(agent_id, 'wifi', {'networks': []}, defer=True)
+
+        assert get_agent(agent_id)['last_seen'] is not None
+        assert list_agents()[0]['last_seen'] is not None
@@ -0,0 +1,197 @@
+"""Query plan regression tests for the SQLite helpers.
+
+Every literal SELECT/UPDATE/DELETE in utils/database.py and utils/alerts.py
+is run through EXPLAIN QUERY PLAN against a freshly initialised schema, and
+the filter combinations built dynamically by the list helpers are captured
+with a trace callback. A filtered full-table SCAN fails the test unless the
+table is a small configuration table listed in SMALL_TABLES.
+"""
+
+import ast
+import re
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Configuration tables that hold a handful of rows; scanning them is cheaper
+# than maintaining an index.
+SMALL_TABLES = {
+    'settings',
+    'users',
+    'agents',
+    'alert_rules',
+    'tscm_baselines',
+    'tscm_schedules',
+    'tracked_satellites',
+    'sqlite_sequence',
+}
+
+PLANNED_STATEMENT = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+
+
+def _literal_queries(relative_path: str) -> list[tuple[str, int, str]]:
+    """Collect literal SQL passed to .execute() in a module."""
+    tree = ast.parse((REPO_ROOT / relative_path).read_text(encoding='utf-8'))
+    queries = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        if node.func.attr not in ('execute', 'executemany') or not node.args:
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and PLANNED_STATEMENT.match(arg.value):
+            queries.append((relative_path, node.lineno, arg.value))
+    return queries
+
+
+LITERAL_QUERIES = _literal_queries('utils/database.py') + _literal_queries('utils/alerts.py')
+
+
+@pytest.fixture
+def db_conn():
+    """Fresh database with the full schema and indexes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with patch('utils.database.DB_PATH', Path(tmpdir) / 'plans.db'), \
+             patch('utils.database.DB_DIR', Path(tmpdir)):
+            from utils.database import close_db, get_connection, init_db
+
+            init_db()
+            yield get_connection()
+            close_db()
+
+
+def _full_scans(conn: sqlite3.Connection, sql: str, params=None) -> list[str]:
+    """Return plan lines that scan a non-whitelisted table under a filter."""
+    if params is None:
+        params = [None] * sql.count('?')
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    filtered = re.search(r'\bWHERE\b|\bJOIN\b', sql, re.IGNORECASE) is not None
+    scans = []
+    for row in plan:
+        detail = row['detail']
+        match = re.match(r'SCAN (\w+)', detail)
+        if not match or match.group(1) in SMALL_TABLES:
+            continue
+        # Unfiltered listings must read every row anyway; only foreign-key
+        # child scans (tables not named in the statement) count there
+        named = re.search(rf'\b{match.group(1)}\b', sql) is not None
+        if filtered or not named:
+            scans.append(detail)
+    return scans
+
+
+@pytest.mark.parametrize(
+    'sql',
+    [q[2] for q in LITERAL_QUERIES],
+    ids=[f'{q[0]}:{q[1]}' for q in LITERAL_QUERIES],
+)
+def test_literal_query_uses_index(db_conn, sql):
+    """Literal queries never fall back to a filtered full table scan."""
+    assert _full_scans(db_conn, sql) == []
+
+
+def test_literal_queries_collected():
+    """Sanity check that the AST walk finds the helpers' queries."""
+    assert len(LITERAL_QUERIES) > 50
+    assert any('signal_history' in q[2] for q in LITERAL_QUERIES)
+    assert any(q[0] == 'utils/alerts.py' for q in LITERAL_QUERIES)
+
+
+def test_dynamic_filters_use_indexes(db_conn):
+    """Queries assembled from optional filters are also index-backed."""
+    import utils.database as database
+    from utils.alerts import AlertManager
+
+    statements: list[str] = []
+    db_conn.set_trace_callback(statements.append)
+    try:
+        database.get_tscm_threats(sweep_id=1)
+        database.get_tscm_threats(severity='high')
+        database.get_tscm_threats(acknowledged=False)
+        database.get_all_known_devices(location='office')
+        database.get_all_known_devices(scope='global')
+        database.get_all_tscm_cases(status='open')
+        database.get_dsc_alerts(category='DISTRESS')
+        database.get_dsc_alerts(acknowledged=False)
+        database.get_dsc_alerts(source_mmsi='123456789')
+        database.get_recent_payloads(agent_id=1)
+        database.get_recent_payloads(scan_type='wifi')
+        manager = AlertManager()
+        manager.list_events(mode='adsb')
+        manager.list_events(severity='high')
+        manager.list_events(mode='adsb', severity='high')
+    finally:
+        db_conn.set_trace_callback(None)
+
+    planned = [s for s in statements if PLANNED_STATEMENT.match(s)]
+    assert len(planned) >= 14
+    for sql in planned:
+        assert _full_scans(db_conn, sql, params=[]) == [], sql
+
+
+def test_connection_profile(db_conn):
+    """New connections get the tuned pragmas and incremental auto-vacuum."""
+    assert db_conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert db_conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+    assert db_conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    assert db_conn.execute('PRAGMA temp_store').fetchone()[0] == 2  # MEMORY
+    assert db_conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    assert db_conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2  # INCREMENTAL
+
+
+def test_run_db_maintenance_releases_pages(db_conn):
+    """Maintenance shrinks the freelist left behind by retention deletes."""
+    from utils.database import run_db_maintenance
+
+    db_conn.executemany(
+        'INSERT INTO signal_history (mode, device_id, signal_strength, metadata) VALUES (?, ?, ?, ?)',
+        [('wifi', f'dev-{i}', -60, 'x' * 200) for i in range(2000)],
+    )
+    db_conn.commit()
+    db_conn.execute('DELETE FROM signal_history')
+    db_conn.commit()
+    assert db_conn.execute('PRAGMA freelist_count').fetchone()[0] > 0
+
+    assert run_db_maintenance() == 0
+    assert db_conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+
+
+def test_adsb_history_filters_are_indexed():
+    """routes/adsb.py history filters lead an index in the PostgreSQL schema.
+
+    The history store is PostgreSQL, so EXPLAIN cannot run here; check the
+    first WHERE column of each query against the schema's index definitions.
+    """
+    route_source = (REPO_ROOT / 'routes' / 'adsb.py').read_text(encoding='utf-8')
+    schema_source = (REPO_ROOT / 'utils' / 'adsb_history.py').read_text(encoding='utf-8')
+
+    leading_columns = {
+        (table, columns.split(',')[0].strip())
+        for table, columns in re.findall(r'ON (adsb_\w+) \(([^)]+)\)', schema_source)
+    }
+    # Partitioned tables declare their indexes as data; rollups are keyed by hour
+    from utils.adsb_history import _PARTITIONED_TABLES
+
+    leading_columns.update(
+        (table, definition.strip('()').split(',')[0].strip())
+        for table, (_, _, indexes) in _PARTITIONED_TABLES.items()
+        for definition in indexes.values()
+    )
+    leading_columns.update(
+        re.findall(r'CREATE TABLE IF NOT EXISTS (adsb_\w+) \(\s+(\w+)[^,]*PRIMARY KEY', schema_source)
+        + re.findall(r'CREATE TABLE IF NOT EXISTS (adsb_\w+) \([^"]*?PRIMARY KEY \((\w+)', schema_source)
+    )
+    filters = set(re.findall(r'FROM (adsb_\w+)\s+WHERE\s+(\w+)', route_source))
+    filters.update(
+        (table, field)
+        for table, field in (('adsb_snapshots', 'captured_at'), ('adsb_messages', 'received_at'))
+        if f"timestamp_field='{field}'" in route_source
+    )
+
+    assert filters
+    assert filters <= leading_columns, filters - leading_columns
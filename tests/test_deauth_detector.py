@@ -3,10 +3,13 @@ Unit tests for deauthentication attack detector.
 """
 
 import os
+import struct
 import sys
 import time
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.constants import (
@@ -15,11 +18,19 @@ from utils.constants import (
     DEAUTH_DETECTION_WINDOW,
 )
 from utils.wifi.deauth_detector import (
+    DEAUTH_BPF_PROGRAM,
     DEAUTH_REASON_CODES,
+    FC_DEAUTH,
+    FC_DISASSOC,
+    LINKTYPE_IEEE802_11,
+    LINKTYPE_IEEE802_11_RADIOTAP,
     DeauthAlert,
     DeauthDetector,
     DeauthPacketInfo,
     DeauthTracker,
+    iter_pcap_frames,
+    parse_deauth_frame,
+    parse_radiotap_header,
 )
 
 
@@ -583,3 +594,185 @@ class TestDeauthDetectorIntegration:
         assert call_args['type'] == 'deauth_alert'
         assert call_args['attacker']['mac'] == 'AA:BB:CC:DD:EE:FF'
         assert call_args['target']['mac'] == '11:22:33:44:55:66'
+
+
+def _radiotap(signal_dbm=-42):
+    """Radiotap header with TSFT, Flags, Channel and dBm antenna signal."""
+    present = (1 << 0) | (1 << 1) | (1 << 3) | (1 << 5)
+    # TSFT is 8-byte aligned at offset 8; Flags at 16; Channel aligned to 18
+    body = struct.pack('<QB', 123456, 0x00) + b'\x00' + struct.pack('<HHb', 2437, 0x00A0, signal_dbm)
+    length = 8 + len(body)
+    return struct.pack('<BBHI', 0, 0, length, present) + body
+
+
+def _dot11(fc_byte, dst='11:22:33:44:55:66', src='AA:BB:CC:DD:EE:FF', bssid='99:88:77:66:55:44', reason=7):
+    macs = b''.join(bytes.fromhex(m.replace(':', '')) for m in (dst, src, bssid))
+    return bytes([fc_byte, 0]) + b'\x00\x00' + macs + b'\x00\x00' + struct.pack('<H', reason)
+
+
+def _write_pcap(path, frames, linktype=LINKTYPE_IEEE802_11_RADIOTAP):
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype))
+        for i, frame in enumerate(frames):
+            f.write(struct.pack('<IIII', 1700000000 + i, 0, len(frame), len(frame)))
+            f.write(frame)
+
+
+def _run_bpf(program, pkt):
+    """Minimal classic-BPF interpreter for the opcodes used by DEAUTH_BPF_PROGRAM."""
+    a = x = pc = 0
+    while True:
+        code, jt, jf, k = program[pc]
+        if code == 0x30:
+            a = pkt[k]
+        elif code == 0x50:
+            if x + k >= len(pkt):
+                return 0
+            a = pkt[x + k]
+        elif code == 0x64:
+            a = (a << k) & 0xFFFFFFFF
+        elif code == 0x4C:
+            a |= x
+        elif code == 0x54:
+            a &= k
+        elif code == 0x07:
+            x = a
+        elif code == 0x15:
+            pc += jt if a == k else jf
+        elif code == 0x06:
+            return k
+        else:
+            raise AssertionError(f'unexpected opcode {code:#x}')
+        pc += 1
+
+
+BEACON = 0x80
+DATA = 0x08
+PROBE_REQ = 0x40
+
+
+class TestRawFrameParsing:
+    """Tests for the struct-based radiotap/802.11 parser."""
+
+    def test_parse_deauth_with_radiotap(self):
+        frame = _radiotap(-37) + _dot11(FC_DEAUTH, reason=7)
+        parsed = parse_deauth_frame(frame)
+        assert parsed == ('deauth', 'AA:BB:CC:DD:EE:FF', '11:22:33:44:55:66', '99:88:77:66:55:44', 7, -37)
+
+    def test_parse_disassoc(self):
+        frame = _radiotap() + _dot11(FC_DISASSOC, reason=8)
+        parsed = parse_deauth_frame(frame)
+        assert parsed[0] == 'disassoc'
+        assert parsed[4] == 8
+
+    def test_parse_bare_dot11(self):
+        parsed = parse_deauth_frame(_dot11(FC_DEAUTH), LINKTYPE_IEEE802_11)
+        assert parsed[0] == 'deauth'
+        assert parsed[5] is None
+
+    def test_parse_rejects_other_frames(self):
+        for fc in (BEACON, DATA, PROBE_REQ):
+            assert parse_deauth_frame(_radiotap() + _dot11(fc)) is None
+
+    def test_parse_rejects_truncated(self):
+        frame = _radiotap() + _dot11(FC_DEAUTH)
+        assert parse_deauth_frame(frame[:-3]) is None
+        assert parse_deauth_frame(b'\x00\x00') is None
+
+    def test_radiotap_fhss_is_byte_aligned(self):
+        # Flags at 8, FHSS hop set/pattern at 9-10, antenna signal at 11
+        present = (1 << 1) | (1 << 4) | (1 << 5)
+        body = struct.pack('<BBBb', 0x00, 3, 17, -61)
+        header = struct.pack('<BBHI', 0, 0, 8 + len(body), present) + body
+        assert parse_radiotap_header(header + _dot11(FC_DEAUTH)) == (12, -61)
+        assert parse_deauth_frame(header + _dot11(FC_DEAUTH))[5] == -61
+
+    def test_radiotap_without_signal(self):
+        header = struct.pack('<BBHI', 0, 0, 8, 0)
+        assert parse_radiotap_header(header + _dot11(FC_DEAUTH)) == (8, None)
+
+    def test_bpf_program_passes_only_deauth_and_disassoc(self):
+        rt = _radiotap()
+        assert _run_bpf(DEAUTH_BPF_PROGRAM, rt + _dot11(FC_DEAUTH)) > 0
+        assert _run_bpf(DEAUTH_BPF_PROGRAM, rt + _dot11(FC_DISASSOC)) > 0
+        for fc in (BEACON, DATA, PROBE_REQ, 0xB0, 0xD0):
+            assert _run_bpf(DEAUTH_BPF_PROGRAM, rt + _dot11(fc)) == 0
+
+
+class TestPcapReplay:
+    """Offline replay of pcap captures through the raw-frame pipeline."""
+
+    def test_iter_pcap_frames(self, tmp_path):
+        path = tmp_path / 'capture.pcap'
+        frames = [_radiotap() + _dot11(BEACON), _radiotap() + _dot11(FC_DEAUTH)]
+        _write_pcap(path, frames)
+
+        records = list(iter_pcap_frames(str(path)))
+        assert [r[2] for r in records] == frames
+        assert records[0][1] == LINKTYPE_IEEE802_11_RADIOTAP
+        assert records[1][0] == 1700000001.0
+
+    def test_replay_generates_alert(self, tmp_path):
+        path = tmp_path / 'flood.pcap'
+        frames = []
+        for _ in range(DEAUTH_ALERT_THRESHOLD):
+            frames.append(_radiotap() + _dot11(BEACON))
+            frames.append(_radiotap(-55) + _dot11(FC_DEAUTH))
+        _write_pcap(path, frames)
+
+        callback = MagicMock()
+        detector = DeauthDetector(interface='wlan0mon', event_callback=callback)
+        assert detector.replay_pcap(str(path)) == DEAUTH_ALERT_THRESHOLD
+
+        assert detector.stats['packets_captured'] == DEAUTH_ALERT_THRESHOLD
+        assert callback.call_count == 1
+        alert = callback.call_args[0][0]
+        assert alert['attacker']['mac'] == 'AA:BB:CC:DD:EE:FF'
+        assert alert['attacker']['signal_dbm'] == -55
+
+    def test_rejects_non_pcap(self, tmp_path):
+        path = tmp_path / 'bogus.pcap'
+        path.write_bytes(b'\x0a\x0d\x0d\x0a' + b'\x00' * 28)
+        with pytest.raises(ValueError):
+            list(iter_pcap_frames(str(path)))
+
+
+class TestKnownApCache:
+    """Tests for the cached known-AP set."""
+
+    def test_known_aps_cached_until_invalidated(self):
+        networks = {'AA:BB:CC:DD:EE:FF': {}}
+        get_networks = MagicMock(side_effect=lambda: dict(networks))
+        detector = DeauthDetector(interface='wlan0mon', event_callback=MagicMock(), get_networks=get_networks)
+
+        for _ in range(5):
+            assert detector._check_spoofed_source('AA:BB:CC:DD:EE:FF') is True
+        assert get_networks.call_count == 1
+
+        networks['11:22:33:44:55:66'] = {}
+        assert detector._check_spoofed_source('11:22:33:44:55:66') is False
+
+        detector.invalidate_known_aps()
+        assert detector._check_spoofed_source('11:22:33:44:55:66') is True
+        assert get_networks.call_count == 2
+
+
+class TestScapyAgreement:
+    """The struct parser classifies frames the way scapy dissects them."""
+
+    def test_raw_parser_matches_scapy(self):
+        scapy_all = pytest.importorskip('scapy.all')
+
+        # Busy channel: mostly beacons/data with occasional deauths
+        frames = []
+        for i in range(200):
+            fc = FC_DEAUTH if i % 10 == 0 else (BEACON if i % 2 else DATA)
+            frames.append(_radiotap(-30 - i % 50) + _dot11(fc))
+
+        for frame in frames:
+            parsed = parse_deauth_frame(frame)
+            pkt = scapy_all.RadioTap(frame)
+            is_deauth = pkt.haslayer(scapy_all.Dot11Deauth) or pkt.haslayer(scapy_all.Dot11Disas)
+            assert (parsed is not None) == is_deauth
+            if parsed is not None:
+                assert parsed[5] == pkt.dBm_AntSignal
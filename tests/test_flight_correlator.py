@@ -1,99 +1,163 @@
-"""Tests for FlightCorrelator: ACARS/VDL2 message matching."""
-
-import pytest
-
-from utils.flight_correlator import FlightCorrelator
-
-
-class TestFlightCorrelator:
-    """Test ACARS/VDL2 message matching by callsign."""
-
-    @pytest.fixture(autouse=True)
-    def setup(self):
-        self.correlator = FlightCorrelator(max_messages=100)
-
-    def test_add_acars_message(self):
-        self.correlator.add_acars_message({
-            'flight': 'BAW123', 'tail': 'G-ABCD', 'text': 'Hello',
-        })
-        assert self.correlator.acars_count == 1
-
-    def test_add_vdl2_message(self):
-        self.correlator.add_vdl2_message({
-            'flight': 'DLH456', 'text': 'World',
-        })
-        assert self.correlator.vdl2_count == 1
-
-    def test_match_by_callsign(self):
-        self.correlator.add_acars_message({
-            'flight': 'BAW123', 'text': 'msg1',
-        })
-        self.correlator.add_acars_message({
-            'flight': 'DLH456', 'text': 'msg2',
-        })
-
-        result = self.correlator.get_messages_for_aircraft(callsign='BAW123')
-        assert len(result['acars']) == 1
-        assert result['acars'][0]['text'] == 'msg1'
-
-    def test_match_by_icao(self):
-        self.correlator.add_vdl2_message({
-            'icao': 'ABC123', 'text': 'vdl2 msg',
-        })
-
-        result = self.correlator.get_messages_for_aircraft(icao='ABC123')
-        assert len(result['vdl2']) == 1
-        assert result['vdl2'][0]['text'] == 'vdl2 msg'
-
-    def test_no_match_returns_empty(self):
-        self.correlator.add_acars_message({'flight': 'BAW123', 'text': 'msg'})
-
-        result = self.correlator.get_messages_for_aircraft(callsign='NOMATCH')
-        assert result['acars'] == []
-        assert result['vdl2'] == []
-
-    def test_empty_search_returns_empty(self):
-        result = self.correlator.get_messages_for_aircraft()
-        assert result == {'acars': [], 'vdl2': []}
-
-    def test_ring_buffer_limit(self):
-        correlator = FlightCorrelator(max_messages=5)
-        for i in range(10):
-            correlator.add_acars_message({'flight': f'FL{i}', 'text': f'msg{i}'})
-
-        assert correlator.acars_count == 5
-        # First 5 messages should have been evicted
-        result = correlator.get_messages_for_aircraft(callsign='FL0')
-        assert len(result['acars']) == 0
-        # Last message should still be there
-        result = correlator.get_messages_for_aircraft(callsign='FL9')
-        assert len(result['acars']) == 1
-
-    def test_case_insensitive_matching(self):
-        self.correlator.add_acars_message({'flight': 'baw123', 'text': 'lowercase'})
-
-        result = self.correlator.get_messages_for_aircraft(callsign='BAW123')
-        assert len(result['acars']) == 1
-
-    def test_match_by_tail_field(self):
-        self.correlator.add_acars_message({
-            'tail': 'G-ABCD', 'text': 'tail match',
-        })
-
-        result = self.correlator.get_messages_for_aircraft(callsign='G-ABCD')
-        assert len(result['acars']) == 1
-
-    def test_internal_fields_not_returned(self):
-        self.correlator.add_acars_message({'flight': 'TEST', 'text': 'msg'})
-
-        result = self.correlator.get_messages_for_aircraft(callsign='TEST')
-        msg = result['acars'][0]
-        assert '_corr_time' not in msg
-
-    def test_both_acars_and_vdl2_returned(self):
-        self.correlator.add_acars_message({'flight': 'UAL789', 'text': 'acars'})
-        self.correlator.add_vdl2_message({'flight': 'UAL789', 'text': 'vdl2'})
-
-        result = self.correlator.get_messages_for_aircraft(callsign='UAL789')
-        assert len(result['acars']) == 1
-        assert len(result['vdl2']) == 1
+"""Tests for FlightCorrelator: ACARS/VDL2 message matching."""
+
+import pytest
+
+from utils.flight_correlator import FlightCorrelator
+
+
+class TestFlightCorrelator:
+    """Test ACARS/VDL2 message matching by callsign."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.correlator = FlightCorrelator(max_messages=100)
+
+    def test_add_acars_message(self):
+        self.correlator.add_acars_message({
+            'flight': 'BAW123', 'tail': 'G-ABCD', 'text': 'Hello',
+        })
+        assert self.correlator.acars_count == 1
+
+    def test_add_vdl2_message(self):
+        self.correlator.add_vdl2_message({
+            'flight': 'DLH456', 'text': 'World',
+        })
+        assert self.correlator.vdl2_count == 1
+
+    def test_match_by_callsign(self):
+        self.correlator.add_acars_message({
+            'flight': 'BAW123', 'text': 'msg1',
+        })
+        self.correlator.add_acars_message({
+            'flight': 'DLH456', 'text': 'msg2',
+        })
+
+        result = self.correlator.get_messages_for_aircraft(callsign='BAW123')
+        assert len(result['acars']) == 1
+        assert result['acars'][0]['text'] == 'msg1'
+
+    def test_match_by_icao(self):
+        self.correlator.add_vdl2_message({
+            'icao': 'ABC123', 'text': 'vdl2 msg',
+        })
+
+        result = self.correlator.get_messages_for_aircraft(icao='ABC123')
+        assert len(result['vdl2']) == 1
+        assert result['vdl2'][0]['text'] == 'vdl2 msg'
+
+    def test_no_match_returns_empty(self):
+        self.correlator.add_acars_message({'flight': 'BAW123', 'text': 'msg'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='NOMATCH')
+        assert result['acars'] == []
+        assert result['vdl2'] == []
+
+    def test_empty_search_returns_empty(self):
+        result = self.correlator.get_messages_for_aircraft()
+        assert result == {'acars': [], 'vdl2': []}
+
+    def test_ring_buffer_limit(self):
+        correlator = FlightCorrelator(max_messages=5)
+        for i in range(10):
+            correlator.add_acars_message({'flight': f'FL{i}', 'text': f'msg{i}'})
+
+        assert correlator.acars_count == 5
+        # First 5 messages should have been evicted
+        result = correlator.get_messages_for_aircraft(callsign='FL0')
+        assert len(result['acars']) == 0
+        # Last message should still be there
+        result = correlator.get_messages_for_aircraft(callsign='FL9')
+        assert len(result['acars']) == 1
+
+    def test_case_insensitive_matching(self):
+        self.correlator.add_acars_message({'flight': 'baw123', 'text': 'lowercase'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='BAW123')
+        assert len(result['acars']) == 1
+
+    def test_match_by_tail_field(self):
+        self.correlator.add_acars_message({
+            'tail': 'G-ABCD', 'text': 'tail match',
+        })
+
+        result = self.correlator.get_messages_for_aircraft(callsign='G-ABCD')
+        assert len(result['acars']) == 1
+
+    def test_internal_fields_not_returned(self):
+        self.correlator.add_acars_message({'flight': 'TEST', 'text': 'msg'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='TEST')
+        msg = result['acars'][0]
+        assert '_corr_time' not in msg
+
+    def test_both_acars_and_vdl2_returned(self):
+        self.correlator.add_acars_message({'flight': 'UAL789', 'text': 'acars'})
+        self.correlator.add_vdl2_message({'flight': 'UAL789', 'text': 'vdl2'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='UAL789')
+        assert len(result['acars']) == 1
+        assert len(result['vdl2']) == 1
+
+    def test_match_by_translated_airline_code(self):
+        self.correlator.add_acars_message({'flight': 'UA789', 'text': 'iata'})
+        self.correlator.add_vdl2_message({'callsign': 'UAL789', 'text': 'icao'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='UAL789')
+        assert [m['text'] for m in result['acars']] == ['iata']
+        result = self.correlator.get_messages_for_aircraft(callsign='UA789')
+        assert [m['text'] for m in result['vdl2']] == ['icao']
+
+    def test_matches_keep_arrival_order_without_duplicates(self):
+        self.correlator.add_acars_message({'flight': 'BAW123', 'tail': 'G-ABCD', 'text': 'first'})
+        self.correlator.add_acars_message({'flight': 'DLH456', 'text': 'other'})
+        self.correlator.add_acars_message({'tail': 'G-ABCD', 'text': 'second'})
+        self.correlator.add_acars_message({'flight': 'BAW123', 'text': 'third'})
+
+        result = self.correlator.get_messages_for_aircraft(callsign='BAW123', registration='G-ABCD')
+        assert [m['text'] for m in result['acars']] == ['first', 'second', 'third']
+
+    def test_eviction_drops_index_entries(self):
+        correlator = FlightCorrelator(max_messages=3)
+        for i in range(6):
+            correlator.add_acars_message({'flight': f'FL{i}', 'tail': 'N1', 'text': f'msg{i}'})
+
+        result = correlator.get_messages_for_aircraft(callsign='N1')
+        assert [m['text'] for m in result['acars']] == ['msg3', 'msg4', 'msg5']
+        assert 'FL0' not in correlator._acars_messages._index
+        assert len(correlator._acars_messages._index['N1']) == 3
+
+    def test_recent_messages_newest_first(self):
+        for i in range(5):
+            self.correlator.add_vdl2_message({'flight': f'FL{i}', 'text': f'msg{i}'})
+
+        recent = self.correlator.get_recent_messages('vdl2', limit=2)
+        assert [m['text'] for m in recent] == ['msg4', 'msg3']
+        assert '_corr_time' not in recent[0]
+
+    def test_clear_resets_index(self):
+        self.correlator.add_acars_message({'flight': 'BAW123', 'text': 'msg'})
+        self.correlator.clear_acars()
+
+        assert self.correlator.acars_count == 0
+        assert self.correlator.get_messages_for_aircraft(callsign='BAW123')['acars'] == []
+
+
+class TestFlightCorrelatorHistory:
+    """Lookups against a large history that has wrapped its bound."""
+
+    def test_lookup_after_eviction(self):
+        correlator = FlightCorrelator(max_messages=20_000)
+        for i in range(50_000):
+            correlator.add_acars_message({
+                'flight': f'UA{i % 2000}', 'tail': f'N{i % 2000:04d}', 'text': f'msg{i}',
+            })
+        assert correlator.acars_count == 20_000
+
+        # Only the last ten messages of each flight are retained, oldest first
+        for k in range(0, 2000, 37):
+            result = correlator.get_messages_for_aircraft(icao='A1B2C3', callsign=f'UAL{k}')
+            assert [m['text'] for m in result['acars']] == [f'msg{k + 2000 * j}' for j in range(15, 25)]
+
+        # Evicted messages leave no index entries behind
+        history = correlator._acars_messages
+        assert sum(map(len, history._index.values())) == sum(len(keys) for _, _, keys in history._messages)
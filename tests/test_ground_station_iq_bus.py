@@ -0,0 +1,162 @@
+"""Tests for the IQ bus shared complex64 chunk view."""
+
+from __future__ import annotations
+
+import io
+import queue
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+import utils.ground_station.iq_bus as iq_bus
+from utils.ground_station.consumers.gr_satellites import GrSatConsumer
+from utils.ground_station.consumers.waterfall import WaterfallConsumer
+from utils.ground_station.iq_bus import CHUNK_SIZE, IQBus, IQChunk, cu8_samples
+from utils.waterfall_fft import build_binary_frame, compute_power_spectrum, cu8_to_complex, quantize_to_uint8
+
+
+def _legacy_cu8_to_complex(raw: bytes) -> np.ndarray:
+    """Per-consumer conversion as before the shared view."""
+    iq = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+    iq = (iq - 127.5) / 127.5
+    return iq[0::2] + 1j * iq[1::2]
+
+
+def _raw(size: int = CHUNK_SIZE, seed: int = 0) -> bytes:
+    return np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8).tobytes()
+
+
+class TestConversion:
+    """In-place conversion is bit-identical to the original arithmetic."""
+
+    def test_matches_original(self):
+        raw = bytes(range(256)) * 4
+        expected = _legacy_cu8_to_complex(raw)
+        assert np.array_equal(cu8_to_complex(raw), expected)
+
+        out = np.empty(2048, dtype=np.float32)
+        samples = cu8_to_complex(raw, out=out)
+        assert np.array_equal(samples, expected)
+        assert np.shares_memory(samples, out)
+
+    def test_odd_trailing_byte_is_ignored(self):
+        assert cu8_to_complex(bytes([0, 255, 7])).size == 1
+
+
+class TestIQChunk:
+    """Chunks are bytes with one lazily converted, read-only view."""
+
+    def test_behaves_as_bytes(self):
+        raw = _raw(64)
+        chunk = IQChunk(raw)
+        assert chunk == raw and isinstance(chunk, bytes)
+        assert bytearray(b'x') + chunk == b'x' + raw
+
+    def test_converted_once_and_shared(self, mocker):
+        convert = mocker.spy(iq_bus, 'cu8_to_complex')
+        buffer = np.empty(CHUNK_SIZE, dtype=np.float32)
+        chunk = IQChunk(_raw(), buffer)
+        assert convert.call_count == 0
+
+        views = [cu8_samples(chunk) for _ in range(4)]
+        assert convert.call_count == 1
+        assert all(view is views[0] for view in views)
+        assert np.shares_memory(views[0], buffer)
+        assert np.array_equal(views[0], _legacy_cu8_to_complex(chunk))
+        with pytest.raises(ValueError):
+            views[0][0] = 0
+
+    def test_plain_bytes_are_converted(self):
+        raw = _raw(128)
+        samples = cu8_samples(raw)
+        assert samples.flags.writeable
+        assert np.array_equal(samples, _legacy_cu8_to_complex(raw))
+
+    def test_producer_fans_out_one_chunk(self, mocker):
+        convert = mocker.spy(iq_bus, 'cu8_to_complex')
+        bus = IQBus(center_mhz=137.5)
+        bus._proc = MagicMock()
+        bus._proc.poll.return_value = None
+        bus._proc.stdout = io.BytesIO(_raw(3 * CHUNK_SIZE))
+
+        seen = []
+        consumers = [MagicMock(), MagicMock()]
+        for consumer in consumers:
+            consumer.on_chunk.side_effect = lambda chunk: seen.append((chunk, cu8_samples(chunk).copy()))
+            bus.add_consumer(consumer)
+        bus._producer_loop()
+
+        assert len(seen) == 6
+        assert convert.call_count == 3
+        for (first, first_samples), (second, second_samples) in zip(seen[0::2], seen[1::2]):
+            assert first is second
+            assert np.array_equal(first_samples, _legacy_cu8_to_complex(first))
+            assert np.array_equal(first_samples, second_samples)
+
+
+class TestConsumers:
+    """Consumers produce the same output from the shared view."""
+
+    def test_gr_satellites_writes_cf32(self):
+        consumer = GrSatConsumer('ISS')
+        consumer._enabled = True
+        consumer._proc = MagicMock()
+        consumer._proc.poll.return_value = None
+        chunk = IQChunk(_raw(), np.empty(CHUNK_SIZE, dtype=np.float32))
+
+        consumer.on_chunk(chunk)
+
+        written = consumer._proc.stdin.write.call_args.args[0]
+        assert bytes(written) == _legacy_cu8_to_complex(chunk).astype(np.complex64).tobytes()
+
+    @pytest.mark.parametrize('sample_rate', [2_400_000, 200_000])
+    def test_waterfall_frame_unchanged(self, sample_rate):
+        out = queue.Queue()
+        consumer = WaterfallConsumer(output_queue=out, fps=20)
+        consumer.on_start(137.5, sample_rate, start_freq_mhz=136.3, end_freq_mhz=138.7)
+        raws = [_raw(seed=i) for i in range(5)]
+        buffer = np.empty(CHUNK_SIZE, dtype=np.float32)
+        consumer._last_frame_time = time.monotonic()  # hold the frame until the last chunk
+        for raw in raws[:-1]:
+            consumer.on_chunk(IQChunk(raw, buffer))
+        consumer._last_frame_time = 0.0
+        consumer.on_chunk(IQChunk(raws[-1], buffer))
+
+        window = b''.join(raws)[-consumer._required_bytes:]
+        power = compute_power_spectrum(_legacy_cu8_to_complex(window).astype(np.complex64), avg_count=4)
+        expected = build_binary_frame(136.3, 138.7, quantize_to_uint8(power))
+        assert out.get_nowait() == expected
+        assert len(consumer._buffer) == 0
+
+
+class TestFanOut:
+    """Adding consumers to the bus adds neither conversions nor copies."""
+
+    CHUNKS = 10
+
+    @staticmethod
+    def _peak_memory(chunks, consumers) -> int:
+        buffer = np.empty(CHUNK_SIZE, dtype=np.float32)
+        tracemalloc.start()
+        try:
+            for raw in chunks:
+                chunk = IQChunk(raw, buffer)
+                for _ in range(consumers):
+                    cu8_samples(chunk)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_consumer_count_scaling(self, mocker):
+        chunks = [_raw(seed=i) for i in range(self.CHUNKS)]
+        peaks = {consumers: self._peak_memory(chunks, consumers) for consumers in (1, 2, 4, 8)}
+        convert = mocker.spy(iq_bus, 'cu8_to_complex')
+        self._peak_memory(chunks, 8)
+
+        assert convert.call_count == self.CHUNKS
+        # Every consumer reads the one view in the bus buffer
+        assert peaks[8] <= peaks[1] + 16 * 1024
+        assert peaks[8] < _legacy_cu8_to_complex(chunks[0]).nbytes
@@ -0,0 +1,154 @@
+"""Tests for the hidden SSID correlation engine."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from utils.wifi.hidden_ssid import HiddenSSIDCorrelator
+
+AP = 'AA:BB:CC:00:00:01'
+CLIENT = '11:22:33:44:55:66'
+
+
+class TestHiddenSSIDCorrelator:
+    """Correlation behaviour."""
+
+    def test_probe_then_association_reveals(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        correlator.record_hidden_ap(AP, now)
+        correlator.record_probe(CLIENT.lower(), 'CorpNet', now - timedelta(seconds=5))
+        correlator.record_association(CLIENT, AP.lower(), now)
+
+        result = correlator.get_correlation(AP)
+        assert result.revealed_ssid == 'CorpNet'
+        assert result.client_mac == CLIENT
+        assert result.method == 'probe_association'
+        assert 0.9 < result.confidence <= 1.0
+
+    def test_association_then_probe_reveals(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        correlator.record_hidden_ap(AP, now)
+        correlator.record_association(CLIENT, AP, now)
+        assert correlator.get_revealed_ssid(AP) is None
+
+        correlator.record_probe(CLIENT, 'CorpNet', now)
+        assert correlator.get_revealed_ssid(AP) == 'CorpNet'
+
+    def test_hidden_ap_seen_last_reveals(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        correlator.record_probe(CLIENT, 'CorpNet', now)
+        correlator.record_association(CLIENT, AP, now)
+        assert correlator.get_all_revealed() == {}
+
+        correlator.record_hidden_ap(AP, now)
+        assert correlator.get_all_revealed() == {AP: 'CorpNet'}
+
+    def test_uses_latest_probe_of_associated_client(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        correlator.record_hidden_ap(AP, now)
+        correlator.record_probe(CLIENT, 'OldNet', now - timedelta(seconds=20))
+        correlator.record_probe(CLIENT, 'CorpNet', now - timedelta(seconds=2))
+        correlator.record_probe('99:99:99:99:99:99', 'OtherNet', now)
+        correlator.record_association(CLIENT, AP, now)
+
+        assert correlator.get_revealed_ssid(AP) == 'CorpNet'
+
+    def test_low_confidence_is_not_reported(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.7)
+        now = datetime.now()
+        correlator.record_hidden_ap(AP, now)
+        correlator.record_probe(CLIENT, 'CorpNet', now - timedelta(seconds=30))
+        correlator.record_association(CLIENT, AP, now)
+
+        assert correlator.get_revealed_ssid(AP) is None
+
+    def test_non_hidden_ap_is_ignored(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        correlator.record_probe(CLIENT, 'CorpNet', now)
+        correlator.record_association(CLIENT, AP, now)
+
+        assert correlator.get_revealed_ssid(AP) is None
+
+    def test_callback_fires_once(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        revealed = []
+        correlator.set_callback(revealed.append)
+        now = datetime.now()
+        correlator.record_hidden_ap(AP, now)
+        correlator.record_probe(CLIENT, 'CorpNet', now)
+        correlator.record_association(CLIENT, AP, now)
+        correlator.record_probe(CLIENT, 'CorpNet', now)
+        correlator.record_association(CLIENT, AP, now)
+
+        assert [r.revealed_ssid for r in revealed] == ['CorpNet']
+
+    def test_expired_records_leave_indexes(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=1, min_confidence=0.5)
+        old = datetime.now() - timedelta(seconds=10)
+        correlator.record_probe(CLIENT, 'CorpNet', old)
+        correlator.record_association(CLIENT, AP, old)
+        correlator.record_probe('77:77:77:77:77:77', 'Fresh')
+
+        assert len(correlator._probe_records) == 1
+        assert len(correlator._association_records) == 0
+        assert CLIENT not in correlator._probes_by_client
+        assert CLIENT not in correlator._associations_by_client
+        assert AP not in correlator._associations_by_bssid
+
+        # Expired association can no longer reveal the AP
+        correlator.record_hidden_ap(AP)
+        correlator.record_probe(CLIENT, 'CorpNet')
+        assert correlator.get_revealed_ssid(AP) is None
+
+    def test_clear(self):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        correlator.record_hidden_ap(AP)
+        correlator.record_probe(CLIENT, 'CorpNet')
+        correlator.record_association(CLIENT, AP)
+        correlator.clear()
+
+        assert correlator.get_all_revealed() == {}
+        assert not correlator._probes_by_client
+        assert not correlator._associations_by_bssid
+
+
+class TestHiddenSSIDLoad:
+    """Synthetic busy-environment load."""
+
+    def test_probe_storm_touches_only_related_entries(self, monkeypatch):
+        correlator = HiddenSSIDCorrelator(correlation_window=60, min_confidence=0.5)
+        now = datetime.now()
+        hidden = [f'AA:BB:CC:00:{i // 256:02X}:{i % 256:02X}' for i in range(300)]
+        clients = [f'11:22:33:00:{i // 256:02X}:{i % 256:02X}' for i in range(2000)]
+        for bssid in hidden:
+            correlator.record_hidden_ap(bssid, now)
+
+        checks = []
+        check_bssid = correlator._check_bssid
+        monkeypatch.setattr(correlator, '_check_bssid', lambda bssid: checks.append(bssid) or check_bssid(bssid))
+
+        associated: dict[str, set[str]] = {}
+        expected_checks = 0
+        events = 40_000
+        for i in range(events):
+            client = clients[(i * 7) % len(clients)]
+            if i % 10 == 0:
+                # Associations to hidden APs that never get a matching probe
+                bssid = hidden[i % len(hidden)]
+                correlator.record_association(client, bssid, now)
+                associated.setdefault(client, set()).add(bssid)
+                expected_checks += 1
+            else:
+                correlator.record_probe(client, f'Net{i % 50}', now - timedelta(seconds=50))
+                expected_checks += len(associated.get(client, ()))
+
+        assert correlator.get_all_revealed() == {}
+        # Each record only checks its own client's hidden APs
+        assert len(checks) == expected_checks
+        assert sum(map(len, correlator._probes_by_client.values())) == len(correlator._probe_records) == 36_000
+        assert sum(map(len, correlator._associations_by_bssid.values())) == len(correlator._association_records)
@@ -0,0 +1,161 @@
+"""Tests for the continuous rtl_power listening-post scanner."""
+
+import queue
+from unittest.mock import MagicMock
+
+import pytest
+
+import routes.listening_post as lp
+from routes.listening_post import scanner
+
+# Recorded rtl_power output, 144-146 MHz in two 1 MHz hops at 100 kHz bins.
+# A carrier at 144.5 MHz is up for sweeps 1-4 and a single-sweep burst
+# appears at 145.2 MHz in sweep 2. Sweeps 1/2 and 4/5 share a timestamp.
+RECORDED_CSV = """\
+2024-05-12, 14:03:21, 144000000, 145000000, 100000.00, 16, -47.53, -48.05, -46.55, -48.28, -46.89, -47.40, -48.33, -46.98, -48.39, -47.20
+2024-05-12, 14:03:21, 145000000, 146000000, 100000.00, 16, -48.29, -48.23, -47.23, -46.02, -48.13, -47.83, -46.62, -45.66, -46.77, -47.31
+2024-05-12, 14:03:22, 144000000, 145000000, 100000.00, 16, -45.57, -48.36, -45.92, -47.63, -35.76, -21.77, -47.96, -46.76, -46.58, -47.38
+2024-05-12, 14:03:22, 145000000, 146000000, 100000.00, 16, -46.86, -48.31, -48.32, -47.88, -46.46, -47.22, -47.56, -46.74, -47.14, -47.60
+2024-05-12, 14:03:22, 144000000, 145000000, 100000.00, 16, -46.12, -46.40, -47.77, -46.78, -34.25, -22.82, -45.56, -48.15, -47.25, -46.23
+2024-05-12, 14:03:22, 145000000, 146000000, 100000.00, 16, -48.04, -47.03, -29.66, -46.21, -46.78, -45.87, -47.56, -46.41, -46.72, -46.76
+2024-05-12, 14:03:23, 144000000, 145000000, 100000.00, 16, -47.13, -45.98, -45.67, -47.08, -35.88, -22.11, -45.52, -46.03, -47.65, -47.34
+2024-05-12, 14:03:23, 145000000, 146000000, 100000.00, 16, -46.49, -48.43, -47.11, -48.00, -48.15, -48.32, -46.20, -48.11, -47.76, -47.33
+2024-05-12, 14:03:24, 144000000, 145000000, 100000.00, 16, -45.89, -48.26, -47.15, -46.85, -34.36, -22.84, -47.25, -47.42, -45.85, -45.63
+2024-05-12, 14:03:24, 145000000, 146000000, 100000.00, 16, -48.05, -47.97, -47.80, -47.80, -47.05, -46.73, -47.71, -48.49, -47.24, -47.39
+2024-05-12, 14:03:24, 144000000, 145000000, 100000.00, 16, -46.80, -45.64, -46.43, -46.95, -46.65, -46.47, -48.34, -45.80, -46.16, -45.88
+2024-05-12, 14:03:24, 145000000, 146000000, 100000.00, 16, -46.11, -47.32, -47.30, -48.19, -46.60, -48.31, -48.30, -47.87, -48.01, -47.48
+2024-05-12, 14:03:25, 144000000, 145000000, 100000.00, 16, -48.34, -48.50, -48.05, -48.20, -47.41, -48.42, -45.88, -46.66, -48.05, -47.74
+2024-05-12, 14:03:25, 145000000, 146000000, 100000.00, 16, -47.46, -47.41, -48.13, -45.95, -45.52, -47.10, -47.05, -48.24, -48.19, -47.47
+"""
+LINES = RECORDED_CSV.splitlines(keepends=True)
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Capture scanner events and activity log entries."""
+    q = queue.Queue()
+    monkeypatch.setattr(scanner, 'scanner_queue', q)
+    monkeypatch.setattr(scanner, 'add_activity_log', MagicMock())
+    monkeypatch.setitem(lp.scanner_config, 'start_freq', 144.0)
+    monkeypatch.setitem(lp.scanner_config, 'end_freq', 146.0)
+    monkeypatch.setitem(lp.scanner_config, 'step', 100.0)
+    monkeypatch.setitem(lp.scanner_config, 'snr_threshold', 8)
+    monkeypatch.setitem(lp.scanner_config, 'dwell_time', 0)
+    monkeypatch.setattr(lp, 'scanner_running', True)
+    monkeypatch.setattr(lp, 'scanner_paused', False)
+    monkeypatch.setattr(lp, 'scanner_skip_signal', False)
+    monkeypatch.setattr(lp, 'scanner_power_process', None)
+    monkeypatch.setattr(scanner, '_power_engine', None)
+
+    def drain(kind):
+        items = []
+        while not q.empty():
+            items.append(q.get_nowait())
+        return [e for e in items if e['type'] == kind]
+
+    return drain
+
+
+def _fake_rtl_power(monkeypatch, chunks):
+    """Replace Popen with processes replaying recorded output chunks."""
+    commands = []
+
+    def popen(cmd, **kwargs):
+        commands.append(cmd)
+        proc = MagicMock()
+        proc.poll.return_value = 0
+        if chunks:
+            proc.stdout = iter(chunks.pop(0))
+        else:
+            lp.scanner_running = False
+            proc.stdout = iter([])
+        return proc
+
+    monkeypatch.setattr(scanner.subprocess, 'Popen', popen)
+    monkeypatch.setattr(scanner, 'find_rtl_power', lambda: '/usr/bin/rtl_power')
+    return commands
+
+
+def test_parse_power_segment():
+    ts, start, end, step, values = scanner._parse_power_segment(LINES[0])
+    assert ts == '2024-05-12,14:03:21'
+    assert (start, end, step) == (144e6, 145e6, 100e3)
+    assert len(values) == 10 and values[0] == -47.53
+    assert scanner._parse_power_segment('# comment') is None
+    assert scanner._parse_power_segment('garbage') is None
+
+
+def test_replay_detects_hits_and_losses(events):
+    engine = scanner.PowerSweepEngine()
+    found = []
+    for i, line in enumerate(LINES):
+        hits = engine.feed_line(line, now=(i // 2) * 0.5)
+        for hit in hits or ():
+            engine.signal_found(hit)
+            found.append(round(hit['frequency'], 3))
+    engine.flush(now=3.5)
+
+    assert found == [144.55, 145.25]
+    assert [round(e['frequency'], 3) for e in events('signal_lost')] == [145.25, 144.55]
+
+    stats = engine.stats()
+    assert stats['sweeps'] == 7
+    assert stats['hops'] == 14
+    assert stats['revisit_s'] == 0.5
+    assert stats['hop_rate'] == 4.0
+    assert stats['hits'] == 2
+    # The 145.25 burst was only seen on one sweep
+    assert stats['transient_hits'] == 1
+    assert stats['missed_activity_rate'] == 0.5
+
+
+def test_replay_emits_progress(events):
+    engine = scanner.PowerSweepEngine()
+    for line in LINES[:5]:
+        engine.feed_line(line)
+
+    # Two complete sweeps of 20 bins each
+    updates = events('scan_update')
+    assert len(updates) == 40
+    assert updates[19]['progress'] == updates[-1]['progress'] == 1.0
+    assert [round(u['frequency'], 1) for u in updates if u['detected']] == [144.4, 144.5]
+
+
+def test_single_process_streams_every_sweep(events, monkeypatch):
+    monkeypatch.setitem(lp.scanner_config, 'power_handoff', False)
+    commands = _fake_rtl_power(monkeypatch, [list(LINES)])
+
+    scanner.scanner_loop_power()
+
+    # One streaming rtl_power for all sweeps; the second launch only
+    # happens because the recording ended
+    assert len(commands) == 2
+    assert '-1' not in commands[0]
+    assert commands[0][commands[0].index('-f') + 1] == '144000000:146000000:100000'
+    assert scanner._power_engine.sweeps == 6
+    assert [round(e['frequency'], 3) for e in events('signal_found')] == [144.55, 145.25]
+
+
+def test_hit_hands_off_to_demodulator(events, monkeypatch):
+    monkeypatch.setitem(lp.scanner_config, 'power_handoff', True)
+    monkeypatch.setitem(lp.scanner_config, 'modulation', 'fm')
+    start_audio = MagicMock()
+    stop_audio = MagicMock()
+    monkeypatch.setattr(scanner, '_start_audio_stream', start_audio)
+    monkeypatch.setattr(scanner, '_stop_audio_stream', stop_audio)
+    # Sweeping resumes after the dwell with the carrier still up
+    commands = _fake_rtl_power(monkeypatch, [list(LINES), list(LINES[6:])])
+
+    scanner.scanner_loop_power()
+
+    start_audio.assert_called_once()
+    freq, mod = start_audio.call_args[0]
+    assert round(freq, 3) == 144.55 and mod == 'fm'
+    stop_audio.assert_called_once()
+    assert len(commands) == 3
+
+    found = events('signal_found')
+    assert found[0]['audio_streaming'] is True
+    stats = scanner._power_engine.stats()
+    assert stats['handoffs'] == 1
+    assert stats['hits'] == 1
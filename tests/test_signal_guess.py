@@ -13,13 +13,40 @@ Tests cover:
 - Confidence level calculations
 """
 
+import random
+
 from utils.signal_guess import (
+    SIGNAL_TYPES,
     Confidence,
     SignalGuessingEngine,
     guess_signal_type,
     guess_signal_type_dict,
+    guess_signal_types_dict,
 )
 
+REGIONS = ["UK/EU", "US", "GLOBAL"]
+
+
+def _catalog_frequencies():
+    """Every range edge, its neighbours and a spread of random frequencies."""
+    freqs = set()
+    for signal_type in SIGNAL_TYPES:
+        for fmin, fmax in signal_type.frequency_ranges:
+            freqs.update((fmin - 1, fmin, fmin + 1, (fmin + fmax) // 2, fmax - 1, fmax, fmax + 1))
+    rng = random.Random(7)
+    freqs.update(rng.randrange(1_000_000, 6_000_000_000) for _ in range(2000))
+    return sorted(freqs)
+
+
+def _full_scan(engine, frequency_hz, modulation=None, bandwidth_hz=None, duration_ms=None,
+               repetition_count=None, region="UK/EU"):
+    """Reference result scoring every catalog entry, as before indexing."""
+    ranking = engine._rank(
+        engine._signal_types, frequency_hz, modulation, bandwidth_hz,
+        duration_ms, repetition_count, region,
+    )
+    return engine._build_result(ranking, frequency_hz, modulation, bandwidth_hz, duration_ms, repetition_count)
+
 
 class TestFMBroadcast:
     """Tests for FM broadcast radio identification."""
@@ -594,3 +621,94 @@ class TestSpecificSignalTypes:
             modulation="FSK",
         )
         assert "Pager" in result.primary_label
+
+
+class TestFrequencyIndex:
+    """The interval index gives the same answers as a full catalog scan."""
+
+    def test_allocations_match_full_scan(self):
+        engine = SignalGuessingEngine()
+        for region in REGIONS:
+            for freq in _catalog_frequencies():
+                expected = [
+                    t.label for t in SIGNAL_TYPES
+                    if (region in t.regions or "GLOBAL" in t.regions)
+                    and any(fmin <= freq <= fmax for fmin, fmax in t.frequency_ranges)
+                ]
+                assert engine.get_frequency_allocations(freq, region=region) == expected, (region, freq)
+
+    def test_guesses_match_full_scan(self):
+        engine = SignalGuessingEngine()
+        for region in REGIONS:
+            for freq in _catalog_frequencies()[::3]:
+                for modulation, bandwidth_hz in ((None, None), ("FM", 12_500), ("OOK", None)):
+                    assert engine.guess_signal_type(
+                        freq, modulation=modulation, bandwidth_hz=bandwidth_hz, region=region,
+                    ) == _full_scan(engine, freq, modulation, bandwidth_hz, region=region)
+
+    def test_index_built_once_per_region(self):
+        engine = SignalGuessingEngine(region="UK/EU")
+        engine.guess_signal_type(frequency_hz=100_000_000)
+        engine.guess_signal_type(frequency_hz=315_000_000, region="US")
+        index = engine._index("UK/EU")
+        engine.guess_signal_type(frequency_hz=433_920_000)
+        assert engine._index("UK/EU") is index
+        assert set(engine._indexes) == {"UK/EU", "US"}
+
+    def test_outside_catalog(self):
+        engine = SignalGuessingEngine()
+        index = engine._index("UK/EU")
+        assert index.slot(1) == -1
+        assert index.candidates(10_000_000_000) == ()
+
+
+class TestBatchGuessing:
+    """Classifying a whole sweep in one call."""
+
+    def test_batch_matches_single_calls(self):
+        engine = SignalGuessingEngine()
+        signals = [
+            {"frequency_hz": 98_500_000, "modulation": "WFM"},
+            {"frequency_hz": 121_500_000, "modulation": "AM", "bandwidth_hz": 8_000},
+            {"frequency_hz": 433_920_000, "duration_ms": 50, "repetition_count": 3},
+            {"frequency_hz": 433_930_000, "duration_ms": 50, "repetition_count": 3},
+            {"frequency_hz": 5_000},
+            {"frequency_hz": 98_500_000, "modulation": "WFM"},
+        ]
+        results = engine.guess_signal_types(signals)
+        assert len(results) == len(signals)
+        for signal, result in zip(signals, results):
+            assert result == engine.guess_signal_type(**signal)
+
+    def test_batch_region_override(self):
+        engine = SignalGuessingEngine(region="UK/EU")
+        signals = [{"frequency_hz": 315_000_000}]
+        assert engine.guess_signal_types(signals, region="US") == [
+            engine.guess_signal_type(315_000_000, region="US")
+        ]
+
+    def test_batch_dict_output(self):
+        results = guess_signal_types_dict([{"frequency_hz": 98_500_000}, {"frequency_hz": 5_000}])
+        assert results[0] == guess_signal_type_dict(frequency_hz=98_500_000)
+        assert results[1]["primary_label"] == "Unknown Signal"
+
+    def test_empty_batch(self):
+        assert SignalGuessingEngine().guess_signal_types([]) == []
+
+
+class TestDenseSweep:
+    """Indexed and batched classification over a dense wideband sweep."""
+
+    def test_dense_sweep_matches_full_scan(self):
+        engine = SignalGuessingEngine()
+        rng = random.Random(1)
+        # 5000 peaks across 24 MHz - 1.7 GHz, clustered on busy bands
+        centres = [98_000_000, 121_000_000, 145_000_000, 433_920_000, 446_000_000, 868_300_000, 935_000_000]
+        peaks = [rng.randrange(24_000_000, 1_700_000_000) for _ in range(2500)]
+        peaks += [rng.choice(centres) + rng.randrange(-500_000, 500_000, 12_500) for _ in range(2500)]
+        signals = [{"frequency_hz": f, "modulation": "FM", "bandwidth_hz": 12_500} for f in peaks]
+
+        reference = [_full_scan(engine, s["frequency_hz"], "FM", 12_500) for s in signals]
+
+        assert [engine.guess_signal_type(**s) for s in signals] == reference
+        assert engine.guess_signal_types(signals) == reference
@@ -98,3 +98,37 @@ def test_signal_guess_response_structure(auth_client):
     assert 'tags' in data
     assert isinstance(data['alternatives'], list)
     assert isinstance(data['tags'], list)
+
+
+def test_signal_guess_batch(auth_client):
+    """Batch endpoint classifies every signal in order."""
+    resp = auth_client.post('/receiver/signal/guess/batch', json={
+        'signals': [
+            {'frequency_mhz': 98.5, 'modulation': 'WFM'},
+            {'frequency_mhz': 121.5, 'modulation': 'AM'},
+        ],
+    })
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data['status'] == 'ok'
+    assert len(data['results']) == 2
+    assert data['results'][0]['primary_label']
+
+
+def test_signal_guess_batch_invalid(auth_client):
+    """Batch endpoint rejects a missing list or a bad frequency."""
+    resp = auth_client.post('/receiver/signal/guess/batch', json={})
+    assert resp.status_code == 400
+    resp = auth_client.post('/receiver/signal/guess/batch', json={'signals': [{'frequency_mhz': -1}]})
+    assert resp.status_code == 400
+
+
+def test_signal_guess_batch_too_large(auth_client):
+    """Batch endpoint rejects more signals than the per-request cap."""
+    from routes.listening_post.tools import MAX_GUESS_BATCH
+
+    signal = {'frequency_mhz': 98.5}
+    resp = auth_client.post('/receiver/signal/guess/batch', json={'signals': [signal] * MAX_GUESS_BATCH})
+    assert resp.status_code == 200
+    resp = auth_client.post('/receiver/signal/guess/batch', json={'signals': [signal] * (MAX_GUESS_BATCH + 1)})
+    assert resp.status_code == 400
@@ -0,0 +1,408 @@
+"""Tests for binary stream codecs."""
+
+from __future__ import annotations
+
+import base64
+import json
+import queue
+import socket
+import struct
+import threading
+import uuid
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+import routes.adsb as adsb
+import routes.ais as ais
+import utils.stream_codec as stream_codec
+from utils.cleanup import DataStore
+from utils.sse import DeltaSubscriber, EntityRevisions, format_sse, sse_stream_fanout
+from utils.stream_codec import (
+    WS_CODEC_MESSAGE_TYPE,
+    KeyDictionary,
+    StreamCodec,
+    encode_cbor,
+    negotiate_codec,
+    ws_message_frames,
+)
+
+
+def _decode_cbor(data: bytes):
+    """Minimal CBOR decoder covering what the encoder emits."""
+    pos = 0
+
+    def item():
+        nonlocal pos
+        initial = data[pos]
+        pos += 1
+        major, info = initial >> 5, initial & 0x1F
+        if major == 7:
+            if info in (20, 21):
+                return info == 21
+            if info == 22:
+                return None
+            size, fmt = {25: (2, '>e'), 26: (4, '>f'), 27: (8, '>d')}[info]
+            pos += size
+            return struct.unpack(fmt, data[pos - size:pos])[0]
+        if info < 24:
+            value = info
+        else:
+            size = 1 << (info - 24)
+            value = int.from_bytes(data[pos:pos + size], 'big')
+            pos += size
+        if major == 0:
+            return value
+        if major == 1:
+            return -1 - value
+        if major in (2, 3):
+            pos += value
+            raw = data[pos - value:pos]
+            return raw if major == 2 else raw.decode()
+        if major == 4:
+            return [item() for _ in range(value)]
+        return {item(): item() for _ in range(value)}
+
+    return item()
+
+
+def _named(value, keys: list[str]):
+    if isinstance(value, dict):
+        return {keys[k] if isinstance(k, int) else k: _named(v, keys) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_named(v, keys) for v in value]
+    return value
+
+
+class _Client:
+    """Decodes an SSE stream the way the browser helper does."""
+
+    def __init__(self):
+        self.codec = None
+        self.keys: list[str] = []
+
+    def feed(self, text: str) -> list[tuple[str | None, dict]]:
+        out = []
+        for block in text.split('\n\n'):
+            if not block:
+                continue
+            event, data = None, None
+            for line in block.split('\n'):
+                if line.startswith('event: '):
+                    event = line[7:]
+                elif line.startswith('data: '):
+                    data = line[6:]
+            if event == 'codec':
+                update = json.loads(data)
+                self.codec = update['codec']
+                del self.keys[update['offset']:]
+                self.keys.extend(update['keys'])
+                continue
+            out.append((event, self.decode(data)))
+        return out
+
+    def decode(self, data: str | bytes):
+        if isinstance(data, str):
+            if self.codec is None or data[0] == '{':
+                return json.loads(data)
+            data = base64.b64decode(data)
+        if self.codec == 'msgpack':
+            import msgpack
+            value = msgpack.unpackb(data, strict_map_key=False)
+        else:
+            value = _decode_cbor(data)
+        return _named(value, self.keys)
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def _replay_sbs(monkeypatch, path: Path, codecs: list[str]) -> tuple[list[dict], dict[str, list[int]]]:
+    """Replay an SBS session through the ADS-B parser.
+
+    The session is served on a local socket as dump1090 would serve it. The
+    update interval is zero, so every line is broadcast. Returns the
+    aircraft messages and, per codec, the size of each SSE event a
+    ``?delta=1`` client is sent.
+    """
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'adsb_aircraft', DataStore(name='adsb_replay'))
+    monkeypatch.setattr(adsb, 'adsb_revisions', EntityRevisions('icao'))
+    monkeypatch.setattr(adsb, 'adsb_history_writer', MagicMock())
+    monkeypatch.setattr(adsb, 'adsb_snapshot_writer', MagicMock())
+    monkeypatch.setattr(adsb, 'process_event', lambda *args: None)
+    monkeypatch.setattr(adsb, 'ADSB_UPDATE_INTERVAL', 0)
+    monkeypatch.setattr(adsb, 'SBS_RECONNECT_DELAY', 0)
+    monkeypatch.setattr(adsb, 'adsb_using_service', True)
+
+    messages: list[dict] = []
+    subscribers = {
+        name: DeltaSubscriber(adsb.adsb_revisions, 'aircraft', keyframe_interval=3600,
+                              codec=negotiate_codec(name, KeyDictionary()))
+        for name in codecs
+    }
+    delta_sizes: dict[str, list[int]] = {name: [] for name in codecs}
+
+    def broadcast(payload):
+        messages.append(dict(payload))
+        for name, subscriber in subscribers.items():
+            for out in subscriber.feed(payload, now=0.0):
+                delta_sizes[name].append(len(format_sse(out, codec=subscriber.codec)))
+
+    monkeypatch.setattr(adsb, '_broadcast_adsb_update', broadcast)
+
+    server = socket.create_server(('127.0.0.1', 0))
+
+    def serve():
+        with server:
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(path.read_bytes())
+            # The parser reconnects once the session ends; stop it there
+            conn, _ = server.accept()
+            adsb.adsb_using_service = False
+            conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    adsb.parse_sbs_stream(f'127.0.0.1:{server.getsockname()[1]}')
+    thread.join(timeout=5)
+    return messages, delta_sizes
+
+
+def _replay_ais(monkeypatch, path: Path) -> list[dict]:
+    """Vessel messages for an AIS-catcher JSON session, one per line."""
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'ais_vessels', DataStore(name='ais_replay'))
+    messages = []
+    for line in path.read_text().splitlines():
+        vessel = ais.process_ais_message(json.loads(line))
+        if vessel:
+            app_module.ais_vessels.set(vessel['mmsi'], vessel)
+            messages.append({'type': 'vessel', **vessel})
+    return messages
+
+
+CODECS = ['cbor'] + (['msgpack'] if stream_codec.MSGPACK_AVAILABLE else [])
+
+
+class TestCbor:
+    """Encodings match the RFC 8949 appendix A examples."""
+
+    @pytest.mark.parametrize('value,expected', [
+        (0, '00'), (23, '17'), (24, '1818'), (100, '1864'), (1000, '1903e8'),
+        (1000000, '1a000f4240'), (1000000000000, '1b000000e8d4a51000'),
+        (-1, '20'), (-1000, '3903e7'), (1.1, 'fb3ff199999999999a'), (100000.0, 'fa47c35000'),
+        (float('inf'), 'fb7ff0000000000000'), (False, 'f4'), (True, 'f5'), (None, 'f6'),
+        (b'', '40'), ('a', '6161'), ('ü', '62c3bc'), ([1, [2, 3]], '8201820203'),
+        ({'a': 1, 'b': [2, 3]}, 'a26161016162820203'),
+    ])
+    def test_rfc_examples(self, value, expected):
+        assert encode_cbor(value).hex() == expected
+
+    def test_round_trip(self):
+        value = {'s': 'x' * 300, 'n': [-2**40, 2**40, 65535, 65536], 't': (1.5, None), 'd': {'nested': [{}]}}
+        assert _decode_cbor(encode_cbor(value)) == {**value, 't': [1.5, None]}
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            encode_cbor({'when': object()})
+
+
+class TestKeyDictionary:
+    """Keys are numbered once and sent to each client once."""
+
+    def test_numbering_and_cap(self):
+        keys = KeyDictionary(['type', 'icao'], max_keys=3)
+        assert [keys.lookup(k) for k in ('icao', 'alt', 'type', 'lat')] == [1, 2, 0, 'lat']
+        assert encode_cbor({'icao': 'A', 'lat': 1.5}, keys) == encode_cbor({1: 'A', 'lat': 1.5})
+        assert keys.keys() == ['type', 'icao', 'alt']
+
+    def test_updates_per_client(self):
+        keys = KeyDictionary(['type'])
+        first, second = StreamCodec('cbor', keys), StreamCodec('cbor', keys)
+        assert first.key_update() == {'type': 'codec', 'codec': 'cbor', 'offset': 0, 'keys': ['type']}
+        assert first.key_update() is None
+        first.pack({'type': 'x', 'alt': 1})
+        update = first.key_update()
+        assert (update['offset'], update['keys']) == (1, ['alt'])
+        assert second.key_update()['keys'] == ['type', 'alt']
+
+    def test_negotiation(self, monkeypatch):
+        keys = KeyDictionary()
+        assert negotiate_codec(None, keys) is None
+        assert negotiate_codec('json', keys) is None
+        assert negotiate_codec('yaml', keys) is None
+        assert negotiate_codec(' CBOR ', keys).name == 'cbor'
+        monkeypatch.setattr(stream_codec, 'MSGPACK_AVAILABLE', False)
+        assert negotiate_codec('msgpack', keys) is None
+
+
+@pytest.mark.parametrize('codec_name', CODECS)
+class TestStreams:
+    """Binary payloads decode to the JSON messages they replace."""
+
+    def test_format_sse_sends_keys_before_use(self, codec_name):
+        codec = StreamCodec(codec_name, KeyDictionary(['type']))
+        client = _Client()
+        first = format_sse({'type': 'aircraft', 'icao': 'A'}, codec=codec)
+        assert first.startswith('event: codec\n')
+        assert client.feed(first) == [(None, {'type': 'aircraft', 'icao': 'A'})]
+
+        second = format_sse({'type': 'aircraft', 'icao': 'B'}, event='update', codec=codec)
+        assert 'event: codec' not in second
+        assert client.feed(second) == [('update', {'type': 'aircraft', 'icao': 'B'})]
+
+        third = format_sse({'type': 'aircraft', 'squawk': '7700'}, codec=codec)
+        assert json.loads(third.split('data: ', 1)[1].split('\n')[0])['offset'] == 2
+        assert client.feed(third) == [(None, {'type': 'aircraft', 'squawk': '7700'})]
+        # Pre-serialized text is left as it is
+        assert client.feed(format_sse('{"type": "raw"}', codec=codec)) == [(None, {'type': 'raw'})]
+
+    def test_delta_messages_are_packed_once(self, codec_name):
+        revisions = EntityRevisions('icao')
+        keys = KeyDictionary()
+        revisions.update({'icao': 'A', 'alt': 100})
+        clients = [DeltaSubscriber(revisions, 'aircraft', codec=StreamCodec(codec_name, keys)) for _ in range(2)]
+        first, second = (client.tick(now=0.0) for client in clients)
+        assert first[0] is second[0]
+
+        revisions.update({'icao': 'A', 'alt': 200})
+        packed = [client.feed({'type': 'aircraft', 'icao': 'A', 'alt': 200}, now=1.0) for client in clients]
+        assert packed[0][0] is packed[1][0]
+        decoder = _Client()
+        decoder.feed(format_sse(packed[0][0], codec=clients[0].codec))
+        assert decoder.decode(packed[0][0]) == {'type': 'aircraft', 'alt': 200, 'icao': 'A', 'rev': 2, 'since': 1}
+
+    def test_fanout_stream(self, codec_name):
+        source = queue.Queue()
+        client = _Client()
+        stream = sse_stream_fanout(
+            source, f'codec-{uuid.uuid4()}', timeout=0.05,
+            codec=StreamCodec(codec_name, KeyDictionary()),
+        )
+        try:
+            assert client.feed(next(stream)) == [(None, {'type': 'keepalive'})]
+            source.put({'type': 'vessel', 'mmsi': '1', 'speed': 3.5})
+            update = client.feed(next(stream))
+        finally:
+            stream.close()
+        assert client.codec == codec_name
+        assert update == [(None, {'type': 'vessel', 'mmsi': '1', 'speed': 3.5})]
+
+    def test_adsb_stream(self, codec_name, client, monkeypatch):
+        monkeypatch.setattr(adsb, 'adsb_revisions', EntityRevisions('icao'))
+        monkeypatch.setattr(adsb, 'process_event', lambda *args: None)
+        aircraft = {'icao': 'ABC123', 'callsign': 'BAW1', 'altitude': 30000}
+        adsb.adsb_revisions.update(aircraft)
+
+        with client.session_transaction() as sess:
+            sess['logged_in'] = True
+        resp = client.get(f'/adsb/stream?delta=1&codec={codec_name}')
+        chunks = iter(resp.response)
+        decoder = _Client()
+
+        def next_messages():
+            chunk = next(chunks)
+            return decoder.feed(chunk.decode() if isinstance(chunk, bytes) else chunk)
+
+        try:
+            assert next_messages() == [(None, {'type': 'keepalive'})]
+            assert next_messages()[0][1]['callsign'] == 'BAW1'
+            aircraft['altitude'] = 30025
+            adsb.adsb_revisions.update(aircraft)
+            adsb._broadcast_adsb_update({'type': 'aircraft', **aircraft})
+            update = next_messages()[0][1]
+        finally:
+            resp.close()
+        assert update['altitude'] == 30025 and 'callsign' not in update
+
+    @pytest.mark.parametrize('path,message', [
+        ('/meshtastic/stream', {'type': 'meshtastic', 'from': '!a1b2c3d4', 'message': 'hi', 'snr': 6.25}),
+        ('/radiosonde/stream', {'type': 'balloon', 'id': 'S1234567', 'alt': 12034.5, 'temp': -51.2}),
+    ])
+    def test_telemetry_streams(self, codec_name, path, message, client, monkeypatch):
+        import app as app_module
+        import routes.meshtastic as meshtastic
+
+        # A fresh source queue, so a fanout thread still serving an earlier
+        # subscriber of the channel cannot take the message
+        source = queue.Queue()
+        if path.startswith('/meshtastic'):
+            monkeypatch.setattr(meshtastic, '_mesh_queue', source)
+        else:
+            monkeypatch.setattr(app_module, 'radiosonde_queue', source)
+        with client.session_transaction() as sess:
+            sess['logged_in'] = True
+        resp = client.get(f'{path}?codec={codec_name}')
+        chunks = iter(resp.response)
+        decoder = _Client()
+
+        def next_messages():
+            chunk = next(chunks)
+            return decoder.feed(chunk.decode() if isinstance(chunk, bytes) else chunk)
+
+        try:
+            assert next_messages() == [(None, {'type': 'keepalive'})]
+            source.put(message)
+            update = next_messages()
+        finally:
+            resp.close()
+        assert decoder.codec == codec_name
+        assert update == [(None, message)]
+
+    def test_websocket_side_messages(self, codec_name):
+        codec = StreamCodec(codec_name, KeyDictionary())
+        msg = {'type': 'detection', 'event': {'snr_db': 12.5, 'duration_ms': 180}}
+        keys, frame = ws_message_frames(msg, codec)
+        assert json.loads(keys)['type'] == 'codec'
+        assert frame[0] == WS_CODEC_MESSAGE_TYPE
+        decoder = _Client()
+        decoder.feed(f'event: codec\ndata: {keys}\n\n')
+        assert decoder.decode(frame[1:]) == msg
+        # Known keys need no update
+        assert [frame[0] for frame in ws_message_frames({'type': 'detection'}, codec)] == [WS_CODEC_MESSAGE_TYPE]
+        assert ws_message_frames({'status': 'stopped'}) == ['{"status": "stopped"}']
+
+
+class TestEncodingSize:
+    """Wire size against JSON on recorded ADS-B and AIS sessions.
+
+    tests/fixtures holds the sessions in the receivers' own output formats:
+    dump1090 SBS (port 30003) and AIS-catcher JSON. They are replayed
+    through the app's parsers, so the test sees the messages the
+    streams really send. The sessions were generated, because no receiver
+    was available to record from. A real capture can replace either file,
+    e.g. from ``nc <host> 30003 > adsb_session.sbs``.
+    """
+
+    @staticmethod
+    def _mean_size(messages, encode) -> float:
+        return sum(len(encode(msg)) for msg in messages) / len(messages)
+
+    def test_codecs_vs_json(self, monkeypatch):
+        adsb_messages, delta_sizes = _replay_sbs(monkeypatch, FIXTURES / 'adsb_session.sbs', ['json', *CODECS])
+        traffic = {'adsb': adsb_messages, 'ais': _replay_ais(monkeypatch, FIXTURES / 'ais_session.jsonl')}
+        assert len(traffic['adsb']) == len((FIXTURES / 'adsb_session.sbs').read_text().splitlines())
+        assert len({msg['icao'] for msg in traffic['adsb']}) == 15
+        assert len({msg['mmsi'] for msg in traffic['ais']}) == 20
+
+        results = {}
+        for stream, messages in traffic.items():
+            for name in ['json', *CODECS]:
+                codec = negotiate_codec(name, KeyDictionary())
+                packed = self._mean_size(messages, json.dumps if codec is None else codec.pack)
+                sse = self._mean_size(messages, lambda msg, codec=codec: format_sse(msg, codec=codec))
+                results[stream, name] = (packed, sse)
+
+        for stream in ('adsb', 'ais'):
+            json_size, json_sse = results[stream, 'json']
+            cbor_size, cbor_sse = results[stream, 'cbor']
+            assert cbor_size < json_size * 0.5
+            # base64 gives back a third of the saving on SSE
+            assert cbor_sse < json_sse * 0.7
+        # Deltas are small already, but key numbering still pays off
+        assert sum(delta_sizes['cbor']) < sum(delta_sizes['json']) * 0.8
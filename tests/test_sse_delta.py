@@ -0,0 +1,303 @@
+"""Tests for delta SSE snapshot streams."""
+
+from __future__ import annotations
+
+import json
+import queue
+import random
+import uuid
+
+import routes.adsb as adsb
+from utils.sse import DeltaSubscriber, EntityRevisions, format_sse, sse_stream_fanout
+
+
+def _aircraft(i: int, rng: random.Random) -> dict:
+    return {
+        'icao': f'{0x400000 + i:06X}',
+        'callsign': f'BAW{i}',
+        'registration': f'G-{i:04d}',
+        'type_code': 'A320',
+        'type_desc': 'AIRBUS A-320',
+        'altitude': rng.randrange(1000, 40000, 25),
+        'speed': rng.randrange(150, 480),
+        'heading': rng.randrange(360),
+        'vertical_rate': 0,
+        'lat': 51 + rng.random(),
+        'lon': -1 + rng.random(),
+        'squawk': f'{rng.randrange(7777):04d}',
+    }
+
+
+def _move(aircraft: dict, rng: random.Random) -> None:
+    """Typical SBS update: position and a few kinematic fields."""
+    aircraft['lat'] += 0.001
+    aircraft['lon'] += 0.001
+    if rng.random() < 0.5:
+        aircraft['altitude'] += 25
+    if rng.random() < 0.2:
+        aircraft['heading'] = (aircraft['heading'] + 1) % 360
+
+
+def _parse(chunk: str | bytes) -> dict:
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    return json.loads(chunk.split('data: ', 1)[1])
+
+
+def _decoded(messages: list) -> list[dict]:
+    return [json.loads(m) if isinstance(m, str) else m for m in messages]
+
+
+class TestEntityRevisions:
+    """Revisions advance only on change and remember per-field changes."""
+
+    def test_field_revisions(self):
+        revisions = EntityRevisions('icao')
+        first = revisions.update({'icao': 'A', 'alt': 100, 'lat': 1.0, 'tags': ['x']})
+        assert revisions.update({'icao': 'A', 'alt': 100, 'lat': 1.0, 'tags': ['x']}) == first
+        second = revisions.update({'icao': 'A', 'alt': 200, 'lat': 1.0, 'tags': ['x', 'y']})
+
+        assert second > first
+        assert revisions.delta('A', first) == (second, {'alt': 200, 'tags': ['x', 'y']})
+        assert revisions.delta('A', second) == (second, {})
+        assert revisions.delta('A') == (second, {'icao': 'A', 'alt': 200, 'lat': 1.0, 'tags': ['x', 'y']})
+        assert revisions.delta('B') is None
+
+    def test_removed_field_becomes_none(self):
+        revisions = EntityRevisions('mmsi')
+        first = revisions.update({'mmsi': 1, 'name': 'ANNA', 'dest': 'OSLO'})
+        second = revisions.update({'mmsi': 1, 'name': 'ANNA'})
+        assert revisions.delta(1, first) == (second, {'dest': None})
+        assert revisions.update({'mmsi': 1, 'name': 'ANNA'}) == second
+
+    def test_mutated_containers_are_detected(self):
+        revisions = EntityRevisions('device_id')
+        flags = ['new']
+        device = {'device_id': 'd', 'heuristic_flags': flags}
+        first = revisions.update(device)
+        flags.append('persistent')
+        assert revisions.update(device) > first
+
+    def test_stale_entities_expire(self):
+        revisions = EntityRevisions('icao', max_age_seconds=60)
+        revisions.update({'icao': 'A'}, now=0.0)
+        revisions.update({'icao': 'B'}, now=30.0)
+        revisions.update({'icao': 'A', 'alt': 1}, now=50.0)
+        revisions.update({'icao': 'C'}, now=100.0)
+
+        assert len(revisions) == 2
+        assert revisions.delta('B') is None
+        assert revisions.changed_since(0) == ['A', 'C']
+
+    def test_removals_leave_tombstones(self):
+        revisions = EntityRevisions('icao', max_age_seconds=60)
+        revisions.update({'icao': 'A'}, now=0.0)
+        since = revisions.update({'icao': 'B'}, now=30.0)
+        revisions.update({'icao': 'C'}, now=70.0)
+        revisions.retain(['C'])
+
+        removed = revisions.removed_since(since)
+        assert [key for key, _ in removed] == ['A', 'B']
+        assert all(since < rev <= revisions.revision for _, rev in removed)
+        assert revisions.removed_since(revisions.revision) == []
+        # Coming back clears the tombstone
+        revisions.update({'icao': 'B'}, now=80.0)
+        assert [key for key, _ in revisions.removed_since(since)] == ['A']
+
+    def test_dropped_tombstones_force_resync(self):
+        revisions = EntityRevisions('icao', max_removed=2)
+        for icao in 'ABC':
+            revisions.update({'icao': icao})
+        since = revisions.revision
+        revisions.clear()
+
+        assert len(revisions) == 0
+        assert revisions.removed_since(since) is None
+        assert [key for key, _ in revisions.removed_since(revisions.revision - 2)] == ['B', 'C']
+
+
+class TestDeltaSubscriber:
+    """Clients get full state once, then only what changed for them."""
+
+    def test_first_full_then_deltas(self):
+        revisions = EntityRevisions('icao')
+        client = DeltaSubscriber(revisions, 'aircraft', keyframe_interval=60)
+        assert client.tick(now=0.0) == []
+
+        aircraft = {'icao': 'A', 'alt': 100, 'lat': 1.0}
+        rev = revisions.update(aircraft)
+        assert _decoded(client.feed({'type': 'aircraft', **aircraft}, now=1.0)) == [
+            {'type': 'aircraft', 'icao': 'A', 'alt': 100, 'lat': 1.0, 'rev': rev}
+        ]
+        aircraft['alt'] = 200
+        rev2 = revisions.update(aircraft)
+        assert _decoded(client.feed({'type': 'aircraft', **aircraft}, now=2.0)) == [
+            {'type': 'aircraft', 'alt': 200, 'icao': 'A', 'rev': rev2, 'since': rev}
+        ]
+        # Re-broadcast of unchanged state sends nothing; other types pass through
+        assert client.feed({'type': 'aircraft', **aircraft}, now=3.0) == []
+        assert client.feed({'type': 'status', 'message': 'ok'}, now=4.0) == [{'type': 'status', 'message': 'ok'}]
+
+    def test_periodic_keyframe(self):
+        revisions = EntityRevisions('icao')
+        for icao in ('A', 'B'):
+            revisions.update({'icao': icao, 'alt': 100})
+        client = DeltaSubscriber(revisions, 'aircraft', keyframe_interval=10)
+
+        first = _decoded(client.tick(now=0.0))
+        assert [(m['icao'], m['alt']) for m in first] == [('A', 100), ('B', 100)]
+        assert client.tick(now=5.0) == []
+        revisions.update({'icao': 'A', 'alt': 200})
+        out = _decoded(client.feed({'type': 'aircraft', 'icao': 'A', 'alt': 200}, now=11.0))
+        # The keyframe already holds the update
+        assert sorted((m['icao'], m['alt']) for m in out) == [('A', 200), ('B', 100)]
+        assert not any('since' in m for m in out)
+
+    def test_removed_entities_are_reported_once(self):
+        revisions = EntityRevisions('device_id', max_age_seconds=60)
+        revisions.update({'device_id': 'A', 'rssi': -50}, now=0.0)
+        revisions.update({'device_id': 'B', 'rssi': -60}, now=30.0)
+        client = DeltaSubscriber(revisions, None, keyframe_interval=1e9, removals=True)
+        assert [m['device_id'] for m in _decoded(client.tick(now=0.0))] == ['A', 'B']
+
+        # A expires between two ticks
+        revisions.update({'device_id': 'C', 'rssi': -70}, now=70.0)
+        rev = revisions.revision
+        assert _decoded(client.tick(now=1.0)) == [{'device_id': 'A', 'removed': True, 'rev': rev}]
+        assert client.tick(now=2.0) == []
+        # Entities this client never got are not reported
+        revisions.remove('C')
+        assert client.tick(now=3.0) == []
+
+    def test_removals_survive_dropped_tombstones(self):
+        revisions = EntityRevisions('icao', max_removed=1)
+        for icao in 'AB':
+            revisions.update({'icao': icao})
+        client = DeltaSubscriber(revisions, 'aircraft', keyframe_interval=1e9, removals=True)
+        client.tick(now=0.0)
+        revisions.clear()
+
+        out = _decoded(client.tick(now=1.0))
+        assert sorted(m['icao'] for m in out) == ['A', 'B']
+        assert all(m['removed'] and m['type'] == 'aircraft' for m in out)
+
+    def test_merged_deltas_reconstruct_state_despite_drops(self):
+        rng = random.Random(3)
+        revisions = EntityRevisions('icao')
+        fleet = [_aircraft(i, rng) for i in range(40)]
+        client = DeltaSubscriber(revisions, 'aircraft', keyframe_interval=1e9)
+        view: dict[str, dict] = {}
+
+        def apply(messages):
+            for msg in _decoded(messages):
+                view.setdefault(msg['icao'], {}).update(msg)
+
+        apply(client.tick(now=0.0))
+        for step in range(2_000):
+            aircraft = rng.choice(fleet)
+            _move(aircraft, rng)
+            if rng.random() < 0.1:
+                aircraft['squawk'] = '7000'
+            revisions.update(aircraft)
+            # A saturated client queue drops a third of the triggers
+            if rng.random() < 0.66:
+                apply(client.feed({'type': 'aircraft', **aircraft}, now=float(step)))
+        for aircraft in fleet:
+            apply(client.feed({'type': 'aircraft', **aircraft}, now=2_001.0))
+
+        for aircraft in fleet:
+            shown = {k: v for k, v in view[aircraft['icao']].items() if k in aircraft}
+            assert shown == aircraft
+
+
+class TestStreams:
+    """Delta mode in the fanout generator and the ADS-B route."""
+
+    def test_fanout_stream_with_delta(self):
+        source = queue.Queue()
+        revisions = EntityRevisions('mmsi')
+        revisions.update({'mmsi': 1, 'name': 'ANNA', 'speed': 3})
+        seen = []
+        stream = sse_stream_fanout(
+            source, f'delta-{uuid.uuid4()}', timeout=0.05,
+            on_message=seen.append, delta=DeltaSubscriber(revisions, 'vessel'),
+        )
+        try:
+            assert _parse(next(stream)) == {'type': 'keepalive'}
+            keyframe = _parse(next(stream))
+            assert keyframe == {'type': 'vessel', 'mmsi': 1, 'name': 'ANNA', 'speed': 3, 'rev': 1}
+
+            revisions.update({'mmsi': 1, 'name': 'ANNA', 'speed': 4})
+            source.put({'type': 'vessel', 'mmsi': 1, 'name': 'ANNA', 'speed': 4})
+            update = _parse(next(stream))
+        finally:
+            stream.close()
+
+        assert update == {'type': 'vessel', 'mmsi': 1, 'speed': 4, 'rev': 2, 'since': 1}
+        assert seen == [{'type': 'vessel', 'mmsi': 1, 'name': 'ANNA', 'speed': 4}]
+
+    def test_adsb_stream_delta(self, client, monkeypatch):
+        monkeypatch.setattr(adsb, 'adsb_revisions', EntityRevisions('icao'))
+        monkeypatch.setattr(adsb, 'process_event', lambda *args: None)
+        aircraft = {'icao': 'ABC123', 'callsign': 'BAW1', 'altitude': 30000}
+        adsb.adsb_revisions.update(aircraft)
+
+        with client.session_transaction() as sess:
+            sess['logged_in'] = True
+        resp = client.get('/adsb/stream?delta=1')
+        chunks = iter(resp.response)
+        try:
+            assert _parse(next(chunks)) == {'type': 'keepalive'}
+            assert _parse(next(chunks))['callsign'] == 'BAW1'
+
+            aircraft['altitude'] = 30025
+            adsb.adsb_revisions.update(aircraft)
+            adsb._broadcast_adsb_update({'type': 'aircraft', **aircraft})
+            update = _parse(next(chunks))
+        finally:
+            resp.close()
+
+        assert update['altitude'] == 30025 and 'callsign' not in update
+        assert update['since'] < update['rev']
+
+
+class TestBandwidthBenchmark:
+    """Bytes sent to a dozen browsers for a busy sky."""
+
+    AIRCRAFT = 300
+    CLIENTS = 12
+    TICKS = 30
+
+    def test_delta_vs_full_snapshots(self):
+        rng = random.Random(1)
+        fleet = [_aircraft(i, rng) for i in range(self.AIRCRAFT)]
+        revisions = EntityRevisions('icao')
+        for aircraft in fleet:
+            revisions.update(aircraft)
+        clients = [DeltaSubscriber(revisions, 'aircraft', keyframe_interval=1e9) for _ in range(self.CLIENTS)]
+        for subscriber in clients:
+            subscriber.tick(now=0.0)
+        ticks = []
+        for _ in range(self.TICKS):
+            for aircraft in fleet:
+                _move(aircraft, rng)
+            ticks.append([dict(aircraft) for aircraft in fleet])
+
+        full_bytes = 0
+        for tick in ticks:
+            for aircraft in tick:
+                msg = {'type': 'aircraft', **aircraft}
+                for _ in clients:
+                    full_bytes += len(format_sse(msg))
+
+        delta_bytes = 0
+        for t, tick in enumerate(ticks, 1):
+            for aircraft in tick:
+                revisions.update(aircraft)
+                msg = {'type': 'aircraft', **aircraft}
+                for subscriber in clients:
+                    for out in subscriber.feed(msg, now=float(t)):
+                        delta_bytes += len(format_sse(out))
+
+        assert delta_bytes * 1.8 < full_bytes
+
@@ -0,0 +1,185 @@
+"""Tests for the bounded temporal pattern detector."""
+
+from __future__ import annotations
+
+import random
+import tracemalloc
+
+from utils.temporal_patterns import TemporalPatternDetector
+
+
+def _reference(timestamps: list[float]) -> dict | None:
+    """Median-interval analysis over a plain timestamp list."""
+    if len(timestamps) < 4:
+        return None
+    intervals = [timestamps[i + 1] - timestamps[i] for i in range(len(timestamps) - 1)]
+    median = sorted(intervals)[len(intervals) // 2]
+    if median < 1.0:
+        return None
+    matching = sum(1 for iv in intervals if abs(iv - median) <= median * 0.2)
+    confidence = matching / len(intervals)
+    if confidence < 0.5:
+        return None
+    return {
+        'period_seconds': round(median, 1),
+        'confidence': round(confidence, 3),
+        'occurrences': len(timestamps),
+    }
+
+
+class TestPatternDetection:
+    """Results match a plain recomputation over the retained window."""
+
+    def test_periodic_device(self):
+        detector = TemporalPatternDetector()
+        for i in range(10):
+            detector.record_event('AA:BB', 'bluetooth', 1000.0 + i * 30)
+
+        pattern = detector.detect_patterns('AA:BB')
+        assert pattern == {
+            'period_seconds': 30.0,
+            'confidence': 1.0,
+            'occurrences': 10,
+            'device_id': 'AA:BB',
+            'mode': 'bluetooth',
+        }
+        assert detector.detect_patterns('AA:BB', 'wifi') is None
+
+    def test_too_few_or_too_fast(self):
+        detector = TemporalPatternDetector()
+        for i in range(3):
+            detector.record_event('slow', 'wifi', 1000.0 + i * 30)
+        for i in range(10):
+            detector.record_event('fast', 'wifi', 1000.0 + i * 0.1)
+        assert detector.detect_patterns('slow') is None
+        assert detector.detect_patterns('fast') is None
+        assert detector.get_all_patterns() == []
+
+    def test_ring_matches_reference_window(self):
+        rng = random.Random(3)
+        detector = TemporalPatternDetector(max_timestamps=20)
+        timestamps = []
+        ts = 1000.0
+        for _ in range(200):
+            ts += rng.choice((10.0, 10.5, 9.5, 40.0, 3.0))
+            timestamps.append(ts)
+            detector.record_event('dev', 'rf', ts)
+            expected = _reference(timestamps[-20:])
+            result = detector.detect_patterns('dev', 'rf')
+            if expected is None:
+                assert result is None
+            else:
+                assert result == {**expected, 'device_id': 'dev', 'mode': 'rf'}
+
+    def test_get_all_patterns_one_per_device(self):
+        detector = TemporalPatternDetector()
+        for i in range(6):
+            detector.record_event('dev', 'wifi', 100.0 + i * 10)
+            detector.record_event('dev', 'bluetooth', 100.0 + i * 20)
+            detector.record_event('other', 'adsb', 100.0 + i * 5)
+
+        patterns = detector.get_all_patterns()
+        assert sorted((p['device_id'], p['mode']) for p in patterns) == [('dev', 'wifi'), ('other', 'adsb')]
+
+    def test_get_all_patterns_recomputes_only_dirty(self, mocker):
+        detector = TemporalPatternDetector()
+        for i in range(6):
+            detector.record_event('a', 'wifi', 100.0 + i * 10)
+            detector.record_event('b', 'wifi', 100.0 + i * 10)
+        first = detector.get_all_patterns()
+
+        analyze = mocker.spy(detector, '_analyze_intervals')
+        assert detector.get_all_patterns() == first
+        assert analyze.call_count == 0
+
+        detector.record_event('a', 'wifi', 160.0)
+        patterns = detector.get_all_patterns()
+        assert analyze.call_count == 1
+        assert {p['device_id']: p['occurrences'] for p in patterns} == {'a': 7, 'b': 6}
+
+    def test_cached_results_are_copies(self):
+        detector = TemporalPatternDetector()
+        for i in range(6):
+            detector.record_event('a', 'wifi', 100.0 + i * 10)
+        detector.get_all_patterns()[0]['period_seconds'] = -1
+        assert detector.get_all_patterns()[0]['period_seconds'] == 10.0
+
+
+class TestBounds:
+    """LRU, TTL and memory ceiling."""
+
+    def test_lru_eviction(self):
+        detector = TemporalPatternDetector(max_timestamps=11)
+        detector._max_devices = 3
+        for key in ('a', 'b', 'c'):
+            detector.record_event(key, 'wifi', 100.0)
+        detector.record_event('a', 'wifi', 101.0)
+        detector.record_event('d', 'wifi', 102.0)
+
+        assert list(detector._devices) == ['wifi:c', 'wifi:a', 'wifi:d']
+        assert 'b' not in detector._modes_by_device
+        assert detector.stats()['evicted'] == 1
+
+    def test_ttl_eviction_drops_patterns(self):
+        detector = TemporalPatternDetector(device_ttl=3600)
+        for i in range(6):
+            detector.record_event('old', 'wifi', 1000.0 + i * 10)
+        assert detector.get_all_patterns()
+
+        detector.record_event('new', 'wifi', 1000.0 + 7200)
+        assert detector.get_all_patterns() == []
+        assert detector.detect_patterns('old') is None
+        assert detector.stats()['devices'] == 1
+
+    def test_memory_ceiling_sets_capacity(self):
+        detector = TemporalPatternDetector(max_timestamps=200, memory_limit_mb=1)
+        assert detector._max_devices == 1024 * 1024 // detector.device_bytes
+        for i in range(detector._max_devices * 2):
+            detector.record_event(f'dev{i}', 'wifi', 100.0)
+            detector.record_event(f'dev{i}', 'wifi', 101.0)
+
+        stats = detector.stats()
+        assert stats['devices'] == detector._max_devices
+        assert stats['estimated_bytes'] <= stats['memory_limit_bytes']
+
+
+class TestSoak:
+    """A million distinct keys through the event pipeline path."""
+
+    def test_million_keys(self):
+        detector = TemporalPatternDetector(memory_limit_mb=8)
+        capacity = detector._max_devices
+        beacons = [f'beacon{i}' for i in range(20)]
+
+        def feed(first, last):
+            for i in range(first, last):
+                ts = 1_000_000.0 + i * 0.01
+                if i % 100 == 0:
+                    # Periodic beacons recur every 2000 events (20 s)
+                    detector.record_event(beacons[(i // 100) % len(beacons)], 'bluetooth', ts)
+                else:
+                    detector.record_event(f'{i:06X}', 'wifi', ts)
+
+        feed(0, 900_000)
+
+        # Steady state: the table is full, so further keys must not grow it
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        feed(900_000, 1_000_000)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+        patterns = detector.get_all_patterns()
+        cached = detector._all_patterns
+        # No events since, so the second query is served from the cache
+        assert detector.get_all_patterns() == patterns
+        assert detector._all_patterns is cached
+
+        stats = detector.stats()
+
+        assert stats['devices'] <= capacity
+        # 990,000 one-shot wifi keys and the beacons went through the table
+        assert stats['evicted'] == 990_000 + len(beacons) - stats['devices']
+        assert peak < stats['memory_limit_bytes'] / 4
+        assert sorted(p['device_id'] for p in patterns) == sorted(beacons)
+        assert all(p['period_seconds'] == 20.0 for p in patterns)
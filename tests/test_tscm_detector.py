@@ -0,0 +1,115 @@
+"""Tests for TSCM repeat-detection history."""
+
+from __future__ import annotations
+
+import random
+import tracemalloc
+
+import utils.tscm.detector as detector
+from utils.tscm.detector import RepeatSightingTracker, ThreatDetector
+
+DAY = 24 * 3600
+
+
+def _reference(sightings: list[float], now: float, window: float) -> int:
+    """Sightings inside (now - window, now], from a plain list."""
+    return sum(1 for ts in sightings if ts > now - window)
+
+
+class TestRepeatSightingTracker:
+    """Counts, window edges and eviction."""
+
+    def test_counts_within_window(self):
+        tracker = RepeatSightingTracker(window_seconds=3600, bucket_seconds=60)
+        assert [tracker.record('wifi:AA', now=t) for t in (0.0, 10.0, 70.0)] == [1, 2, 3]
+        assert tracker.count('wifi:AA', now=100.0) == 3
+        assert tracker.count('wifi:BB', now=100.0) == 0
+        assert tracker.count('wifi:AA', now=3600.0) == 3
+        # The first bucket has left the window, the one at 70 s has not
+        assert tracker.count('wifi:AA', now=3660.0) == 1
+        assert tracker.record('wifi:AA', now=3700.0) == 2
+        assert tracker.count('wifi:AA', now=3700.0 + 3660) == 0
+
+    def test_matches_reference_to_one_bucket(self):
+        rng = random.Random(7)
+        tracker = RepeatSightingTracker(window_seconds=DAY, bucket_seconds=300)
+        sightings = []
+        now = 0.0
+        for _ in range(3_000):
+            now += rng.expovariate(1 / 120)
+            sightings.append(now)
+            count = tracker.record('bt:11:22', now=now)
+            # Bucketing may keep sightings up to one bucket past the window
+            assert _reference(sightings, now, DAY) <= count <= _reference(sightings, now, DAY + 300)
+        assert len(tracker._history['bt:11:22'][4]) <= DAY // 300
+
+    def test_idle_identifiers_are_evicted(self):
+        tracker = RepeatSightingTracker(window_seconds=3600, bucket_seconds=60)
+        for i in range(10):
+            tracker.record(f'rf:{i}', now=0.0)
+        tracker.record('rf:live', now=3000.0)
+        tracker.record('rf:live', now=3700.0)
+
+        stats = tracker.stats()
+        assert stats['identifiers'] == 1
+        assert stats['evicted'] == 10
+
+    def test_identifier_cap(self):
+        tracker = RepeatSightingTracker(window_seconds=3600, bucket_seconds=60, max_identifiers=3)
+        for key in ('a', 'b', 'c', 'a', 'd'):
+            tracker.record(key, now=1.0)
+        assert list(tracker._history) == ['c', 'a', 'd']
+        assert tracker.count('a', now=1.0) == 2
+
+    def test_detector_reports_repeat_sightings(self, monkeypatch):
+        monkeypatch.setattr(detector, '_repeat_tracker', RepeatSightingTracker())
+        engine = ThreatDetector()
+        device = {'bssid': 'AA:BB:CC:DD:EE:FF', 'essid': 'Cam'}
+        results = [engine.classify_wifi_device(dict(device)) for _ in range(3)]
+        assert [r['times_seen'] for r in results] == [1, 2, 3]
+
+
+class TestSoak:
+    """Four days of sweeps over a churning device population."""
+
+    def test_multi_day_sweep(self):
+        tracker = RepeatSightingTracker(max_identifiers=20_000)
+        rng = random.Random(11)
+        resident = [f'bt:{i:012X}' for i in range(200)]
+        now = 0.0
+        scan = 0
+
+        def sweep_until(end):
+            nonlocal now, scan
+            while now < end:
+                for key in resident:
+                    tracker.record(key, now=now)
+                # Randomized MACs seen once and never again
+                for i in range(scan * 100, scan * 100 + 100):
+                    tracker.record(f'bt:R{i:08X}', now=now)
+                scan += 1
+                now += 120 + rng.random()
+
+        def held():
+            snapshot = tracemalloc.take_snapshot().filter_traces(own)
+            return sum(stat.size for stat in snapshot.statistics('filename'))
+
+        # Only the tracker's own allocations; app threads allocate on their own
+        own = [tracemalloc.Filter(True, detector.__file__)]
+        tracemalloc.start()
+        try:
+            # Resident histories fill their window during the first day
+            sweep_until(2 * DAY)
+            steady, steady_bytes = tracker.stats(), held()
+            sweep_until(4 * DAY)
+            final_bytes = held()
+        finally:
+            tracemalloc.stop()
+
+        stats = tracker.stats()
+        assert stats['identifiers'] == steady['identifiers'] == 20_000
+        assert stats['buckets'] == steady['buckets']
+        assert final_bytes < steady_bytes * 1.02
+        assert stats['evicted'] > 5 * stats['identifiers']
+        # Residents count their full day of scans, give or take a bucket
+        assert 715 <= tracker.count(resident[0], now=now) <= 722
@@ -0,0 +1,231 @@
+"""Tests for TSCM device identity clustering."""
+
+from __future__ import annotations
+
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.tscm.device_identity import (
+    FINGERPRINT_WEIGHTS,
+    BLEObservation,
+    DeviceIdentityEngine,
+    _RunningStats,
+    jaccard_similarity,
+    manufacturer_data_similarity,
+    name_similarity,
+    rssi_trajectory_similarity,
+    timing_pattern_similarity,
+)
+
+START = datetime(2024, 5, 1, 9, 0, 0)
+
+
+def _legacy_similarity(cluster, session) -> float:
+    """Cluster similarity recomputed from raw observation history."""
+    def observations(sessions):
+        return [obs for s in sessions for obs in s.observations]
+
+    cluster_obs = observations(cluster.sessions)
+    session_obs = session.observations
+    scores = {}
+
+    fp_overlap = cluster.fingerprint_hashes & session.fingerprint_hashes
+    if fp_overlap:
+        fp_score = len(fp_overlap) / max(len(cluster.fingerprint_hashes), len(session.fingerprint_hashes))
+        scores['fingerprint'] = min(1.0, fp_score * 1.5)
+
+    cluster_mfg = next((o.manufacturer_data for o in cluster_obs if o.manufacturer_data), None)
+    session_mfg = next((o.manufacturer_data for o in session_obs if o.manufacturer_data), None)
+    if cluster_mfg and session_mfg:
+        scores['manufacturer_data'] = manufacturer_data_similarity(cluster_mfg, session_mfg)
+
+    cluster_uuids = {u for o in cluster_obs for u in o.service_uuids}
+    session_uuids = {u for o in session_obs for u in o.service_uuids}
+    if cluster_uuids or session_uuids:
+        scores['service_uuids'] = jaccard_similarity(cluster_uuids, session_uuids)
+
+    cluster_rssi = cluster.get_all_rssi_samples()
+    if cluster_rssi and session.rssi_samples:
+        scores['rssi_trajectory'] = rssi_trajectory_similarity(cluster_rssi, session.rssi_samples)
+
+    cluster_intervals = [i for s in cluster.sessions for i in s.observation_intervals]
+    if cluster_intervals and session.observation_intervals:
+        scores['timing_pattern'] = timing_pattern_similarity(cluster_intervals, session.observation_intervals)
+
+    session_name = next((o.local_name for o in session_obs if o.local_name), None)
+    if cluster.best_name and session_name:
+        scores['name_similarity'] = name_similarity(cluster.best_name, session_name)
+
+    if not scores:
+        return 0.0
+    weights = [FINGERPRINT_WEIGHTS.get(k, 0.1) for k in scores]
+    return sum(score * w for score, w in zip(scores.values(), weights)) / sum(weights)
+
+
+def _random_mac(rng) -> str:
+    # Locally administered (randomized) address
+    octets = [rng.randrange(256) | 0x02] + [rng.randrange(256) for _ in range(5)]
+    octets[0] &= 0xFE
+    return ':'.join(f'{o:02X}' for o in octets)
+
+
+def _population(devices: int, models: int, rotations: int = 4, per_session: int = 5, seed: int = 1):
+    """Rotating-MAC BLE population: (device index, observations) per session."""
+    rng = random.Random(seed)
+    model_specs = [
+        {
+            'manufacturer_id': 0x0001 + m,
+            'prefix': bytes([0x10, m, 0x1B, 0x00]),
+            'uuids': [f'0000{0xFE00 + m:04x}-0000-1000-8000-00805f9b34fb'],
+            'interval': 0.5 + (m % 7) * 0.25,
+        }
+        for m in range(models)
+    ]
+    sessions = []
+    for d in range(devices):
+        spec = model_specs[d % models]
+        ident = rng.randbytes(4)
+        rssi = rng.randrange(-90, -40)
+        for r in range(rotations):
+            mac = _random_mac(rng)
+            t = START + timedelta(minutes=5 * r, seconds=rng.random() * 30)
+            observations = []
+            for _ in range(per_session):
+                observations.append(BLEObservation(
+                    timestamp=t,
+                    addr=mac,
+                    rssi=rssi + rng.randrange(-3, 4),
+                    manufacturer_id=spec['manufacturer_id'],
+                    manufacturer_data=spec['prefix'] + ident + rng.randbytes(4),
+                    service_uuids=list(spec['uuids']),
+                    tx_power=-12,
+                ))
+                t += timedelta(seconds=spec['interval'] * rng.uniform(0.9, 1.1))
+            sessions.append((d, observations))
+    return sessions
+
+
+def _replay(engine, sessions):
+    """Feed sessions in time order, then close them all."""
+    owner = {}
+    for device, observations in sorted(sessions, key=lambda s: s[1][0].timestamp):
+        for obs in observations:
+            engine.ingest_ble_observation(obs)
+        owner[observations[0].addr] = device
+    engine.finalize_all_sessions()
+    return owner
+
+
+def _grouping(engine, owner, models: int) -> tuple[int, int]:
+    """(devices split across clusters, most models mixed in one cluster)."""
+    clusters_by_device = {}
+    mixed = 0
+    for cluster in engine.clusters.values():
+        devices = {owner[s.primary_mac] for s in cluster.sessions}
+        for device in devices:
+            clusters_by_device.setdefault(device, set()).add(cluster.cluster_id)
+        mixed = max(mixed, len({d % models for d in devices}))
+    return sum(1 for ids in clusters_by_device.values() if len(ids) > 1), mixed
+
+
+class TestSignatures:
+    """Precomputed signatures score exactly like the observation history."""
+
+    def test_signature_similarity_matches_history(self):
+        rng = random.Random(5)
+        engine = DeviceIdentityEngine()
+        _replay(engine, _population(devices=30, models=3, seed=2))
+        clusters = list(engine.clusters.values())
+        sessions = [s for c in clusters for s in c.sessions]
+
+        for _ in range(300):
+            cluster = rng.choice(clusters)
+            session = rng.choice(sessions)
+            assert engine._calculate_cluster_similarity(cluster, session) == pytest.approx(
+                _legacy_similarity(cluster, session), abs=1e-12
+            )
+
+    def test_rotating_device_forms_one_cluster(self):
+        engine = DeviceIdentityEngine()
+        owner = _replay(engine, _population(devices=1, models=1, rotations=5))
+
+        assert len(engine.clusters) == 1
+        cluster = next(iter(engine.clusters.values()))
+        assert cluster.linked_macs == set(owner)
+        assert any(i.indicator_type == 'mac_rotation' for i in cluster.risk_indicators)
+
+    def test_unrelated_payloads_are_not_scored(self, mocker):
+        engine = DeviceIdentityEngine()
+        sessions = _population(devices=2, models=2, rotations=1)
+        _replay(engine, sessions)
+        assert len(engine.clusters) == 2
+
+        score = mocker.spy(engine, '_calculate_cluster_similarity')
+        _, observations = _population(devices=1, models=1, rotations=1, seed=9)[0]
+        for obs in observations:
+            session = engine.ingest_ble_observation(obs)
+        engine._finalize_session(session)
+
+        # Each session only meets clusters sharing its model's payload key
+        assert score.call_count == 1
+
+    def test_keyless_sessions_cluster_among_themselves(self):
+        engine = DeviceIdentityEngine()
+        for r in range(2):
+            t = START + timedelta(minutes=r)
+            mac = f'7A:00:00:00:00:0{r}'
+            for i in range(6):
+                engine.ingest_ble_observation(BLEObservation(
+                    timestamp=t + timedelta(seconds=i), addr=mac, rssi=-60,
+                ))
+        engine.finalize_all_sessions()
+
+        assert len(engine.clusters) == 1
+        assert engine._cluster_index[('ble', ('keyless',))]
+
+    def test_merged_running_stats_match_pooled_samples(self):
+        rng = random.Random(7)
+        parts = [[rng.randrange(-90, -40) for _ in range(rng.randrange(1, 8))] for _ in range(50)]
+        merged = _RunningStats()
+        for part in parts:
+            merged.merge(_RunningStats(part))
+
+        pooled = [x for part in parts for x in part]
+        assert merged.count == len(pooled)
+        assert merged.mean == pytest.approx(statistics.mean(pooled), abs=1e-9)
+        assert merged.variance() == pytest.approx(statistics.variance(pooled), abs=1e-9)
+
+    def test_signature_merge_keeps_no_samples(self):
+        engine = DeviceIdentityEngine()
+        _replay(engine, _population(devices=1, models=1, rotations=6))
+        signature = next(iter(engine._signatures.values()))
+        cluster = next(iter(engine.clusters.values()))
+
+        assert signature.rssi.count == len(cluster.get_all_rssi_samples())
+        assert signature.rssi_stats[1] == pytest.approx(statistics.variance(cluster.get_all_rssi_samples()))
+
+    def test_clear_resets_index(self):
+        engine = DeviceIdentityEngine()
+        _replay(engine, _population(devices=3, models=1))
+        engine.clear()
+        assert not engine._signatures and not engine._cluster_index
+
+
+class TestRotatingPopulation:
+    """Clustering of a rotating-MAC population."""
+
+    def test_rotations_group_by_device(self):
+        sessions = _population(devices=120, models=20)
+
+        indexed = DeviceIdentityEngine()
+        owner = _replay(indexed, sessions)
+
+        large = DeviceIdentityEngine()
+        large_owner = _replay(large, _population(devices=1200, models=200, seed=3))
+
+        # Rotations of one device stay together and models never mix
+        assert _grouping(indexed, owner, 20) == (0, 1)
+        assert _grouping(large, large_owner, 200) == (0, 1)
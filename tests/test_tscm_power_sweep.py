@@ -0,0 +1,309 @@
+"""Tests for the continuous TSCM power sweep."""
+
+from __future__ import annotations
+
+import io
+import random
+
+import numpy as np
+import pytest
+
+from utils.tscm import power_sweep
+from utils.tscm.power_sweep import (
+    RTL_POWER_DWELL_PASSES,
+    PowerSweepEngine,
+    SweepBand,
+    parse_sweep_line,
+)
+
+# Captured rtl_power output: 433-434 MHz in 10 kHz bins, two hops per pass
+RTL_POWER_CAPTURE = """\
+2026-03-14, 10:15:02, 433000000, 433500000, 10000.00, 1024, {a}
+2026-03-14, 10:15:02, 433500000, 434000000, 10000.00, 1024, {b}
+2026-03-14, 10:15:04, 433000000, 433500000, 10000.00, 1024, {c}
+2026-03-14, 10:15:04, 433500000, 434000000, 10000.00, 1024, {d}
+"""
+
+ISM_433 = (433_000_000, 434_000_000, 10_000, '433 MHz ISM')
+ISM_24 = (2_400_000_000, 2_500_000_000, 500_000, '2.4 GHz ISM')
+
+
+def _levels(count: int, peaks: dict[int, float] | None = None, floor: float = -60.0) -> str:
+    values = [floor + (i % 3) * 0.5 for i in range(count)]
+    for index, level in (peaks or {}).items():
+        values[index] = level
+    return ', '.join(f'{v:.2f}' for v in values)
+
+
+def _rtl_power_pass(clock: str, peaks: dict[int, float] | None = None) -> list[str]:
+    """One 433 MHz pass in two 50-bin hops; peak indexes are band bins."""
+    peaks = peaks or {}
+    low = {i: v for i, v in peaks.items() if i < 50}
+    high = {i - 50: v for i, v in peaks.items() if i >= 50}
+    return [
+        f'2026-03-14, {clock}, 433000000, 433500000, 10000.00, 1024, {_levels(50, low)}',
+        f'2026-03-14, {clock}, 433500000, 434000000, 10000.00, 1024, {_levels(50, high)}',
+    ]
+
+
+def _hackrf_pass(clock: str, peaks: dict[int, float] | None = None) -> list[str]:
+    """One 2.4 GHz hackrf_sweep pass: 20 blocks of 5 MHz in 500 kHz bins."""
+    peaks = peaks or {}
+    lines = []
+    for block in range(20):
+        low = 2_400_000_000 + block * 5_000_000
+        block_peaks = {i - block * 10: v for i, v in peaks.items() if block * 10 <= i < block * 10 + 10}
+        lines.append(
+            f'2026-03-14, {clock}, {low}, {low + 5_000_000}, 500000.00, 20, '
+            f'{_levels(10, block_peaks, floor=-75.0)}'
+        )
+    return lines
+
+
+def _replay(engine: PowerSweepEngine, lines: list[str]) -> list[dict]:
+    detections = []
+    for line in lines:
+        detections.extend(engine.feed_line(line))
+    return detections
+
+
+class TestParseSweepLine:
+    """Both tools' CSV rows parse to the same record."""
+
+    def test_rtl_power_row(self):
+        row = parse_sweep_line('2026-03-14, 10:15:02, 433000000, 433500000, 10000.00, 1024, -52.3, -60.1, -61')
+        assert (row.hz_low, row.hz_high, row.hz_step) == (433_000_000, 433_500_000, 10_000.0)
+        assert row.levels.tolist() == pytest.approx([-52.3, -60.1, -61.0])
+        assert row.timestamp is not None
+
+    def test_hackrf_row_with_fractional_seconds(self):
+        row = parse_sweep_line('2026-03-14, 10:15:02.250000, 2400000000, 2405000000, 500000.00, 20, -70, -71.5\n')
+        other = parse_sweep_line('2026-03-14, 10:15:02, 2400000000, 2405000000, 500000.00, 20, -70, -71.5')
+        assert row.timestamp - other.timestamp == pytest.approx(0.25)
+        assert row.levels.size == 2
+
+    @pytest.mark.parametrize('line', [
+        '',
+        'Found 1 device(s):',
+        '2026-03-14, 10:15:02, 433000000, 433500000',
+        '2026-03-14, 10:15:02, 433000000, 433500000, 0, 1024, -50',
+        '2026-03-14, 10:15:02, low, 433500000, 10000, 1024, -50',
+    ])
+    def test_other_lines_are_ignored(self, line):
+        assert parse_sweep_line(line) is None
+
+
+class TestAccumulation:
+    """Max-hold, average and pass timing from replayed CSV."""
+
+    def test_max_hold_and_average(self):
+        engine = PowerSweepEngine([ISM_433])
+        _replay(engine, RTL_POWER_CAPTURE.format(
+            a=_levels(50, {5: -40.0}),
+            b=_levels(50),
+            c=_levels(50, {5: -30.0}),
+            d=_levels(50),
+        ).splitlines())
+        spectrum = engine.spectrum('433 MHz ISM')
+
+        assert spectrum['max_hold'][5] == pytest.approx(-30.0)
+        assert spectrum['average'][5] == pytest.approx(-35.0)
+        assert spectrum['max_hold'].size == 100
+        assert np.isfinite(spectrum['max_hold']).all()
+        assert engine.spectrum('nonexistent') is None
+
+    def test_pass_completes_on_wrap_and_revisit_from_timestamps(self):
+        engine = PowerSweepEngine([ISM_433])
+        assert _replay(engine, _rtl_power_pass('10:15:02', {20: -35.0})) == []
+        assert engine.revisit_seconds() is None
+
+        detections = _replay(engine, _rtl_power_pass('10:15:07', {20: -35.0}))
+        # The second pass opened 5 s after the first
+        assert engine.revisit_seconds() == pytest.approx(5.0)
+        assert [d['frequency'] for d in detections] == [pytest.approx(433.2)]
+
+        detections += engine.flush()
+        assert engine.stats()['bands'][0]['passes'] == 2
+        assert detections[-1]['seen_interval_seconds'] is not None
+        assert detections[-1]['detections'] == 2
+
+    def test_misaligned_bins_fold_into_band_bins(self):
+        # A 5 kHz row into a 10 kHz band takes the ufunc.at path
+        engine = PowerSweepEngine([(433_000_000, 433_100_000, 10_000, 'narrow')])
+        levels = [-60.0] * 20
+        levels[7] = -30.0
+        engine.feed_line(
+            '2026-03-14, 10:15:02, 433000000, 433100000, 5000.00, 64, ' + ', '.join(str(v) for v in levels)
+        )
+        spectrum = engine.spectrum('narrow')
+        assert spectrum['max_hold'][3] == pytest.approx(-30.0)
+        assert spectrum['average'][3] == pytest.approx(-45.0)
+
+        detections = engine.flush(now=100.0)
+        assert [d['frequency_hz'] for d in detections] == [433_030_000.0]
+
+    def test_rows_outside_every_band_are_ignored(self):
+        engine = PowerSweepEngine([ISM_433])
+        assert engine.feed_line('2026-03-14, 10:15:02, 868000000, 868500000, 10000.00, 1024, -20, -20') == []
+        assert engine.lines == 0
+
+
+class TestDetection:
+    """Signals stand out from their row and are checked against the baseline."""
+
+    def test_new_and_baseline_signals(self):
+        engine = PowerSweepEngine([ISM_433], baseline_frequencies=[433.2])
+        lines = _rtl_power_pass('10:15:02', {20: -35.0, 72: -40.0})
+        detections = _replay(engine, lines) + engine.flush()
+        by_freq = {round(d['frequency'], 2): d for d in detections}
+
+        assert sorted(by_freq) == [433.2, 433.72]
+        assert by_freq[433.2]['is_new'] is False
+        assert by_freq[433.72]['is_new'] is True
+        signal = by_freq[433.72]
+        assert signal['band'] == '433 MHz ISM'
+        assert signal['power'] == pytest.approx(-40.0)
+        assert signal['signal_strength'] == pytest.approx(signal['power'] - signal['noise_floor'])
+        assert signal['first_detection'] is True
+
+    def test_weak_or_flat_rows_detect_nothing(self):
+        engine = PowerSweepEngine([ISM_433])
+        # Below the absolute level, and a row that is all noise
+        lines = _rtl_power_pass('10:15:02', {10: -95.0})
+        lines[0] = lines[0].replace('-60.00', '-99.00')
+        assert _replay(engine, lines) + engine.flush() == []
+
+    def test_adjacent_and_nearby_bins_merge(self):
+        engine = PowerSweepEngine([ISM_433])
+        # A wide emitter over 3 bins, plus a spur 80 kHz away
+        peaks = {30: -42.0, 31: -38.0, 32: -41.0, 39: -45.0}
+        detections = _replay(engine, _rtl_power_pass('10:15:02', peaks)) + engine.flush()
+        assert len(detections) == 1
+        assert detections[0]['frequency'] == pytest.approx(433.31)
+        assert detections[0]['power'] == pytest.approx(-38.0)
+
+    def test_drifting_signal_keeps_its_history(self):
+        engine = PowerSweepEngine([ISM_433])
+        detections = _replay(engine, _rtl_power_pass('10:15:02', {40: -35.0}))
+        detections += _replay(engine, _rtl_power_pass('10:15:04', {41: -35.0}))
+        detections += engine.flush()
+        assert [d['first_detection'] for d in detections] == [True, False]
+        assert detections[1]['first_seen'] == detections[0]['first_seen']
+
+    def test_hackrf_sweep_capture(self):
+        engine = PowerSweepEngine([ISM_24], sdr_type='hackrf')
+        detections = []
+        for second in range(3):
+            detections += _replay(engine, _hackrf_pass(f'10:15:0{second}.500000', {74: -30.0}))
+        detections += engine.flush()
+
+        assert {d['frequency'] for d in detections} == {2437.0}
+        assert engine.revisit_seconds() == pytest.approx(1.0)
+        assert engine.stats()['bands'][0]['passes'] == 3
+
+
+class TestSweepTool:
+    """Command lines and the streaming reader thread."""
+
+    def test_rtl_power_commands_one_per_band(self):
+        engine = PowerSweepEngine([ISM_433, ISM_24], tool_path='/usr/bin/rtl_power', device_index=1)
+        commands = engine.commands()
+        assert [bands for _, bands in commands] == [[0], [1]]
+        cmd = commands[0][0]
+        assert cmd[:3] == ['/usr/bin/rtl_power', '-f', '433000000:434000000:10000']
+        assert cmd[cmd.index('-d') + 1] == '1'
+        assert cmd[-1] == '-'
+
+    def test_hackrf_commands_one_process(self):
+        engine = PowerSweepEngine([ISM_433, ISM_24], tool_path='hackrf_sweep', sdr_type='hackrf')
+        (cmd, bands), = engine.commands()
+        assert bands == [0, 1]
+        assert cmd == ['hackrf_sweep', '-f', '433:434', '-f', '2400:2500', '-w', '10000']
+
+    def test_streams_tool_output(self, mocker):
+        lines = []
+        for second in range(4):
+            lines += _rtl_power_pass(f'10:15:0{second}', {60: -33.0})
+
+        class FakeProcess:
+            def __init__(self, cmd, **kwargs):
+                self.cmd = cmd
+                self.stdout = io.StringIO(''.join(line + '\n' for line in lines))
+
+        popen = mocker.patch.object(power_sweep.subprocess, 'Popen', side_effect=FakeProcess)
+        mocker.patch.object(power_sweep, 'register_process')
+        mocker.patch.object(power_sweep, 'unregister_process')
+        mocker.patch.object(power_sweep, 'safe_terminate')
+
+        engine = PowerSweepEngine([ISM_433], tool_path='rtl_power')
+        engine._sweep(engine.commands()[0][0], [0], rotate=False)
+        detections = engine.poll()
+
+        assert popen.call_args[0][0][0] == 'rtl_power'
+        assert len(detections) == 4
+        assert {round(d['frequency'], 2) for d in detections} == {433.6}
+        assert detections[-1]['revisit_seconds'] == pytest.approx(1.0)
+        assert engine.poll() == []
+
+    def test_rotation_moves_on_after_dwell(self, mocker):
+        lines = []
+        for second in range(10):
+            lines += _rtl_power_pass(f'10:15:{second:02d}')
+        mocker.patch.object(
+            power_sweep.subprocess, 'Popen',
+            side_effect=lambda cmd, **kwargs: mocker.Mock(stdout=iter(line + '\n' for line in lines)),
+        )
+        mocker.patch.object(power_sweep, 'register_process')
+        mocker.patch.object(power_sweep, 'unregister_process')
+        mocker.patch.object(power_sweep, 'safe_terminate')
+
+        engine = PowerSweepEngine([ISM_433], tool_path='rtl_power')
+        engine._sweep(engine.commands()[0][0], [0], rotate=True)
+        assert engine.stats()['bands'][0]['passes'] == RTL_POWER_DWELL_PASSES + 1
+
+    def test_start_without_tool(self):
+        engine = PowerSweepEngine([ISM_433])
+        assert engine.start() is False
+        assert engine.running is False
+        engine.stop()
+
+
+class TestReplay:
+    """Streaming a survey's CSV agrees with parsing it whole."""
+
+    BINS = 2_000
+    PASSES = 60
+
+    def test_streaming_replay_matches_whole_file(self):
+        rng = random.Random(5)
+        band = SweepBand(400_000_000, 420_000_000, 10_000, 'survey')
+        lines = []
+        for p in range(self.PASSES):
+            clock = f'10:{p // 60:02d}:{p % 60:02d}'
+            for hop in range(0, self.BINS, 200):
+                low = band.start_hz + hop * band.bin_hz
+                values = ', '.join(f'{-60 + rng.random() * 3:.2f}' for _ in range(200))
+                lines.append(f'2026-03-14, {clock}, {low}, {low + 2_000_000}, 10000.00, 512, {values}')
+
+        def whole_file_parse() -> int:
+            # Previous approach: every bin to a dict, mean threshold over the file
+            signals = []
+            for line in lines:
+                parts = line.split(',')
+                start_freq, step = float(parts[2]), float(parts[4])
+                for i, db in enumerate(parts[6:]):
+                    signals.append({'frequency': (start_freq + i * step) / 1e6, 'power': float(db)})
+            mean = sum(s['power'] for s in signals) / len(signals)
+            return sum(1 for s in signals if s['power'] > mean + 6)
+
+        engine = PowerSweepEngine([band])
+        for line in lines:
+            engine.feed_line(line)
+        engine.flush()
+
+        stats = engine.stats()
+        assert stats['lines'] == len(lines)
+        assert stats['bands'][0]['passes'] == self.PASSES
+        assert stats['bands'][0]['revisit_seconds'] == pytest.approx(1.0)
+        # Flat noise: neither approach finds a signal
+        assert stats['signals'] == whole_file_parse() == 0
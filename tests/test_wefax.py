@@ -8,6 +8,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import numpy as np
+import pytest
 
 
 def _login_session(client) -> None:
@@ -589,3 +590,312 @@ class TestWeFaxProgressCallback:
             assert wefax_routes.wefax_active_device == 4
         finally:
             wefax_routes.wefax_active_device = original_device
+
+
+# ---------------------------------------------------------------------------
+# Vectorized DSP path
+# ---------------------------------------------------------------------------
+
+def _fax_audio(lines: np.ndarray, sr: int = 22050, lpm: int = 120) -> np.ndarray:
+    """Synthesize WeFax audio for rows of 0-255 pixel values."""
+    from utils.wefax import BLACK_FREQ, WHITE_FREQ
+
+    samples_per_line = int(60.0 / lpm * sr)
+    idx = (np.arange(samples_per_line) * lines.shape[1] / samples_per_line).astype(int)
+    freq = BLACK_FREQ + lines[:, idx].astype(np.float64) / 255.0 * (WHITE_FREQ - BLACK_FREQ)
+    phase = 2 * np.pi * np.cumsum(freq.ravel()) / sr
+    return 0.5 * np.cos(phase)
+
+
+def _scalar_goertzel(samples, freq, sr):
+    """Reference Goertzel recurrence."""
+    coeff = 2.0 * math.cos(2.0 * math.pi * freq / sr)
+    s1 = s2 = 0.0
+    for sample in samples:
+        s1, s2 = float(sample) + coeff * s1 - s2, s1
+    return math.sqrt(max(0.0, s1 * s1 + s2 * s2 - coeff * s1 * s2))
+
+
+class TestWeFaxDSP:
+    """Tests for the batched Goertzel bank and streaming discriminator."""
+
+    def test_goertzel_bank_matches_recurrence(self):
+        from utils.wefax import _goertzel_bank
+        sr = 22050
+        rng = np.random.default_rng(1)
+        samples = rng.normal(size=2205)
+        freqs = (300.0, 450.0, 1500.0, 1900.0, 2300.0)
+        expected = [_scalar_goertzel(samples, f, sr) for f in freqs]
+        assert np.allclose(_goertzel_bank(samples, freqs, sr), expected, rtol=1e-9)
+
+    def test_detect_tone_rejects_image_audio(self):
+        from utils.wefax import STOP_TONE_FREQ, _detect_tone
+        audio = _fax_audio(np.full((1, 1809), 128, dtype=np.uint8))
+        assert not _detect_tone(audio[:2205], STOP_TONE_FREQ, 22050, threshold=2.5)
+
+    @pytest.mark.parametrize('n', [1, 2047, 2048, 2049, 2205, 3 * 2048, 10_000])
+    def test_goertzel_bank_any_length(self, n):
+        from utils.wefax import _goertzel_bank
+        sr = 22050
+        samples = np.random.default_rng(n).normal(size=n)
+        freqs = (300.0, 450.0, 1900.0)
+        expected = [_scalar_goertzel(samples, f, sr) for f in freqs]
+        assert np.allclose(_goertzel_bank(samples, freqs, sr), expected, rtol=1e-9, atol=1e-9)
+
+    def test_goertzel_cache_ignores_read_length(self):
+        from utils import wefax
+        wefax._goertzel_basis_cache.clear()
+        for n in range(100, 100 + 3 * wefax._GOERTZEL_CACHE_MAX):
+            wefax._goertzel_bank(np.ones(n * 37), (1900.0,), 22050)
+        assert list(wefax._goertzel_basis_cache) == [((1900.0,), 22050)]
+        assert wefax._goertzel_basis_cache[((1900.0,), 22050)].shape == (1, wefax._GOERTZEL_BLOCK)
+
+    def test_goertzel_cache_is_bounded(self):
+        from utils import wefax
+        wefax._goertzel_basis_cache.clear()
+        for i in range(3 * wefax._GOERTZEL_CACHE_MAX):
+            wefax._goertzel_bank(np.ones(100), (1000.0 + i,), 22050)
+        assert len(wefax._goertzel_basis_cache) <= wefax._GOERTZEL_CACHE_MAX
+
+    def test_discriminator_is_chunk_invariant(self):
+        from utils.wefax import _FMDiscriminator
+        rng = np.random.default_rng(2)
+        audio = _fax_audio(rng.integers(0, 256, size=(4, 1809)).astype(np.uint8))
+
+        whole = _FMDiscriminator(22050).process(audio)
+        disc = _FMDiscriminator(22050)
+        pieces = [disc.process(audio[i:i + 2205]) for i in range(0, len(audio), 2205)]
+        chunked = np.concatenate(pieces)
+
+        assert len(whole) == len(chunked)
+        assert np.allclose(whole, chunked)
+
+    def test_decode_line_recovers_pixels(self):
+        from utils.wefax import WeFaxDecoder, _FMDiscriminator
+        width = 1809
+        # Horizontal ramp with a few solid bands
+        row = np.linspace(0, 255, width).astype(np.uint8)
+        row[200:400] = 0
+        row[900:1100] = 255
+        audio = _fax_audio(np.tile(row, (3, 1)))
+
+        freq = _FMDiscriminator(22050).process(audio)
+        decoder = WeFaxDecoder.__new__(WeFaxDecoder)
+        pixels = decoder._decode_line(freq[11025:22050], width)
+
+        assert pixels.shape == (width,)
+        assert pixels.dtype == np.uint8
+        assert np.median(np.abs(pixels.astype(int) - row.astype(int))) <= 3
+        assert pixels[250:350].max() <= 10
+        assert pixels[950:1050].min() >= 245
+
+
+class TestWeFaxStreaming:
+    """The demodulator fed 100 ms reads of synthetic 120 LPM fax audio."""
+
+    def test_decodes_every_line(self):
+        from utils.wefax import STOP_TONE_FREQ, WeFaxDecoder, _detect_tone, _FMDiscriminator
+
+        sr = 22050
+        width = 1809
+        rng = np.random.default_rng(3)
+        lines = rng.integers(0, 256, size=(60, width)).astype(np.uint8)  # 30 s of audio
+        audio = _fax_audio(lines, sr)
+        samples_per_line = sr // 2
+
+        decoder = WeFaxDecoder.__new__(WeFaxDecoder)
+        disc = _FMDiscriminator(sr)
+        buffer = np.zeros(0)
+        decoded = 0
+        stop_tones = 0
+
+        for i in range(0, len(audio), sr // 10):  # 100 ms blocks, as read from rtl_fm
+            block = audio[i:i + sr // 10]
+            stop_tones += _detect_tone(block, STOP_TONE_FREQ, sr, threshold=2.5)
+            buffer = np.concatenate([buffer, disc.process(block)])
+            while len(buffer) >= samples_per_line:
+                decoder._decode_line(buffer[:samples_per_line], width)
+                buffer = buffer[samples_per_line:]
+                decoded += 1
+
+        assert decoded >= 59
+        assert stop_tones == 0
+
+
+class TestWeFaxImageCanvas:
+    """Tests for row-by-row image assembly and strip previews."""
+
+    def _decoder(self, tmp_path):
+        from utils.wefax import WeFaxDecoder
+        decoder = WeFaxDecoder.__new__(WeFaxDecoder)
+        decoder._output_dir = tmp_path
+        decoder._station = 'NOJ'
+        decoder._frequency_khz = 4298.0
+        decoder._ioc = 576
+        decoder._lpm = 120
+        decoder._images = []
+        decoder._emit_progress = MagicMock()
+        return decoder
+
+    def test_canvas_grows_and_keeps_rows(self):
+        from utils.wefax import _ImageCanvas
+        canvas = _ImageCanvas(8, max_rows=100, initial_rows=4)
+        for i in range(10):
+            canvas.append(np.full(8, i, dtype=np.uint8))
+
+        assert canvas.height == 10
+        assert canvas.rows.shape == (10, 8)
+        assert list(canvas.rows[:, 0]) == list(range(10))
+        assert np.shares_memory(canvas.rows, canvas.rows[2:])
+
+    def test_canvas_pads_short_lines_and_stops_at_limit(self):
+        from utils.wefax import _ImageCanvas
+        canvas = _ImageCanvas(4, max_rows=3, initial_rows=2)
+        canvas.append(np.full(4, 9, dtype=np.uint8))
+        canvas.clear()
+        canvas.append(np.array([1, 2], dtype=np.uint8))
+        canvas.append(np.arange(6, dtype=np.uint8))
+        canvas.append(np.zeros(4, dtype=np.uint8))
+        canvas.append(np.full(4, 7, dtype=np.uint8))
+
+        assert canvas.full
+        assert canvas.rows.tolist() == [[1, 2, 0, 0], [0, 1, 2, 3], [0, 0, 0, 0]]
+
+    def test_strip_covers_only_new_rows(self, tmp_path):
+        import base64
+        import io
+
+        from PIL import Image
+
+        from utils.wefax import _ImageCanvas
+        canvas = _ImageCanvas(64, max_rows=200)
+        for i in range(60):
+            canvas.append(np.full(64, i * 4, dtype=np.uint8))
+
+        url = self._decoder(tmp_path)._encode_strip(canvas, 40)
+        assert url.startswith('data:image/jpeg;base64,')
+        strip = Image.open(io.BytesIO(base64.b64decode(url.split(',', 1)[1])))
+        assert strip.size == (64, 20)
+        assert abs(int(np.asarray(strip)[0, 0]) - 160) <= 4
+
+        assert self._decoder(tmp_path)._encode_strip(canvas, 60) is None
+
+    def test_strip_progress_to_dict(self):
+        from utils.wefax import WeFaxProgress
+        d = WeFaxProgress(
+            status='receiving',
+            line_count=40,
+            partial_strip='data:image/jpeg;base64,AAAA',
+            strip_row=20,
+            image_width=1809,
+        ).to_dict()
+        assert d['partial_strip'].startswith('data:image/jpeg')
+        assert d['strip_row'] == 20
+        assert d['image_width'] == 1809
+        assert 'partial_strip' not in WeFaxProgress(status='receiving').to_dict()
+        assert 'keyframe' not in d
+
+        d = WeFaxProgress(
+            status='receiving',
+            partial_strip='data:image/jpeg;base64,AAAA',
+            strip_row=200,
+            image_width=1809,
+            keyframe='data:image/jpeg;base64,BBBB',
+            keyframe_rows=200,
+        ).to_dict()
+        assert d['keyframe'].endswith('BBBB')
+        assert d['keyframe_rows'] == d['strip_row'] == 200
+
+    def test_keyframe_is_downscaled_image_so_far(self, tmp_path):
+        import base64
+        import io
+
+        from PIL import Image
+
+        from utils.wefax import PREVIEW_KEYFRAME_WIDTH, _ImageCanvas
+        canvas = _ImageCanvas(1800, max_rows=2000)
+        for i in range(300):
+            canvas.append(np.full(1800, 200 if i < 150 else 20, dtype=np.uint8))
+
+        url = self._decoder(tmp_path)._encode_keyframe(canvas, 240)
+        keyframe = Image.open(io.BytesIO(base64.b64decode(url.split(',', 1)[1])))
+        assert keyframe.size == (PREVIEW_KEYFRAME_WIDTH, 80)
+        pixels = np.asarray(keyframe)
+        assert abs(int(pixels[10, 10]) - 200) <= 4
+        assert abs(int(pixels[-10, 10]) - 20) <= 4
+
+    def test_preview_keyframe_only_while_receiving(self, tmp_path):
+        from utils.wefax import _ImageCanvas
+        decoder = self._decoder(tmp_path)
+        decoder._preview = None
+        assert decoder.preview_keyframe() is None
+
+        decoder._preview = _ImageCanvas(1809, max_rows=2000)
+        for _ in range(45):
+            decoder._preview.append(np.zeros(1809, dtype=np.uint8))
+        event = decoder.preview_keyframe()
+        assert event['status'] == 'receiving'
+        assert event['keyframe'].startswith('data:image/jpeg')
+        assert event['keyframe_rows'] == event['line_count'] == 45
+        assert event['image_width'] == 1809
+        assert 'partial_strip' not in event
+
+    def test_new_subscriber_gets_keyframe_first(self, client):
+        _login_session(client)
+        decoder = MagicMock()
+        decoder.preview_keyframe.return_value = {'type': 'wefax_progress', 'keyframe_rows': 60}
+
+        with patch('routes.wefax.get_wefax_decoder', return_value=decoder):
+            resp = client.get('/wefax/stream')
+            chunks = iter(resp.response)
+            try:
+                first = json.loads(next(chunks).decode().split('data: ', 1)[1])
+                second = json.loads(next(chunks).decode().split('data: ', 1)[1])
+            finally:
+                resp.close()
+
+        assert first == {'type': 'keepalive'}
+        assert second['keyframe_rows'] == 60
+
+    def test_save_image_from_canvas(self, tmp_path):
+        from PIL import Image
+
+        from utils.wefax import _ImageCanvas
+        rng = np.random.default_rng(4)
+        rows = rng.integers(0, 256, size=(30, 120)).astype(np.uint8)
+        canvas = _ImageCanvas(120, max_rows=2000, initial_rows=8)
+        for row in rows:
+            canvas.append(row)
+
+        decoder = self._decoder(tmp_path)
+        decoder._save_image(canvas)
+
+        assert len(decoder._images) == 1
+        saved = np.asarray(Image.open(decoder._images[0].path))
+        assert np.array_equal(saved, rows)
+        progress = decoder._emit_progress.call_args[0][0]
+        assert progress.status == 'complete'
+        assert progress.line_count == 30
+
+    def test_preview_size_is_flat(self, tmp_path):
+        """Late previews carry as many rows as early ones on a long chart."""
+        import base64
+        import io
+
+        from PIL import Image
+
+        from utils.wefax import _ImageCanvas
+        width = 1809
+        rng = np.random.default_rng(5)
+        canvas = _ImageCanvas(width, max_rows=2000)
+        decoder = self._decoder(tmp_path)
+        sizes = []
+        for start in range(0, 1200, 20):
+            for _ in range(20):
+                canvas.append(rng.integers(0, 256, size=width).astype(np.uint8))
+            url = decoder._encode_strip(canvas, start)
+            strip = Image.open(io.BytesIO(base64.b64decode(url.split(',', 1)[1])))
+            assert strip.size == (width, 20)
+            sizes.append(len(url))
+
+        assert max(sizes) < 1.5 * min(sizes)
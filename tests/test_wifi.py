@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
@@ -7,6 +8,8 @@ from flask import Flask
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from routes.wifi import parse_airodump_csv, wifi_bp
+from utils.wifi.parsers.airodump import AirodumpCSVReader
+from utils.wifi.parsers.airodump import parse_airodump_csv as parse_intercept_airodump_csv
 
 
 @pytest.fixture
@@ -50,6 +53,64 @@ def test_parse_airodump_csv(mocker):
         assert "11:22:33:44:55:66" in clients
         assert clients["11:22:33:44:55:66"]["vendor"] == "Apple"
 
+AIRODUMP_HEADER = (
+    "BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key\n"
+)
+STATION_HEADER = "Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs\n"
+
+
+def _airodump_csv(ap_rows, client_rows):
+    return AIRODUMP_HEADER + ''.join(ap_rows) + "\n" + STATION_HEADER + ''.join(client_rows)
+
+
+def test_airodump_reader_emits_only_changed_rows(tmp_path):
+    """Incremental reader should skip unchanged files and unchanged rows."""
+    ap1 = "AA:BB:CC:DD:EE:01, 2023-01-01 10:00:00, 2023-01-01 10:00:05, 6, 54, WPA2, CCMP, PSK, -50, 10, 0, 0.0.0.0, 5, Alpha, \n"
+    ap2 = "AA:BB:CC:DD:EE:02, 2023-01-01 10:00:00, 2023-01-01 10:00:05, 11, 54, OPN, , , -70, 4, 0, 0.0.0.0, 4, Beta, \n"
+    cl1 = "11:22:33:44:55:66, 2023-01-01 10:00:00, 2023-01-01 10:00:05, -60, 20, AA:BB:CC:DD:EE:01, Alpha\n"
+    csv_file = tmp_path / 'scan-01.csv'
+    csv_file.write_text(_airodump_csv([ap1, ap2], [cl1]))
+
+    reader = AirodumpCSVReader(str(csv_file))
+    networks, clients = reader.read_changes()
+    assert {n.bssid for n in networks} == {'AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02'}
+    assert [c['mac'] for c in clients] == ['11:22:33:44:55:66']
+
+    # Unchanged file: nothing to do
+    assert reader.read_changes() == ([], [])
+
+    # One AP re-seen with a new power reading, one new client
+    ap2_updated = ap2.replace('10:00:05, 11, 54, OPN, , , -70', '10:00:09, 11, 54, OPN, , , -64')
+    cl2 = "77:88:99:AA:BB:CC, 2023-01-01 10:00:08, 2023-01-01 10:00:09, -80, 3, (not associated), \n"
+    csv_file.write_text(_airodump_csv([ap1, ap2_updated], [cl1, cl2]))
+    os.utime(csv_file, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+    networks, clients = reader.read_changes()
+    assert [(n.bssid, n.rssi) for n in networks] == [('AA:BB:CC:DD:EE:02', -64)]
+    assert [c['mac'] for c in clients] == ['77:88:99:AA:BB:CC']
+    assert clients[0]['bssid'] is None
+
+
+def test_airodump_reader_missing_file(tmp_path):
+    reader = AirodumpCSVReader(str(tmp_path / 'missing-01.csv'))
+    assert reader.read_changes() == ([], [])
+
+
+def test_airodump_reader_matches_full_parse(tmp_path):
+    """First incremental read should agree with the one-shot parser."""
+    rows = [
+        f"AA:BB:CC:DD:EE:{i:02X}, 2023-01-01 10:00:00, 2023-01-01 10:00:05, {1 + i % 11}, 54, WPA2, CCMP, PSK, -{40 + i % 50}, {i}, 0, 0.0.0.0, 6, Net{i}, \n"
+        for i in range(200)
+    ]
+    csv_file = tmp_path / 'scan-01.csv'
+    csv_file.write_text(_airodump_csv(rows, []))
+
+    full_networks, _ = parse_intercept_airodump_csv(str(csv_file))
+    networks, _ = AirodumpCSVReader(str(csv_file)).read_changes()
+
+    assert [(n.bssid, n.channel, n.rssi, n.essid) for n in networks] == \
+        [(n.bssid, n.channel, n.rssi, n.essid) for n in full_networks]
+
 ### --- ROUTE TESTS --- ###
 
 def test_get_interfaces(client, mocker):
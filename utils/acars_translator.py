@@ -104,6 +104,66 @@ MESSAGE_TYPES = {
     'oooi', 'squawk', 'link_test', 'cpdlc', 'other',
 }
 
+# Label → message type. B? labels not listed here are ATS (see below).
+_LABEL_TYPES: dict[str, str] = {
+    **dict.fromkeys(('H1', '20', '15', '16', '30', 'S1'), 'position'),
+    **dict.fromkeys(('DF', 'D3', 'D6'), 'engine_data'),
+    **dict.fromkeys(('H2', '44', '50', '51', '52', '54', '4T'), 'weather'),
+    **dict.fromkeys(('AA', 'AB', 'A0', 'A1', 'A2', 'A3', 'A6', 'A7', 'AT'), 'cpdlc'),
+    **dict.fromkeys(('5Z', '2Z'), 'oooi'),
+    **dict.fromkeys(('SQ', 'SA'), 'squawk'),
+    **dict.fromkeys(
+        ('Q0', 'QA', 'QB', 'QC', 'QD', 'QE', 'QF', 'QG', 'QH', 'QK', 'QM',
+         'QN', 'QP', 'QQ', 'QR', 'QS', 'QT', 'QX', '4X'),
+        'link_test',
+    ),
+    '_d': 'handshake',
+}
+
+# Engine / DFDR keys → descriptions, in output order
+ENGINE_KEYS: dict[str, str] = {
+    'SM': 'Source mode',
+    'AC0': 'Eng 1 N2 (%)',
+    'AC1': 'Eng 2 N2 (%)',
+    'FL': 'Flight level',
+    'FU': 'Fuel used (lbs)',
+    'ES': 'EGT spread',
+    'BA': 'Bleed air',
+    'CO': 'Config',
+    'AO': 'Auto',
+    'EGT': 'Exhaust gas temp',
+    'OIT': 'Oil temp',
+    'OIP': 'Oil pressure',
+    'N1': 'N1 (%)',
+    'N2': 'N2 (%)',
+    'FF': 'Fuel flow',
+    'VIB': 'Vibration',
+}
+
+# Field patterns, compiled once at import
+_BPOS_RE = re.compile(
+    r'#M\d[A-Z]*POS'
+    r'([NS])(\d{2,5})([EW])(\d{3,6})'
+    r',([^,]*),(\d{4,6})'
+    r',(\d{2,3})'
+    r'(?:,([NS]\d{2,5}[EW]\d{3,6}))?'
+    r'(?:,([A-Z]{3,4}))?'
+)
+_POS_TEMP_RE = re.compile(r'/TS([MP]?)(\d{2,3})')
+# One scan for every engine key (KEY/VALUE or KEY VALUE); no key is a
+# prefix of another, so at most one alternative matches at a position
+_ENGINE_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(ENGINE_KEYS, key=len, reverse=True)) + r')'
+    r'[/: ]?\s*([+-]?\d+\.?\d*)'
+)
+_WIND_RE = re.compile(r'(?:WND|WIND)\s*(\d{3})[/ ]?(\d{2,3})')
+_AIRPORT_RE = re.compile(r'\b([A-Z]{3,4})\b')
+_WX_TEMP_RE = re.compile(r'(?:TMP|TEMP|T)\s*([MP+-]?\d{1,3})')
+_VIS_RE = re.compile(r'VIS\s*(\d+(?:\.\d+)?)')
+_OOOI_RE = re.compile(r'([A-Z]{3,4})\s+([A-Z]{3,4})\s+(\d{4})\s+(\d{4})\s+(\d{4})\s+(\d{4})')
+_AIRPORT_PAIR_RE = re.compile(r'([A-Z]{3,4})\s+([A-Z]{3,4})')
+_TIME_BLOCK_RE = re.compile(r'\b(\d{4})\b')
+
 
 def translate_label(label: str | None) -> str:
     """Return human-readable description for an ACARS label code."""
@@ -124,46 +184,18 @@ def classify_message_type(label: str | None, text: str | None = None) -> str:
         return 'other'
     label = label.strip()
 
-    # Position reports
-    if label in ('H1', '20', '15', '16', '30', 'S1'):
-        return 'position'
+    message_type = _LABEL_TYPES.get(label)
+    if message_type == 'position':
+        return message_type
     if text and '#M1BPOS' in text:
         return 'position'
-
-    # Engine / DFDR data
-    if label in ('DF', 'D3', 'D6'):
-        return 'engine_data'
-
-    # Weather
-    if label in ('H2', '44', '50', '51', '52', '54', '4T'):
-        return 'weather'
+    if message_type:
+        return message_type
 
     # ATS / ATC
     if label.startswith('B') and len(label) == 2:
         return 'ats'
 
-    # CPDLC
-    if label in ('AA', 'AB', 'A0', 'A1', 'A2', 'A3', 'A6', 'A7', 'AT'):
-        return 'cpdlc'
-
-    # OOOI (Out/Off/On/In gate times)
-    if label in ('5Z', '2Z'):
-        return 'oooi'
-
-    # Squawk
-    if label in ('SQ', 'SA'):
-        return 'squawk'
-
-    # Link test / handshake
-    if label in ('Q0', 'QA', 'QB', 'QC', 'QD', 'QE', 'QF', 'QG',
-                 'QH', 'QK', 'QM', 'QN', 'QP', 'QQ', 'QR', 'QS', 'QT', 'QX',
-                 '4X'):
-        return 'link_test'
-
-    # Handshake (_d is demand mode)
-    if label == '_d':
-        return 'handshake'
-
     return 'other'
 
 
@@ -184,15 +216,7 @@ def parse_position_report(text: str | None) -> dict | None:
     result: dict = {}
 
     # Look for BPOS block
-    bpos_match = re.search(
-        r'#M\d[A-Z]*POS'
-        r'([NS])(\d{2,5})([EW])(\d{3,6})'
-        r',([^,]*),(\d{4,6})'
-        r',(\d{2,3})'
-        r'(?:,([NS]\d{2,5}[EW]\d{3,6}))?'
-        r'(?:,([A-Z]{3,4}))?',
-        text
-    )
+    bpos_match = _BPOS_RE.search(text)
     if bpos_match:
         lat_dir, lat_val, lon_dir, lon_val = bpos_match.group(1, 2, 3, 4)
         # Convert to decimal degrees
@@ -223,7 +247,7 @@ def parse_position_report(text: str | None) -> dict | None:
             result['destination'] = bpos_match.group(9)
 
     # Look for temperature (e.g., /TS-045 or M045)
-    temp_match = re.search(r'/TS([MP]?)(\d{2,3})', text)
+    temp_match = _POS_TEMP_RE.search(text)
     if temp_match:
         sign = '-' if temp_match.group(1) == 'M' else ''
         result['temperature'] = f"{sign}{temp_match.group(2)} C"
@@ -241,33 +265,16 @@ def parse_engine_data(text: str | None) -> dict | None:
     if not text:
         return None
 
-    result: dict = {}
-    engine_keys = {
-        'SM': 'Source mode',
-        'AC0': 'Eng 1 N2 (%)',
-        'AC1': 'Eng 2 N2 (%)',
-        'FL': 'Flight level',
-        'FU': 'Fuel used (lbs)',
-        'ES': 'EGT spread',
-        'BA': 'Bleed air',
-        'CO': 'Config',
-        'AO': 'Auto',
-        'EGT': 'Exhaust gas temp',
-        'OIT': 'Oil temp',
-        'OIP': 'Oil pressure',
-        'N1': 'N1 (%)',
-        'N2': 'N2 (%)',
-        'FF': 'Fuel flow',
-        'VIB': 'Vibration',
-    }
-
-    # Match KEY/VALUE or KEY VALUE patterns
-    for key, desc in engine_keys.items():
-        pattern = rf'\b{re.escape(key)}[/: ]?\s*([+-]?\d+\.?\d*)'
-        m = re.search(pattern, text)
-        if m:
-            result[key] = {'value': m.group(1), 'description': desc}
+    # First value seen for each key
+    found: dict[str, str] = {}
+    for m in _ENGINE_RE.finditer(text):
+        found.setdefault(m.group(1), m.group(2))
 
+    result = {
+        key: {'value': found[key], 'description': desc}
+        for key, desc in ENGINE_KEYS.items()
+        if key in found
+    }
     return result if result else None
 
 
@@ -279,24 +286,24 @@ def parse_weather_data(text: str | None) -> dict | None:
     result: dict = {}
 
     # Wind: direction/speed (e.g., 270/15 or WND270015)
-    wind_match = re.search(r'(?:WND|WIND)\s*(\d{3})[/ ]?(\d{2,3})', text)
+    wind_match = _WIND_RE.search(text)
     if wind_match:
         result['wind_dir'] = f"{wind_match.group(1)} deg"
         result['wind_speed'] = f"{wind_match.group(2)} kts"
 
     # Airport codes (3-4 letter ICAO)
-    airports = re.findall(r'\b([A-Z]{3,4})\b', text)
+    airports = _AIRPORT_RE.findall(text)
     if airports:
         result['airports'] = list(dict.fromkeys(airports))[:4]
 
     # Temperature (e.g., T24/D18, TMP24, TEMP -5)
-    temp_match = re.search(r'(?:TMP|TEMP|T)\s*([MP+-]?\d{1,3})', text)
+    temp_match = _WX_TEMP_RE.search(text)
     if temp_match:
         val = temp_match.group(1).replace('M', '-').replace('P', '')
         result['temperature'] = f"{val} C"
 
     # Visibility
-    vis_match = re.search(r'VIS\s*(\d+(?:\.\d+)?)', text)
+    vis_match = _VIS_RE.search(text)
     if vis_match:
         result['visibility'] = f"{vis_match.group(1)} SM"
 
@@ -315,10 +322,7 @@ def parse_oooi(text: str | None) -> dict | None:
     result: dict = {}
 
     # Try to find airport pair + 4 time blocks
-    oooi_match = re.search(
-        r'([A-Z]{3,4})\s+([A-Z]{3,4})\s+(\d{4})\s+(\d{4})\s+(\d{4})\s+(\d{4})',
-        text
-    )
+    oooi_match = _OOOI_RE.search(text)
     if oooi_match:
         result['origin'] = oooi_match.group(1)
         result['destination'] = oooi_match.group(2)
@@ -329,12 +333,12 @@ def parse_oooi(text: str | None) -> dict | None:
         return result
 
     # Try partial (just origin/destination and some times)
-    partial = re.search(r'([A-Z]{3,4})\s+([A-Z]{3,4})', text)
+    partial = _AIRPORT_PAIR_RE.search(text)
     if partial:
         result['origin'] = partial.group(1)
         result['destination'] = partial.group(2)
 
-    times = re.findall(r'\b(\d{4})\b', text)
+    times = _TIME_BLOCK_RE.findall(text)
     labels = ['out', 'off', 'on', 'in']
     for i, t in enumerate(times[:4]):
         result[labels[i]] = t
@@ -342,6 +346,15 @@ def parse_oooi(text: str | None) -> dict | None:
     return result if result else None
 
 
+# Field parser for each message type; other types carry no parsed fields
+_TYPE_PARSERS = {
+    'position': parse_position_report,
+    'engine_data': parse_engine_data,
+    'weather': parse_weather_data,
+    'oooi': parse_oooi,
+}
+
+
 def translate_message(msg: dict) -> dict:
     """Translate an ACARS message dict, returning enrichment fields.
 
@@ -357,15 +370,8 @@ def translate_message(msg: dict) -> dict:
     label_description = translate_label(label)
     message_type = classify_message_type(label, text)
 
-    parsed: dict | None = None
-    if message_type == 'position' or (label == 'H1' and 'POS' in text.upper()):
-        parsed = parse_position_report(text)
-    elif message_type == 'engine_data':
-        parsed = parse_engine_data(text)
-    elif message_type == 'weather':
-        parsed = parse_weather_data(text)
-    elif message_type == 'oooi':
-        parsed = parse_oooi(text)
+    parser = _TYPE_PARSERS.get(message_type)
+    parsed = parser(text) if parser else None
 
     return {
         'label_description': label_description,
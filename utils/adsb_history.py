@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import io
+import json
 import logging
+import os
 import queue
 import threading
 import time
-from collections.abc import Iterable
-from datetime import datetime, timezone
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO
 
 # psycopg2 is optional - only needed for PostgreSQL history persistence
 try:
@@ -31,11 +37,20 @@ from config import (
     ADSB_HISTORY_BATCH_SIZE,
     ADSB_HISTORY_ENABLED,
     ADSB_HISTORY_FLUSH_INTERVAL,
+    ADSB_HISTORY_HIGH_WATER,
     ADSB_HISTORY_QUEUE_SIZE,
+    ADSB_HISTORY_RETENTION_DAYS,
+    ADSB_HISTORY_RETRY_INTERVAL,
+    ADSB_SPILL_DIR,
+    ADSB_SPILL_MAX_MB,
+    ADSB_SPILL_SEGMENT_MB,
 )
 
 logger = logging.getLogger('intercept.adsb_history')
 
+# Default spill location, next to the SQLite database
+SPILL_DIR = Path(__file__).parent.parent / 'instance' / 'adsb_spill'
+
 
 _MESSAGE_FIELDS = (
     'received_at',
@@ -58,11 +73,6 @@ _MESSAGE_FIELDS = (
     'source_host',
 )
 
-_MESSAGE_INSERT_SQL = f"""
-    INSERT INTO adsb_messages ({', '.join(_MESSAGE_FIELDS)})
-    VALUES %s
-"""
-
 _SNAPSHOT_FIELDS = (
     'captured_at',
     'icao',
@@ -81,121 +91,554 @@ _SNAPSHOT_FIELDS = (
     'snapshot',
 )
 
-_SNAPSHOT_INSERT_SQL = f"""
-    INSERT INTO adsb_snapshots ({', '.join(_SNAPSHOT_FIELDS)})
-    VALUES %s
+_MESSAGE_COLUMNS = """
+    received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    msg_time TIMESTAMPTZ,
+    logged_time TIMESTAMPTZ,
+    icao TEXT NOT NULL,
+    msg_type SMALLINT,
+    callsign TEXT,
+    altitude INTEGER,
+    speed INTEGER,
+    heading INTEGER,
+    vertical_rate INTEGER,
+    lat DOUBLE PRECISION,
+    lon DOUBLE PRECISION,
+    squawk TEXT,
+    session_id TEXT,
+    aircraft_id TEXT,
+    flight_id TEXT,
+    raw_line TEXT,
+    source_host TEXT
 """
 
-def _ensure_adsb_schema(conn: psycopg2.extensions.connection) -> None:
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS adsb_messages (
-                id BIGSERIAL PRIMARY KEY,
-                received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                msg_time TIMESTAMPTZ,
-                logged_time TIMESTAMPTZ,
-                icao TEXT NOT NULL,
-                msg_type SMALLINT,
-                callsign TEXT,
-                altitude INTEGER,
-                speed INTEGER,
-                heading INTEGER,
-                vertical_rate INTEGER,
-                lat DOUBLE PRECISION,
-                lon DOUBLE PRECISION,
-                squawk TEXT,
-                session_id TEXT,
-                aircraft_id TEXT,
-                flight_id TEXT,
-                raw_line TEXT,
-                source_host TEXT
+_SNAPSHOT_COLUMNS = """
+    captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    icao TEXT NOT NULL,
+    callsign TEXT,
+    registration TEXT,
+    type_code TEXT,
+    type_desc TEXT,
+    altitude INTEGER,
+    speed INTEGER,
+    heading INTEGER,
+    vertical_rate INTEGER,
+    lat DOUBLE PRECISION,
+    lon DOUBLE PRECISION,
+    squawk TEXT,
+    source_host TEXT,
+    snapshot JSONB
+"""
+
+# Daily range-partitioned history tables: timestamp column, columns, indexes
+_PARTITIONED_TABLES: dict[str, tuple[str, str, dict[str, str]]] = {
+    'adsb_messages': (
+        'received_at',
+        _MESSAGE_COLUMNS,
+        {
+            'idx_adsb_messages_icao_time': '(icao, received_at)',
+            'idx_adsb_messages_received_at': '(received_at)',
+            'idx_adsb_messages_msg_time': '(msg_time)',
+        },
+    ),
+    'adsb_snapshots': (
+        'captured_at',
+        _SNAPSHOT_COLUMNS,
+        {
+            'idx_adsb_snapshots_icao_time': '(icao, captured_at)',
+            'idx_adsb_snapshots_captured_at': '(captured_at)',
+        },
+    ),
+}
+
+# Daily partitions are created this many days ahead of today (UTC)
+PARTITION_PREMAKE_DAYS = 2
+
+# Writers create upcoming partitions and apply retention this often (seconds)
+PARTITION_MAINTENANCE_INTERVAL = 3600.0
+
+# Partition names known to exist, so the writers skip catalog lookups
+_known_partitions: set[str] = set()
+
+# pg_advisory_xact_lock key serializing schema changes across connections
+SCHEMA_LOCK_KEY = 0x4144_5342  # 'ADSB'
+
+# Recorded in adsb_history_migrations once plain tables are partitioned
+# and the rollups hold all earlier history
+MIGRATION_PARTITIONS_ROLLUPS = 'partitions_rollups'
+
+_migration_thread: threading.Thread | None = None
+_migration_lock = threading.Lock()
+
+
+def _hour_sql(column: str) -> str:
+    """SQL for the UTC hour bucket of a timestamp column."""
+    return f"date_trunc('hour', {column} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+
+
+def _day_start(value: datetime | date) -> datetime:
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def _bound_literal(value: datetime) -> str:
+    # Partition bounds must be plain literals on older servers
+    return f"'{value.strftime('%Y-%m-%d %H:%M:%S')}+00'"
+
+
+def rollup_span(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """Whole UTC hours [full_start, full_end) inside the window [start, end).
+
+    Queries read the rollups for that span and raw rows only for the
+    partial hours at either edge. A window without a whole hour returns
+    an empty span at ``start``, leaving everything to the raw tables.
+    """
+    full_start = start.replace(minute=0, second=0, microsecond=0)
+    if full_start < start:
+        full_start += timedelta(hours=1)
+    full_end = end.replace(minute=0, second=0, microsecond=0)
+    if full_end <= full_start:
+        return start, start
+    return full_start, full_end
+
+
+def _partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day.strftime('%Y%m%d')}"
+
+
+def _ensure_partitions(cur: Any, table: str, days: Iterable[date]) -> None:
+    """Create the daily partitions of ``table`` covering ``days``.
+
+    Rows that already landed in the default partition for a day are moved
+    into its new partition before it is attached.
+    """
+    timestamp_field = _PARTITIONED_TABLES[table][0]
+    for day in sorted(set(days)):
+        name = _partition_name(table, day)
+        if name in _known_partitions:
+            continue
+        cur.execute("SELECT to_regclass(%s)", (name,))
+        row = cur.fetchone()
+        if row and row[0]:
+            _known_partitions.add(name)
+            continue
+
+        low = _day_start(day)
+        high = low + timedelta(days=1)
+        cur.execute("SAVEPOINT adsb_partition")
+        try:
+            cur.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cur.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default
+                    WHERE {timestamp_field} >= %s AND {timestamp_field} < %s
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                (low, high),
             )
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_messages_icao_time
-            ON adsb_messages (icao, received_at)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_messages_received_at
-            ON adsb_messages (received_at)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_messages_msg_time
-            ON adsb_messages (msg_time)
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS adsb_snapshots (
-                id BIGSERIAL PRIMARY KEY,
-                captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                icao TEXT NOT NULL,
-                callsign TEXT,
-                registration TEXT,
-                type_code TEXT,
-                type_desc TEXT,
-                altitude INTEGER,
-                speed INTEGER,
-                heading INTEGER,
-                vertical_rate INTEGER,
-                lat DOUBLE PRECISION,
-                lon DOUBLE PRECISION,
-                squawk TEXT,
-                source_host TEXT,
-                snapshot JSONB
+            cur.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ({_bound_literal(low)}) TO ({_bound_literal(high)})"
             )
-            """
+            cur.execute("RELEASE SAVEPOINT adsb_partition")
+        except psycopg2.Error as exc:
+            # Another writer created it first, or the day is still
+            # covered by the legacy partition of a migrated table; the
+            # next batch for the day looks again
+            cur.execute("ROLLBACK TO SAVEPOINT adsb_partition")
+            logger.debug("ADS-B partition %s not created: %s", name, exc)
+            continue
+        _known_partitions.add(name)
+
+
+def _daily_partitions(cur: Any, table: str) -> dict[date, str]:
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        (table,),
+    )
+    prefix = f'{table}_p'
+    partitions = {}
+    for (name,) in cur.fetchall():
+        if name.startswith(prefix):
+            with contextlib.suppress(ValueError):
+                partitions[datetime.strptime(name[len(prefix):], '%Y%m%d').date()] = name
+    return partitions
+
+
+def _relkind(cur: Any, table: str) -> str | None:
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _create_partitioned_table(cur: Any, table: str) -> None:
+    """Create ``table`` partitioned by day if it does not exist yet."""
+    timestamp_field, columns, indexes = _PARTITIONED_TABLES[table]
+    cur.execute(f"CREATE SEQUENCE IF NOT EXISTS {table}_id_seq")
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id BIGINT NOT NULL DEFAULT nextval('{table}_id_seq'),
+            {columns.strip()},
+            PRIMARY KEY (id, {timestamp_field})
+        ) PARTITION BY RANGE ({timestamp_field})
+        """
+    )
+    cur.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+    for index, definition in indexes.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} {definition}")
+
+
+def _partition_plain_table(cur: Any, table: str) -> None:
+    """Turn an unpartitioned ``table`` into a partitioned one in place.
+
+    The existing table is renamed to ``<table>_legacy`` and attached as one
+    partition covering everything up to the day after its newest row, so
+    existing history is never rewritten. Attaching still scans it once to
+    check the range and builds the new primary key.
+    """
+    timestamp_field, _, indexes = _PARTITIONED_TABLES[table]
+    cur.execute(f"SELECT MAX({timestamp_field}) FROM {table}")
+    newest = cur.fetchone()[0]
+    legacy_cutoff = _day_start(newest or datetime.now(timezone.utc)) + timedelta(days=1)
+    legacy = f'{table}_legacy'
+    logger.info("ADS-B history: partitioning %s (existing rows kept in %s)", table, legacy)
+    cur.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    # The partitioned key is (id, timestamp); ATTACH builds it
+    cur.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {table}_pkey")
+    for index in indexes:
+        cur.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index.replace(table, legacy)}")
+    _create_partitioned_table(cur, table)
+    cur.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ({_bound_literal(legacy_cutoff)})"
+    )
+
+
+def _ensure_rollups(cur: Any) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS adsb_rollup_hourly (
+            hour TIMESTAMPTZ PRIMARY KEY,
+            message_count BIGINT NOT NULL DEFAULT 0,
+            snapshot_count BIGINT NOT NULL DEFAULT 0,
+            first_seen TIMESTAMPTZ,
+            last_seen TIMESTAMPTZ
         )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_snapshots_icao_time
-            ON adsb_snapshots (icao, captured_at)
-            """
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS adsb_rollup_aircraft (
+            hour TIMESTAMPTZ NOT NULL,
+            icao TEXT NOT NULL,
+            snapshot_count BIGINT NOT NULL DEFAULT 0,
+            first_seen TIMESTAMPTZ,
+            last_seen TIMESTAMPTZ,
+            PRIMARY KEY (hour, icao)
         )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_adsb_rollup_aircraft_icao
+        ON adsb_rollup_aircraft (icao, hour)
+        """
+    )
+
+
+def _rollup_sql(table: str, source: str, where: str = '') -> list[str]:
+    """Statements adding the rows of ``source`` into the hourly rollups."""
+    timestamp_field = _PARTITIONED_TABLES[table][0]
+    hour = _hour_sql(timestamp_field)
+    where = f'WHERE {where}' if where else ''
+    if table == 'adsb_messages':
+        return [
+            f"""
+            INSERT INTO adsb_rollup_hourly AS r (hour, message_count)
+            SELECT {hour}, COUNT(*) FROM {source} {where} GROUP BY 1
+            ON CONFLICT (hour) DO UPDATE SET message_count = r.message_count + EXCLUDED.message_count
+            """,
+        ]
+    return [
+        f"""
+        INSERT INTO adsb_rollup_hourly AS r (hour, snapshot_count, first_seen, last_seen)
+        SELECT {hour}, COUNT(*), MIN(captured_at), MAX(captured_at) FROM {source} {where} GROUP BY 1
+        ON CONFLICT (hour) DO UPDATE SET
+            snapshot_count = r.snapshot_count + EXCLUDED.snapshot_count,
+            first_seen = LEAST(r.first_seen, EXCLUDED.first_seen),
+            last_seen = GREATEST(r.last_seen, EXCLUDED.last_seen)
+        """,
+        f"""
+        INSERT INTO adsb_rollup_aircraft AS r (hour, icao, snapshot_count, first_seen, last_seen)
+        SELECT {hour}, icao, COUNT(*), MIN(captured_at), MAX(captured_at) FROM {source} {where} GROUP BY 1, 2
+        ON CONFLICT (hour, icao) DO UPDATE SET
+            snapshot_count = r.snapshot_count + EXCLUDED.snapshot_count,
+            first_seen = LEAST(r.first_seen, EXCLUDED.first_seen),
+            last_seen = GREATEST(r.last_seen, EXCLUDED.last_seen)
+        """,
+    ]
+
+
+def _rebuild_rollups(
+    cur: Any,
+    start: datetime | None,
+    end: datetime | None,
+    tables: Iterable[str] = tuple(_PARTITIONED_TABLES),
+) -> None:
+    """Recompute the rollups of ``tables`` for whole hours in [start, end) from raw rows.
+
+    Rebuilding one table resets only its own rollup columns and rows, so
+    the other table is not rescanned.
+    """
+    if start is not None:
+        start = start.replace(minute=0, second=0, microsecond=0)
+    if end is not None and end != end.replace(minute=0, second=0, microsecond=0):
+        end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    bounds = []
+    params: list[Any] = []
+    if start is not None:
+        bounds.append('{col} >= %s')
+        params.append(start)
+    if end is not None:
+        bounds.append('{col} < %s')
+        params.append(end)
+    where = ' AND '.join(bounds)
+    hour_where = where.format(col='hour')
+    tables = [table for table in _PARTITIONED_TABLES if table in set(tables)]
+
+    if len(tables) == len(_PARTITIONED_TABLES):
+        for rollup in ('adsb_rollup_hourly', 'adsb_rollup_aircraft'):
+            cur.execute(f"DELETE FROM {rollup} {'WHERE ' + hour_where if where else ''}", params)
+    else:
+        for table in tables:
+            if table == 'adsb_messages':
+                reset = 'message_count = 0'
+            else:
+                reset = 'snapshot_count = 0, first_seen = NULL, last_seen = NULL'
+                cur.execute(f"DELETE FROM adsb_rollup_aircraft {'WHERE ' + hour_where if where else ''}", params)
+            cur.execute(f"UPDATE adsb_rollup_hourly SET {reset} {'WHERE ' + hour_where if where else ''}", params)
         cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_snapshots_captured_at
-            ON adsb_snapshots (captured_at)
-            """
+            "DELETE FROM adsb_rollup_hourly WHERE message_count = 0 AND snapshot_count = 0"
+            f"{' AND ' + hour_where if where else ''}",
+            params,
         )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS adsb_sessions (
-                id BIGSERIAL PRIMARY KEY,
-                started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                ended_at TIMESTAMPTZ,
-                device_index INTEGER,
-                sdr_type TEXT,
-                remote_host TEXT,
-                remote_port INTEGER,
-                start_source TEXT,
-                stop_source TEXT,
-                started_by TEXT,
-                stopped_by TEXT,
-                notes TEXT
+    for table in tables:
+        for sql in _rollup_sql(table, table, where.format(col=_PARTITIONED_TABLES[table][0])):
+            cur.execute(sql, params)
+
+
+def prune_history(
+    cur: Any,
+    start: datetime | None,
+    end: datetime | None,
+    tables: Iterable[str] = tuple(_PARTITIONED_TABLES),
+) -> dict[str, int]:
+    """Delete history in [start, end); None leaves that side open.
+
+    Daily partitions wholly inside the range are dropped, so the heavy
+    part of a prune never deletes row by row; only rows in partial days
+    (and in the default/legacy partitions) are deleted. Rollups of the
+    pruned tables are rebuilt for the affected hours only. Returns rows
+    removed per table, taking the counts of dropped partitions from the
+    rollups.
+    """
+    removed = {}
+    for table in tables:
+        timestamp_field = _PARTITIONED_TABLES[table][0]
+        count_column = 'message_count' if table == 'adsb_messages' else 'snapshot_count'
+        removed[table] = 0
+
+        for day, name in sorted(_daily_partitions(cur, table).items()):
+            low = _day_start(day)
+            high = low + timedelta(days=1)
+            if (start is not None and low < start) or (end is not None and high > end):
+                continue
+            cur.execute(
+                f"SELECT COALESCE(SUM({count_column}), 0) FROM adsb_rollup_hourly WHERE hour >= %s AND hour < %s",
+                (low, high),
             )
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_sessions_started_at
-            ON adsb_sessions (started_at)
-            """
+            removed[table] += int(cur.fetchone()[0])
+            cur.execute(f"DROP TABLE {name}")
+            _known_partitions.discard(name)
+
+        bounds = []
+        params: list[Any] = []
+        if start is not None:
+            bounds.append(f'{timestamp_field} >= %s')
+            params.append(start)
+        if end is not None:
+            bounds.append(f'{timestamp_field} < %s')
+            params.append(end)
+        if bounds:
+            cur.execute(f"DELETE FROM {table} WHERE {' AND '.join(bounds)}", params)
+        else:
+            cur.execute(f"DELETE FROM {table}")
+        removed[table] += max(0, cur.rowcount or 0)
+
+    _rebuild_rollups(cur, start, end, tables=removed)
+    return removed
+
+
+def maintain_partitions(cur: Any, table: str, now: datetime | None = None) -> None:
+    """Create upcoming daily partitions and drop those past retention."""
+    today = (now or datetime.now(timezone.utc)).date()
+    _ensure_partitions(cur, table, (today + timedelta(days=d) for d in range(-1, PARTITION_PREMAKE_DAYS + 1)))
+    if ADSB_HISTORY_RETENTION_DAYS > 0:
+        prune_history(cur, None, _day_start(today - timedelta(days=ADSB_HISTORY_RETENTION_DAYS)), tables=(table,))
+
+
+def _create_schema(cur: Any) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS adsb_history_migrations (
+            name TEXT PRIMARY KEY,
+            done_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
         )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_adsb_sessions_active
-            ON adsb_sessions (ended_at)
-            """
+        """
+    )
+    partitioned = [table for table in _PARTITIONED_TABLES if _relkind(cur, table) != 'r']
+    for table in partitioned:
+        _create_partitioned_table(cur, table)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS adsb_sessions (
+            id BIGSERIAL PRIMARY KEY,
+            started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            ended_at TIMESTAMPTZ,
+            device_index INTEGER,
+            sdr_type TEXT,
+            remote_host TEXT,
+            remote_port INTEGER,
+            start_source TEXT,
+            stop_source TEXT,
+            started_by TEXT,
+            stopped_by TEXT,
+            notes TEXT
         )
-    conn.commit()
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_adsb_sessions_started_at
+        ON adsb_sessions (started_at)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_adsb_sessions_active
+        ON adsb_sessions (ended_at)
+        """
+    )
+    _ensure_rollups(cur)
+    today = datetime.now(timezone.utc).date()
+    for table in partitioned:
+        _ensure_partitions(cur, table, (today + timedelta(days=d) for d in range(-1, PARTITION_PREMAKE_DAYS + 1)))
+
+
+def _ensure_adsb_schema(conn: psycopg2.extensions.connection) -> bool:
+    """Create any missing history tables and upcoming partitions.
+
+    Cheap enough for request handlers: plain tables left by older versions
+    are not migrated here (see :func:`migrate_adsb_history`), and nothing
+    is done while another connection holds the schema lock. Returns False
+    in that case.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+            if not cur.fetchone()[0]:
+                conn.rollback()
+                return False
+            _create_schema(cur)
+        conn.commit()
+    except Exception:
+        _rollback(conn)
+        raise
+    return True
+
+
+def _rollback(conn: psycopg2.extensions.connection) -> None:
+    """Roll back, forgetting partitions the transaction may have created."""
+    with contextlib.suppress(Exception):
+        conn.rollback()
+    _known_partitions.clear()
+
+
+def adsb_history_migrated(cur: Any) -> bool:
+    """Whether :func:`migrate_adsb_history` has completed on this database."""
+    cur.execute("SELECT to_regclass('adsb_history_migrations')")
+    row = cur.fetchone()
+    if not row or not row[0]:
+        return False
+    cur.execute("SELECT 1 FROM adsb_history_migrations WHERE name = %s", (MIGRATION_PARTITIONS_ROLLUPS,))
+    return cur.fetchone() is not None
+
+
+def migrate_adsb_history(conn: psycopg2.extensions.connection) -> None:
+    """One-time migration: partition plain tables and backfill the rollups.
+
+    Both steps read all existing history, so this only runs on the
+    thread started by :func:`start_adsb_history_migration`. The schema
+    lock makes concurrent callers wait and then find it done.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+            if adsb_history_migrated(cur):
+                _create_schema(cur)
+                conn.commit()
+                return
+            started = time.time()
+            for table in _PARTITIONED_TABLES:
+                if _relkind(cur, table) == 'r':
+                    _partition_plain_table(cur, table)
+            _create_schema(cur)
+            # Rollups of history recorded before they existed
+            _rebuild_rollups(cur, None, None)
+            cur.execute(
+                "INSERT INTO adsb_history_migrations (name) VALUES (%s) ON CONFLICT DO NOTHING",
+                (MIGRATION_PARTITIONS_ROLLUPS,),
+            )
+        conn.commit()
+    except Exception:
+        _rollback(conn)
+        raise
+    logger.info("ADS-B history: migration finished in %.1fs", time.time() - started)
+
+
+def start_adsb_history_migration() -> None:
+    """Run :func:`migrate_adsb_history` on a background thread, once at a time."""
+    global _migration_thread
+    if not (ADSB_HISTORY_ENABLED and PSYCOPG2_AVAILABLE):
+        return
+    with _migration_lock:
+        if _migration_thread is not None and _migration_thread.is_alive():
+            return
+
+        def run() -> None:
+            try:
+                conn = psycopg2.connect(_make_dsn())
+            except Exception as exc:
+                logger.warning("ADS-B history migration: DB connection failed: %s", exc)
+                return
+            try:
+                migrate_adsb_history(conn)
+            except Exception as exc:
+                logger.warning("ADS-B history migration failed: %s", exc)
+            finally:
+                conn.close()
+
+        _migration_thread = threading.Thread(target=run, name='adsb-history-migration', daemon=True)
+        _migration_thread.start()
 
 
 def _make_dsn() -> str:
@@ -205,138 +648,245 @@ def _make_dsn() -> str:
     )
 
 
-class AdsbHistoryWriter:
-    """Background writer for ADS-B history records."""
+class _SpillSegment:
+    __slots__ = ('path', 'size', 'records')
 
-    def __init__(self) -> None:
-        self.enabled = ADSB_HISTORY_ENABLED and PSYCOPG2_AVAILABLE
-        self._queue: queue.Queue[dict] = queue.Queue(maxsize=ADSB_HISTORY_QUEUE_SIZE)
-        self._thread: threading.Thread | None = None
-        self._stop_event = threading.Event()
-        self._conn: psycopg2.extensions.connection | None = None
-        self._dropped = 0
+    def __init__(self, path: Path, size: int = 0, records: int = 0) -> None:
+        self.path = path
+        self.size = size
+        self.records = records
 
-    def start(self) -> None:
-        if not self.enabled:
-            return
-        if self._thread and self._thread.is_alive():
-            return
-        self._thread = threading.Thread(target=self._run, name='adsb-history-writer', daemon=True)
-        self._thread.start()
-        logger.info("ADS-B history writer started")
 
-    def stop(self) -> None:
-        self._stop_event.set()
+class _SpillLog:
+    """Ordered segment files of COPY text rows waiting to be inserted.
 
-    def enqueue(self, record: dict) -> None:
-        if not self.enabled:
+    Batches are appended and fsynced to the newest segment; replay takes
+    the oldest. Total size is capped at ``max_bytes`` - appends beyond it
+    are refused so the caller can count them as dropped.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, segment_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.bytes = 0
+        self.records = 0
+        self._segments: deque[_SpillSegment] = deque()
+        self._active: BinaryIO | None = None
+        self._next_seq = 1
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def recover(self) -> None:
+        """Pick up segments left by a previous run, trimming torn writes."""
+        if self._segments or not self.directory.is_dir():
             return
-        if 'received_at' not in record or record['received_at'] is None:
-            record['received_at'] = datetime.now(timezone.utc)
+        for path in sorted(self.directory.glob('*.seg')):
+            data = path.read_bytes()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                with open(path, 'r+b') as fh:
+                    fh.truncate(complete)
+            self._segments.append(_SpillSegment(path, complete, data.count(b'\n')))
+            self.bytes += complete
+            self.records += data.count(b'\n')
+            self._next_seq = int(path.stem) + 1
+        if self._segments:
+            logger.info("ADS-B spill: recovered %d records in %s", self.records, self.directory)
+
+    def append(self, data: bytes, records: int) -> bool:
+        if self.bytes + len(data) > self.max_bytes:
+            return False
+        if self._active is None or self._segments[-1].size >= self.segment_bytes:
+            self._open_segment()
+        segment = self._segments[-1]
         try:
-            self._queue.put_nowait(record)
-        except queue.Full:
-            self._dropped += 1
-            if self._dropped % 1000 == 0:
-                logger.warning("ADS-B history queue full, dropped %d records", self._dropped)
+            self._active.write(data)
+            self._active.flush()
+            os.fsync(self._active.fileno())
+        except OSError as exc:
+            logger.warning("ADS-B spill write failed: %s", exc)
+            with contextlib.suppress(OSError):
+                self._active.truncate(segment.size)
+            return False
+        segment.size += len(data)
+        segment.records += records
+        self.bytes += len(data)
+        self.records += records
+        return True
 
-    def _run(self) -> None:
-        batch: list[dict] = []
-        last_flush = time.time()
+    def _open_segment(self) -> None:
+        self._seal()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{self._next_seq:012d}.seg'
+        self._next_seq += 1
+        self._active = open(path, 'ab')  # noqa: SIM115 - kept open across appends
+        self._segments.append(_SpillSegment(path))
 
-        while not self._stop_event.is_set():
-            timeout = max(0.0, ADSB_HISTORY_FLUSH_INTERVAL - (time.time() - last_flush))
-            try:
-                item = self._queue.get(timeout=timeout)
-                batch.append(item)
-            except queue.Empty:
-                pass
+    def _seal(self) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._active = None
 
-            now = time.time()
-            if batch and (len(batch) >= ADSB_HISTORY_BATCH_SIZE or now - last_flush >= ADSB_HISTORY_FLUSH_INTERVAL):
-                if self._flush(batch):
-                    batch.clear()
-                    last_flush = now
+    def oldest(self) -> _SpillSegment | None:
+        """Oldest segment, closed for writing so it can be replayed."""
+        if not self._segments:
+            return None
+        if len(self._segments) == 1:
+            self._seal()
+        return self._segments[0]
 
-    def _ensure_connection(self) -> psycopg2.extensions.connection | None:
-        if self._conn:
-            return self._conn
+    def remove(self, segment: _SpillSegment) -> None:
+        self._segments.remove(segment)
+        self.bytes -= segment.size
+        self.records -= segment.records
+        segment.path.unlink(missing_ok=True)
+
+    def rewrite(self, segment: _SpillSegment, lines: list[bytes]) -> None:
+        """Replace a sealed segment's rows with ``lines``."""
+        data = b''.join(lines)
+        tmp = segment.path.with_suffix('.tmp')
+        with open(tmp, 'wb') as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, segment.path)
+        self.bytes += len(data) - segment.size
+        self.records += len(lines) - segment.records
+        segment.size = len(data)
+        segment.records = len(lines)
+
+    def quarantine(self, lines: list[bytes]) -> None:
+        """Set aside rows the server rejected, for inspection; never replayed."""
         try:
-            self._conn = psycopg2.connect(_make_dsn())
-            self._conn.autocommit = False
-            self._ensure_schema(self._conn)
-            return self._conn
-        except Exception as exc:
-            logger.warning("ADS-B history DB connection failed: %s", exc)
-            self._conn = None
-            return None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / 'rejected.bad', 'ab') as fh:
+                fh.writelines(lines)
+        except OSError as exc:
+            logger.warning("ADS-B spill quarantine write failed: %s", exc)
 
-    def _ensure_schema(self, conn: psycopg2.extensions.connection) -> None:
-        _ensure_adsb_schema(conn)
 
-    def _flush(self, batch: Iterable[dict]) -> bool:
-        conn = self._ensure_connection()
-        if not conn:
-            time.sleep(2.0)
-            return False
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
 
-        values = []
-        for record in batch:
-            values.append(tuple(record.get(field) for field in _MESSAGE_FIELDS))
 
-        try:
-            with conn.cursor() as cur:
-                execute_values(cur, _MESSAGE_INSERT_SQL, values)
-            conn.commit()
-            return True
-        except Exception as exc:
-            logger.warning("ADS-B history insert failed: %s", exc)
-            with contextlib.suppress(Exception):
-                conn.rollback()
-            self._conn = None
-            time.sleep(2.0)
-            return False
+def _copy_value(value: Any) -> str:
+    """Render a value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value, default=str)
+    else:
+        value = str(value)
+    return value.translate(_COPY_ESCAPES)
 
 
-adsb_history_writer = AdsbHistoryWriter()
 
+class _HistoryWriter:
+    """Background batch writer for one ADS-B history table.
 
-class AdsbSnapshotWriter:
-    """Background writer for ADS-B snapshot records."""
+    Batches go straight to PostgreSQL while it keeps up. When the database
+    is unreachable, or the queue passes its high-water mark, batches are
+    spilled to disk instead and replayed in order with COPY once the
+    database is back. Replay is at-least-once: a connection lost between
+    COMMIT and removing the segment repeats that segment.
+
+    Both paths load into a temporary staging table first, so one batch
+    creates any missing daily partitions and updates the hourly rollups
+    in the same transaction as its rows. A batch the server rejects is
+    retried row by row; only the offending rows are set aside, in the
+    spill directory's ``rejected.bad``, and counted as dropped.
+    """
+
+    table = ''
+    fields: tuple[str, ...] = ()
+    timestamp_field = ''
+    label = ''
 
     def __init__(self) -> None:
         self.enabled = ADSB_HISTORY_ENABLED and PSYCOPG2_AVAILABLE
         self._queue: queue.Queue[dict] = queue.Queue(maxsize=ADSB_HISTORY_QUEUE_SIZE)
+        self._high_water = max(1, int(ADSB_HISTORY_QUEUE_SIZE * ADSB_HISTORY_HIGH_WATER))
         self._thread: threading.Thread | None = None
         self._stop_event = threading.Event()
         self._conn: psycopg2.extensions.connection | None = None
         self._dropped = 0
+        self._spilled = 0
+        self._replayed = 0
+        self._rejected = 0
+        self._retry_at = 0.0
+        self._maintained_at = 0.0
+        spill_dir = Path(ADSB_SPILL_DIR) if ADSB_SPILL_DIR else SPILL_DIR
+        self._spill = _SpillLog(
+            spill_dir / self.table,
+            max_bytes=int(ADSB_SPILL_MAX_MB * 1024 * 1024),
+            segment_bytes=int(ADSB_SPILL_SEGMENT_MB * 1024 * 1024),
+        )
+        columns = ', '.join(self.fields)
+        self._stage = f'{self.table}_stage'
+        self._stage_sql = (
+            f"CREATE TEMP TABLE IF NOT EXISTS {self._stage} ON COMMIT DELETE ROWS "
+            f"AS SELECT {columns} FROM {self.table} WITH NO DATA"
+        )
+        self._insert_sql = f"INSERT INTO {self._stage} ({columns}) VALUES %s"
+        self._copy_sql = f"COPY {self._stage} ({columns}) FROM STDIN"
+        self._publish_sql = f"INSERT INTO {self.table} ({columns}) SELECT {columns} FROM {self._stage}"
 
     def start(self) -> None:
         if not self.enabled:
             return
         if self._thread and self._thread.is_alive():
             return
-        self._thread = threading.Thread(target=self._run, name='adsb-snapshot-writer', daemon=True)
+        start_adsb_history_migration()
+        self._thread = threading.Thread(target=self._run, name=f'adsb-{self.label}-writer', daemon=True)
         self._thread.start()
-        logger.info("ADS-B snapshot writer started")
+        logger.info("ADS-B %s writer started", self.label)
 
-    def stop(self) -> None:
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the writer thread once it has written or spilled what is queued."""
         self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logger.warning("ADS-B %s writer did not stop within %.0fs", self.label, timeout)
 
     def enqueue(self, record: dict) -> None:
         if not self.enabled:
             return
-        if 'captured_at' not in record or record['captured_at'] is None:
-            record['captured_at'] = datetime.now(timezone.utc)
+        if self.timestamp_field not in record or record[self.timestamp_field] is None:
+            record[self.timestamp_field] = datetime.now(timezone.utc)
         try:
             self._queue.put_nowait(record)
         except queue.Full:
-            self._dropped += 1
-            if self._dropped % 1000 == 0:
-                logger.warning("ADS-B snapshot queue full, dropped %d records", self._dropped)
+            self._drop(1)
+
+    def _drop(self, count: int) -> None:
+        before = self._dropped
+        self._dropped += count
+        if self._dropped // 1000 > before // 1000:
+            logger.warning("ADS-B %s queue full, dropped %d records", self.label, self._dropped)
+
+    def stats(self) -> dict:
+        """Queue and spill backlog depth for status reporting."""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_high_water': self._high_water,
+            'spill_segments': len(self._spill),
+            'spill_records': self._spill.records,
+            'spill_bytes': self._spill.bytes,
+            'spill_limit_bytes': self._spill.max_bytes,
+            'spilled': self._spilled,
+            'replayed': self._replayed,
+            'rejected': self._rejected,
+            'dropped': self._dropped,
+            'db_connected': self._conn is not None,
+        }
 
     def _run(self) -> None:
+        self._spill.recover()
         batch: list[dict] = []
         last_flush = time.time()
 
@@ -350,9 +900,32 @@ class AdsbSnapshotWriter:
 
             now = time.time()
             if batch and (len(batch) >= ADSB_HISTORY_BATCH_SIZE or now - last_flush >= ADSB_HISTORY_FLUSH_INTERVAL):
-                if self._flush(batch):
-                    batch.clear()
-                    last_flush = now
+                self._flush(batch)
+                batch.clear()
+                last_flush = now
+            if len(self._spill) and self._queue.qsize() < self._high_water:
+                self._replay_segment()
+            if self._conn is not None and now - self._maintained_at >= PARTITION_MAINTENANCE_INTERVAL:
+                self._maintain()
+
+        self._drain(batch)
+
+    def _drain(self, batch: list[dict]) -> None:
+        """Write the pending batch and whatever is still queued, spilling if the database is down."""
+        while True:
+            while len(batch) < ADSB_HISTORY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            self._flush(batch)
+            batch.clear()
+        if self._conn is not None:
+            with contextlib.suppress(Exception):
+                self._conn.close()
+            self._conn = None
 
     def _ensure_connection(self) -> psycopg2.extensions.connection | None:
         if self._conn:
@@ -363,41 +936,211 @@ class AdsbSnapshotWriter:
             self._ensure_schema(self._conn)
             return self._conn
         except Exception as exc:
-            logger.warning("ADS-B snapshot DB connection failed: %s", exc)
+            logger.warning("ADS-B %s DB connection failed: %s", self.label, exc)
+            if self._conn is not None:
+                with contextlib.suppress(Exception):
+                    self._conn.close()
             self._conn = None
             return None
 
     def _ensure_schema(self, conn: psycopg2.extensions.connection) -> None:
-        _ensure_adsb_schema(conn)
+        # Until the migration is done, batches spill to disk
+        with conn.cursor() as cur:
+            migrated = adsb_history_migrated(cur)
+        conn.rollback()
+        if not migrated:
+            start_adsb_history_migration()
+            raise RuntimeError('history migration still running')
+        if not _ensure_adsb_schema(conn):
+            raise RuntimeError('history schema is being changed')
+
+    def _connection_lost(self, conn: psycopg2.extensions.connection) -> None:
+        _rollback(conn)
+        self._conn = None
+        self._retry_at = time.time() + ADSB_HISTORY_RETRY_INTERVAL
+
+    def _row(self, record: dict) -> tuple:
+        return tuple(record.get(field) for field in self.fields)
+
+    def _write_staged(self, cur: Any, load: Callable[[Any], None]) -> None:
+        """Load rows into the staging table, then publish them."""
+        cur.execute(self._stage_sql)
+        load(cur)
+        cur.execute(f"SELECT DISTINCT ({self.timestamp_field} AT TIME ZONE 'UTC')::date FROM {self._stage}")
+        _ensure_partitions(cur, self.table, (row[0] for row in cur.fetchall()))
+        cur.execute(self._publish_sql)
+        for sql in _rollup_sql(self.table, self._stage):
+            cur.execute(sql)
+
+    def _maintain(self) -> None:
+        """Create upcoming partitions and apply retention."""
+        conn = self._conn
+        self._maintained_at = time.time()
+        try:
+            with conn.cursor() as cur:
+                maintain_partitions(cur, self.table)
+            conn.commit()
+        except Exception as exc:
+            logger.warning("ADS-B %s partition maintenance failed: %s", self.label, exc)
+            self._connection_lost(conn)
 
     def _flush(self, batch: Iterable[dict]) -> bool:
+        """Insert a batch, or spill it. Returns True if it reached the database."""
+        # Anything already spilled must land first to keep insert order
+        if len(self._spill) or self._queue.qsize() >= self._high_water or time.time() < self._retry_at:
+            self._spill_batch(batch)
+            return False
+
         conn = self._ensure_connection()
         if not conn:
-            time.sleep(2.0)
+            self._retry_at = time.time() + ADSB_HISTORY_RETRY_INTERVAL
+            self._spill_batch(batch)
             return False
 
-        values = []
-        for record in batch:
-            row = []
-            for field in _SNAPSHOT_FIELDS:
-                value = record.get(field)
-                if field == 'snapshot' and value is not None:
-                    value = Json(value)
-                row.append(value)
-            values.append(tuple(row))
-
         try:
             with conn.cursor() as cur:
-                execute_values(cur, _SNAPSHOT_INSERT_SQL, values)
+                rows = [self._row(record) for record in batch]
+                self._write_staged(cur, lambda c: execute_values(c, self._insert_sql, rows))
             conn.commit()
             return True
-        except Exception as exc:
-            logger.warning("ADS-B snapshot insert failed: %s", exc)
-            with contextlib.suppress(Exception):
-                conn.rollback()
-            self._conn = None
-            time.sleep(2.0)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+            logger.warning("ADS-B %s insert failed: %s", self.label, exc)
+            self._connection_lost(conn)
+            self._spill_batch(batch)
             return False
+        except Exception as exc:
+            logger.warning("ADS-B %s batch rejected, inserting rows one by one: %s", self.label, exc)
+            lines = self._copy_lines(batch)
+            _, remaining = self._write_each(conn, lines)
+            if remaining:
+                self._spill_lines(remaining)
+                return False
+            return True
+
+    def _copy_lines(self, batch: Iterable[dict]) -> list[bytes]:
+        return [
+            ('\t'.join(_copy_value(record.get(field)) for field in self.fields) + '\n').encode('utf-8')
+            for record in batch
+        ]
+
+    def _spill_batch(self, batch: Iterable[dict]) -> None:
+        self._spill_lines(self._copy_lines(batch))
+
+    def _spill_lines(self, lines: list[bytes]) -> None:
+        if self._spill.append(b''.join(lines), len(lines)):
+            self._spilled += len(lines)
+        else:
+            self._drop(len(lines))
+
+    def _write_each(
+        self, conn: psycopg2.extensions.connection, lines: list[bytes]
+    ) -> tuple[int, list[bytes]]:
+        """
+        COPY rows one transaction at a time, setting aside those rejected.
+
+        Returns the number of rows written and the rows not attempted
+        because the connection was lost.
+        """
+        with contextlib.suppress(Exception):
+            conn.rollback()
+        written = 0
+        rejected: list[bytes] = []
+        remaining: list[bytes] = []
+        for index, line in enumerate(lines):
+            try:
+                with conn.cursor() as cur:
+                    self._write_staged(cur, lambda c, line=line: c.copy_expert(self._copy_sql, io.BytesIO(line)))
+                conn.commit()
+                written += 1
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+                logger.warning("ADS-B %s insert failed: %s", self.label, exc)
+                self._connection_lost(conn)
+                remaining = lines[index:]
+                break
+            except Exception as exc:
+                logger.debug("ADS-B %s row rejected: %s", self.label, exc)
+                rejected.append(line)
+                _known_partitions.clear()
+                try:
+                    conn.rollback()
+                except Exception:
+                    self._connection_lost(conn)
+                    remaining = lines[index + 1:]
+                    break
+
+        if rejected:
+            logger.error("ADS-B %s: %d rows rejected by the server, set aside", self.label, len(rejected))
+            self._spill.quarantine(rejected)
+            self._rejected += len(rejected)
+            self._drop(len(rejected))
+        return written, remaining
+
+    def _replay_segment(self) -> None:
+        """COPY the oldest spilled segment into the table."""
+        if time.time() < self._retry_at:
+            return
+        segment = self._spill.oldest()
+        if segment is None:
+            return
+        conn = self._ensure_connection()
+        if not conn:
+            self._retry_at = time.time() + ADSB_HISTORY_RETRY_INTERVAL
+            return
+
+        try:
+            with open(segment.path, 'rb') as fh, conn.cursor() as cur:
+                self._write_staged(cur, lambda c: c.copy_expert(self._copy_sql, fh))
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+            logger.warning("ADS-B %s replay failed: %s", self.label, exc)
+            self._connection_lost(conn)
+            return
+        except Exception as exc:
+            # Rows the server rejects will never load; set them aside
+            # instead of blocking the rest of the segment
+            logger.warning("ADS-B %s replay of %s rejected, loading rows one by one: %s",
+                           self.label, segment.path.name, exc)
+            with open(segment.path, 'rb') as fh:
+                lines = fh.readlines()
+            replayed, remaining = self._write_each(conn, lines)
+            if remaining:
+                # Connection lost part way; keep only the rows not yet tried
+                self._spill.rewrite(segment, remaining)
+                self._replayed += replayed
+                return
+        else:
+            replayed = segment.records
+
+        self._spill.remove(segment)
+        self._replayed += replayed
+        if not len(self._spill):
+            logger.info("ADS-B %s spill backlog cleared (%d records replayed)", self.label, self._replayed)
+
+
+class AdsbHistoryWriter(_HistoryWriter):
+    """Background writer for ADS-B history records."""
+
+    table = 'adsb_messages'
+    fields = _MESSAGE_FIELDS
+    timestamp_field = 'received_at'
+    label = 'history'
+
+
+adsb_history_writer = AdsbHistoryWriter()
+
+
+class AdsbSnapshotWriter(_HistoryWriter):
+    """Background writer for ADS-B snapshot records."""
+
+    table = 'adsb_snapshots'
+    fields = _SNAPSHOT_FIELDS
+    timestamp_field = 'captured_at'
+    label = 'snapshot'
+
+    def _row(self, record: dict) -> tuple:
+        row = super()._row(record)
+        snapshot = row[-1]
+        return row[:-1] + (Json(snapshot) if snapshot is not None else None,)
 
 
 adsb_snapshot_writer = AdsbSnapshotWriter()
@@ -1,12 +1,23 @@
-"""Aircraft database for ICAO hex to type/registration lookup."""
+"""Aircraft database for ICAO hex to type/registration lookup.
+
+The Mictronics JSON download is compiled into ``aircraft_db.bin``, a sorted
+table of 24-bit ICAO addresses with offsets into a deduplicated string table.
+Lookups binary-search the file through ``mmap``, so nothing is parsed at
+startup and every gunicorn worker shares the same page-cache copy.
+"""
 
 from __future__ import annotations
 
 import contextlib
 import json
 import logging
+import mmap
 import os
+import struct
+import sys
 import threading
+from array import array
+from bisect import bisect_left
 from datetime import datetime
 from typing import Any
 from urllib.error import URLError
@@ -17,7 +28,8 @@ logger = logging.getLogger('intercept.aircraft_db')
 # Database file location (persisted under data/adsb/ for Docker volume compatibility)
 DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'adsb')
 os.makedirs(DB_DIR, exist_ok=True)
-DB_FILE = os.path.join(DB_DIR, 'aircraft_db.json')
+DB_FILE = os.path.join(DB_DIR, 'aircraft_db.json')  # legacy format, converted on load
+DB_BIN_FILE = os.path.join(DB_DIR, 'aircraft_db.bin')
 DB_META_FILE = os.path.join(DB_DIR, 'aircraft_db_meta.json')
 
 # Mictronics database URLs (raw GitHub)
@@ -25,26 +37,173 @@ AIRCRAFT_DB_URL = 'https://raw.githubusercontent.com/Mictronics/readsb-protobuf/
 TYPES_DB_URL = 'https://raw.githubusercontent.com/Mictronics/readsb-protobuf/dev/webapp/src/db/types.json'
 GITHUB_API_URL = 'https://api.github.com/repos/Mictronics/readsb-protobuf/commits?path=webapp/src/db/aircrafts.json&per_page=1'
 
-# In-memory cache
-_aircraft_cache: dict[str, dict[str, str]] = {}
-_types_cache: dict[str, str] = {}
-_cache_lock = threading.Lock()
+# Binary layout (little-endian):
+#   header   magic, record count, string table offset
+#   keys     count x uint32 ICAO address, ascending
+#   values   count x (uint32 registration offset, uint32 type offset)
+#   strings  uint16 length + UTF-8 bytes; offset 0 is the empty string.
+#            Type entries are "CODE\x1fDescription", shared by all aircraft.
+_BIN_MAGIC = b'ICAODB01'
+_BIN_HEADER = struct.Struct('<8sII')
+_BIN_VALUE = struct.Struct('<II')
+_BIN_STRLEN = struct.Struct('<H')
+
+# Loaded registry; replaced wholesale on reload so lookups need no lock
+_registry: _Registry | None = None
+_cache_lock = threading.Lock()  # serialises load/download/delete only
 _db_loaded = False
 _db_version: str | None = None
 _update_available: bool = False
 _latest_version: str | None = None
 
 
+class _LittleEndianKeys:
+    """Sequence of uint32 keys over a buffer, for big-endian hosts."""
+
+    def __init__(self, buf: mmap.mmap, offset: int, count: int):
+        self._buf = buf
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return struct.unpack_from('<I', self._buf, self._offset + index * 4)[0]
+
+
+class _Registry:
+    """Read-only view over a memory-mapped aircraft_db.bin."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, strings_offset = _BIN_HEADER.unpack_from(self._mm, 0)
+        if magic != _BIN_MAGIC:
+            raise ValueError(f'{path} is not an aircraft registry file')
+
+        keys_offset = _BIN_HEADER.size
+        self.count = count
+        self._values_offset = keys_offset + count * 4
+        self._strings_offset = strings_offset
+        if sys.byteorder == 'little':
+            self._keys = memoryview(self._mm)[keys_offset:self._values_offset].cast('I')
+        else:
+            self._keys = _LittleEndianKeys(self._mm, keys_offset, count)
+
+    def _string(self, offset: int) -> str:
+        start = self._strings_offset + offset
+        (length,) = _BIN_STRLEN.unpack_from(self._mm, start)
+        start += _BIN_STRLEN.size
+        return self._mm[start:start + length].decode('utf-8', 'replace')
+
+    def get(self, key: int) -> dict[str, str] | None:
+        index = bisect_left(self._keys, key)
+        if index == self.count or self._keys[index] != key:
+            return None
+
+        reg_offset, type_offset = _BIN_VALUE.unpack_from(self._mm, self._values_offset + index * _BIN_VALUE.size)
+        type_code, _, type_desc = self._string(type_offset).partition('\x1f')
+        return {
+            'registration': self._string(reg_offset),
+            'type_code': type_code,
+            'type_desc': type_desc,
+        }
+
+
+def _entry_fields(entry: Any) -> tuple[str, str]:
+    """Extract (registration, type_code) from a Mictronics aircraft entry."""
+    # Database format is array: [registration, type_code, flags, ...]
+    # Handle both list format (from Mictronics) and dict format (legacy)
+    if isinstance(entry, list):
+        reg = entry[0] if len(entry) > 0 else ''
+        type_code = entry[1] if len(entry) > 1 else ''
+    elif isinstance(entry, dict):
+        reg = entry.get('r', '')
+        type_code = entry.get('t', '')
+    else:
+        return '', ''
+    return str(reg or ''), str(type_code or '')
+
+
+def _type_description(value: Any) -> str:
+    """Type table values are either a description or [description, icao_class, wtc]."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and value and isinstance(value[0], str):
+        return value[0]
+    return ''
+
+
+def build_binary_database(aircraft: dict[str, Any], types: dict[str, Any], path: str | None = None) -> int:
+    """
+    Compile Mictronics aircraft/type tables into the binary registry format.
+
+    The file is written to a temporary name and renamed onto ``path``
+    (default ``DB_BIN_FILE``), so workers that still have the old file
+    mapped keep reading a consistent copy.
+
+    Returns:
+        Number of aircraft records written.
+    """
+    path = path or DB_BIN_FILE
+    strings = bytearray(_BIN_STRLEN.pack(0))
+    string_offsets: dict[str, int] = {'': 0}
+
+    def intern(text: str) -> int:
+        offset = string_offsets.get(text)
+        if offset is None:
+            raw = text.encode('utf-8')[:0xFFFF]
+            offset = len(strings)
+            strings.extend(_BIN_STRLEN.pack(len(raw)))
+            strings.extend(raw)
+            string_offsets[text] = offset
+        return offset
+
+    records: dict[int, tuple[int, int]] = {}
+    for icao, entry in aircraft.items():
+        try:
+            key = int(icao, 16)
+        except (TypeError, ValueError):
+            continue  # non-ICAO keys (e.g. "~" TIS-B addresses) cannot be looked up
+        if not 0 <= key <= 0xFFFFFF:
+            continue
+        reg, type_code = _entry_fields(entry)
+        type_entry = f'{type_code}\x1f{_type_description(types.get(type_code))}' if type_code else ''
+        records[key] = (intern(reg), intern(type_entry))
+
+    keys = sorted(records)
+    key_array = array('I', keys)
+    value_array = array('I')
+    for key in keys:
+        value_array.extend(records[key])
+    if sys.byteorder != 'little':
+        key_array.byteswap()
+        value_array.byteswap()
+
+    strings_offset = _BIN_HEADER.size + len(keys) * (4 + _BIN_VALUE.size)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_BIN_HEADER.pack(_BIN_MAGIC, len(keys), strings_offset))
+        f.write(key_array.tobytes())
+        f.write(value_array.tobytes())
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
 def get_db_status() -> dict[str, Any]:
     """Get current database status."""
-    exists = os.path.exists(DB_FILE)
+    exists = os.path.exists(DB_BIN_FILE) or os.path.exists(DB_FILE)
     meta = _load_meta()
+    registry = _registry
 
     return {
         'installed': exists,
         'version': meta.get('version') if meta else None,
         'downloaded': meta.get('downloaded') if meta else None,
-        'aircraft_count': len(_aircraft_cache) if _db_loaded else 0,
+        'aircraft_count': registry.count if registry is not None else 0,
         'update_available': _update_available,
         'latest_version': _latest_version,
     }
@@ -79,26 +238,29 @@ def _save_meta(version: str) -> None:
 
 
 def load_database() -> bool:
-    """Load aircraft database into memory. Returns True if successful."""
-    global _aircraft_cache, _types_cache, _db_loaded, _db_version
-
-    if not os.path.exists(DB_FILE):
-        logger.info("Aircraft database not installed")
-        return False
+    """Map the aircraft registry. Returns True if successful."""
+    global _registry, _db_loaded, _db_version
 
     try:
         with _cache_lock:
-            with open(DB_FILE) as f:
-                data = json.load(f)
-
-            _aircraft_cache = data.get('aircraft', {})
-            _types_cache = data.get('types', {})
+            if not os.path.exists(DB_BIN_FILE):
+                if not os.path.exists(DB_FILE):
+                    logger.info("Aircraft database not installed")
+                    return False
+                # Existing install from before the binary format: compile once
+                logger.info("Converting aircraft database to binary registry")
+                with open(DB_FILE) as f:
+                    data = json.load(f)
+                build_binary_database(data.get('aircraft', {}), data.get('types', {}))
+                del data
+
+            _registry = _Registry(DB_BIN_FILE)
             _db_loaded = True
 
             meta = _load_meta()
             _db_version = meta.get('version') if meta else 'unknown'
 
-            logger.info(f"Loaded aircraft database: {len(_aircraft_cache)} aircraft, {len(_types_cache)} types")
+            logger.info(f"Loaded aircraft database: {_registry.count} aircraft")
             return True
     except Exception as e:
         logger.error(f"Error loading aircraft database: {e}")
@@ -112,36 +274,15 @@ def lookup(icao: str) -> dict[str, str] | None:
     Returns dict with keys: registration, type_code, type_desc
     Or None if not found.
     """
-    if not _db_loaded:
+    registry = _registry
+    if registry is None:
         return None
 
-    icao_upper = icao.upper()
-
-    with _cache_lock:
-        aircraft = _aircraft_cache.get(icao_upper)
-        if not aircraft:
-            return None
-
-        # Database format is array: [registration, type_code, flags, ...]
-        # Handle both list format (from Mictronics) and dict format (legacy)
-        if isinstance(aircraft, list):
-            reg = aircraft[0] if len(aircraft) > 0 else ''
-            type_code = aircraft[1] if len(aircraft) > 1 else ''
-        else:
-            # Dict format fallback
-            reg = aircraft.get('r', '')
-            type_code = aircraft.get('t', '')
-
-        # Look up type description
-        type_desc = ''
-        if type_code and type_code in _types_cache:
-            type_desc = _types_cache[type_code]
-
-        return {
-            'registration': reg,
-            'type_code': type_code,
-            'type_desc': type_desc,
-        }
+    try:
+        key = int(icao, 16)
+    except (TypeError, ValueError):
+        return None
+    return registry.get(key)
 
 
 def check_for_updates() -> dict[str, Any]:
@@ -209,15 +350,9 @@ def download_database(progress_callback=None) -> dict[str, Any]:
         if progress_callback:
             progress_callback('Processing database...')
 
-        # Combine into single file
-        combined = {
-            'aircraft': aircraft_data,
-            'types': types_data,
-        }
-
-        # Save to file
-        with open(DB_FILE, 'w') as f:
-            json.dump(combined, f, separators=(',', ':'))  # Compact JSON
+        # Compile into the memory-mapped registry format
+        with _cache_lock:
+            build_binary_database(aircraft_data, types_data)
 
         # Get version from GitHub
         version = datetime.utcnow().strftime('%Y-%m-%d')
@@ -254,15 +389,17 @@ def download_database(progress_callback=None) -> dict[str, Any]:
 
 def delete_database() -> dict[str, Any]:
     """Delete local database files."""
-    global _aircraft_cache, _types_cache, _db_loaded, _db_version
+    global _registry, _db_loaded, _db_version
 
     try:
         with _cache_lock:
-            _aircraft_cache = {}
-            _types_cache = {}
+            # In-flight lookups keep their reference; the map closes once they finish
+            _registry = None
             _db_loaded = False
             _db_version = None
 
+        if os.path.exists(DB_BIN_FILE):
+            os.remove(DB_BIN_FILE)
         if os.path.exists(DB_FILE):
             os.remove(DB_FILE)
         if os.path.exists(DB_META_FILE):
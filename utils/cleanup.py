@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import contextlib
+import heapq
+import itertools
 import logging
 import threading
 import time
@@ -9,112 +12,216 @@ from typing import Any
 
 logger = logging.getLogger('intercept.cleanup')
 
+# Independent locks per store; point operations on different keys rarely
+# contend, and cleanup only holds one stripe at a time.
+DEFAULT_STRIPES = 16
+
+
+class _Stripe:
+    """One lock's worth of entries with a lazy expiry heap.
+
+    Each key has exactly one live heap entry, pushed when the key is
+    added and matched against ``scheduled``. Refreshing a key only
+    updates its timestamp; the heap entry is moved forward when cleanup
+    reaches it, so writes never touch the heap for existing keys.
+
+    ``order`` holds the store-wide insertion sequence number of each key;
+    ``data`` is in insertion order, so it is also ascending in ``order``.
+    """
+
+    __slots__ = ('lock', 'data', 'timestamps', 'scheduled', 'heap', 'order')
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.data: dict[str, Any] = {}
+        self.timestamps: dict[str, float] = {}
+        self.scheduled: dict[str, float] = {}
+        self.heap: list[tuple[float, str]] = []
+        self.order: dict[str, int] = {}
+
+    def stamp(self, key: str, now: float) -> None:
+        self.timestamps[key] = now
+        if key not in self.scheduled:
+            self.scheduled[key] = now
+            heapq.heappush(self.heap, (now, key))
+
+    def remove(self, key: str) -> None:
+        del self.data[key]
+        del self.timestamps[key]
+        del self.order[key]
+        # The heap entry is dropped when cleanup pops it
+        del self.scheduled[key]
+        if len(self.heap) > 2 * len(self.scheduled) + 64:
+            self.heap = [(ts, k) for k, ts in self.scheduled.items()]
+            heapq.heapify(self.heap)
+
+    def expire(self, cutoff: float) -> int:
+        """Remove entries last stamped before cutoff; cost is O(popped)."""
+        heap = self.heap
+        removed = 0
+        while heap and heap[0][0] < cutoff:
+            ts, key = heapq.heappop(heap)
+            if self.scheduled.get(key) != ts:
+                continue  # deleted (and possibly re-added) since
+            last = self.timestamps[key]
+            if last < cutoff:
+                del self.data[key]
+                del self.timestamps[key]
+                del self.scheduled[key]
+                del self.order[key]
+                removed += 1
+            else:
+                self.scheduled[key] = last
+                heapq.heappush(heap, (last, key))
+        return removed
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.timestamps.clear()
+        self.scheduled.clear()
+        self.heap.clear()
+        self.order.clear()
+
 
 class DataStore:
-    """Thread-safe data store with automatic cleanup of stale entries."""
+    """Thread-safe data store with automatic cleanup of stale entries.
+
+    Keys are spread over lock stripes by hash, so writers and readers of
+    different keys do not serialise on one lock. Bulk reads go through
+    :meth:`snapshot`, which holds every stripe briefly to return a
+    consistent view in insertion order, like a plain dict. Cleanup walks
+    per-stripe expiry heaps and only touches entries that are actually due.
+    """
 
-    def __init__(self, max_age_seconds: float = 300.0, name: str = 'data'):
+    def __init__(self, max_age_seconds: float = 300.0, name: str = 'data', stripes: int = DEFAULT_STRIPES):
         """
         Initialize data store.
 
         Args:
             max_age_seconds: Maximum age of entries before cleanup (default 5 minutes)
             name: Name for logging purposes
+            stripes: Number of independently locked partitions
         """
-        self.data: dict[str, Any] = {}
-        self.timestamps: dict[str, float] = {}
         self.max_age = max_age_seconds
         self.name = name
-        self._lock = threading.Lock()
+        self._stripes = tuple(_Stripe() for _ in range(max(1, stripes)))
+        self._stripe_count = len(self._stripes)
+        self._sequence = itertools.count()
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[hash(key) % self._stripe_count]
+
+    @contextlib.contextmanager
+    def _all_locked(self):
+        # Always acquired in stripe order, so concurrent snapshots cannot deadlock
+        with contextlib.ExitStack() as stack:
+            for stripe in self._stripes:
+                stack.enter_context(stripe.lock)
+            yield
 
     def set(self, key: str, value: Any) -> None:
         """Add or update an entry."""
-        with self._lock:
-            self.data[key] = value
-            self.timestamps[key] = time.time()
+        # Hot path for the decoders: stripe lookup and stamp() are inlined
+        stripe = self._stripes[hash(key) % self._stripe_count]
+        with stripe.lock:
+            if key not in stripe.data:
+                stripe.order[key] = next(self._sequence)
+            stripe.data[key] = value
+            now = stripe.timestamps[key] = time.time()
+            if key not in stripe.scheduled:
+                stripe.scheduled[key] = now
+                heapq.heappush(stripe.heap, (now, key))
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get an entry."""
-        with self._lock:
-            return self.data.get(key, default)
+        stripe = self._stripes[hash(key) % self._stripe_count]
+        with stripe.lock:
+            return stripe.data.get(key, default)
 
     def update(self, key: str, updates: dict) -> None:
         """Update an existing entry with new values."""
-        with self._lock:
-            if key in self.data:
-                if isinstance(self.data[key], dict):
-                    self.data[key].update(updates)
-                else:
-                    self.data[key] = updates
+        stripe = self._stripe(key)
+        with stripe.lock:
+            current = stripe.data.get(key)
+            if isinstance(current, dict):
+                current.update(updates)
             else:
-                self.data[key] = updates
-            self.timestamps[key] = time.time()
+                if key not in stripe.data:
+                    stripe.order[key] = next(self._sequence)
+                stripe.data[key] = updates
+            stripe.stamp(key, time.time())
 
     def touch(self, key: str) -> None:
         """Update timestamp for an entry without changing data."""
-        with self._lock:
-            if key in self.data:
-                self.timestamps[key] = time.time()
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if key in stripe.data:
+                stripe.stamp(key, time.time())
 
     def delete(self, key: str) -> bool:
         """Delete an entry."""
-        with self._lock:
-            if key in self.data:
-                del self.data[key]
-                del self.timestamps[key]
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if key in stripe.data:
+                stripe.remove(key)
                 return True
             return False
 
     def clear(self) -> None:
         """Clear all entries."""
-        with self._lock:
-            self.data.clear()
-            self.timestamps.clear()
+        with self._all_locked():
+            for stripe in self._stripes:
+                stripe.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Consistent copy of all entries across every stripe, in insertion order."""
+        with self._all_locked():
+            runs = [
+                [(stripe.order[key], key, value) for key, value in stripe.data.items()]
+                for stripe in self._stripes
+            ]
+        # Each stripe is already in sequence order; sequence numbers are unique
+        return {key: value for _, key, value in heapq.merge(*runs)}
 
     def all(self) -> dict[str, Any]:
         """Get a copy of all data."""
-        with self._lock:
-            return dict(self.data)
+        return self.snapshot()
 
     def keys(self) -> list[str]:
         """Get all keys."""
-        with self._lock:
-            return list(self.data.keys())
+        return list(self.snapshot())
 
     def values(self) -> list[Any]:
         """Get all values."""
-        with self._lock:
-            return list(self.data.values())
+        return list(self.snapshot().values())
 
     def items(self) -> list[tuple[str, Any]]:
         """Get all items."""
-        with self._lock:
-            return list(self.data.items())
+        return list(self.snapshot().items())
 
     def __len__(self) -> int:
-        with self._lock:
-            return len(self.data)
+        with self._all_locked():
+            return sum(len(stripe.data) for stripe in self._stripes)
 
     def __contains__(self, key: str) -> bool:
-        with self._lock:
-            return key in self.data
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return key in stripe.data
 
     def __getitem__(self, key: str) -> Any:
         """Get an entry using subscript notation."""
-        with self._lock:
-            return self.data[key]
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.data[key]
 
     def __setitem__(self, key: str, value: Any) -> None:
         """Set an entry using subscript notation."""
-        with self._lock:
-            self.data[key] = value
-            self.timestamps[key] = time.time()
+        self.set(key, value)
 
     def __delitem__(self, key: str) -> None:
         """Delete an entry using subscript notation."""
-        with self._lock:
-            del self.data[key]
-            del self.timestamps[key]
+        if not self.delete(key):
+            raise KeyError(key)
 
     def cleanup(self) -> int:
         """
@@ -123,22 +230,17 @@ class DataStore:
         Returns:
             Number of entries removed
         """
-        now = time.time()
-        expired = []
-
-        with self._lock:
-            for key, timestamp in self.timestamps.items():
-                if now - timestamp > self.max_age:
-                    expired.append(key)
+        cutoff = time.time() - self.max_age
+        removed = 0
 
-            for key in expired:
-                del self.data[key]
-                del self.timestamps[key]
+        for stripe in self._stripes:
+            with stripe.lock:
+                removed += stripe.expire(cutoff)
 
-        if expired:
-            logger.debug(f"{self.name}: Cleaned up {len(expired)} stale entries")
+        if removed:
+            logger.debug(f"{self.name}: Cleaned up {removed} stale entries")
 
-        return len(expired)
+        return removed
 
 
 class CleanupManager:
@@ -75,6 +75,12 @@ SSE_KEEPALIVE_INTERVAL = 30.0
 # Queue get timeout for SSE generators (seconds)
 SSE_QUEUE_TIMEOUT = 1.0
 
+# Full keyframe interval for delta SSE streams (seconds)
+SSE_DELTA_KEYFRAME_INTERVAL = 60.0
+
+# Most message keys numbered by a binary stream codec's key dictionary
+STREAM_CODEC_MAX_KEYS = 1024
+
 
 # =============================================================================
 # DATA RETENTION / CLEANUP (seconds)
@@ -333,3 +339,6 @@ MAX_DEAUTH_ALERTS_AGE_SECONDS = 300  # 5 minutes
 # Deauth detector sniff timeout (seconds)
 DEAUTH_SNIFF_TIMEOUT = 0.5
 
+# Maximum age of the cached known-AP BSSID set used for spoof checks (seconds)
+DEAUTH_KNOWN_AP_REFRESH = 10.0
+
@@ -8,15 +8,20 @@ signals likely belong to the same physical device.
 from __future__ import annotations
 
 import logging
+import math
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 
-from utils.database import add_correlation
+from utils.database import add_correlations
 from utils.database import get_correlations as db_get_correlations
 
 logger = logging.getLogger('intercept.correlation')
 
+WIFI = 0
+BLUETOOTH = 1
+
 
 @dataclass
 class DeviceObservation:
@@ -37,13 +42,23 @@ class DeviceCorrelator:
     1. They appear within a short time window of each other
     2. They have similar signal strength patterns (optional)
     3. They share the same OUI/manufacturer (bonus confidence)
+
+    Only co-located pairs are scored. Sightings are hashed into fixed
+    time buckets that persist between calls: a device's presence span
+    fills the buckets it covers, and its first sighting is also filed as
+    an arrival. Two overlapping devices always share the bucket where the
+    later one arrived, so pairs are discovered once, when that arrival
+    (or the span reaching it) is filed, and kept for later refreshes.
+    Every other pair is skipped without evaluation.
     """
 
     def __init__(
         self,
         time_window_seconds: int = 30,
         min_confidence: float = 0.5,
-        rssi_threshold: int = 20
+        rssi_threshold: int = 20,
+        bucket_seconds: int = 10,
+        history_seconds: int = 3600,
     ):
         """
         Initialize correlator.
@@ -52,10 +67,27 @@ class DeviceCorrelator:
             time_window_seconds: Max time difference for correlation (default 30s)
             min_confidence: Minimum confidence score to report (default 0.5)
             rssi_threshold: Max RSSI difference for signal-based correlation
+            bucket_seconds: Width of the co-location time buckets (default 10s)
+            history_seconds: How far back buckets and counters are kept (default 1h)
         """
         self.time_window = timedelta(seconds=time_window_seconds)
         self.min_confidence = min_confidence
         self.rssi_threshold = rssi_threshold
+        self.bucket_seconds = bucket_seconds
+        self.history_buckets = max(1, history_seconds // bucket_seconds)
+
+        self._lock = threading.Lock()
+        # bucket -> (wifi MACs, bluetooth MACs)
+        self._presence: dict[int, tuple[set[str], set[str]]] = {}
+        self._arrivals: dict[int, tuple[set[str], set[str]]] = {}
+        # (side, MAC) -> (first bucket, last registered bucket)
+        self._spans: dict[tuple[int, str], tuple[int, int]] = {}
+        # wifi MAC -> candidate bt MACs
+        self._pairs: dict[str, set[str]] = {}
+        # Last observation per device and [confidence, result] per pair
+        self._observed: dict[tuple[int, str], DeviceObservation] = {}
+        self._scores: dict[tuple[str, str], list] = {}
+        self._newest_bucket: int | None = None
 
     def correlate(
         self,
@@ -72,50 +104,207 @@ class DeviceCorrelator:
         Returns:
             List of correlation results with confidence scores
         """
+        wifi_obs = self._observations(wifi_devices, 'wifi')
+        bt_obs = self._observations(bt_devices, 'bluetooth')
+        if not wifi_obs or not bt_obs:
+            return []
+
         correlations = []
+        persist = []
 
-        for wifi_mac, wifi_data in wifi_devices.items():
-            wifi_obs = self._to_observation(wifi_mac, wifi_data, 'wifi')
-            if not wifi_obs:
-                continue
+        with self._lock:
+            self._index(wifi_obs, bt_obs)
+            changed_wifi = self._changed(WIFI, wifi_obs)
+            changed_bt = self._changed(BLUETOOTH, bt_obs)
 
-            for bt_mac, bt_data in bt_devices.items():
-                bt_obs = self._to_observation(bt_mac, bt_data, 'bluetooth')
-                if not bt_obs:
+            for wifi_mac, wifi in wifi_obs.items():
+                partners = self._pairs.get(wifi_mac)
+                if not partners:
                     continue
 
-                confidence = self._calculate_confidence(wifi_obs, bt_obs)
+                for bt_mac in partners:
+                    bt = bt_obs.get(bt_mac)
+                    if bt is None:
+                        continue
+
+                    # Scores only depend on the two observations, so pairs
+                    # where neither side changed reuse the previous result
+                    key = (wifi_mac, bt_mac)
+                    fresh = wifi_mac in changed_wifi or bt_mac in changed_bt or key not in self._scores
+                    if fresh:
+                        confidence = self._calculate_confidence(wifi, bt) if self._co_located(wifi, bt) else -1.0
+                        self._scores[key] = [confidence, None]
+                    scored = self._scores[key]
+                    confidence = scored[0]
+
+                    if confidence >= self.min_confidence:
+                        if scored[1] is None:
+                            scored[1] = {
+                                'wifi_mac': wifi_mac,
+                                'wifi_name': wifi.name,
+                                'bt_mac': bt_mac,
+                                'bt_name': bt.name,
+                                'confidence': round(confidence, 2),
+                                'co_occurrences': self._co_occurrences(wifi_mac, bt_mac),
+                                'reason': self._get_correlation_reason(wifi, bt)
+                            }
+                        correlations.append(dict(scored[1]))
+
+                        # Persist new or changed high-confidence correlations
+                        if fresh and confidence >= 0.7:
+                            persist.append((wifi_mac, bt_mac, confidence, {
+                                'wifi_name': wifi.name,
+                                'bt_name': bt.name
+                            }))
 
-                if confidence >= self.min_confidence:
-                    correlations.append({
-                        'wifi_mac': wifi_mac,
-                        'wifi_name': wifi_obs.name,
-                        'bt_mac': bt_mac,
-                        'bt_name': bt_obs.name,
-                        'confidence': round(confidence, 2),
-                        'reason': self._get_correlation_reason(wifi_obs, bt_obs)
-                    })
-
-                    # Persist high-confidence correlations
-                    if confidence >= 0.7:
-                        try:
-                            add_correlation(
-                                wifi_mac=wifi_mac,
-                                bt_mac=bt_mac,
-                                confidence=confidence,
-                                metadata={
-                                    'wifi_name': wifi_obs.name,
-                                    'bt_name': bt_obs.name
-                                }
-                            )
-                        except Exception as e:
-                            logger.debug(f"Failed to persist correlation: {e}")
+        try:
+            add_correlations(persist)
+        except Exception as e:
+            logger.debug(f"Failed to persist correlations: {e}")
 
         # Sort by confidence (highest first)
         correlations.sort(key=lambda x: x['confidence'], reverse=True)
 
         return correlations
 
+    def _observations(
+        self,
+        devices: dict[str, dict[str, Any]],
+        device_type: str
+    ) -> dict[str, DeviceObservation]:
+        """Parse each device once per refresh."""
+        observations = {}
+        for mac, data in devices.items():
+            obs = self._to_observation(mac, data, device_type)
+            if obs:
+                observations[mac] = obs
+        return observations
+
+    def _changed(self, side: int, observations: dict[str, DeviceObservation]) -> set[str]:
+        """MACs whose observation differs from the previous refresh."""
+        changed = set()
+        for mac, obs in observations.items():
+            if self._observed.get((side, mac)) != obs:
+                self._observed[(side, mac)] = obs
+                changed.add(mac)
+        return changed
+
+    def _bucket(self, when: datetime) -> int:
+        return int(when.timestamp() // self.bucket_seconds)
+
+    def _index(
+        self,
+        wifi_obs: dict[str, DeviceObservation],
+        bt_obs: dict[str, DeviceObservation]
+    ) -> None:
+        """File new sightings into the time buckets, updating pair counters."""
+        newest = max(
+            self._bucket(obs.last_seen)
+            for observations in (wifi_obs, bt_obs)
+            for obs in observations.values()
+        )
+        if self._newest_bucket is None or newest > self._newest_bucket:
+            self._newest_bucket = newest
+            self._prune(newest - self.history_buckets)
+        cutoff = self._newest_bucket - self.history_buckets
+
+        # Extend presence first so arrivals filed below see every device
+        # present in their bucket, including ones first seen this refresh
+        arrivals = []
+        for side, observations in ((WIFI, wifi_obs), (BLUETOOTH, bt_obs)):
+            for mac, obs in observations.items():
+                first = self._bucket(obs.first_seen)
+                last = max(first, self._bucket(obs.last_seen))
+                span = self._spans.get((side, mac))
+                if span is None or span[0] != first:
+                    # New device, or one that reappeared with a fresh first_seen
+                    arrivals.append((side, mac, first))
+                    start = first
+                elif last > span[1]:
+                    start = span[1] + 1
+                else:
+                    continue
+                for bucket in range(max(start, cutoff), last + 1):
+                    self._add_presence(side, mac, bucket)
+                self._spans[(side, mac)] = (first, last)
+
+        for side, mac, first in arrivals:
+            self._add_arrival(side, mac, first)
+
+    def _add_presence(self, side: int, mac: str, bucket: int) -> None:
+        members = self._presence.get(bucket)
+        if members is None:
+            members = self._presence[bucket] = (set(), set())
+        members[side].add(mac)
+        # Devices that arrived here earlier now overlap this one
+        arrived = self._arrivals.get(bucket)
+        if arrived:
+            for other in arrived[1 - side]:
+                self._add_pair(side, mac, other)
+
+    def _add_arrival(self, side: int, mac: str, bucket: int) -> None:
+        members = self._arrivals.get(bucket)
+        if members is None:
+            members = self._arrivals[bucket] = (set(), set())
+        members[side].add(mac)
+
+        present = self._presence.get(bucket)
+        if present:
+            for other in present[1 - side]:
+                self._add_pair(side, mac, other)
+
+        reach = math.ceil(self.time_window.total_seconds() / self.bucket_seconds)
+        for nearby in range(bucket - reach, bucket + reach + 1):
+            others = self._arrivals.get(nearby)
+            if others:
+                for other in others[1 - side]:
+                    self._add_pair(side, mac, other)
+
+    def _add_pair(self, side: int, mac: str, other: str) -> None:
+        wifi_mac, bt_mac = (mac, other) if side == WIFI else (other, mac)
+        partners = self._pairs.get(wifi_mac)
+        if partners is None:
+            partners = self._pairs[wifi_mac] = set()
+        partners.add(bt_mac)
+
+    def _co_occurrences(self, wifi_mac: str, bt_mac: str) -> int:
+        """Number of buckets both devices were present in."""
+        wifi = self._spans.get((WIFI, wifi_mac))
+        bt = self._spans.get((BLUETOOTH, bt_mac))
+        if wifi is None or bt is None:
+            return 0
+        return max(0, min(wifi[1], bt[1]) - max(wifi[0], bt[0]) + 1)
+
+    def _prune(self, cutoff: int) -> None:
+        """Forget buckets, spans and pairs older than the history window."""
+        for table in (self._presence, self._arrivals):
+            for bucket in [b for b in table if b < cutoff]:
+                del table[bucket]
+        expired = [k for k, span in self._spans.items() if span[1] < cutoff]
+        if not expired:
+            return
+        for key in expired:
+            del self._spans[key]
+            self._observed.pop(key, None)
+        # Pairs live as long as both devices do
+        for wifi_mac in list(self._pairs):
+            if (WIFI, wifi_mac) not in self._spans:
+                del self._pairs[wifi_mac]
+                continue
+            partners = self._pairs[wifi_mac]
+            partners.difference_update([m for m in partners if (BLUETOOTH, m) not in self._spans])
+            if not partners:
+                del self._pairs[wifi_mac]
+        for key in [k for k in self._scores if k[1] not in self._pairs.get(k[0], ())]:
+            del self._scores[key]
+
+    def _co_located(self, wifi: DeviceObservation, bt: DeviceObservation) -> bool:
+        """Whether the timing check gives the pair any credit."""
+        time_diff = abs((wifi.first_seen - bt.first_seen).total_seconds())
+        if time_diff <= self.time_window.total_seconds():
+            return True
+        return wifi.first_seen <= bt.last_seen and bt.first_seen <= wifi.last_seen
+
     def _to_observation(
         self,
         mac: str,
@@ -288,14 +477,10 @@ def get_correlations(
     if include_historical:
         try:
             historical = db_get_correlations(min_confidence)
+            live_pairs = {(r['wifi_mac'], r['bt_mac']) for r in results}
             for h in historical:
                 # Avoid duplicates
-                existing = next(
-                    (r for r in results
-                     if r['wifi_mac'] == h['wifi_mac'] and r['bt_mac'] == h['bt_mac']),
-                    None
-                )
-                if not existing:
+                if (h['wifi_mac'], h['bt_mac']) not in live_pairs:
                     results.append({
                         'wifi_mac': h['wifi_mac'],
                         'bt_mac': h['bt_mac'],
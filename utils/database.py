@@ -4,11 +4,15 @@ SQLite database utilities for persistent settings storage.
 
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import logging
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
@@ -22,6 +26,34 @@ DB_PATH = DB_DIR / 'intercept.db'
 
 # Thread-local storage for connections
 _local = threading.local()
+# Bumped by close_db(); other threads reopen connections from older generations
+_connection_generation = 0
+
+# Settings read-through cache (key -> (decoded value, expires_at)).
+# Local writes invalidate immediately; the TTL bounds staleness when another
+# process (e.g. a second gunicorn worker) changes a setting.
+SETTINGS_CACHE_TTL = 5.0
+_settings_cache: dict[str, tuple[Any, float]] = {}
+_settings_cache_lock = threading.Lock()
+_MISSING = object()
+
+# Connection profile applied to every connection, in order
+SQLITE_PRAGMAS = (
+    ('foreign_keys', 'ON'),
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),        # safe under WAL; only an OS crash can lose the last commits
+    ('busy_timeout', '5000'),         # ms to wait on another writer before "database is locked"
+    ('cache_size', '-16384'),         # negative = KiB, i.e. 16 MiB page cache
+    ('temp_store', 'MEMORY'),         # sorts and temp B-trees stay off disk
+    ('mmap_size', str(128 * 1024 * 1024)),
+)
+
+# Pages returned to the filesystem per maintenance run
+DB_INCREMENTAL_VACUUM_PAGES = 2000
+
+# Write-behind batching for high-rate append-only tables
+WRITE_BEHIND_MAX_ROWS = 500       # flush once a buffer holds this many rows
+WRITE_BEHIND_MAX_DELAY = 2.0      # ...or once its oldest row is this old (seconds)
 
 
 def get_db_path() -> Path:
@@ -32,15 +64,19 @@ def get_db_path() -> Path:
 
 def get_connection() -> sqlite3.Connection:
     """Get a thread-local database connection."""
-    if not hasattr(_local, 'connection') or _local.connection is None:
+    conn = getattr(_local, 'connection', None)
+    if conn is not None and (_local.generation != _connection_generation or _local.db_path != DB_PATH):
+        # close_db() ran on another thread, or the database moved (tests swap DB_PATH)
+        conn.close()
+        _local.connection = None
+    if getattr(_local, 'connection', None) is None:
         db_path = get_db_path()
         try:
+            _local.generation = _connection_generation
+            _local.db_path = db_path
             _local.connection = sqlite3.connect(str(db_path), check_same_thread=False)
             _local.connection.row_factory = sqlite3.Row
-            # Enable foreign keys
-            _local.connection.execute('PRAGMA foreign_keys = ON')
-            # Use WAL mode for better concurrent read/write performance
-            _local.connection.execute('PRAGMA journal_mode = WAL')
+            _apply_connection_profile(_local.connection)
         except sqlite3.OperationalError as e:
             logger.error(
                 f"Cannot open database at {db_path}: {e}. "
@@ -51,6 +87,16 @@ def get_connection() -> sqlite3.Connection:
     return _local.connection
 
 
+def _apply_connection_profile(conn: sqlite3.Connection) -> None:
+    """Apply the tuned pragmas in SQLITE_PRAGMAS to a new connection."""
+    # auto_vacuum can only be chosen before the first page is written, and
+    # switching to WAL writes the header, so do it first on a fresh file
+    if conn.execute('PRAGMA page_count').fetchone()[0] == 0:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    for name, value in SQLITE_PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+
+
 @contextmanager
 def get_db():
     """Context manager for database operations."""
@@ -102,6 +148,7 @@ def _file_owner(path: Path) -> str:
 def init_db() -> None:
     """Initialize the database schema."""
     db_path = get_db_path()
+    invalidate_settings_cache()
     logger.info(f"Initializing database at {db_path}")
 
     _check_db_writable(db_path)
@@ -772,14 +819,305 @@ def init_db() -> None:
         if 'tasks_json' not in profile_cols:
             conn.execute('ALTER TABLE observation_profiles ADD COLUMN tasks_json TEXT')
 
+        _create_query_indexes(conn)
+
         logger.info("Database initialized successfully")
 
 
+# Indexes backing hot filters, retention DELETEs and foreign-key lookups.
+# Kept separate from the CREATE TABLE blocks so existing installs pick them
+# up on the next start; tests/test_database_query_plans.py guards coverage.
+QUERY_INDEXES = (
+    ('idx_signal_history_timestamp', 'signal_history', 'timestamp'),
+    ('idx_device_correlations_confidence', 'device_correlations', 'confidence'),
+    ('idx_alert_events_mode_severity', 'alert_events', 'mode, severity, created_at'),
+    ('idx_alert_events_severity', 'alert_events', 'severity, created_at'),
+    ('idx_alert_events_rule', 'alert_events', 'rule_id'),
+    ('idx_recording_sessions_mode', 'recording_sessions', 'mode, started_at'),
+    ('idx_recording_sessions_started', 'recording_sessions', 'started_at'),
+    ('idx_tscm_threats_acknowledged', 'tscm_threats', 'acknowledged, severity'),
+    ('idx_tscm_schedules_baseline', 'tscm_schedules', 'baseline_id'),
+    ('idx_tscm_timelines_timestamp', 'tscm_device_timelines', 'timestamp'),
+    ('idx_tscm_timelines_sweep', 'tscm_device_timelines', 'sweep_id'),
+    ('idx_tscm_known_devices_location', 'tscm_known_devices', 'location'),
+    ('idx_tscm_known_devices_scope', 'tscm_known_devices', 'scope'),
+    ('idx_tscm_case_sweeps_sweep', 'tscm_case_sweeps', 'sweep_id'),
+    ('idx_tscm_case_threats_threat', 'tscm_case_threats', 'threat_id'),
+    ('idx_tscm_case_notes_case', 'tscm_case_notes', 'case_id, created_at'),
+    ('idx_tscm_meeting_windows_sweep', 'tscm_meeting_windows', 'sweep_id, start_time'),
+    ('idx_tscm_meeting_windows_open', 'tscm_meeting_windows', 'end_time, start_time'),
+    ('idx_dsc_alerts_acknowledged', 'dsc_alerts', 'acknowledged, category, received_at'),
+    ('idx_push_payloads_received_at', 'push_payloads', 'received_at'),
+    ('idx_push_payloads_scan_type', 'push_payloads', 'scan_type, received_at'),
+    ('idx_gs_observations_profile', 'ground_station_observations', 'profile_id'),
+    ('idx_sigmf_recordings_observation', 'sigmf_recordings', 'observation_id'),
+)
+
+
+def _create_query_indexes(conn: sqlite3.Connection) -> None:
+    """Create any missing indexes from QUERY_INDEXES."""
+    for name, table, columns in QUERY_INDEXES:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})')
+
+
+def run_db_maintenance() -> int:
+    """
+    Periodic upkeep: refresh query planner statistics and release free pages.
+
+    Registered with the cleanup manager alongside the retention jobs.
+
+    Returns:
+        Always 0 (nothing is deleted; the cleanup manager counts rows)
+    """
+    with get_db() as conn:
+        conn.execute('PRAGMA optimize')
+        # Only databases created with auto_vacuum=INCREMENTAL (2) can shrink in place
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if free_pages:
+                # executescript steps the pragma to completion; execute() frees one page
+                conn.executescript(f'PRAGMA incremental_vacuum({DB_INCREMENTAL_VACUUM_PAGES});')
+                released = free_pages - conn.execute('PRAGMA freelist_count').fetchone()[0]
+                logger.debug(f"Database maintenance released {released} free pages")
+    return 0
+
+
 def close_db() -> None:
-    """Close the thread-local database connection."""
-    if hasattr(_local, 'connection') and _local.connection is not None:
+    """
+    Flush pending batched writes and close the thread-local database connection.
+
+    Connections held by other threads, such as the write-behind flusher, are
+    reopened on their next use. Registered with atexit, so rows still queued
+    at shutdown are written.
+    """
+    global _connection_generation
+    try:
+        flush_write_behind()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to flush batched writes on close: {e}")
+    _connection_generation += 1
+    if getattr(_local, 'connection', None) is not None:
+        try:
+            _local.connection.execute('PRAGMA optimize')
+        except sqlite3.Error as e:
+            logger.debug(f"PRAGMA optimize failed on close: {e}")
         _local.connection.close()
         _local.connection = None
+    invalidate_settings_cache()
+
+
+# =============================================================================
+# Write-Behind Batching
+# =============================================================================
+
+class WriteBehindBuffer:
+    """
+    Batches INSERTs for a high-rate append-only table.
+
+    Rows are queued in memory and written with a single ``executemany`` inside
+    one transaction once the buffer reaches ``max_rows`` or its oldest row is
+    older than ``max_delay`` seconds. Flushing happens on a shared background
+    thread; callers only block if the flusher falls far behind.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sql: str,
+        max_rows: int = WRITE_BEHIND_MAX_ROWS,
+        max_delay: float = WRITE_BEHIND_MAX_DELAY,
+    ):
+        self.name = name
+        self.sql = sql
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._rows: list[tuple] = []
+        self._oldest: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def append(self, params: tuple) -> None:
+        """Queue one row of INSERT parameters."""
+        with self._lock:
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._rows.append(params)
+            pending = len(self._rows)
+
+        if pending >= self.max_rows * 4:
+            # Flusher is not keeping up: apply backpressure on the producer
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name}: batched write failed: {e}")
+        elif pending >= self.max_rows:
+            _wake_write_behind_flusher()
+        else:
+            _ensure_write_behind_flusher()
+
+    def is_due(self, now: float) -> bool:
+        """Whether the size or age trigger has fired."""
+        with self._lock:
+            if not self._rows:
+                return False
+            return len(self._rows) >= self.max_rows or now - self._oldest >= self.max_delay
+
+    def flush(self) -> int:
+        """
+        Write all queued rows in one transaction.
+
+        If the write fails (e.g. "database is locked"), the rows go back to
+        the head of the queue for the next flush, keeping at most
+        ``max_rows * 10``; any beyond that are counted as dropped.
+
+        Returns:
+            Number of rows written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                oldest, self._oldest = self._oldest, None
+            if not rows:
+                return 0
+
+            try:
+                written = self._write(rows)
+            except sqlite3.Error:
+                self._requeue(rows, oldest)
+                raise
+
+            self.rows_written += written
+            self.flushes += 1
+            return written
+
+    def _write(self, rows: list[tuple]) -> int:
+        try:
+            with get_db() as conn:
+                conn.executemany(self.sql, rows)
+            return len(rows)
+        except sqlite3.IntegrityError:
+            # One bad row (e.g. a deleted foreign key) must not sink the batch
+            written = 0
+            with get_db() as conn:
+                for row in rows:
+                    try:
+                        conn.execute(self.sql, row)
+                        written += 1
+                    except sqlite3.IntegrityError as e:
+                        logger.debug(f"{self.name}: dropping batched row: {e}")
+            self.rows_dropped += len(rows) - written
+            return written
+
+    def _requeue(self, rows: list[tuple], oldest: float | None) -> None:
+        with self._lock:
+            self._rows[:0] = rows
+            self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+            excess = len(self._rows) - self.max_rows * 10
+            if excess > 0:
+                # Drop the oldest rows rather than grow without bound
+                del self._rows[:excess]
+                self.rows_dropped += excess
+                logger.warning(f"{self.name}: dropped {excess} rows after repeated write failures")
+
+
+_write_behind_buffers: dict[str, WriteBehindBuffer] = {}
+_write_behind_lock = threading.Lock()
+_write_behind_wakeup = threading.Event()
+_write_behind_thread: threading.Thread | None = None
+
+
+def get_write_behind_buffer(name: str, sql: str, **kwargs) -> WriteBehindBuffer:
+    """Get (or create) the named write-behind buffer for an INSERT statement."""
+    with _write_behind_lock:
+        buffer = _write_behind_buffers.get(name)
+        if buffer is None:
+            buffer = WriteBehindBuffer(name, sql, **kwargs)
+            _write_behind_buffers[name] = buffer
+        return buffer
+
+
+def flush_write_behind(name: str | None = None) -> int:
+    """
+    Synchronously flush pending batched writes.
+
+    Args:
+        name: Buffer to flush, or None for all buffers.
+
+    Returns:
+        Number of rows written.
+    """
+    with _write_behind_lock:
+        if name is not None:
+            buffers = [_write_behind_buffers[name]] if name in _write_behind_buffers else []
+        else:
+            buffers = list(_write_behind_buffers.values())
+    return sum(buffer.flush() for buffer in buffers)
+
+
+def get_write_behind_stats() -> dict[str, dict]:
+    """Get pending/written counters for each write-behind buffer."""
+    with _write_behind_lock:
+        buffers = list(_write_behind_buffers.values())
+    return {
+        b.name: {
+            'pending': len(b),
+            'rows_written': b.rows_written,
+            'rows_dropped': b.rows_dropped,
+            'flushes': b.flushes,
+        }
+        for b in buffers
+    }
+
+
+def _write_behind_loop() -> None:
+    """Background flusher for all write-behind buffers."""
+    while True:
+        _write_behind_wakeup.wait(timeout=WRITE_BEHIND_MAX_DELAY / 2)
+        _write_behind_wakeup.clear()
+
+        now = time.monotonic()
+        with _write_behind_lock:
+            buffers = list(_write_behind_buffers.values())
+        for buffer in buffers:
+            if buffer.is_due(now):
+                try:
+                    buffer.flush()
+                except Exception as e:
+                    logger.warning(f"{buffer.name}: batched write failed: {e}")
+
+
+def _ensure_write_behind_flusher() -> None:
+    global _write_behind_thread
+    if _write_behind_thread is not None and _write_behind_thread.is_alive():
+        return
+    with _write_behind_lock:
+        if _write_behind_thread is None or not _write_behind_thread.is_alive():
+            _write_behind_thread = threading.Thread(
+                target=_write_behind_loop,
+                name='db-write-behind',
+                daemon=True,
+            )
+            _write_behind_thread.start()
+
+
+def _wake_write_behind_flusher() -> None:
+    _ensure_write_behind_flusher()
+    _write_behind_wakeup.set()
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in SQLite CURRENT_TIMESTAMP format."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+atexit.register(close_db)
 
 
 # =============================================================================
@@ -797,6 +1135,16 @@ def get_setting(key: str, default: Any = None) -> Any:
     Returns:
         Setting value (auto-converted from JSON for complex types)
     """
+    now = time.monotonic()
+    with _settings_cache_lock:
+        cached = _settings_cache.get(key)
+    if cached is not None and cached[1] > now:
+        value = cached[0]
+        if value is _MISSING:
+            return default
+        # Never hand out the cached object itself for mutable JSON values
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
     try:
         with get_db() as conn:
             cursor = conn.execute(
@@ -804,29 +1152,47 @@ def get_setting(key: str, default: Any = None) -> Any:
                 (key,)
             )
             row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        logger.warning("Database unavailable reading setting '%s', using default", key)
+        return default
 
-            if row is None:
-                return default
+    if row is None:
+        value = _MISSING
+    else:
+        value = _decode_setting(row['value'], row['value_type'], _MISSING)
 
-            value, value_type = row['value'], row['value_type']
+    with _settings_cache_lock:
+        _settings_cache[key] = (value, now + SETTINGS_CACHE_TTL)
 
-            # Convert based on type
-            if value_type == 'json':
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return default
-            elif value_type == 'int':
-                return int(value)
-            elif value_type == 'float':
-                return float(value)
-            elif value_type == 'bool':
-                return value.lower() in ('true', '1', 'yes')
-            else:
-                return value
-    except sqlite3.OperationalError:
-        logger.warning("Database unavailable reading setting '%s', using default", key)
+    if value is _MISSING:
         return default
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+def _decode_setting(value: str, value_type: str, default: Any) -> Any:
+    """Convert a stored setting string back to its Python type."""
+    if value_type == 'json':
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return default
+    elif value_type == 'int':
+        return int(value)
+    elif value_type == 'float':
+        return float(value)
+    elif value_type == 'bool':
+        return value.lower() in ('true', '1', 'yes')
+    else:
+        return value
+
+
+def invalidate_settings_cache(key: str | None = None) -> None:
+    """Drop one key (or all keys) from the settings cache."""
+    with _settings_cache_lock:
+        if key is None:
+            _settings_cache.clear()
+        else:
+            _settings_cache.pop(key, None)
 
 
 def set_setting(key: str, value: Any) -> None:
@@ -863,6 +1229,7 @@ def set_setting(key: str, value: Any) -> None:
                 value_type = excluded.value_type,
                 updated_at = CURRENT_TIMESTAMP
         ''', (key, str_value, value_type))
+    invalidate_settings_cache(key)
 
 
 def delete_setting(key: str) -> bool:
@@ -877,7 +1244,8 @@ def delete_setting(key: str) -> bool:
     """
     with get_db() as conn:
         cursor = conn.execute('DELETE FROM settings WHERE key = ?', (key,))
-        return cursor.rowcount > 0
+    invalidate_settings_cache(key)
+    return cursor.rowcount > 0
 
 
 def get_all_settings() -> dict[str, Any]:
@@ -888,20 +1256,7 @@ def get_all_settings() -> dict[str, Any]:
 
         for row in cursor:
             key, value, value_type = row['key'], row['value'], row['value_type']
-
-            if value_type == 'json':
-                try:
-                    settings[key] = json.loads(value)
-                except json.JSONDecodeError:
-                    settings[key] = value
-            elif value_type == 'int':
-                settings[key] = int(value)
-            elif value_type == 'float':
-                settings[key] = float(value)
-            elif value_type == 'bool':
-                settings[key] = value.lower() in ('true', '1', 'yes')
-            else:
-                settings[key] = value
+            settings[key] = _decode_setting(value, value_type, value)
 
         return settings
 
@@ -910,18 +1265,23 @@ def get_all_settings() -> dict[str, Any]:
 # Signal History Functions
 # =============================================================================
 
+_signal_history_buffer = get_write_behind_buffer('signal_history', '''
+    INSERT INTO signal_history (mode, device_id, signal_strength, timestamp, metadata)
+    VALUES (?, ?, ?, ?, ?)
+''')
+
+
 def add_signal_reading(
     mode: str,
     device_id: str,
     signal_strength: float,
     metadata: dict | None = None
 ) -> None:
-    """Add a signal strength reading."""
-    with get_db() as conn:
-        conn.execute('''
-            INSERT INTO signal_history (mode, device_id, signal_strength, metadata)
-            VALUES (?, ?, ?, ?)
-        ''', (mode, device_id, signal_strength, json.dumps(metadata) if metadata else None))
+    """Queue a signal strength reading (written in batches)."""
+    _signal_history_buffer.append((
+        mode, device_id, signal_strength, _utc_timestamp(),
+        json.dumps(metadata) if metadata else None,
+    ))
 
 
 def get_signal_history(
@@ -942,6 +1302,7 @@ def get_signal_history(
     Returns:
         List of signal readings with timestamp
     """
+    _signal_history_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('''
             SELECT signal_strength, timestamp, metadata
@@ -973,6 +1334,7 @@ def cleanup_old_signal_history(max_age_hours: int = 24) -> int:
     Returns:
         Number of deleted entries
     """
+    _signal_history_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('''
             DELETE FROM signal_history
@@ -992,15 +1354,28 @@ def add_correlation(
     metadata: dict | None = None
 ) -> None:
     """Add or update a device correlation."""
+    add_correlations([(wifi_mac, bt_mac, confidence, metadata)])
+
+
+def add_correlations(rows: list[tuple[str, str, float, dict | None]]) -> None:
+    """Add or update many device correlations in one transaction.
+
+    Each row is ``(wifi_mac, bt_mac, confidence, metadata)``.
+    """
+    if not rows:
+        return
     with get_db() as conn:
-        conn.execute('''
+        conn.executemany('''
             INSERT INTO device_correlations (wifi_mac, bt_mac, confidence, metadata, last_seen)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
             ON CONFLICT(wifi_mac, bt_mac) DO UPDATE SET
                 confidence = excluded.confidence,
                 last_seen = CURRENT_TIMESTAMP,
                 metadata = excluded.metadata
-        ''', (wifi_mac, bt_mac, confidence, json.dumps(metadata) if metadata else None))
+        ''', [
+            (wifi_mac, bt_mac, confidence, json.dumps(metadata) if metadata else None)
+            for wifi_mac, bt_mac, confidence, metadata in rows
+        ])
 
 
 def get_correlations(min_confidence: float = 0.5) -> list[dict]:
@@ -1388,6 +1763,13 @@ def get_tscm_threat_summary() -> dict:
 # TSCM Device Timeline Functions
 # =============================================================================
 
+_timeline_buffer = get_write_behind_buffer('tscm_device_timelines', '''
+    INSERT INTO tscm_device_timelines
+    (device_identifier, protocol, sweep_id, timestamp, rssi, presence, channel, frequency, attributes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+''')
+
+
 def add_device_timeline_entry(
     device_identifier: str,
     protocol: str,
@@ -1397,18 +1779,12 @@ def add_device_timeline_entry(
     channel: int | None = None,
     frequency: float | None = None,
     attributes: dict | None = None
-) -> int:
-    """Add a device timeline observation entry."""
-    with get_db() as conn:
-        cursor = conn.execute('''
-            INSERT INTO tscm_device_timelines
-            (device_identifier, protocol, sweep_id, rssi, presence, channel, frequency, attributes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            device_identifier, protocol, sweep_id, rssi, presence,
-            channel, frequency, json.dumps(attributes) if attributes else None
-        ))
-        return cursor.lastrowid
+) -> None:
+    """Queue a device timeline observation entry (written in batches)."""
+    _timeline_buffer.append((
+        device_identifier, protocol, sweep_id, _utc_timestamp(), rssi, presence,
+        channel, frequency, json.dumps(attributes) if attributes else None
+    ))
 
 
 def get_device_timeline(
@@ -1417,6 +1793,7 @@ def get_device_timeline(
     since_hours: int = 24
 ) -> list[dict]:
     """Get timeline entries for a device."""
+    _timeline_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('''
             SELECT * FROM tscm_device_timelines
@@ -1445,6 +1822,7 @@ def get_device_timeline(
 
 def cleanup_old_timeline_entries(max_age_hours: int = 72) -> int:
     """Remove old timeline entries."""
+    _timeline_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('''
             DELETE FROM tscm_device_timelines
@@ -2221,6 +2599,7 @@ def create_agent(
 
 def get_agent(agent_id: int) -> dict | None:
     """Get an agent by ID."""
+    _agent_seen_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('SELECT * FROM agents WHERE id = ?', (agent_id,))
         row = cursor.fetchone()
@@ -2230,7 +2609,12 @@ def get_agent(agent_id: int) -> dict | None:
 
 
 def get_agent_by_name(name: str) -> dict | None:
-    """Get an agent by name."""
+    """
+    Get an agent by name.
+
+    Used to authenticate every push, so queued last_seen updates are not
+    flushed first and ``last_seen`` may lag by up to WRITE_BEHIND_MAX_DELAY.
+    """
     with get_db() as conn:
         cursor = conn.execute('SELECT * FROM agents WHERE name = ?', (name,))
         row = cursor.fetchone()
@@ -2258,6 +2642,7 @@ def _row_to_agent(row) -> dict:
 
 def list_agents(active_only: bool = True) -> list[dict]:
     """Get all agents."""
+    _agent_seen_buffer.flush()
     with get_db() as conn:
         if active_only:
             cursor = conn.execute(
@@ -2322,6 +2707,7 @@ def update_agent(
 
 def delete_agent(agent_id: int) -> bool:
     """Delete an agent and its push payloads."""
+    _push_payload_buffer.flush()
     with get_db() as conn:
         # Delete push payloads first (foreign key)
         conn.execute('DELETE FROM push_payloads WHERE agent_id = ?', (agent_id,))
@@ -2329,19 +2715,73 @@ def delete_agent(agent_id: int) -> bool:
         return cursor.rowcount > 0
 
 
+_push_payload_buffer = get_write_behind_buffer('push_payloads', '''
+    INSERT INTO push_payloads (id, agent_id, scan_type, interface, payload, received_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+''')
+_agent_seen_buffer = get_write_behind_buffer('agent_last_seen', '''
+    UPDATE agents SET last_seen = ? WHERE id = ?
+''')
+
+# IDs for deferred payloads, reserved from the AUTOINCREMENT sequence in
+# blocks so they are unique across worker processes: (database, next, end)
+PUSH_PAYLOAD_ID_BLOCK = 256
+_push_payload_ids: tuple[Path | None, int, int] = (None, 0, 0)
+_push_payload_ids_lock = threading.Lock()
+
+
+def _reserve_push_payload_id() -> int:
+    """Allocate a push_payloads ID before the row is written."""
+    global _push_payload_ids
+    with _push_payload_ids_lock:
+        db_path, next_id, end = _push_payload_ids
+        if db_path != DB_PATH or next_id >= end:
+            with get_db() as conn:
+                updated = conn.execute(
+                    "UPDATE sqlite_sequence SET seq = seq + ? WHERE name = 'push_payloads'",
+                    (PUSH_PAYLOAD_ID_BLOCK,),
+                ).rowcount
+                if not updated:
+                    conn.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) "
+                        "SELECT 'push_payloads', COALESCE(MAX(id), 0) + ? FROM push_payloads",
+                        (PUSH_PAYLOAD_ID_BLOCK,),
+                    )
+                end = conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'push_payloads'"
+                ).fetchone()[0] + 1
+            db_path, next_id = DB_PATH, end - PUSH_PAYLOAD_ID_BLOCK
+        _push_payload_ids = (db_path, next_id + 1, end)
+        return next_id
+
+
 def store_push_payload(
     agent_id: int,
     scan_type: str,
     payload: dict,
     interface: str | None = None,
-    received_at: str | None = None
-) -> int:
+    received_at: str | None = None,
+    defer: bool = False
+) -> int | None:
     """
     Store a push payload from a remote agent.
 
+    Args:
+        defer: Queue the payload for a batched write instead of inserting it now.
+            Its ID is reserved up front, so it is known before the row is written.
+
     Returns:
-        The ID of the created payload record
+        The ID of the payload record
     """
+    if defer:
+        now = _utc_timestamp()
+        payload_id = _reserve_push_payload_id()
+        _push_payload_buffer.append((
+            payload_id, agent_id, scan_type, interface, json.dumps(payload), received_at or now,
+        ))
+        _agent_seen_buffer.append((now, agent_id))
+        return payload_id
+
     with get_db() as conn:
         if received_at:
             cursor = conn.execute('''
@@ -2382,6 +2822,7 @@ def get_recent_payloads(
     where_clause = f'WHERE {" AND ".join(conditions)}' if conditions else ''
     params.append(limit)
 
+    _push_payload_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute(f'''
             SELECT p.*, a.name as agent_name
@@ -2408,6 +2849,7 @@ def get_recent_payloads(
 
 def cleanup_old_payloads(max_age_hours: int = 24) -> int:
     """Remove old push payloads."""
+    _push_payload_buffer.flush()
     with get_db() as conn:
         cursor = conn.execute('''
             DELETE FROM push_payloads
@@ -2,30 +2,98 @@
 
 from __future__ import annotations
 
+import threading
 import time
 from collections import deque
+from itertools import islice
 
 from utils.airline_codes import expand_search_terms, translate_flight
 
+# Message fields that identify the aircraft, in match order
+IDENTITY_FIELDS = ('flight', 'tail', 'reg', 'callsign', 'icao', 'addr')
+
+
+def _identity_keys(msg: dict) -> set[str]:
+    """Normalized identifiers of a message plus their airline code translations."""
+    keys: set[str] = set()
+    for field in IDENTITY_FIELDS:
+        val = msg.get(field)
+        if not val:
+            continue
+        upper_val = str(val).strip().upper()
+        keys.add(upper_val)
+        keys.update(translate_flight(upper_val))
+    return keys
+
+
+class _MessageIndex:
+    """Bounded message history with an inverted index on identity keys.
+
+    Each message is stored once in arrival order; the index maps every
+    identity key to the (sequence, message) pairs carrying it. Index
+    entries are also in arrival order, so evicting the oldest message
+    pops the front of each of its keys' deques.
+    """
+
+    def __init__(self, max_messages: int):
+        self._messages: deque[tuple[int, dict, frozenset[str]]] = deque()
+        self._index: dict[str, deque[tuple[int, dict]]] = {}
+        self._max_messages = max_messages
+        self._seq = 0
+
+    def append(self, msg: dict) -> None:
+        keys = frozenset(_identity_keys(msg))
+        self._seq += 1
+        self._messages.append((self._seq, msg, keys))
+        for key in keys:
+            self._index.setdefault(key, deque()).append((self._seq, msg))
+
+        while len(self._messages) > self._max_messages:
+            seq, _, old_keys = self._messages.popleft()
+            for key in old_keys:
+                entries = self._index[key]
+                if entries and entries[0][0] == seq:
+                    entries.popleft()
+                if not entries:
+                    del self._index[key]
+
+    def find(self, terms: set[str]) -> list[dict]:
+        """Messages carrying any of the terms, oldest first."""
+        found: dict[int, dict] = {}
+        for term in terms:
+            for seq, msg in self._index.get(term, ()):
+                found[seq] = msg
+        return [found[seq] for seq in sorted(found)]
+
+    def recent(self, limit: int) -> list[dict]:
+        """Newest messages first."""
+        return [msg for _, msg, _ in islice(reversed(self._messages), max(limit, 0))]
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._index.clear()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
 
 class FlightCorrelator:
     """Correlate ACARS and VDL2 messages with ADS-B aircraft."""
 
     def __init__(self, max_messages: int = 1000):
-        self._acars_messages: deque[dict] = deque(maxlen=max_messages)
-        self._vdl2_messages: deque[dict] = deque(maxlen=max_messages)
+        self._lock = threading.Lock()
+        self._acars_messages = _MessageIndex(max_messages)
+        self._vdl2_messages = _MessageIndex(max_messages)
 
     def add_acars_message(self, msg: dict) -> None:
-        self._acars_messages.append({
-            **msg,
-            '_corr_time': time.time(),
-        })
+        entry = {**msg, '_corr_time': time.time()}
+        with self._lock:
+            self._acars_messages.append(entry)
 
     def add_vdl2_message(self, msg: dict) -> None:
-        self._vdl2_messages.append({
-            **msg,
-            '_corr_time': time.time(),
-        })
+        entry = {**msg, '_corr_time': time.time()}
+        with self._lock:
+            self._vdl2_messages.append(entry)
 
     def get_messages_for_aircraft(
         self,
@@ -48,33 +116,14 @@ class FlightCorrelator:
         # Expand with IATA↔ICAO airline code translations
         search_terms = expand_search_terms(search_terms)
 
-        acars = []
-        for msg in self._acars_messages:
-            if self._msg_matches(msg, search_terms):
-                acars.append(self._clean_msg(msg))
-
-        vdl2 = []
-        for msg in self._vdl2_messages:
-            if self._msg_matches(msg, search_terms):
-                vdl2.append(self._clean_msg(msg))
+        with self._lock:
+            acars = self._acars_messages.find(search_terms)
+            vdl2 = self._vdl2_messages.find(search_terms)
 
-        return {'acars': acars, 'vdl2': vdl2}
-
-    @staticmethod
-    def _msg_matches(msg: dict, terms: set[str]) -> bool:
-        """Check if any identifying field in msg matches the search terms."""
-        for field in ('flight', 'tail', 'reg', 'callsign', 'icao', 'addr'):
-            val = msg.get(field)
-            if not val:
-                continue
-            upper_val = str(val).strip().upper()
-            if upper_val in terms:
-                return True
-            # Also try translating the message field value
-            for translated in translate_flight(upper_val):
-                if translated in terms:
-                    return True
-        return False
+        return {
+            'acars': [self._clean_msg(m) for m in acars],
+            'vdl2': [self._clean_msg(m) for m in vdl2],
+        }
 
     @staticmethod
     def _clean_msg(msg: dict) -> dict:
@@ -84,17 +133,19 @@ class FlightCorrelator:
     def get_recent_messages(self, msg_type: str = 'acars', limit: int = 50) -> list[dict]:
         """Return the most recent messages (newest first)."""
         source = self._acars_messages if msg_type == 'acars' else self._vdl2_messages
-        msgs = [self._clean_msg(m) for m in source]
-        msgs.reverse()
-        return msgs[:limit]
+        with self._lock:
+            recent = source.recent(limit)
+        return [self._clean_msg(m) for m in recent]
 
     def clear_acars(self) -> None:
         """Clear all stored ACARS messages."""
-        self._acars_messages.clear()
+        with self._lock:
+            self._acars_messages.clear()
 
     def clear_vdl2(self) -> None:
         """Clear all stored VDL2 messages."""
-        self._vdl2_messages.clear()
+        with self._lock:
+            self._vdl2_messages.clear()
 
     @property
     def acars_count(self) -> int:
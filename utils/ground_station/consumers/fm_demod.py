@@ -1,7 +1,7 @@
 """FMDemodConsumer — demodulates FM from CU8 IQ and pipes PCM to a decoder.
 
-Performs FM (or AM/USB/LSB) demodulation in-process using numpy — the
-same algorithm as the listening-post waterfall monitor.  The resulting
+Performs FM (or AM/USB/LSB) demodulation in-process with numpy/scipy,
+keeping filter and discriminator state across IQ chunks.  The resulting
 int16 PCM is written to the stdin of a configurable decoder subprocess
 (e.g. direwolf for AX.25 AFSK or multimon-ng for GMSK/POCSAG).
 
@@ -13,13 +13,16 @@ from __future__ import annotations
 
 import subprocess
 import threading
+from fractions import Fraction
 from typing import Callable
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from scipy import signal as scipy_signal
 
+from utils.ground_station.iq_bus import cu8_samples
 from utils.logging import get_logger
 from utils.process import register_process, safe_terminate, unregister_process
-from utils.waterfall_fft import cu8_to_complex
 
 logger = get_logger('intercept.ground_station.fm_demod')
 
@@ -51,7 +54,7 @@ class FMDemodConsumer:
         self._stdout_thread: threading.Thread | None = None
         self._center_mhz = 0.0
         self._sample_rate = 0
-        self._rotator_phase = 0.0
+        self._demod: FMDemodulator | None = None
 
     # ------------------------------------------------------------------
     # IQConsumer protocol
@@ -67,21 +70,15 @@ class FMDemodConsumer:
     ) -> None:
         self._center_mhz = center_mhz
         self._sample_rate = sample_rate
-        self._rotator_phase = 0.0
+        # Decode on-center; the demodulator keeps its state for the pass
+        self._demod = FMDemodulator(sample_rate, modulation=self._modulation)
         self._start_proc()
 
     def on_chunk(self, raw: bytes) -> None:
-        if self._proc is None or self._proc.poll() is not None:
+        if self._proc is None or self._proc.poll() is not None or self._demod is None:
             return
         try:
-            pcm, self._rotator_phase = _demodulate(
-                raw,
-                sample_rate=self._sample_rate,
-                center_mhz=self._center_mhz,
-                monitor_freq_mhz=self._center_mhz,  # decode on-center
-                modulation=self._modulation,
-                rotator_phase=self._rotator_phase,
-            )
+            pcm = self._demod.process(raw)
             if pcm and self._proc.stdin:
                 self._proc.stdin.write(pcm)
                 self._proc.stdin.flush()
@@ -141,79 +138,182 @@ class FMDemodConsumer:
 
 
 # ---------------------------------------------------------------------------
-# In-process FM demodulation (mirrors waterfall_websocket._demodulate_monitor_audio)
+# Stateful in-process demodulation
 # ---------------------------------------------------------------------------
 
+# Channel filter: passband edge as a fraction of the first-stage output rate
+CHANNEL_CUTOFF = 0.4
+# FIR taps per unit of decimation/interpolation, and Kaiser window beta
+TAPS_PER_PHASE = 12
+KAISER_BETA = 6.0
+# Largest interpolation/decimation pair for the audio resampler
+MAX_RESAMPLE_FACTOR = 256
+# DC blocker pole and AGC release per chunk
+DC_POLE = 0.999
+AGC_TARGET = 0.85
+AGC_MAX_GAIN = 20.0
+AGC_RELEASE = 0.1
+
+
+class _PolyphaseResampler:
+    """Rational FIR resampler that carries its input history across calls.
+
+    Output is identical to filtering the concatenated stream in one go:
+    only outputs whose inputs are all known are produced, and enough
+    trailing input is kept for the next call. Pure decimation computes
+    just the kept outputs as a product of strided input windows with the
+    taps; interpolation goes through ``scipy.signal.upfirdn``.
+    """
 
-def _demodulate(
-    raw: bytes,
-    sample_rate: int,
-    center_mhz: float,
-    monitor_freq_mhz: float,
-    modulation: str,
-    rotator_phase: float,
-) -> tuple[bytes | None, float]:
-    """Demodulate CU8 IQ to int16 PCM.
-
-    Returns ``(pcm_bytes, next_rotator_phase)``.
+    def __init__(self, taps: np.ndarray, up: int = 1, down: int = 1, dtype: type = np.float32):
+        self.taps = taps
+        self.up = up
+        self.down = down
+        self._reversed = np.ascontiguousarray(taps[::-1], dtype=np.float32)
+        # Decimation starts from a zeroed filter history
+        self._carry = np.zeros(taps.size - 1 if up == 1 else 0, dtype=dtype)
+        self._next = 0  # upfirdn path: index of the next output relative to the carry
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        buf = np.concatenate((self._carry, x)) if self._carry.size else x
+        if buf.size == 0:
+            return buf
+        if self.up == 1:
+            return self._decimate(buf)
+
+        up, down = self.up, self.down
+        y = scipy_signal.upfirdn(self.taps, buf, up, down)
+        # Outputs at upsampled positions below len(buf) * up are final
+        end = (buf.size * up - 1) // down + 1
+        out = y[self._next:end]
+
+        # Drop whole input blocks of `down` samples the next output no
+        # longer needs, keeping outputs aligned to the carry origin
+        reach = end * down - (self.taps.size - 1)
+        drop = min(buf.size, max(0, reach // (up * down)) * down)
+        self._carry = buf[drop:].copy()
+        self._next = end - drop * up // down
+        return out.astype(buf.dtype, copy=False)
+
+    def _decimate(self, buf: np.ndarray) -> np.ndarray:
+        ntaps, down = self.taps.size, self.down
+        count = (buf.size - ntaps) // down + 1 if buf.size >= ntaps else 0
+        self._carry = buf[count * down:].copy()
+        if count == 0:
+            return buf[:0]
+        buf = np.ascontiguousarray(buf)
+        step = buf.itemsize * down
+        if np.iscomplexobj(buf):
+            # I and Q rows of each window as float32, one matrix product for both
+            floats = buf.view(np.float32)
+            windows = as_strided(floats, shape=(count, 2, ntaps), strides=(step, 4, 8), writeable=False)
+            return (windows @ self._reversed).view(np.complex64).ravel()
+        windows = as_strided(buf, shape=(count, ntaps), strides=(step, buf.itemsize), writeable=False)
+        return windows @ self._reversed.astype(buf.dtype, copy=False)
+
+
+class FMDemodulator:
+    """CU8 IQ to int16 PCM at ``AUDIO_RATE``, continuous across chunks.
+
+    The chain is a cached NCO, a polyphase decimating channel filter, a
+    discriminator (or envelope/SSB detector) carrying its last sample, a
+    DC blocker and a rational polyphase resampler to the audio rate. All
+    filter state is carried between chunks, so chunk boundaries are
+    inaudible and the output rate is exact.
     """
-    if len(raw) < 32 or sample_rate <= 0:
-        return None, float(rotator_phase)
-
-    samples = cu8_to_complex(raw)
-    fs = float(sample_rate)
-    freq_offset_hz = (float(monitor_freq_mhz) - float(center_mhz)) * 1e6
-    nyquist = fs * 0.5
-    if abs(freq_offset_hz) > nyquist * 0.98:
-        return None, float(rotator_phase)
-
-    phase_inc = (2.0 * np.pi * freq_offset_hz) / fs
-    n = np.arange(samples.size, dtype=np.float64)
-    rotator = np.exp(-1j * (float(rotator_phase) + phase_inc * n)).astype(np.complex64)
-    next_phase = float((float(rotator_phase) + phase_inc * samples.size) % (2.0 * np.pi))
-    shifted = samples * rotator
-
-    mod = modulation.lower().strip()
-    target_bb = 48_000.0
-    pre_decim = max(1, int(fs // target_bb))
-    if pre_decim > 1:
-        usable = (shifted.size // pre_decim) * pre_decim
-        if usable < pre_decim:
-            return None, next_phase
-        shifted = shifted[:usable].reshape(-1, pre_decim).mean(axis=1)
-    fs1 = fs / pre_decim
-
-    if shifted.size < 16:
-        return None, next_phase
-
-    if mod == 'fm':
-        audio = np.angle(shifted[1:] * np.conj(shifted[:-1])).astype(np.float32)
-    elif mod == 'am':
-        envelope = np.abs(shifted).astype(np.float32)
-        audio = envelope - float(np.mean(envelope))
-    elif mod == 'usb':
-        audio = np.real(shifted).astype(np.float32)
-    elif mod == 'lsb':
-        audio = -np.real(shifted).astype(np.float32)
-    else:
-        audio = np.real(shifted).astype(np.float32)
-
-    if audio.size < 8:
-        return None, next_phase
-
-    audio = audio - float(np.mean(audio))
-
-    # Resample to AUDIO_RATE
-    out_len = int(audio.size * AUDIO_RATE / fs1)
-    if out_len < 32:
-        return None, next_phase
-    x_old = np.linspace(0.0, 1.0, audio.size, endpoint=False, dtype=np.float32)
-    x_new = np.linspace(0.0, 1.0, out_len, endpoint=False, dtype=np.float32)
-    audio = np.interp(x_new, x_old, audio).astype(np.float32)
-
-    peak = float(np.max(np.abs(audio))) if audio.size else 0.0
-    if peak > 0:
-        audio = audio * min(20.0, 0.85 / peak)
-
-    pcm = np.clip(audio, -1.0, 1.0)
-    return (pcm * 32767.0).astype(np.int16).tobytes(), next_phase
+
+    def __init__(self, sample_rate: int, offset_hz: float = 0.0, modulation: str = 'fm'):
+        fs = float(sample_rate)
+        self.sample_rate = sample_rate
+        self.modulation = modulation.lower().strip()
+        self.valid = sample_rate > 0 and abs(offset_hz) <= fs * 0.5 * 0.98
+
+        self._phase_inc = -2.0 * np.pi * offset_hz / fs if fs else 0.0
+        self._phase = 0.0
+        self._nco = np.ones(0, dtype=np.complex64)
+
+        decim = max(1, int(fs // AUDIO_RATE))
+        self.channel_rate = fs / decim if decim else 0.0
+        self._channel = None
+        if decim > 1:
+            taps = scipy_signal.firwin(
+                TAPS_PER_PHASE * decim + 1,
+                CHANNEL_CUTOFF * self.channel_rate,
+                window=('kaiser', KAISER_BETA),
+                fs=fs,
+            ).astype(np.float32)
+            self._channel = _PolyphaseResampler(taps, 1, decim, dtype=np.complex64)
+
+        ratio = Fraction(AUDIO_RATE * decim, sample_rate or 1).limit_denominator(MAX_RESAMPLE_FACTOR)
+        self._audio = None
+        if self.valid and ratio != 1:
+            up, down = ratio.numerator, ratio.denominator
+            taps = scipy_signal.firwin(
+                TAPS_PER_PHASE * max(up, down) + 1,
+                0.45 * min(self.channel_rate, AUDIO_RATE),
+                window=('kaiser', KAISER_BETA),
+                fs=self.channel_rate * up,
+            ) * up
+            self._audio = _PolyphaseResampler(taps.astype(np.float32), up, down)
+
+        self._last = np.complex64(0)
+        self._dc_zi = np.zeros(1, dtype=np.float32)
+        self._gain = 1.0
+
+    def _rotate(self, samples: np.ndarray) -> np.ndarray:
+        if not self._phase_inc:
+            return samples
+        n = samples.size
+        if self._nco.size < n:
+            self._nco = np.exp(1j * self._phase_inc * np.arange(n)).astype(np.complex64)
+        shifted = samples * self._nco[:n]
+        shifted *= np.complex64(np.exp(1j * self._phase))
+        self._phase = (self._phase + self._phase_inc * n) % (2.0 * np.pi)
+        return shifted
+
+    def _detect(self, baseband: np.ndarray) -> np.ndarray:
+        mod = self.modulation
+        if mod == 'fm':
+            prev = np.empty_like(baseband)
+            prev[0] = self._last
+            prev[1:] = baseband[:-1]
+            self._last = baseband[-1]
+            return np.angle(baseband * np.conj(prev)).astype(np.float32)
+        if mod == 'am':
+            return np.abs(baseband).astype(np.float32)
+        if mod == 'lsb':
+            return -np.real(baseband).astype(np.float32)
+        return np.real(baseband).astype(np.float32)
+
+    def _level(self, audio: np.ndarray) -> np.ndarray:
+        # Fast attack, slow release; the gain ramps across the chunk
+        peak = float(np.max(np.abs(audio)))
+        target = min(AGC_MAX_GAIN, AGC_TARGET / peak) if peak > 0 else self._gain
+        gain = target if target < self._gain else self._gain + (target - self._gain) * AGC_RELEASE
+        ramp = np.linspace(self._gain, gain, audio.size, endpoint=False, dtype=np.float32)
+        self._gain = gain
+        return audio * ramp
+
+    def process(self, raw: bytes) -> bytes | None:
+        """Demodulate one CU8 chunk; returns PCM for the audio it completes."""
+        if not self.valid or len(raw) < 2:
+            return None
+        baseband = self._rotate(cu8_samples(raw))
+        if self._channel is not None:
+            baseband = self._channel.process(baseband)
+        if baseband.size == 0:
+            return None
+
+        audio = self._detect(baseband)
+        if self.modulation in ('fm', 'am'):
+            audio, self._dc_zi = scipy_signal.lfilter(
+                [1.0, -1.0], [1.0, -DC_POLE], audio, zi=self._dc_zi
+            )
+            audio = audio.astype(np.float32)
+        if self._audio is not None:
+            audio = self._audio.process(audio)
+        if audio.size == 0:
+            return None
+
+        pcm = np.clip(self._level(audio), -1.0, 1.0)
+        return (pcm * 32767.0).astype(np.int16).tobytes()
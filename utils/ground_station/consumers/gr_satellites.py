@@ -4,8 +4,8 @@
 (https://github.com/daniestevez/gr-satellites).  It accepts complex
 float32 (cf32) IQ samples on stdin when invoked with ``--iq``.
 
-This consumer converts CU8 → cf32 via numpy and pipes the result to
-``gr_satellites``.  If the tool is not installed it silently stays
+This consumer takes the bus's shared cf32 view of each CU8 chunk and
+pipes it to ``gr_satellites``.  If the tool is not installed it silently stays
 disabled.
 
 Decoded JSON packets are forwarded to an optional ``on_decoded`` callback.
@@ -18,8 +18,7 @@ import subprocess
 import threading
 from typing import Callable
 
-import numpy as np
-
+from utils.ground_station.iq_bus import cu8_samples
 from utils.logging import get_logger
 from utils.process import register_process, safe_terminate, unregister_process
 
@@ -75,12 +74,9 @@ class GrSatConsumer:
     def on_chunk(self, raw: bytes) -> None:
         if not self._enabled or self._proc is None or self._proc.poll() is not None:
             return
-        # Convert CU8 → cf32
         try:
-            iq = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
-            cf32 = ((iq - 127.5) / 127.5).view(np.complex64)
             if self._proc.stdin:
-                self._proc.stdin.write(cf32.tobytes())
+                self._proc.stdin.write(cu8_samples(raw))
                 self._proc.stdin.flush()
         except (BrokenPipeError, OSError):
             pass
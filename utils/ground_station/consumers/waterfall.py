@@ -12,6 +12,9 @@ from __future__ import annotations
 import queue
 import time
 
+import numpy as np
+
+from utils.ground_station.iq_bus import cu8_samples
 from utils.logging import get_logger
 from utils.waterfall_fft import (
     build_binary_frame,
@@ -52,7 +55,8 @@ class WaterfallConsumer:
         self._start_freq = 0.0
         self._end_freq = 0.0
         self._sample_rate = 0
-        self._buffer = b''
+        self._buffer = bytearray()
+        self._frame_buffer = np.empty(0, dtype=np.float32)
         self._required_bytes = 0
         self._frame_interval = 1.0 / max(1, fps)
         self._last_frame_time = 0.0
@@ -79,24 +83,30 @@ class WaterfallConsumer:
             sample_rate // max(1, self._fps),
         )
         self._required_bytes = required_samples * 2  # 1 byte I + 1 byte Q
+        self._frame_buffer = np.empty(self._required_bytes, dtype=np.float32)
         self._frame_interval = 1.0 / max(1, self._fps)
-        self._buffer = b''
+        self._buffer = bytearray()
         self._last_frame_time = 0.0
 
     def on_chunk(self, raw: bytes) -> None:
         self._buffer += raw
+        if len(self._buffer) > self._required_bytes:
+            del self._buffer[:-self._required_bytes]
         now = time.monotonic()
         if (now - self._last_frame_time) < self._frame_interval:
             return
         if len(self._buffer) < self._required_bytes:
             return
 
-        chunk = self._buffer[-self._required_bytes:]
-        self._buffer = b''
         self._last_frame_time = now
 
         try:
-            samples = cu8_to_complex(chunk)
+            if len(raw) >= self._required_bytes:
+                # The newest chunk fills the frame: use the bus's shared view
+                samples = cu8_samples(raw)[-(self._required_bytes // 2):]
+            else:
+                samples = cu8_to_complex(self._buffer, out=self._frame_buffer)
+            self._buffer.clear()
             power_db = compute_power_spectrum(
                 samples, fft_size=self._fft_size, avg_count=self._avg_count
             )
@@ -118,4 +128,4 @@ class WaterfallConsumer:
             pass
 
     def on_stop(self) -> None:
-        self._buffer = b''
+        self._buffer = bytearray()
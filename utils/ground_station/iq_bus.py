@@ -8,6 +8,11 @@ registered consumer for each chunk.
 Consumers are responsible for their own internal buffering.  The bus
 does *not* block on slow consumers — each consumer's ``on_chunk`` is
 called in the producer thread, so consumers must be non-blocking.
+
+Chunks are delivered as :class:`IQChunk`, a ``bytes`` subclass whose
+:attr:`~IQChunk.samples` converts the chunk to complex64 once, on first
+use, and shares the result with every consumer.  Use :func:`cu8_samples`
+to accept either an ``IQChunk`` or plain bytes.
 """
 
 from __future__ import annotations
@@ -18,20 +23,53 @@ import threading
 import time
 from typing import Protocol, runtime_checkable
 
+import numpy as np
+
 from utils.logging import get_logger
 from utils.process import register_process, safe_terminate, unregister_process
+from utils.waterfall_fft import cu8_to_complex
 
 logger = get_logger('intercept.ground_station.iq_bus')
 
 CHUNK_SIZE = 65_536  # bytes per read (~27 ms @ 2.4 Msps CU8)
 
 
+class IQChunk(bytes):
+    """Raw CU8 chunk with a lazily converted, shared complex64 view.
+
+    The bus converts into a buffer it reuses for the next chunk, so
+    :attr:`samples` is read-only and only valid during ``on_chunk``;
+    consumers that keep samples must copy them.
+    """
+
+    def __new__(cls, raw: bytes, buffer: np.ndarray | None = None) -> IQChunk:
+        chunk = super().__new__(cls, raw)
+        chunk._buffer = buffer
+        chunk._samples = None
+        return chunk
+
+    @property
+    def samples(self) -> np.ndarray:
+        if self._samples is None:
+            samples = cu8_to_complex(self, out=self._buffer)
+            samples.flags.writeable = False
+            self._samples = samples
+        return self._samples
+
+
+def cu8_samples(raw: bytes) -> np.ndarray:
+    """Complex64 samples of a chunk, shared when it came from the bus."""
+    if isinstance(raw, IQChunk):
+        return raw.samples
+    return cu8_to_complex(raw)
+
+
 @runtime_checkable
 class IQConsumer(Protocol):
     """Protocol for objects that receive raw CU8 chunks from the IQ bus."""
 
     def on_chunk(self, raw: bytes) -> None:
-        """Called with each raw CU8 chunk from the SDR.  Must be fast."""
+        """Called with each raw CU8 chunk (an :class:`IQChunk`).  Must be fast."""
         ...
 
     def on_start(
@@ -92,6 +130,8 @@ class IQBus:
         self._stop_event = threading.Event()
         self._running = False
         self._current_freq_mhz = center_mhz
+        # Reused for every chunk's complex64 view (float32 I/Q pairs)
+        self._sample_buffer = np.empty(CHUNK_SIZE, dtype=np.float32)
 
     # ------------------------------------------------------------------
     # Consumer management
@@ -265,9 +305,10 @@ class IQBus:
                     break
                 with self._consumers_lock:
                     consumers = list(self._consumers)
+                chunk = IQChunk(raw, self._sample_buffer)
                 for consumer in consumers:
                     try:
-                        consumer.on_chunk(raw)
+                        consumer.on_chunk(chunk)
                     except Exception as e:
                         logger.warning(f"Consumer on_chunk error: {e}")
         except Exception as e:
@@ -10,6 +10,8 @@ All outputs use hedged language - never claims certainty, uses
 
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -384,6 +386,57 @@ class SignalGuessResult:
     _scores: dict[str, int] = field(default_factory=dict, repr=False)
 
 
+# =============================================================================
+# Frequency Index
+# =============================================================================
+
+class FrequencyIndex:
+    """
+    Sorted-boundary index of signal types by frequency for one region.
+
+    Every range endpoint in the catalog splits the spectrum into elementary
+    slots: the endpoints themselves and the open gaps between them. Each
+    slot lists the signal types covering it (in catalog order), so a lookup
+    is one bisect instead of a scan of every range.
+    """
+
+    def __init__(self, signal_types: list[SignalTypeDefinition], region: str):
+        applicable = [
+            t for t in signal_types
+            if region in t.regions or "GLOBAL" in t.regions
+        ]
+        self.points: list[int] = sorted({
+            edge for t in applicable for rng in t.frequency_ranges for edge in rng
+        })
+
+        def covering(lo: int, hi: int) -> tuple[SignalTypeDefinition, ...]:
+            return tuple(
+                t for t in applicable
+                if any(fmin <= lo and hi <= fmax for fmin, fmax in t.frequency_ranges)
+            )
+
+        # Slot 2k is points[k] itself; slot 2k+1 the gap (points[k], points[k+1])
+        self.slots: list[tuple[SignalTypeDefinition, ...]] = []
+        for k, point in enumerate(self.points):
+            self.slots.append(covering(point, point))
+            if k + 1 < len(self.points):
+                self.slots.append(covering(point, self.points[k + 1]))
+
+    def slot(self, frequency_hz: float) -> int:
+        """Slot number for a frequency, or -1 outside every range."""
+        i = bisect_left(self.points, frequency_hz)
+        if i < len(self.points) and self.points[i] == frequency_hz:
+            return 2 * i
+        if i == 0 or i == len(self.points):
+            return -1
+        return 2 * i - 1
+
+    def candidates(self, frequency_hz: float) -> tuple[SignalTypeDefinition, ...]:
+        """Signal types with a range containing the frequency."""
+        slot = self.slot(frequency_hz)
+        return self.slots[slot] if slot >= 0 else ()
+
+
 # =============================================================================
 # Signal Guessing Engine
 # =============================================================================
@@ -408,6 +461,14 @@ class SignalGuessingEngine:
         """
         self.region = region
         self._signal_types = SIGNAL_TYPES
+        self._indexes: dict[str, FrequencyIndex] = {}
+
+    def _index(self, region: str) -> FrequencyIndex:
+        """Frequency index for a region, built on first use."""
+        index = self._indexes.get(region)
+        if index is None:
+            index = self._indexes[region] = FrequencyIndex(self._signal_types, region)
+        return index
 
     def guess_signal_type(
         self,
@@ -435,12 +496,75 @@ class SignalGuessingEngine:
             SignalGuessResult with primary guess, alternatives, and explanation
         """
         effective_region = region or self.region
+        candidates = self._index(effective_region).candidates(frequency_hz)
+        ranking = self._rank(
+            candidates, frequency_hz, modulation, bandwidth_hz,
+            duration_ms, repetition_count, effective_region,
+        )
+        return self._build_result(
+            ranking, frequency_hz, modulation, bandwidth_hz, duration_ms, repetition_count,
+        )
+
+    def guess_signal_types(
+        self,
+        signals: Iterable[dict],
+        region: str | None = None,
+    ) -> list[SignalGuessResult]:
+        """
+        Guess signal types for many detections in one call (e.g. a sweep).
 
-        # Score all signal types
+        Args:
+            signals: Dicts with ``frequency_hz`` and optionally ``modulation``,
+                     ``bandwidth_hz``, ``duration_ms``, ``repetition_count``
+                     and ``rssi_dbm`` (same meaning as guess_signal_type).
+            region: Override default region
+
+        Returns:
+            One SignalGuessResult per input, in input order
+        """
+        effective_region = region or self.region
+        index = self._index(effective_region)
+
+        # Scores depend on the frequency only through which catalog ranges
+        # contain it, so detections sharing a slot and characteristics
+        # share one ranking
+        rankings: dict[tuple, tuple] = {}
+        results = []
+        for signal in signals:
+            frequency_hz = signal['frequency_hz']
+            modulation = signal.get('modulation')
+            bandwidth_hz = signal.get('bandwidth_hz')
+            duration_ms = signal.get('duration_ms')
+            repetition_count = signal.get('repetition_count')
+
+            slot = index.slot(frequency_hz)
+            key = (slot, modulation, bandwidth_hz, duration_ms, repetition_count)
+            ranking = rankings.get(key)
+            if ranking is None:
+                ranking = rankings[key] = self._rank(
+                    index.slots[slot] if slot >= 0 else (), frequency_hz, modulation,
+                    bandwidth_hz, duration_ms, repetition_count, effective_region,
+                )
+            results.append(self._build_result(
+                ranking, frequency_hz, modulation, bandwidth_hz, duration_ms, repetition_count,
+            ))
+        return results
+
+    def _rank(
+        self,
+        candidates: Iterable[SignalTypeDefinition],
+        frequency_hz: int,
+        modulation: str | None,
+        bandwidth_hz: int | None,
+        duration_ms: int | None,
+        repetition_count: int | None,
+        region: str,
+    ) -> tuple[dict[str, int], dict[str, SignalTypeDefinition], list[str], Confidence | None]:
+        """Score candidate types; returns scores, types, ranked labels and confidence."""
         scores: dict[str, int] = {}
         matched_types: dict[str, SignalTypeDefinition] = {}
 
-        for signal_type in self._signal_types:
+        for signal_type in candidates:
             score = self._score_signal_type(
                 signal_type,
                 frequency_hz,
@@ -448,12 +572,40 @@ class SignalGuessingEngine:
                 bandwidth_hz,
                 duration_ms,
                 repetition_count,
-                effective_region,
+                region,
             )
             if score > 0:
                 scores[signal_type.label] = score
                 matched_types[signal_type.label] = signal_type
 
+        if not scores:
+            return scores, matched_types, [], None
+
+        # Sort by score descending
+        sorted_labels = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
+
+        # Calculate confidence based on score and margin
+        confidence = self._calculate_confidence(
+            scores[sorted_labels[0]],
+            scores,
+            sorted_labels,
+            modulation,
+            bandwidth_hz,
+        )
+        return scores, matched_types, sorted_labels, confidence
+
+    def _build_result(
+        self,
+        ranking: tuple[dict[str, int], dict[str, SignalTypeDefinition], list[str], Confidence | None],
+        frequency_hz: int,
+        modulation: str | None,
+        bandwidth_hz: int | None,
+        duration_ms: int | None,
+        repetition_count: int | None,
+    ) -> SignalGuessResult:
+        """Turn a ranking into a result with alternatives and explanation."""
+        scores, matched_types, sorted_labels, confidence = ranking
+
         # If no matches, return unknown
         if not scores:
             return SignalGuessResult(
@@ -465,23 +617,11 @@ class SignalGuessingEngine:
                 _scores={},
             )
 
-        # Sort by score descending
-        sorted_labels = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
-
         # Primary guess
         primary_label = sorted_labels[0]
         primary_score = scores[primary_label]
         primary_type = matched_types[primary_label]
 
-        # Calculate confidence based on score and margin
-        confidence = self._calculate_confidence(
-            primary_score,
-            scores,
-            sorted_labels,
-            modulation,
-            bandwidth_hz,
-        )
-
         # Build alternatives (up to 3, excluding primary)
         alternatives = []
         for label in sorted_labels[1:4]:  # Next 3 candidates
@@ -514,7 +654,7 @@ class SignalGuessingEngine:
             alternatives=alternatives,
             explanation=explanation,
             tags=primary_type.tags.copy(),
-            _scores=scores,
+            _scores=dict(scores),
         )
 
     def _score_signal_type(
@@ -697,18 +837,7 @@ class SignalGuessingEngine:
         Useful for displaying what services could operate at a given frequency.
         """
         effective_region = region or self.region
-        allocations = []
-
-        for signal_type in self._signal_types:
-            if effective_region not in signal_type.regions and "GLOBAL" not in signal_type.regions:
-                continue
-
-            for freq_min, freq_max in signal_type.frequency_ranges:
-                if freq_min <= frequency_hz <= freq_max:
-                    allocations.append(signal_type.label)
-                    break
-
-        return allocations
+        return [t.label for t in self._index(effective_region).candidates(frequency_hz)]
 
 
 # =============================================================================
@@ -774,7 +903,20 @@ def guess_signal_type_dict(
         rssi_dbm=rssi_dbm,
         region=region,
     )
+    return _result_to_dict(result)
+
+
+def guess_signal_types_dict(signals: Iterable[dict], region: str = "UK/EU") -> list[dict]:
+    """
+    Batch variant of guess_signal_type_dict for many detections.
+
+    See SignalGuessingEngine.guess_signal_types for the input format.
+    """
+    return [_result_to_dict(r) for r in get_engine(region).guess_signal_types(signals, region=region)]
+
 
+def _result_to_dict(result: SignalGuessResult) -> dict:
+    """Serialize a guess result for JSON responses."""
     return {
         "primary_label": result.primary_label,
         "confidence": result.confidence.value,
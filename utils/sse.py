@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
+import base64
 import contextlib
 import json
 import queue
 import threading
 import time
-from collections.abc import Generator
+from collections import OrderedDict
+from collections.abc import Generator, Hashable, Iterable
 from dataclasses import dataclass, field
 from typing import Any, Callable
 
+from utils.constants import SSE_DELTA_KEYFRAME_INTERVAL
+from utils.stream_codec import StreamCodec
+
 
 @dataclass
 class _QueueFanoutChannel:
@@ -141,9 +146,15 @@ def sse_stream_fanout(
     keepalive_interval: float = 30.0,
     stop_check: Callable[[], bool] | None = None,
     on_message: Callable[[dict[str, Any]], None] | None = None,
+    delta: DeltaSubscriber | None = None,
+    codec: StreamCodec | None = None,
 ) -> Generator[str, None, None]:
     """
     Generate an SSE stream from a fanout channel backed by source_queue.
+
+    With ``delta``, entity messages are sent as per-client deltas with
+    periodic keyframes; ``on_message`` still sees every full message.
+    With ``codec``, messages are sent in that binary encoding.
     """
     subscriber, unsubscribe = subscribe_fanout_queue(
         source_queue=source_queue,
@@ -154,7 +165,10 @@ def sse_stream_fanout(
 
     # Send an immediate keepalive so the browser receives response headers
     # right away (Werkzeug dev server buffers headers until first body byte).
-    yield format_sse({'type': 'keepalive'})
+    yield format_sse({'type': 'keepalive'}, codec=codec)
+    if delta is not None:
+        for out in delta.tick():
+            yield format_sse(out, codec=codec)
 
     try:
         while True:
@@ -167,11 +181,18 @@ def sse_stream_fanout(
                 if on_message and isinstance(msg, dict):
                     with contextlib.suppress(Exception):
                         on_message(msg)
-                yield format_sse(msg)
+                if delta is None:
+                    yield format_sse(msg, codec=codec)
+                    continue
+                for out in delta.feed(msg):
+                    yield format_sse(out, codec=codec)
             except queue.Empty:
+                if delta is not None:
+                    for out in delta.tick():
+                        yield format_sse(out, codec=codec)
                 now = time.time()
                 if now - last_keepalive >= keepalive_interval:
-                    yield format_sse({'type': 'keepalive'})
+                    yield format_sse({'type': 'keepalive'}, codec=codec)
                     last_keepalive = now
     finally:
         unsubscribe()
@@ -207,17 +228,29 @@ def sse_stream(
     )
 
 
-def format_sse(data: dict[str, Any] | str, event: str | None = None) -> str:
+def format_sse(
+    data: dict[str, Any] | str | bytes,
+    event: str | None = None,
+    codec: StreamCodec | None = None,
+) -> str:
     """
     Format data as SSE message.
 
     Args:
-        data: Data to send (will be JSON encoded if dict)
+        data: Data to send (will be JSON encoded if dict, or packed with
+            ``codec``; bytes are an already packed message)
         event: Optional event name
+        codec: Optional binary codec; its payload is sent base64 encoded,
+            preceded by a ``codec`` event with any key table additions
 
     Returns:
         SSE formatted string
     """
+    if codec is not None and not isinstance(data, str):
+        packed = data if isinstance(data, bytes) else codec.pack(data)
+        update = codec.key_update()
+        prefix = format_sse(update, event='codec') if update is not None else ''
+        return prefix + format_sse(base64.b64encode(packed).decode('ascii'), event)
     if isinstance(data, dict):
         data = json.dumps(data)
 
@@ -231,6 +264,295 @@ def format_sse(data: dict[str, Any] | str, event: str | None = None) -> str:
     return '\n'.join(lines)
 
 
+def _field_hash(value: Any) -> int:
+    """Hash of a field value; containers are hashed by their JSON form."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return hash((type(value), value))
+    try:
+        return hash(json.dumps(value, sort_keys=True, default=str))
+    except (TypeError, ValueError):
+        return hash(repr(value))
+
+
+class _Entity:
+    """Latest field values of one entity and the revision each last changed at."""
+
+    __slots__ = ('values', 'fields', 'revision', 'updated', 'encoded')
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+        self.fields: dict[str, tuple[int, int]] = {}  # name -> (hash, revision)
+        self.revision = 0
+        self.updated = 0.0
+        # (message type, since, codec) -> encoding of the current revision, shared by clients
+        self.encoded: dict[tuple[str | None, int, tuple | None], str | bytes] = {}
+
+
+class EntityRevisions:
+    """
+    Field-level revisions of keyed entities for delta SSE streams.
+
+    Every update that changes at least one field advances a tracker-wide
+    revision, and each field remembers the revision it last changed at,
+    so any client can be sent just the fields changed since the revision
+    it last saw. Fields that disappear from an entity change to None.
+    Entities not updated for ``max_age_seconds`` are forgotten, and every
+    forgotten entity leaves a tombstone at a new revision so clients can
+    be told it is gone; only the newest ``max_removed`` tombstones are kept.
+
+    Encoded messages are cached per revision, so clients that are equally
+    up to date share one serialization.
+    """
+
+    def __init__(self, key_field: str, max_age_seconds: float = 300.0, max_removed: int = 10000):
+        self.key_field = key_field
+        self.max_age = max_age_seconds
+        self.max_removed = max_removed
+        self.revision = 0
+        self._entities: OrderedDict[Hashable, _Entity] = OrderedDict()  # least recently updated first
+        self._removed: OrderedDict[Hashable, int] = OrderedDict()  # key -> revision removed at, oldest first
+        self._removed_floor = 0  # newest revision of a dropped tombstone
+        self._lock = threading.Lock()
+
+    def _forget(self, key: Hashable) -> None:
+        """Drop an entity and leave its tombstone; caller holds the lock."""
+        del self._entities[key]
+        self.revision += 1
+        self._removed[key] = self.revision
+        while len(self._removed) > self.max_removed:
+            _, self._removed_floor = self._removed.popitem(last=False)
+
+    def update(self, entity: dict[str, Any], now: float | None = None) -> int:
+        """Record the current state of an entity; returns its revision."""
+        key = entity[self.key_field]
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._entities.get(key)
+            if state is None:
+                state = self._entities[key] = _Entity()
+                self._removed.pop(key, None)
+            else:
+                self._entities.move_to_end(key)
+            state.updated = now
+
+            revision = self.revision + 1
+            changed = False
+            fields = state.fields
+            for name, value in entity.items():
+                digest = _field_hash(value)
+                known = fields.get(name)
+                if known is None or known[0] != digest:
+                    fields[name] = (digest, revision)
+                    changed = True
+                state.values[name] = value
+            if len(fields) > len(entity):
+                for name in [name for name in fields if name not in entity]:
+                    if state.values[name] is not None:
+                        fields[name] = (_field_hash(None), revision)
+                        state.values[name] = None
+                        changed = True
+            if changed:
+                self.revision = state.revision = revision
+                state.encoded.clear()
+
+            cutoff = now - self.max_age
+            while self._entities:
+                oldest_key, oldest = next(iter(self._entities.items()))
+                if oldest.updated >= cutoff:
+                    break
+                self._forget(oldest_key)
+            return state.revision
+
+    def delta(self, key: Hashable, since: int = 0) -> tuple[int, dict[str, Any]] | None:
+        """(revision, fields changed after ``since``) for an entity, or None if unknown."""
+        with self._lock:
+            state = self._entities.get(key)
+            if state is None:
+                return None
+            if since <= 0:
+                return state.revision, dict(state.values)
+            changed = {name: state.values[name] for name, (_, rev) in state.fields.items() if rev > since}
+            return state.revision, changed
+
+    def message(
+        self,
+        key: Hashable,
+        since: int,
+        message_type: str | None,
+        codec: StreamCodec | None = None,
+    ) -> tuple[int, str | bytes | None] | None:
+        """
+        JSON message with an entity's fields changed after ``since``.
+
+        Returns (revision, JSON), with None for the JSON if nothing changed
+        after ``since``, or None if the entity is unknown. Messages carry
+        ``rev`` and, for deltas, ``since``. With ``codec`` the message is
+        packed bytes instead of JSON.
+        """
+        with self._lock:
+            state = self._entities.get(key)
+            if state is None:
+                return None
+            if state.revision <= since:
+                return state.revision, None
+            variant = codec.variant if codec is not None else None
+            text = state.encoded.get((message_type, since, variant))
+            if text is None:
+                msg: dict[str, Any] = {'type': message_type} if message_type else {}
+                if since > 0:
+                    msg.update({name: state.values[name] for name, (_, rev) in state.fields.items() if rev > since})
+                    msg[self.key_field] = key
+                    msg['since'] = since
+                else:
+                    msg.update(state.values)
+                msg['rev'] = state.revision
+                text = codec.pack(msg) if codec is not None else json.dumps(msg)
+                state.encoded[(message_type, since, variant)] = text
+            return state.revision, text
+
+    def changed_since(self, since: int) -> list[Hashable]:
+        """Keys of entities with any field changed after ``since``."""
+        with self._lock:
+            return [key for key, state in self._entities.items() if state.revision > since]
+
+    def removed_since(self, since: int) -> list[tuple[Hashable, int]] | None:
+        """
+        (key, revision) of entities forgotten after ``since``, oldest first.
+
+        Returns None if tombstones after ``since`` have already been
+        dropped, in which case the caller has to resynchronise.
+        """
+        with self._lock:
+            if since < self._removed_floor:
+                return None
+            removed = []
+            for key, revision in reversed(self._removed.items()):
+                if revision <= since:
+                    break
+                removed.append((key, revision))
+            removed.reverse()
+            return removed
+
+    def retain(self, keys: Iterable[Hashable]) -> None:
+        """Forget every entity whose key is not in ``keys``."""
+        keep = set(keys)
+        with self._lock:
+            for key in [key for key in self._entities if key not in keep]:
+                self._forget(key)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entities:
+                self._forget(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entities):
+                self._forget(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entities
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entities)
+
+
+class DeltaSubscriber:
+    """
+    One client's view of an :class:`EntityRevisions`.
+
+    Entity messages become deltas against the revision this client was
+    last sent for that entity; the first message for an entity, and a
+    periodic keyframe of every entity, carry all fields. Entity messages
+    are returned as JSON text, or bytes packed with ``codec``, from the
+    shared cache; other messages pass through unchanged.
+
+    With ``removals`` each tick also reports entities this client was
+    sent that have since been forgotten, as ``{key_field: key,
+    'removed': True, 'rev': revision}`` messages.
+    """
+
+    def __init__(
+        self,
+        revisions: EntityRevisions,
+        message_type: str | None,
+        keyframe_interval: float = SSE_DELTA_KEYFRAME_INTERVAL,
+        codec: StreamCodec | None = None,
+        removals: bool = False,
+    ):
+        self.revisions = revisions
+        self.message_type = message_type
+        self.keyframe_interval = keyframe_interval
+        self.codec = codec
+        self.removals = removals
+        self._sent: dict[Hashable, int] = {}
+        self._removed_seen = revisions.revision
+        self._next_keyframe = 0.0
+
+    def removed(self) -> list[str | bytes]:
+        """Removal messages for entities this client was sent that are now forgotten."""
+        removed = self.revisions.removed_since(self._removed_seen)
+        if removed is None:
+            # Tombstones were dropped before this client saw them
+            self._removed_seen = self.revisions.revision
+            removed = [(key, self._removed_seen) for key in self._sent if key not in self.revisions]
+        elif removed:
+            self._removed_seen = removed[-1][1]
+        out = []
+        for key, revision in removed:
+            if self._sent.pop(key, None) is None:
+                continue
+            msg: dict[str, Any] = {'type': self.message_type} if self.message_type else {}
+            msg.update({self.revisions.key_field: key, 'removed': True, 'rev': revision})
+            out.append(self.codec.pack(msg) if self.codec is not None else json.dumps(msg))
+        return out
+
+    def keyframe(self, now: float | None = None) -> list[str | bytes]:
+        """Full messages for every known entity; restarts all deltas."""
+        now = time.monotonic() if now is None else now
+        self._next_keyframe = now + self.keyframe_interval
+        self._sent = {}
+        out = []
+        for key in self.revisions.changed_since(0):
+            current = self.revisions.message(key, 0, self.message_type, self.codec)
+            if current is not None:
+                self._sent[key], text = current
+                out.append(text)
+        return out
+
+    def tick(self, now: float | None = None) -> list[str | bytes]:
+        """Removal messages, then keyframe messages if one is due."""
+        now = time.monotonic() if now is None else now
+        out = self.removed() if self.removals else []
+        if now >= self._next_keyframe:
+            out.extend(self.keyframe(now))
+        return out
+
+    def encode(self, msg: dict[str, Any]) -> dict[str, Any] | str | bytes | None:
+        """Delta JSON for an entity message; None if this client is already current."""
+        if self.message_type and msg.get('type') != self.message_type:
+            return msg
+        key = msg.get(self.revisions.key_field)
+        since = self._sent.get(key, 0)
+        current = self.revisions.message(key, since, self.message_type, self.codec) if key is not None else None
+        if current is None:
+            return msg
+        revision, text = current
+        if text is not None:
+            self._sent[key] = revision
+        return text
+
+    def feed(self, msg: dict[str, Any], now: float | None = None) -> list[dict[str, Any] | str | bytes]:
+        """Messages to send for one queued message, keyframe first when due."""
+        out: list[dict[str, Any] | str | bytes] = [*self.tick(now)]
+        encoded = self.encode(msg) if isinstance(msg, dict) else msg
+        if encoded is not None:
+            out.append(encoded)
+        return out
+
+
 def clear_queue(q: queue.Queue) -> int:
     """
     Clear all items from a queue.
@@ -0,0 +1,245 @@
+"""Compact binary encodings for high-rate stream messages.
+
+Clients may ask a stream for CBOR (RFC 8949) or, when the ``msgpack``
+package is installed, MessagePack instead of JSON text. JSON remains the
+default. Both binary codecs replace known dictionary keys with small
+integers from a per-stream :class:`KeyDictionary`; each client is sent
+the key table, and later additions to it, before any message using them.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from utils.constants import STREAM_CODEC_MAX_KEYS
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Leading byte of binary WebSocket side messages; spectrum frames use 0x01
+WS_CODEC_MESSAGE_TYPE = 0x02
+
+_FLOAT32 = struct.Struct('>Bf')
+_FLOAT64 = struct.Struct('>Bd')
+
+
+class KeyDictionary:
+    """
+    Append-only table of message keys shared by every client of a stream.
+
+    Keys are numbered in the order they are added, starting from the
+    ``initial`` field names; unseen keys are added as messages are packed
+    until ``max_keys`` is reached, after which they stay strings. Since
+    numbers never change, packed messages can be shared between clients.
+    """
+
+    def __init__(self, initial: Iterable[str] = (), max_keys: int = STREAM_CODEC_MAX_KEYS):
+        self.max_keys = max_keys
+        self._keys: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._cbor: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        for key in initial:
+            self.lookup(key)
+
+    def lookup(self, key: str) -> int | str:
+        """Number for a key, adding it if there is room; else the key itself."""
+        index = self._ids.get(key)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._ids.get(key)
+            if index is None:
+                if len(self._keys) >= self.max_keys:
+                    return key
+                index = self._ids[key] = len(self._keys)
+                self._keys.append(key)
+            return index
+
+    def encoded(self, key: str) -> bytes:
+        """CBOR encoding of a key as its number, or as text past ``max_keys``."""
+        data = self._cbor.get(key)
+        if data is None:
+            index = self.lookup(key)
+            data = encode_cbor(index)
+            if type(index) is int:
+                self._cbor[key] = data
+        return data
+
+    def keys(self, start: int = 0) -> list[str]:
+        """Keys numbered from ``start`` onwards."""
+        return self._keys[start:]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _head(major: int, value: int) -> bytes:
+    """CBOR initial byte and argument for a major type."""
+    major <<= 5
+    if value < 24:
+        return bytes((major | value,))
+    if value < 0x100:
+        return bytes((major | 24, value))
+    if value < 0x10000:
+        return bytes((major | 25,)) + value.to_bytes(2, 'big')
+    if value < 0x100000000:
+        return bytes((major | 26,)) + value.to_bytes(4, 'big')
+    return bytes((major | 27,)) + value.to_bytes(8, 'big')
+
+
+# Heads for the small unsigned ints and text lengths most messages hold
+_UINT_HEADS = tuple(_head(0, i) for i in range(0x100))
+_TEXT_HEADS = tuple(_head(3, i) for i in range(0x100))
+
+
+def _encode_float(value: float) -> bytes:
+    """Single precision for whole numbers it holds exactly, else double."""
+    if value.is_integer() and -0x1000000 <= value <= 0x1000000:
+        return _FLOAT32.pack(0xFA, value)
+    return _FLOAT64.pack(0xFB, value)
+
+
+def encode_cbor(value: Any, keys: KeyDictionary | None = None) -> bytes:
+    """
+    Encode a JSON-like value as CBOR.
+
+    Dict keys are replaced by their number in ``keys`` when given. Tuples
+    encode as arrays; other types than JSON's raise TypeError.
+    """
+    out = bytearray()
+    _encode(value, out, keys)
+    return bytes(out)
+
+
+def _encode(value: Any, out: bytearray, keys: KeyDictionary | None) -> None:
+    # Ordered by how often each type appears in stream messages
+    kind = type(value)
+    if kind is str:
+        data = value.encode('utf-8')
+        size = len(data)
+        out += _TEXT_HEADS[size] if size < 0x100 else _head(3, size)
+        out += data
+    elif kind is float:
+        out += _encode_float(value)
+    elif kind is int:
+        if 0 <= value < 0x100:
+            out += _UINT_HEADS[value]
+        else:
+            out += _head(0, value) if value >= 0 else _head(1, -1 - value)
+    elif value is None:
+        out.append(0xF6)
+    elif kind is bool:
+        out.append(0xF5 if value else 0xF4)
+    elif isinstance(value, dict):
+        out += _head(5, len(value))
+        for key, item in value.items():
+            if keys is not None and type(key) is str:
+                out += keys.encoded(key)
+            else:
+                _encode(key, out, None)
+            _encode(item, out, keys)
+    elif isinstance(value, (list, tuple)):
+        out += _head(4, len(value))
+        for item in value:
+            _encode(item, out, keys)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out += _head(2, len(value))
+        out += value
+    elif isinstance(value, str):
+        _encode(str.__str__(value), out, keys)
+    elif isinstance(value, int):
+        _encode(int(value), out, keys)
+    elif isinstance(value, float):
+        _encode(float(value), out, keys)
+    else:
+        raise TypeError(f'Object of type {kind.__name__} is not CBOR serializable')
+
+
+def _numbered(value: Any, keys: KeyDictionary) -> Any:
+    """Copy of a value with dict keys replaced by their numbers."""
+    if isinstance(value, dict):
+        return {
+            keys.lookup(key) if type(key) is str else key: _numbered(item, keys)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_numbered(item, keys) for item in value]
+    return value
+
+
+class StreamCodec:
+    """
+    One client's binary encoding of a stream.
+
+    ``pack`` output depends only on the codec name and the key dictionary,
+    so it may be cached and shared; ``key_update`` tracks which keys this
+    client has been sent.
+    """
+
+    def __init__(self, name: str, keys: KeyDictionary):
+        if name not in ('cbor', 'msgpack'):
+            raise ValueError(f'Unknown stream codec: {name}')
+        if name == 'msgpack' and not MSGPACK_AVAILABLE:
+            raise ValueError('msgpack is not installed')
+        self.name = name
+        self.keys = keys
+        # Cache key for shared packed messages
+        self.variant = (name, id(keys))
+        self._keys_sent: int | None = None
+
+    def pack(self, msg: Any) -> bytes:
+        """Binary form of a message, with dictionary keys numbered."""
+        if self.name == 'cbor':
+            return encode_cbor(msg, self.keys)
+        return msgpack.packb(_numbered(msg, self.keys), use_bin_type=True)
+
+    def key_update(self) -> dict[str, Any] | None:
+        """
+        Key table entries this client has not been sent yet, or None.
+
+        The first update also names the codec, so it is always sent.
+        """
+        count = len(self.keys)
+        if self._keys_sent == count:
+            return None
+        start = self._keys_sent or 0
+        self._keys_sent = count
+        return {'type': 'codec', 'codec': self.name, 'offset': start, 'keys': self.keys.keys(start)[:count - start]}
+
+    def ws_frames(self, msg: dict[str, Any] | bytes) -> list[str | bytes]:
+        """WebSocket frames for a side message: key update as JSON text, then the binary message."""
+        packed = msg if isinstance(msg, bytes) else self.pack(msg)
+        update = self.key_update()
+        frame = bytes((WS_CODEC_MESSAGE_TYPE,)) + packed
+        if update is None:
+            return [frame]
+        return [json.dumps(update), frame]
+
+
+def ws_message_frames(msg: dict[str, Any], codec: StreamCodec | None = None) -> list[str | bytes]:
+    """WebSocket frames for a side message: JSON text, or binary in ``codec``."""
+    if codec is None:
+        return [json.dumps(msg)]
+    return codec.ws_frames(msg)
+
+
+def negotiate_codec(requested: str | None, keys: KeyDictionary) -> StreamCodec | None:
+    """
+    Codec for a client's ``codec`` request parameter.
+
+    Returns None, meaning JSON, for no request, ``json``, unknown names
+    and MessagePack without the ``msgpack`` package.
+    """
+    name = (requested or '').strip().lower()
+    if name == 'cbor' or (name == 'msgpack' and MSGPACK_AVAILABLE):
+        return StreamCodec(name, keys)
+    return None
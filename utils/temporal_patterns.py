@@ -2,60 +2,178 @@
 
 from __future__ import annotations
 
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
 
+import numpy as np
 
-class TemporalPatternDetector:
-    """Detect periodic patterns from event timestamps per device."""
+from config import PATTERN_DEVICE_TTL, PATTERN_MEMORY_LIMIT_MB
+
+# Rough per-device cost besides the interval ring: the history object,
+# its key string and the table/index entries pointing at it.
+DEVICE_OVERHEAD_BYTES = 512
+
+
+class _DeviceHistory:
+    """Fixed-size ring of inter-arrival intervals for one mode:device key."""
+
+    __slots__ = ('intervals', 'count', 'pos', 'last_ts', 'occurrences', 'dirty')
+
+    def __init__(self, timestamp: float):
+        # The ring is allocated on the second event; most keys seen in a
+        # busy environment never repeat.
+        self.intervals: np.ndarray | None = None
+        self.count = 0
+        self.pos = 0
+        self.last_ts = timestamp
+        self.occurrences = 1
+        self.dirty = False
+
+    def add(self, timestamp: float, capacity: int) -> None:
+        if self.intervals is None:
+            self.intervals = np.empty(capacity, dtype=np.float64)
+        self.intervals[self.pos] = timestamp - self.last_ts
+        self.pos = (self.pos + 1) % capacity
+        self.count = min(self.count + 1, capacity)
+        self.last_ts = timestamp
+        self.occurrences = self.count + 1
+        self.dirty = True
 
-    def __init__(self, max_timestamps: int = 200):
-        self._timestamps: dict[str, list[float]] = defaultdict(list)
+    def window(self) -> np.ndarray:
+        """Stored intervals, oldest first."""
+        if self.intervals is None:
+            return np.empty(0, dtype=np.float64)
+        if self.count < len(self.intervals):
+            return self.intervals[:self.count]
+        return np.concatenate((self.intervals[self.pos:], self.intervals[:self.pos]))
+
+
+class TemporalPatternDetector:
+    """Detect periodic patterns from event timestamps per device.
+
+    Histories live in an LRU table bounded by a memory ceiling and a TTL,
+    so the detector can stay attached to the event pipeline for days.
+    Pattern results are cached per key and only recomputed for keys that
+    received events since the last query.
+    """
+
+    def __init__(
+        self,
+        max_timestamps: int = 200,
+        memory_limit_mb: float = PATTERN_MEMORY_LIMIT_MB,
+        device_ttl: float = PATTERN_DEVICE_TTL,
+    ):
         self._max_timestamps = max_timestamps
+        self._ring_size = max(1, max_timestamps - 1)
+        self._device_ttl = device_ttl
+        self._memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self._max_devices = max(1, self._memory_limit // self.device_bytes)
+
+        self._devices: OrderedDict[str, _DeviceHistory] = OrderedDict()
+        self._modes_by_device: dict[str, list[str]] = {}
+        self._patterns: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._all_patterns: list[dict] | None = None
+        self._evicted = 0
+        self._next_expiry = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def device_bytes(self) -> int:
+        """Estimated memory held by one device with a full history."""
+        return self._ring_size * 8 + DEVICE_OVERHEAD_BYTES
 
     def record_event(self, device_id: str, mode: str, timestamp: float | None = None) -> None:
         key = f"{mode}:{device_id}"
         ts = timestamp or time.time()
-        buf = self._timestamps[key]
-        buf.append(ts)
-        if len(buf) > self._max_timestamps:
-            del buf[: len(buf) - self._max_timestamps]
+        with self._lock:
+            history = self._devices.get(key)
+            if history is None:
+                self._devices[key] = _DeviceHistory(ts)
+                self._modes_by_device.setdefault(device_id, []).append(mode)
+                self._evict(ts)
+                return
+            self._devices.move_to_end(key)
+            history.add(ts, self._ring_size)
+            if key not in self._dirty:
+                self._dirty.add(key)
+                self._all_patterns = None
+            self._evict(ts)
+
+    def _evict(self, now: float) -> None:
+        """Drop least recently updated keys over capacity or past the TTL."""
+        devices = self._devices
+        while len(devices) > self._max_devices:
+            self._forget(devices.popitem(last=False)[0])
+
+        # Expiry sweeps are cheap but not free; run them a few hundred
+        # times per TTL rather than on every event
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + self._device_ttl / 256
+        cutoff = now - self._device_ttl
+        while devices:
+            key, history = next(iter(devices.items()))
+            if history.last_ts >= cutoff:
+                break
+            del devices[key]
+            self._forget(key)
+
+    def _forget(self, key: str) -> None:
+        self._evicted += 1
+        mode, device_id = key.split(':', 1)
+        modes = self._modes_by_device.get(device_id)
+        if modes is not None:
+            modes.remove(mode)
+            if not modes:
+                del self._modes_by_device[device_id]
+        self._dirty.discard(key)
+        if self._patterns.pop(key, None) is not None:
+            self._all_patterns = None
+
+    def _refresh(self, key: str) -> dict | None:
+        """Cached pattern for a key, recomputed if new events arrived."""
+        history = self._devices.get(key)
+        if history is None:
+            return None
+        if history.dirty:
+            history.dirty = False
+            self._dirty.discard(key)
+            result = self._analyze_intervals(history.window(), history.occurrences)
+            if result:
+                self._patterns[key] = result
+            else:
+                self._patterns.pop(key, None)
+        return self._patterns.get(key)
 
     def detect_patterns(self, device_id: str, mode: str | None = None) -> dict | None:
         """Detect periodic patterns for a device.
 
         Returns dict with period_seconds, confidence, occurrences or None.
         """
-        keys = []
-        if mode:
-            keys.append(f"{mode}:{device_id}")
-        else:
-            keys = [k for k in self._timestamps if k.endswith(f":{device_id}")]
-
-        for key in keys:
-            result = self._analyze_intervals(self._timestamps.get(key, []))
-            if result:
-                result['device_id'] = device_id
-                result['mode'] = key.split(':')[0]
-                return result
+        with self._lock:
+            modes = [mode] if mode else list(self._modes_by_device.get(device_id, ()))
+            for m in modes:
+                result = self._refresh(f"{m}:{device_id}")
+                if result:
+                    return {**result, 'device_id': device_id, 'mode': m}
         return None
 
-    def _analyze_intervals(self, timestamps: list[float]) -> dict | None:
-        if len(timestamps) < 4:
+    def _analyze_intervals(self, intervals: np.ndarray, occurrences: int) -> dict | None:
+        if occurrences < 4:
             return None
 
-        intervals = [timestamps[i + 1] - timestamps[i] for i in range(len(timestamps) - 1)]
-
-        # Find the median interval
-        sorted_intervals = sorted(intervals)
-        median = sorted_intervals[len(sorted_intervals) // 2]
+        # Upper median, matching a sort-and-index of the intervals
+        mid = len(intervals) // 2
+        median = float(np.partition(intervals, mid)[mid])
 
         if median < 1.0:
             return None
 
         # Count how many intervals are within 20% of the median
         tolerance = median * 0.2
-        matching = sum(1 for iv in intervals if abs(iv - median) <= tolerance)
+        matching = int(np.count_nonzero(np.abs(intervals - median) <= tolerance))
         confidence = matching / len(intervals)
 
         if confidence < 0.5:
@@ -64,22 +182,43 @@ class TemporalPatternDetector:
         return {
             'period_seconds': round(median, 1),
             'confidence': round(confidence, 3),
-            'occurrences': len(timestamps),
+            'occurrences': occurrences,
         }
 
     def get_all_patterns(self) -> list[dict]:
         """Return all detected patterns across all devices."""
-        results = []
-        seen = set()
-        for key in self._timestamps:
-            mode, device_id = key.split(':', 1)
-            if device_id in seen:
-                continue
-            pattern = self.detect_patterns(device_id, mode)
-            if pattern:
-                results.append(pattern)
-                seen.add(device_id)
-        return results
+        with self._lock:
+            for key in list(self._dirty):
+                self._refresh(key)
+            if self._all_patterns is None:
+                results = []
+                seen = set()
+                for key in self._patterns:
+                    device_id = key.split(':', 1)[1]
+                    if device_id in seen:
+                        continue
+                    seen.add(device_id)
+                    # First mode the device was seen on wins, as in detect_patterns
+                    for mode in self._modes_by_device[device_id]:
+                        pattern = self._patterns.get(f"{mode}:{device_id}")
+                        if pattern:
+                            results.append({**pattern, 'device_id': device_id, 'mode': mode})
+                            break
+                self._all_patterns = results
+            return [dict(p) for p in self._all_patterns]
+
+    def stats(self) -> dict:
+        """Table size and estimated memory against the configured ceiling."""
+        with self._lock:
+            rings = sum(1 for h in self._devices.values() if h.intervals is not None)
+            return {
+                'devices': len(self._devices),
+                'max_devices': self._max_devices,
+                'evicted': self._evicted,
+                'patterns': len(self._patterns),
+                'estimated_bytes': len(self._devices) * DEVICE_OVERHEAD_BYTES + rings * self._ring_size * 8,
+                'memory_limit_bytes': self._memory_limit,
+            }
 
 
 # Singleton
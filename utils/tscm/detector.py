@@ -8,8 +8,11 @@ and classify threats based on known patterns and baseline comparison.
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict, deque
 
+from config import TSCM_REPEAT_MAX_IDENTIFIERS
 from data.tscm_frequencies import (
     get_frequency_risk,
     get_threat_severity,
@@ -49,26 +52,124 @@ AUDIO_CAPABLE_BLE_NAMES = [
     'jbl', 'soundcore', 'anker', 'skullcandy',
 ]
 
-# Device history for tracking repeat detections across scans
-_device_history: dict[str, list[datetime]] = {}
-_history_window_hours = 24  # Consider detections within 24 hours
+# Repeat detections are counted over this window
+REPEAT_WINDOW_SECONDS = 24 * 3600
+# Sightings are counted in buckets of this width; the window may reach back
+# up to one extra bucket, and memory per identifier is bounded by the count
+REPEAT_BUCKET_SECONDS = 300
+
+
+class RepeatSightingTracker:
+    """Count sightings per identifier over a sliding window.
+
+    Each identifier keeps a running total, a counter for its current
+    bucket and, once it has been seen in more than one bucket, a deque of
+    ``(bucket, count)`` pairs for the older ones. Recording and counting
+    are O(1) amortized however often a device is seen, and identifiers
+    seen once (randomized MACs) never allocate a deque. Identifiers idle
+    for a whole window are evicted, and the table is capped at
+    ``max_identifiers`` least recently seen.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = REPEAT_WINDOW_SECONDS,
+        bucket_seconds: float = REPEAT_BUCKET_SECONDS,
+        max_identifiers: int = TSCM_REPEAT_MAX_IDENTIFIERS,
+    ):
+        self._window = window_seconds
+        self._bucket_seconds = bucket_seconds
+        self._buckets = max(1, int(window_seconds // bucket_seconds))
+        self._max_identifiers = max_identifiers
+        # identifier -> [total, last_seen, bucket, bucket_count, older buckets or None]
+        self._history: OrderedDict[str, list] = OrderedDict()
+        self._evicted = 0
+        self._next_expiry = 0.0
+        self._lock = threading.Lock()
+
+    def _trim(self, entry: list, bucket: int) -> None:
+        oldest = bucket - self._buckets
+        older = entry[4]
+        while older and older[0][0] < oldest:
+            entry[0] -= older.popleft()[1]
+        if entry[2] < oldest:
+            entry[0] -= entry[3]
+            entry[3] = 0
+
+    def record(self, identifier: str, now: float | None = None) -> int:
+        """Record a sighting and return the sightings within the window."""
+        now = time.monotonic() if now is None else now
+        bucket = int(now // self._bucket_seconds)
+        with self._lock:
+            entry = self._history.get(identifier)
+            if entry is None:
+                entry = self._history[identifier] = [0, now, bucket, 0, None]
+            else:
+                self._history.move_to_end(identifier)
+                self._trim(entry, bucket)
+                if entry[2] != bucket:
+                    if entry[3]:
+                        if entry[4] is None:
+                            entry[4] = deque()
+                        entry[4].append((entry[2], entry[3]))
+                    entry[2] = bucket
+                    entry[3] = 0
+            entry[0] += 1
+            entry[1] = now
+            entry[3] += 1
+            count = entry[0]
+            self._evict(now)
+        return count
+
+    def count(self, identifier: str, now: float | None = None) -> int:
+        """Sightings of an identifier within the window, without recording."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._history.get(identifier)
+            if entry is None:
+                return 0
+            self._trim(entry, int(now // self._bucket_seconds))
+            return entry[0]
+
+    def _evict(self, now: float) -> None:
+        history = self._history
+        while len(history) > self._max_identifiers:
+            history.popitem(last=False)
+            self._evicted += 1
+
+        # Least recently seen first, so the sweep stops at the first live one
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + self._bucket_seconds
+        cutoff = now - self._window
+        while history:
+            identifier, entry = next(iter(history.items()))
+            if entry[1] >= cutoff:
+                break
+            del history[identifier]
+            self._evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'identifiers': len(self._history),
+                'max_identifiers': self._max_identifiers,
+                'buckets': sum(1 + len(entry[4] or ()) for entry in self._history.values()),
+                'evicted': self._evicted,
+            }
+
+
+# Repeat detections across scans
+_repeat_tracker = RepeatSightingTracker()
 
 
 def _record_device_seen(identifier: str) -> int:
     """Record a device sighting and return count of times seen."""
-    now = datetime.now()
-    if identifier not in _device_history:
-        _device_history[identifier] = []
-
-    # Clean old entries
-    cutoff = now.timestamp() - (_history_window_hours * 3600)
-    _device_history[identifier] = [
-        dt for dt in _device_history[identifier]
-        if dt.timestamp() > cutoff
-    ]
-
-    _device_history[identifier].append(now)
-    return len(_device_history[identifier])
+    return _repeat_tracker.record(identifier)
 
 
 def _is_audio_capable_ble(name: str | None, device_type: str | None = None) -> bool:
@@ -26,6 +26,7 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import math
 import statistics
 from collections import defaultdict
 from dataclasses import dataclass, field
@@ -54,6 +55,9 @@ RSSI_PROXIMITY_THRESHOLD = 10  # dBm difference
 # Time window for temporal correlation
 TEMPORAL_CORRELATION_WINDOW = timedelta(seconds=5)
 
+# Leading manufacturer data bytes used in the cluster signature index
+SIGNATURE_PREFIX_BYTES = 4
+
 # Fingerprint weights (sum to 1.0 for normalization)
 FINGERPRINT_WEIGHTS = {
     'manufacturer_data': 0.25,
@@ -568,13 +572,27 @@ def rssi_trajectory_similarity(samples1: list[int],
     Devices at the same physical location show similar RSSI patterns.
     This helps correlate observations that may be from the same device.
     """
-    if len(samples1) < 3 or len(samples2) < 3:
+    return _rssi_stats_similarity(_rssi_stats(samples1), _rssi_stats(samples2))
+
+
+def _rssi_stats(samples: list[int]) -> tuple[float, float | None] | None:
+    """Mean and variance used by RSSI trajectory comparison."""
+    if len(samples) < 3:
+        return None
+    try:
+        variance = statistics.variance(samples)
+    except statistics.StatisticsError:
+        variance = None
+    return statistics.mean(samples), variance
+
+
+def _rssi_stats_similarity(stats1: tuple | None, stats2: tuple | None) -> float:
+    """rssi_trajectory_similarity() over precomputed _rssi_stats()."""
+    if stats1 is None or stats2 is None:
         return 0.0
 
     # Compare mean RSSI (proximity indicator)
-    mean1 = statistics.mean(samples1)
-    mean2 = statistics.mean(samples2)
-    mean_diff = abs(mean1 - mean2)
+    mean_diff = abs(stats1[0] - stats2[0])
 
     # If means are very different, devices are likely in different locations
     if mean_diff > 20:
@@ -583,13 +601,11 @@ def rssi_trajectory_similarity(samples1: list[int],
     mean_sim = 1.0 - (mean_diff / 20)
 
     # Compare RSSI variance (movement pattern)
-    try:
-        var1 = statistics.variance(samples1)
-        var2 = statistics.variance(samples2)
-        var_diff = abs(var1 - var2)
-        var_sim = 1.0 / (1.0 + var_diff / 50)
-    except statistics.StatisticsError:
+    if stats1[1] is None or stats2[1] is None:
         var_sim = 0.5
+    else:
+        var_diff = abs(stats1[1] - stats2[1])
+        var_sim = 1.0 / (1.0 + var_diff / 50)
 
     return 0.6 * mean_sim + 0.4 * var_sim
 
@@ -601,11 +617,30 @@ def timing_pattern_similarity(intervals1: list[float],
 
     Devices often have characteristic timing patterns.
     """
-    if len(intervals1) < 2 or len(intervals2) < 2:
+    return _timing_stats_similarity(_timing_stats(intervals1), _timing_stats(intervals2))
+
+
+def _timing_stats(intervals: list[float]) -> tuple[float, float | None] | None:
+    """Mean and coefficient of variation used by timing comparison."""
+    if len(intervals) < 2:
+        return None
+    mean = statistics.mean(intervals)
+    if mean == 0:
+        return mean, None
+    try:
+        cv = statistics.stdev(intervals) / mean if mean > 0 else 0
+    except statistics.StatisticsError:
+        cv = None
+    return mean, cv
+
+
+def _timing_stats_similarity(stats1: tuple | None, stats2: tuple | None) -> float:
+    """timing_pattern_similarity() over precomputed _timing_stats()."""
+    if stats1 is None or stats2 is None:
         return 0.0
 
-    mean1 = statistics.mean(intervals1)
-    mean2 = statistics.mean(intervals2)
+    mean1, cv1 = stats1
+    mean2, cv2 = stats2
 
     # Calculate relative difference
     if mean1 == 0 or mean2 == 0:
@@ -614,12 +649,10 @@ def timing_pattern_similarity(intervals1: list[float],
     ratio = min(mean1, mean2) / max(mean1, mean2)
 
     # Also compare variance in timing
-    try:
-        cv1 = statistics.stdev(intervals1) / mean1 if mean1 > 0 else 0
-        cv2 = statistics.stdev(intervals2) / mean2 if mean2 > 0 else 0
-        cv_sim = 1.0 - abs(cv1 - cv2)
-    except statistics.StatisticsError:
+    if cv1 is None or cv2 is None:
         cv_sim = 0.5
+    else:
+        cv_sim = 1.0 - abs(cv1 - cv2)
 
     return 0.7 * ratio + 0.3 * max(0, cv_sim)
 
@@ -646,6 +679,124 @@ def name_similarity(name1: str | None, name2: str | None) -> float:
     return common / total if total > 0 else 0.0
 
 
+# =============================================================================
+# Cluster Signatures
+# =============================================================================
+
+class _RunningStats:
+    """Count, mean and sum of squared deviations; two summaries combine in O(1)."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, samples=()):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        for x in samples:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: _RunningStats) -> None:
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    def variance(self) -> float:
+        """Sample variance, as statistics.variance(); needs two samples."""
+        return max(self.m2, 0.0) / (self.count - 1)
+
+
+def _rssi_summary(stats: _RunningStats) -> tuple[float, float | None] | None:
+    """_rssi_stats() from a running summary."""
+    if stats.count < 3:
+        return None
+    return stats.mean, stats.variance()
+
+
+def _timing_summary(stats: _RunningStats) -> tuple[float, float | None] | None:
+    """_timing_stats() from a running summary."""
+    if stats.count < 2:
+        return None
+    if stats.mean == 0:
+        return stats.mean, None
+    return stats.mean, math.sqrt(stats.variance()) / stats.mean if stats.mean > 0 else 0
+
+
+class _Signature:
+    """
+    Precomputed similarity inputs for a session or cluster.
+
+    Built once when a session is finalized and merged into its cluster's
+    signature, so scoring a candidate never walks observation history.
+    """
+
+    __slots__ = (
+        'manufacturer_data', 'service_uuids', 'name', 'rssi',
+        'rssi_stats', 'timing', 'timing_stats', 'keys',
+    )
+
+    def __init__(self):
+        self.manufacturer_data: bytes | None = None
+        self.service_uuids: set[str] = set()
+        self.name: str | None = None
+        self.rssi = _RunningStats()
+        self.rssi_stats: tuple | None = None
+        self.timing = _RunningStats()
+        self.timing_stats: tuple | None = None
+        self.keys: set[tuple] = set()
+
+    @classmethod
+    def from_session(cls, session: DeviceSession) -> _Signature:
+        sig = cls()
+        for obs in session.observations:
+            mfg_data = getattr(obs, 'manufacturer_data', None)
+            if mfg_data and sig.manufacturer_data is None:
+                sig.manufacturer_data = mfg_data
+            uuids = getattr(obs, 'service_uuids', None)
+            if uuids:
+                sig.service_uuids.update(uuids)
+            if sig.name is None and getattr(obs, 'local_name', None):
+                sig.name = obs.local_name
+            key = _payload_key(obs)
+            if key is not None:
+                sig.keys.add(key)
+        sig.keys.update(('fp', fp) for fp in session.fingerprint_hashes)
+        sig.rssi = _RunningStats(session.rssi_samples)
+        sig.rssi_stats = _rssi_stats(session.rssi_samples)
+        sig.timing = _RunningStats(session.observation_intervals)
+        sig.timing_stats = _timing_stats(session.observation_intervals)
+        return sig
+
+    def merge(self, other: _Signature) -> None:
+        """Fold a newly linked session into a cluster signature."""
+        if self.manufacturer_data is None:
+            self.manufacturer_data = other.manufacturer_data
+        self.service_uuids |= other.service_uuids
+        self.keys |= other.keys
+        if other.rssi.count:
+            self.rssi.merge(other.rssi)
+            self.rssi_stats = _rssi_summary(self.rssi)
+        if other.timing.count:
+            self.timing.merge(other.timing)
+            self.timing_stats = _timing_summary(self.timing)
+
+
+def _payload_key(obs) -> tuple | None:
+    """(manufacturer ID, service UUID set, payload prefix) index key for a BLE observation."""
+    mfg_id = getattr(obs, 'manufacturer_id', None)
+    uuids = frozenset(getattr(obs, 'service_uuids', None) or ())
+    prefix = (getattr(obs, 'manufacturer_data', None) or b'')[:SIGNATURE_PREFIX_BYTES]
+    if mfg_id is None and not uuids and not prefix:
+        return None
+    return ('payload', mfg_id, uuids, prefix)
+
+
 # =============================================================================
 # Device Identity Engine
 # =============================================================================
@@ -666,6 +817,13 @@ class DeviceIdentityEngine:
         # Fingerprint index for efficient lookup
         self._fingerprint_to_sessions: dict[str, list[str]] = defaultdict(list)
 
+        # Cluster signatures and (protocol, key) -> cluster IDs. Sessions
+        # without any payload or fingerprint key fall back to the keyless
+        # clusters of their protocol.
+        self._signatures: dict[str, _Signature] = {}
+        self._cluster_index: dict[tuple, list[str]] = defaultdict(list)
+        self._cluster_order: dict[str, int] = {}
+
         # Session counters
         self._session_counter = 0
         self._cluster_counter = 0
@@ -772,52 +930,85 @@ class DeviceIdentityEngine:
 
     def _finalize_session(self, session: DeviceSession) -> None:
         """Finalize a session and attempt to cluster it."""
+        signature = _Signature.from_session(session)
+
         # Try to find existing cluster for this session
-        cluster = self._find_matching_cluster(session)
+        cluster, similarity = self._find_matching_cluster(session, signature)
 
         if cluster:
             # Add to existing cluster
-            similarity = self._calculate_cluster_similarity(cluster, session)
             cluster.add_session(
                 session,
                 link_reason="Fingerprint/behavioral match",
                 link_confidence=similarity
             )
+            self._signatures[cluster.cluster_id].merge(signature)
+            self._index_cluster(cluster, signature.keys)
         else:
             # Create new cluster
             cluster = self._create_cluster_from_session(session)
             self.clusters[cluster.cluster_id] = cluster
+            self._cluster_order[cluster.cluster_id] = len(self._cluster_order)
+            self._signatures[cluster.cluster_id] = signature
+            self._index_cluster(cluster, signature.keys)
 
         # Run risk assessment on the cluster
         self._assess_cluster_risk(cluster)
 
-    def _find_matching_cluster(self, session: DeviceSession) -> DeviceCluster | None:
+    def _index_cluster(self, cluster: DeviceCluster, keys: set[tuple]) -> None:
+        """Register a cluster under the signature keys of a linked session."""
+        for key in keys or (('keyless',),):
+            bucket = self._cluster_index[(cluster.protocol, key)]
+            if cluster.cluster_id not in bucket:
+                bucket.append(cluster.cluster_id)
+
+    def _candidate_clusters(self, session: DeviceSession, signature: _Signature) -> list[DeviceCluster]:
+        """Clusters sharing a signature key with the session, oldest first."""
+        candidates = set()
+        for key in signature.keys or (('keyless',),):
+            candidates.update(self._cluster_index.get((session.protocol, key), ()))
+        return [self.clusters[cid] for cid in sorted(candidates, key=self._cluster_order.__getitem__)]
+
+    def _find_matching_cluster(
+        self,
+        session: DeviceSession,
+        signature: _Signature | None = None,
+    ) -> tuple[DeviceCluster | None, float]:
         """
         Find an existing cluster that matches this session.
 
         Uses fingerprint matching, temporal correlation, and RSSI similarity.
+        Only clusters sharing a payload key (manufacturer ID, service UUID
+        set, payload prefix) or fingerprint hash with the session are scored.
+
+        Returns:
+            Best matching cluster (or None) and its similarity
         """
+        if signature is None:
+            signature = _Signature.from_session(session)
+
         best_match = None
         best_score = MIN_CLUSTER_CONFIDENCE
 
-        for cluster in self.clusters.values():
-            if cluster.protocol != session.protocol:
-                continue
-
-            similarity = self._calculate_cluster_similarity(cluster, session)
+        for cluster in self._candidate_clusters(session, signature):
+            similarity = self._calculate_cluster_similarity(cluster, session, signature)
             if similarity > best_score:
                 best_score = similarity
                 best_match = cluster
 
-        return best_match
+        return best_match, best_score
 
     def _calculate_cluster_similarity(self, cluster: DeviceCluster,
-                                       session: DeviceSession) -> float:
+                                       session: DeviceSession,
+                                       signature: _Signature | None = None) -> float:
         """
         Calculate similarity between a cluster and a session.
 
         Returns a confidence score 0-1.
         """
+        if signature is None:
+            signature = _Signature.from_session(session)
+        cluster_sig = self._signatures[cluster.cluster_id]
         scores = {}
 
         # 1. Fingerprint hash matching (strongest signal)
@@ -830,40 +1021,33 @@ class DeviceIdentityEngine:
             scores['fingerprint'] = min(1.0, fp_score * 1.5)  # Boost for exact match
 
         # 2. Manufacturer data similarity
-        cluster_mfg_data = self._get_cluster_manufacturer_data(cluster)
-        session_mfg_data = self._get_session_manufacturer_data(session)
-        if cluster_mfg_data and session_mfg_data:
+        if cluster_sig.manufacturer_data and signature.manufacturer_data:
             scores['manufacturer_data'] = manufacturer_data_similarity(
-                cluster_mfg_data, session_mfg_data
+                cluster_sig.manufacturer_data, signature.manufacturer_data
             )
 
         # 3. Service UUID overlap
-        cluster_uuids = self._get_cluster_service_uuids(cluster)
-        session_uuids = self._get_session_service_uuids(session)
-        if cluster_uuids or session_uuids:
+        if cluster_sig.service_uuids or signature.service_uuids:
             scores['service_uuids'] = jaccard_similarity(
-                cluster_uuids, session_uuids
+                cluster_sig.service_uuids, signature.service_uuids
             )
 
         # 4. RSSI trajectory similarity
-        cluster_rssi = cluster.get_all_rssi_samples()
-        if cluster_rssi and session.rssi_samples:
-            scores['rssi_trajectory'] = rssi_trajectory_similarity(
-                cluster_rssi, session.rssi_samples
+        if cluster_sig.rssi.count and signature.rssi.count:
+            scores['rssi_trajectory'] = _rssi_stats_similarity(
+                cluster_sig.rssi_stats, signature.rssi_stats
             )
 
         # 5. Timing pattern similarity
-        cluster_intervals = self._get_cluster_intervals(cluster)
-        if cluster_intervals and session.observation_intervals:
-            scores['timing_pattern'] = timing_pattern_similarity(
-                cluster_intervals, session.observation_intervals
+        if cluster_sig.timing.count and signature.timing.count:
+            scores['timing_pattern'] = _timing_stats_similarity(
+                cluster_sig.timing_stats, signature.timing_stats
             )
 
         # 6. Name similarity
-        session_name = self._get_session_name(session)
-        if cluster.best_name and session_name:
+        if cluster.best_name and signature.name:
             scores['name_similarity'] = name_similarity(
-                cluster.best_name, session_name
+                cluster.best_name, signature.name
             )
 
         if not scores:
@@ -880,52 +1064,6 @@ class DeviceIdentityEngine:
 
         return weighted_sum / total_weight if total_weight > 0 else 0.0
 
-    def _get_cluster_manufacturer_data(self, cluster: DeviceCluster) -> bytes | None:
-        """Get representative manufacturer data from cluster."""
-        for session in cluster.sessions:
-            for obs in session.observations:
-                if hasattr(obs, 'manufacturer_data') and obs.manufacturer_data:
-                    return obs.manufacturer_data
-        return None
-
-    def _get_session_manufacturer_data(self, session: DeviceSession) -> bytes | None:
-        """Get manufacturer data from session."""
-        for obs in session.observations:
-            if hasattr(obs, 'manufacturer_data') and obs.manufacturer_data:
-                return obs.manufacturer_data
-        return None
-
-    def _get_cluster_service_uuids(self, cluster: DeviceCluster) -> set[str]:
-        """Get all service UUIDs from cluster."""
-        uuids = set()
-        for session in cluster.sessions:
-            for obs in session.observations:
-                if hasattr(obs, 'service_uuids') and obs.service_uuids:
-                    uuids.update(obs.service_uuids)
-        return uuids
-
-    def _get_session_service_uuids(self, session: DeviceSession) -> set[str]:
-        """Get service UUIDs from session."""
-        uuids = set()
-        for obs in session.observations:
-            if hasattr(obs, 'service_uuids') and obs.service_uuids:
-                uuids.update(obs.service_uuids)
-        return uuids
-
-    def _get_cluster_intervals(self, cluster: DeviceCluster) -> list[float]:
-        """Get all observation intervals from cluster."""
-        intervals = []
-        for session in cluster.sessions:
-            intervals.extend(session.observation_intervals)
-        return intervals
-
-    def _get_session_name(self, session: DeviceSession) -> str | None:
-        """Get device name from session."""
-        for obs in session.observations:
-            if hasattr(obs, 'local_name') and obs.local_name:
-                return obs.local_name
-        return None
-
     def _create_cluster_from_session(self, session: DeviceSession) -> DeviceCluster:
         """Create a new cluster from a session."""
         cluster = DeviceCluster(
@@ -1019,9 +1157,7 @@ class DeviceIdentityEngine:
 
         # Risk: Check for audio-capable services (BLE)
         audio_service_prefixes = ['0000110', '00001108', '00001203']  # A2DP, Headset, Audio
-        cluster_uuids = set()
-        for session in cluster.sessions:
-            cluster_uuids.update(self._get_session_service_uuids(session))
+        cluster_uuids = self._signatures[cluster.cluster_id].service_uuids
 
         for uuid in cluster_uuids:
             if any(uuid.lower().startswith(prefix) for prefix in audio_service_prefixes):
@@ -1125,6 +1261,9 @@ class DeviceIdentityEngine:
         self.wifi_sessions.clear()
         self.clusters.clear()
         self._fingerprint_to_sessions.clear()
+        self._signatures.clear()
+        self._cluster_index.clear()
+        self._cluster_order.clear()
         self._session_counter = 0
         self._cluster_counter = 0
         self.monitoring_start = None
@@ -0,0 +1,477 @@
+"""
+Continuous RF power sweeps for TSCM surveys.
+
+Keeps rtl_power or hackrf_sweep running and folds its CSV output, line by
+line, into per-band NumPy accumulators (max-hold, average and the peak of
+the current pass). Signals are picked out of each row as it arrives and
+reported when the pass over their band completes, marked new when absent
+from the baseline, together with how long the band took to be revisited.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from utils.process import register_process, safe_terminate, unregister_process
+
+logger = logging.getLogger('intercept.tscm.power_sweep')
+
+# A bin is a signal when this far above its row's median level...
+SWEEP_THRESHOLD_DB = 6.0
+# ...and above this absolute level
+SWEEP_MIN_LEVEL_DB = -90.0
+# Peaks closer than this are one signal
+SWEEP_MERGE_HZ = 100_000
+# rtl_power tunes one range per process; it stays on a band this many passes
+RTL_POWER_DWELL_PASSES = 3
+# Wait before restarting a sweep tool that exited
+SWEEP_RESTART_DELAY = 2.0
+# hackrf_sweep accepts at most this many -f ranges
+HACKRF_MAX_RANGES = 10
+
+
+@dataclass
+class SweepBand:
+    """One frequency range to sweep, in Hz."""
+    start_hz: int
+    end_hz: int
+    bin_hz: int
+    name: str
+
+
+@dataclass
+class SweepRow:
+    """One CSV line of rtl_power or hackrf_sweep output."""
+    timestamp: float | None
+    hz_low: int
+    hz_high: int
+    hz_step: float
+    levels: np.ndarray
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_timestamp(date: str, clock: str) -> float | None:
+    """Epoch seconds of a CSV date and time; rows of one pass share them."""
+    try:
+        return datetime.fromisoformat(f'{date}T{clock}').timestamp()
+    except ValueError:
+        return None
+
+
+def parse_sweep_line(line: str) -> SweepRow | None:
+    """
+    Parse a line of sweep CSV; both tools write the same columns.
+
+    Format: date, time, hz_low, hz_high, hz_step, samples, dB values...
+    Returns None for anything else.
+    """
+    parts = line.split(',')
+    if len(parts) < 7:
+        return None
+    try:
+        hz_low = int(float(parts[2]))
+        hz_high = int(float(parts[3]))
+        hz_step = float(parts[4])
+        levels = np.array([float(x) for x in parts[6:] if x.strip()], dtype=np.float32)
+    except ValueError:
+        return None
+    if hz_step <= 0 or not levels.size:
+        return None
+    return SweepRow(_parse_timestamp(parts[0].strip(), parts[1].strip()), hz_low, hz_high, hz_step, levels)
+
+
+class _BandAccumulator:
+    """Per-bin statistics of one band and its pass in progress."""
+
+    def __init__(self, band: SweepBand):
+        self.band = band
+        size = max(1, -(-(band.end_hz - band.start_hz) // band.bin_hz))
+        self.max_hold = np.full(size, -np.inf, dtype=np.float32)
+        self.total = np.zeros(size, dtype=np.float64)
+        self.count = np.zeros(size, dtype=np.uint32)
+        # Strongest level above threshold this pass, and the floor it was measured against
+        self.pass_peak = np.full(size, -np.inf, dtype=np.float32)
+        self.pass_floor = np.zeros(size, dtype=np.float32)
+        self.pass_open = False
+        self.pass_start: float | None = None
+        self.pass_first_hz: int | None = None
+        self.passes = 0
+        self.revisit: float | None = None
+
+    def contains(self, hz: int) -> bool:
+        return self.band.start_hz <= hz < self.band.end_hz
+
+    def wraps(self, row: SweepRow) -> bool:
+        """True if a row is back at (or below) where the open pass began."""
+        return self.pass_open and row.hz_low <= self.pass_first_hz
+
+    def accumulate(self, row: SweepRow, now: float, threshold_db: float, min_level_db: float) -> None:
+        """Fold a row into the statistics and mark its bins above threshold."""
+        if not self.pass_open:
+            if self.pass_start is not None:
+                self.revisit = now - self.pass_start
+            self.pass_start = now
+            self.pass_open = True
+            self.pass_first_hz = row.hz_low
+
+        levels = row.levels
+        band = self.band
+        offset = (row.hz_low - band.start_hz) / band.bin_hz
+        ratio = row.hz_step / band.bin_hz
+        first = int(np.floor(offset + 1e-9))
+        if abs(ratio - 1.0) < 1e-6 and abs(offset - first) < 1e-6:
+            # Row bins line up with the band's: work on slices
+            lo, hi = max(first, 0), min(first + levels.size, self.max_hold.size)
+            if lo >= hi:
+                return
+            index = np.arange(lo, hi)
+            levels = levels[lo - first:hi - first]
+            finite = np.isfinite(levels)
+            np.fmax(self.max_hold[lo:hi], levels, out=self.max_hold[lo:hi])
+            self.total[lo:hi] += np.where(finite, levels, 0.0)
+            self.count[lo:hi] += finite
+        else:
+            index = np.floor(offset + np.arange(levels.size) * ratio + 1e-9).astype(np.intp)
+            keep = (index >= 0) & (index < self.max_hold.size) & np.isfinite(levels)
+            index, levels = index[keep], levels[keep]
+            if not index.size:
+                return
+            np.fmax.at(self.max_hold, index, levels)
+            np.add.at(self.total, index, levels)
+            np.add.at(self.count, index, 1)
+
+        finite = levels[np.isfinite(levels)]
+        if not finite.size:
+            return
+        floor = float(np.median(finite))
+        hot = levels > max(floor + threshold_db, min_level_db)
+        if hot.any():
+            index, levels = index[hot], levels[hot]
+            np.fmax.at(self.pass_peak, index, levels)
+            self.pass_floor[index] = floor
+
+    def finish_pass(self) -> list[tuple[int, float, float]]:
+        """Close the pass in progress; returns (bin, peak dB, floor dB) per signal."""
+        if not self.pass_open:
+            return []
+        self.pass_open = False
+        self.passes += 1
+        hot = np.flatnonzero(np.isfinite(self.pass_peak))
+        peaks: list[tuple[int, float, float]] = []
+        if hot.size:
+            # Runs of adjacent bins are one emitter; take each run's strongest bin
+            runs = np.split(hot, np.flatnonzero(np.diff(hot) > 1) + 1)
+            merge_bins = SWEEP_MERGE_HZ / self.band.bin_hz
+            for run in runs:
+                best = int(run[np.argmax(self.pass_peak[run])])
+                level = float(self.pass_peak[best])
+                if peaks and best - peaks[-1][0] <= merge_bins:
+                    if level > peaks[-1][1]:
+                        peaks[-1] = (best, level, float(self.pass_floor[best]))
+                    continue
+                peaks.append((best, level, float(self.pass_floor[best])))
+        self.pass_peak.fill(-np.inf)
+        return peaks
+
+    def frequency_hz(self, index: int) -> float:
+        return float(self.band.start_hz + index * self.band.bin_hz)
+
+    def average(self, index: int) -> float | None:
+        count = int(self.count[index])
+        return float(self.total[index] / count) if count else None
+
+
+class PowerSweepEngine:
+    """
+    Persistent rtl_power/hackrf_sweep survey of a set of bands.
+
+    ``start`` runs the sweep tool in a reader thread; detections are
+    collected with ``poll``. ``feed_line`` and ``flush`` drive the same
+    accumulators directly, e.g. to replay recorded sweep CSV.
+
+    hackrf_sweep covers every band in one process. rtl_power can only tune
+    one range, so with several bands it dwells on each for
+    RTL_POWER_DWELL_PASSES passes in turn.
+    """
+
+    def __init__(
+        self,
+        bands: Iterable[SweepBand | tuple[int, int, int, str]],
+        tool_path: str | None = None,
+        sdr_type: str = 'rtlsdr',
+        device_index: int = 0,
+        baseline_frequencies: Iterable[float] = (),
+        threshold_db: float = SWEEP_THRESHOLD_DB,
+        min_level_db: float = SWEEP_MIN_LEVEL_DB,
+    ):
+        self.bands = [band if isinstance(band, SweepBand) else SweepBand(*band) for band in bands]
+        self.tool_path = tool_path
+        self.sdr_type = sdr_type
+        self.device_index = device_index
+        self.threshold_db = threshold_db
+        self.min_level_db = min_level_db
+        # Baseline RF entries are grouped to 0.1 MHz, as by BaselineComparator
+        self.baseline = {round(float(freq), 1) for freq in baseline_frequencies if freq}
+        self._accumulators = [_BandAccumulator(band) for band in self.bands]
+        # (band, bin) -> [first seen, last seen, detections]
+        self._signals: dict[tuple[int, int], list] = {}
+        self._lock = threading.Lock()
+        self._detections: queue.Queue = queue.Queue(maxsize=2000)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._process: subprocess.Popen | None = None
+        self.lines = 0
+
+    # -- Accumulation ---------------------------------------------------
+
+    def _band_for(self, hz: int) -> int | None:
+        for index, accumulator in enumerate(self._accumulators):
+            if accumulator.contains(hz):
+                return index
+        return None
+
+    def feed_line(self, line: str, now: float | None = None) -> list[dict]:
+        """
+        Fold one CSV line into the accumulators.
+
+        ``now`` defaults to the line's own timestamp. Returns the signals
+        of a pass this line completed.
+        """
+        row = parse_sweep_line(line)
+        if row is None:
+            return []
+        band_index = self._band_for(row.hz_low)
+        if band_index is None:
+            # rtl_power crops edges, hackrf_sweep rounds ranges to whole MHz
+            band_index = self._band_for(row.hz_high - 1)
+            if band_index is None:
+                return []
+        if now is None:
+            now = row.timestamp if row.timestamp is not None else time.time()
+        with self._lock:
+            self.lines += 1
+            accumulator = self._accumulators[band_index]
+            detections = self._report(band_index, now) if accumulator.wraps(row) else []
+            accumulator.accumulate(row, now, self.threshold_db, self.min_level_db)
+            return detections
+
+    def flush(self, now: float | None = None) -> list[dict]:
+        """Finish every pass in progress, e.g. when the sweep tool stops."""
+        now = time.time() if now is None else now
+        with self._lock:
+            detections = []
+            for band_index in range(len(self._accumulators)):
+                detections.extend(self._report(band_index, now))
+            return detections
+
+    def _report(self, band_index: int, now: float) -> list[dict]:
+        accumulator = self._accumulators[band_index]
+        peaks = accumulator.finish_pass()
+        merge_bins = max(1, int(SWEEP_MERGE_HZ // accumulator.band.bin_hz))
+        detections = []
+        for index, level, floor in peaks:
+            key = None
+            for nearby in range(index - merge_bins, index + merge_bins + 1):
+                if (band_index, nearby) in self._signals:
+                    key = (band_index, nearby)
+                    break
+            first_detection = key is None
+            if first_detection:
+                key = (band_index, index)
+                self._signals[key] = [now, now, 0]
+            state = self._signals[key]
+            interval = now - state[1] if not first_detection else None
+            state[1] = now
+            state[2] += 1
+
+            freq_hz = accumulator.frequency_hz(index)
+            freq_mhz = freq_hz / 1_000_000
+            detections.append({
+                'frequency': freq_mhz,
+                'frequency_hz': freq_hz,
+                'power': level,
+                'band': accumulator.band.name,
+                'noise_floor': floor,
+                'signal_strength': level - floor,
+                'max_hold': float(accumulator.max_hold[index]),
+                'average': accumulator.average(index),
+                'is_new': round(freq_mhz, 1) not in self.baseline,
+                'first_detection': first_detection,
+                'detections': state[2],
+                'first_seen': state[0],
+                'last_seen': now,
+                'seen_interval_seconds': interval,
+                'revisit_seconds': accumulator.revisit,
+            })
+        return detections
+
+    # -- Reporting ------------------------------------------------------
+
+    def poll(self) -> list[dict]:
+        """Detections from the reader thread since the last poll."""
+        out = []
+        while True:
+            try:
+                out.append(self._detections.get_nowait())
+            except queue.Empty:
+                return out
+
+    def spectrum(self, band_name: str) -> dict | None:
+        """Max-hold and average levels of a band so far."""
+        with self._lock:
+            for accumulator in self._accumulators:
+                if accumulator.band.name != band_name:
+                    continue
+                count = accumulator.count
+                average = np.divide(
+                    accumulator.total, count, out=np.full(count.size, np.nan), where=count > 0,
+                )
+                return {
+                    'start_hz': accumulator.band.start_hz,
+                    'bin_hz': accumulator.band.bin_hz,
+                    'max_hold': accumulator.max_hold.copy(),
+                    'average': average,
+                    'passes': accumulator.passes,
+                }
+        return None
+
+    def revisit_seconds(self) -> float | None:
+        """Longest time any band has taken to be swept again."""
+        with self._lock:
+            times = [acc.revisit for acc in self._accumulators if acc.revisit is not None]
+        return max(times) if times else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': self.running,
+                'lines': self.lines,
+                'signals': len(self._signals),
+                'bands': [
+                    {'name': acc.band.name, 'passes': acc.passes, 'revisit_seconds': acc.revisit}
+                    for acc in self._accumulators
+                ],
+            }
+
+    # -- Sweep tool -----------------------------------------------------
+
+    def commands(self) -> list[tuple[list[str], list[int]]]:
+        """Sweep tool invocations and the bands each covers, in turn."""
+        if self.sdr_type == 'hackrf':
+            commands = []
+            for start in range(0, len(self.bands), HACKRF_MAX_RANGES):
+                group = list(range(start, min(start + HACKRF_MAX_RANGES, len(self.bands))))
+                cmd = [self.tool_path]
+                for index in group:
+                    band = self.bands[index]
+                    cmd += ['-f', f'{int(band.start_hz // 1_000_000)}:{int(-(-band.end_hz // 1_000_000))}']
+                cmd += ['-w', str(min(self.bands[index].bin_hz for index in group))]
+                commands.append((cmd, group))
+            return commands
+        return [
+            ([
+                self.tool_path,
+                '-f', f'{band.start_hz}:{band.end_hz}:{band.bin_hz}',
+                '-g', '40',
+                '-i', '1',
+                '-c', '20%',
+                '-d', str(self.device_index),
+                '-',
+            ], [index])
+            for index, band in enumerate(self.bands)
+        ]
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if not self.tool_path or not self.bands:
+            return False
+        if self.running:
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='tscm-power-sweep')
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 3.0) -> None:
+        self._stop.set()
+        process = self._process
+        if process is not None:
+            safe_terminate(process)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _queue_detections(self, detections: list[dict]) -> None:
+        for detection in detections:
+            try:
+                self._detections.put_nowait(detection)
+            except queue.Full:
+                # Newest detections matter most; drop the oldest
+                try:
+                    self._detections.get_nowait()
+                    self._detections.put_nowait(detection)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _run(self) -> None:
+        commands = self.commands()
+        rotate = len(commands) > 1
+        tool = os.path.basename(self.tool_path)
+        while not self._stop.is_set():
+            for cmd, band_indexes in commands:
+                if self._stop.is_set():
+                    break
+                started = time.monotonic()
+                try:
+                    self._sweep(cmd, band_indexes, rotate)
+                except Exception as e:
+                    logger.warning(f"{tool} sweep error: {e}")
+                if time.monotonic() - started < SWEEP_RESTART_DELAY:
+                    # Exited straight away; do not spin on a missing device
+                    self._stop.wait(SWEEP_RESTART_DELAY)
+
+    def _sweep(self, cmd: list[str], band_indexes: list[int], rotate: bool) -> None:
+        logger.debug(f"Running: {' '.join(cmd)}")
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=1,
+            text=True,
+        )
+        register_process(process)
+        self._process = process
+        try:
+            start_passes = [self._accumulators[index].passes for index in band_indexes]
+            for line in process.stdout:
+                if self._stop.is_set():
+                    break
+                self._queue_detections(self.feed_line(line))
+                if rotate and all(
+                    self._accumulators[index].passes - before >= RTL_POWER_DWELL_PASSES
+                    for index, before in zip(band_indexes, start_passes)
+                ):
+                    break
+        finally:
+            safe_terminate(process)
+            unregister_process(process)
+            self._process = None
+            with self._lock:
+                detections = []
+                for index in band_indexes:
+                    detections.extend(self._report(index, time.time()))
+            self._queue_detections(detections)
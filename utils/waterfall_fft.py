@@ -11,7 +11,7 @@ import struct
 import numpy as np
 
 
-def cu8_to_complex(raw: bytes) -> np.ndarray:
+def cu8_to_complex(raw: bytes, out: np.ndarray | None = None) -> np.ndarray:
     """Convert unsigned 8-bit I/Q bytes to complex64.
 
     RTL-SDR (and rx_sdr with -F cu8) outputs interleaved unsigned 8-bit
@@ -19,14 +19,18 @@ def cu8_to_complex(raw: bytes) -> np.ndarray:
 
     Args:
         raw: Raw bytes, length must be even (I/Q pairs).
+        out: Optional float32 buffer of at least len(raw) elements to
+            convert into instead of allocating.
 
     Returns:
         Complex64 array of length len(raw) // 2.
     """
-    iq = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
-    # Normalize: 0 -> -1.0, 128 -> ~0.0, 255 -> +1.0
-    iq = (iq - 127.5) / 127.5
-    return iq[0::2] + 1j * iq[1::2]
+    iq = np.frombuffer(raw, dtype=np.uint8, count=len(raw) & ~1)
+    out = np.empty(iq.size, dtype=np.float32) if out is None else out[:iq.size]
+    # Normalize in place: 0 -> -1.0, 128 -> ~0.0, 255 -> +1.0
+    np.subtract(iq, np.float32(127.5), out=out, dtype=np.float32)
+    np.divide(out, np.float32(127.5), out=out)
+    return out.view(np.complex64)
 
 
 def compute_power_spectrum(
@@ -58,6 +58,18 @@ DEFAULT_SAMPLE_RATE = 22050
 DEFAULT_IOC = 576
 DEFAULT_LPM = 120
 
+# Discriminator low-pass: passes the +/-400 Hz deviation plus pixel-rate
+# sidebands (~1.8 kHz at IOC 576 / 120 LPM), rejects the image near -3.8 kHz
+DISCRIMINATOR_CUTOFF = 2000.0  # Hz
+DISCRIMINATOR_TAPS = 63
+
+TONE_REFERENCE_FREQS = (1000.0, 1500.0, 1900.0, 2300.0)
+
+# Live preview: strips carry new rows at full width; a downscaled keyframe
+# of the whole image lets late or lagging subscribers resync
+PREVIEW_KEYFRAME_WIDTH = 600   # pixels
+PREVIEW_KEYFRAME_LINES = 200   # image lines between periodic keyframes
+
 
 class DecoderState(Enum):
     """WeFax decoder state machine states."""
@@ -107,7 +119,11 @@ class WeFaxProgress:
     progress_percent: int = 0
     line_count: int = 0
     image: WeFaxImage | None = None
-    partial_image: str | None = None
+    partial_strip: str | None = None
+    strip_row: int = 0
+    image_width: int = 0
+    keyframe: str | None = None
+    keyframe_rows: int = 0
 
     def to_dict(self) -> dict:
         result: dict = {
@@ -123,31 +139,109 @@ class WeFaxProgress:
             result['line_count'] = self.line_count
         if self.image:
             result['image'] = self.image.to_dict()
-        if self.partial_image:
-            result['partial_image'] = self.partial_image
+        if self.partial_strip:
+            result['partial_strip'] = self.partial_strip
+            result['strip_row'] = self.strip_row
+            result['image_width'] = self.image_width
+        if self.keyframe:
+            result['keyframe'] = self.keyframe
+            result['keyframe_rows'] = self.keyframe_rows
+            result['image_width'] = self.image_width
         return result
 
 
+class _ImageCanvas:
+    """Growable grayscale image written one scan line at a time.
+
+    Rows live in a single preallocated uint8 array whose capacity doubles
+    (up to ``max_rows``) when full, so appending a line is amortised O(1)
+    and ``rows`` is a view of the decoded image rather than a copy.
+    """
+
+    def __init__(self, width: int, max_rows: int, initial_rows: int = 256):
+        self.width = width
+        self.max_rows = max_rows
+        self._buf = np.zeros((min(initial_rows, max_rows), width), dtype=np.uint8)
+        self.height = 0
+
+    @property
+    def rows(self) -> np.ndarray:
+        """View of the rows written so far."""
+        return self._buf[:self.height]
+
+    @property
+    def full(self) -> bool:
+        return self.height >= self.max_rows
+
+    def append(self, line: np.ndarray) -> None:
+        """Write one scan line; lines beyond ``max_rows`` are dropped."""
+        if self.full:
+            return
+        if self.height == len(self._buf):
+            grown = np.zeros((min(len(self._buf) * 2, self.max_rows), self.width), dtype=np.uint8)
+            grown[:self.height] = self._buf
+            self._buf = grown
+        row = self._buf[self.height]
+        n = min(len(line), self.width)
+        row[:n] = line[:n]
+        row[n:] = 0
+        self.height += 1
+
+    def clear(self) -> None:
+        self.height = 0
+
+
 # ---------------------------------------------------------------------------
 # DSP helpers (reuse Goertzel from SSTV where sensible)
 # ---------------------------------------------------------------------------
 
+# Complex exponential bases keyed by (frequencies, rate), one fixed-size
+# analysis block long. Reads from rtl_fm vary in length, so longer inputs
+# are summed block by block with a phase shift per block rather than
+# building a basis per length; the size cap guards against odd tone sets
+_GOERTZEL_BLOCK = 2048
+_GOERTZEL_CACHE_MAX = 32
+_goertzel_basis_cache: dict[tuple[tuple[float, ...], int], np.ndarray] = {}
+
+
+def _goertzel_bank(samples: np.ndarray, freqs: tuple[float, ...],
+                   sample_rate: int) -> np.ndarray:
+    """Goertzel magnitudes at several frequencies in one matrix product.
+
+    Equivalent to running the generalized (non-integer bin) Goertzel
+    recurrence per frequency: the magnitude is |sum x[n] e^(-jwn)|.
+    """
+    n = len(samples)
+    if n == 0:
+        return np.zeros(len(freqs))
+    key = (freqs, sample_rate)
+    basis = _goertzel_basis_cache.get(key)
+    if basis is None:
+        if len(_goertzel_basis_cache) >= _GOERTZEL_CACHE_MAX:
+            _goertzel_basis_cache.clear()
+        w = 2.0 * np.pi * np.asarray(freqs, dtype=np.float64) / sample_rate
+        basis = np.exp(-1j * np.outer(w, np.arange(_GOERTZEL_BLOCK)))
+        _goertzel_basis_cache[key] = basis
+
+    samples = np.asarray(samples, dtype=np.float64)
+    if n <= _GOERTZEL_BLOCK:
+        return np.abs(basis[:, :n] @ samples)
+    # Block k starts at sample k*B, so its sum is shifted by e^(-jwkB)
+    w = 2.0 * np.pi * np.asarray(freqs, dtype=np.float64) / sample_rate
+    blocks = -(-n // _GOERTZEL_BLOCK)
+    padded = np.zeros(blocks * _GOERTZEL_BLOCK)
+    padded[:n] = samples
+    partial = basis @ padded.reshape(blocks, _GOERTZEL_BLOCK).T
+    shift = np.exp(-1j * np.outer(w, np.arange(blocks) * _GOERTZEL_BLOCK))
+    return np.abs(np.sum(partial * shift, axis=1))
+
+
 def _goertzel_mag(samples: np.ndarray, target_freq: float,
                   sample_rate: int) -> float:
     """Compute Goertzel magnitude at a single frequency."""
-    n = len(samples)
-    if n == 0:
+    if len(samples) == 0:
         return 0.0
-    w = 2.0 * math.pi * target_freq / sample_rate
-    coeff = 2.0 * math.cos(w)
-    s1 = 0.0
-    s2 = 0.0
-    for sample in samples:
-        s0 = float(sample) + coeff * s1 - s2
-        s2 = s1
-        s1 = s0
-    energy = s1 * s1 + s2 * s2 - coeff * s1 * s2
-    return math.sqrt(max(0.0, energy))
+    return float(_goertzel_bank(samples, (float(target_freq),), sample_rate)[0])
 
 
 def _freq_to_pixel(frequency: float) -> int:
@@ -159,54 +253,86 @@ def _freq_to_pixel(frequency: float) -> int:
     return max(0, min(255, int(normalized * 255 + 0.5)))
 
 
-def _estimate_frequency(samples: np.ndarray, sample_rate: int,
-                         freq_low: float = 1200.0,
-                         freq_high: float = 2500.0) -> float:
-    """Estimate dominant frequency using coarse+fine Goertzel sweep."""
-    if len(samples) == 0:
-        return 0.0
-
-    best_freq = freq_low
-    best_energy = 0.0
-
-    # Coarse sweep (25 Hz steps)
-    freq = freq_low
-    while freq <= freq_high:
-        energy = _goertzel_mag(samples, freq, sample_rate) ** 2
-        if energy > best_energy:
-            best_energy = energy
-            best_freq = freq
-        freq += 25.0
-
-    # Fine sweep around peak (+/- 25 Hz, 5 Hz steps)
-    fine_low = max(freq_low, best_freq - 25.0)
-    fine_high = min(freq_high, best_freq + 25.0)
-    freq = fine_low
-    while freq <= fine_high:
-        energy = _goertzel_mag(samples, freq, sample_rate) ** 2
-        if energy > best_energy:
-            best_energy = energy
-            best_freq = freq
-        freq += 5.0
-
-    return best_freq
+def _freqs_to_pixels(frequencies: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`_freq_to_pixel`."""
+    normalized = (frequencies - BLACK_FREQ) / (WHITE_FREQ - BLACK_FREQ)
+    return np.clip(np.floor(normalized * 255 + 0.5), 0, 255).astype(np.uint8)
 
 
 def _detect_tone(samples: np.ndarray, target_freq: float,
                  sample_rate: int, threshold: float = 3.0) -> bool:
     """Detect if a specific tone dominates the signal."""
-    target_mag = _goertzel_mag(samples, target_freq, sample_rate)
     # Check against a few reference frequencies
-    refs = [1000.0, 1500.0, 1900.0, 2300.0]
-    refs = [f for f in refs if abs(f - target_freq) > 100]
+    refs = tuple(f for f in TONE_REFERENCE_FREQS if abs(f - target_freq) > 100)
+    mags = _goertzel_bank(samples, (float(target_freq),) + refs, sample_rate)
+    target_mag = mags[0]
     if not refs:
         return target_mag > 0.01
-    avg_ref = sum(_goertzel_mag(samples, f, sample_rate) for f in refs) / len(refs)
+    avg_ref = float(np.mean(mags[1:]))
     if avg_ref <= 0:
         return target_mag > 0.01
     return target_mag / avg_ref >= threshold
 
 
+class _FMDiscriminator:
+    """Streaming quadrature FM discriminator for the WeFax subcarrier.
+
+    Mixes the audio down by the 1900 Hz carrier, low-pass filters the
+    complex baseband and takes the phase difference between successive
+    samples.  Oscillator phase, FIR history and the previous sample are
+    carried between calls, so lines can be fed in arbitrary chunks with
+    no edge effects at chunk boundaries.
+
+    Output is delayed by the FIR group delay; ``reset()`` drops that
+    many leading samples so the first output lines up with the first
+    input sample.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        n = np.arange(DISCRIMINATOR_TAPS) - (DISCRIMINATOR_TAPS - 1) / 2
+        cutoff = DISCRIMINATOR_CUTOFF / sample_rate
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(DISCRIMINATOR_TAPS)
+        self._taps = taps / taps.sum()
+        self._delay = (DISCRIMINATOR_TAPS - 1) // 2
+        self._step = 2.0 * math.pi * CARRIER_FREQ / sample_rate
+        self._freq_scale = sample_rate / (2.0 * math.pi)
+        self.reset()
+
+    def reset(self) -> None:
+        self._phase = 0.0
+        self._history = np.zeros(DISCRIMINATOR_TAPS - 1, dtype=np.complex128)
+        self._prev: complex | None = None
+        self._skip = self._delay
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Return instantaneous frequency (Hz) for a block of audio."""
+        n = len(samples)
+        if n == 0:
+            return np.zeros(0)
+
+        phases = self._phase + self._step * np.arange(n)
+        self._phase = float((self._phase + self._step * n) % (2.0 * math.pi))
+        mixed = samples * np.exp(-1j * phases)
+
+        padded = np.concatenate([self._history, mixed])
+        self._history = padded[-(DISCRIMINATOR_TAPS - 1):]
+        baseband = np.convolve(padded, self._taps, mode='valid')
+
+        if self._prev is None:
+            prev = np.concatenate([[baseband[0]], baseband[:-1]])
+        else:
+            prev = np.concatenate([[self._prev], baseband[:-1]])
+        self._prev = complex(baseband[-1])
+        freq = CARRIER_FREQ + np.angle(baseband * np.conj(prev)) * self._freq_scale
+
+        if self._skip:
+            dropped = min(self._skip, len(freq))
+            self._skip -= dropped
+            freq = freq[dropped:]
+        return freq
+
+
 # ---------------------------------------------------------------------------
 # WeFaxDecoder
 # ---------------------------------------------------------------------------
@@ -228,6 +354,7 @@ class WeFaxDecoder:
         self._output_dir = Path('instance/wefax_images')
         self._images: list[WeFaxImage] = []
         self._decode_thread: threading.Thread | None = None
+        self._preview: _ImageCanvas | None = None
 
         # Current session parameters
         self._station = ''
@@ -417,13 +544,15 @@ class WeFaxDecoder:
         line_duration_s = 60.0 / self._lpm
         samples_per_line = int(line_duration_s * sr)
 
-        # Image buffer
-        image_lines: list[np.ndarray] = []
-        line_buffer = np.zeros(0, dtype=np.float64)
+        # Image buffer; line_buffer holds discriminator output (Hz)
+        discriminator = _FMDiscriminator(sr)
         max_lines = 2000  # Safety limit
+        canvas = _ImageCanvas(pixels_per_line, max_lines)
+        line_buffer = np.zeros(0, dtype=np.float64)
 
         sdr_error = ''
-        last_partial_line = -1
+        last_partial_line = 0
+        last_keyframe_line = 0
 
         logger.info(
             f"WeFax decode thread started: IOC={self._ioc}, "
@@ -502,9 +631,12 @@ class WeFaxDecoder:
                     needed_phasing = max(PHASING_MIN_LINES, int(2.0 / 0.1))
                     if phasing_line_count >= needed_phasing:
                         state = DecoderState.RECEIVING
-                        image_lines = []
+                        canvas.clear()
                         line_buffer = np.zeros(0, dtype=np.float64)
-                        last_partial_line = -1
+                        discriminator.reset()
+                        last_partial_line = 0
+                        last_keyframe_line = 0
+                        self._preview = canvas
                         logger.info("Phasing complete, receiving image")
                         self._emit_progress(WeFaxProgress(
                             status='receiving',
@@ -520,53 +652,62 @@ class WeFaxDecoder:
                         if stop_tone_count >= needed_stop:
                             # Process any remaining line buffer
                             if len(line_buffer) >= samples_per_line * 0.5:
-                                line_pixels = self._decode_line(
-                                    line_buffer, pixels_per_line, sr)
-                                image_lines.append(line_pixels)
+                                canvas.append(self._decode_line(
+                                    line_buffer, pixels_per_line))
 
                             state = DecoderState.COMPLETE
                             logger.info(
                                 f"Stop tone detected, image complete: "
-                                f"{len(image_lines)} lines"
+                                f"{canvas.height} lines"
                             )
                             break
                     else:
                         stop_tone_count = max(0, stop_tone_count - 1)
 
-                    # Accumulate samples into line buffer
-                    line_buffer = np.concatenate([line_buffer, samples])
+                    # Demodulate and accumulate into line buffer
+                    line_buffer = np.concatenate([line_buffer, discriminator.process(samples)])
 
                     # Extract complete lines
                     while len(line_buffer) >= samples_per_line:
-                        line_samples = line_buffer[:samples_per_line]
+                        line_freq = line_buffer[:samples_per_line]
                         line_buffer = line_buffer[samples_per_line:]
 
-                        line_pixels = self._decode_line(
-                            line_samples, pixels_per_line, sr)
-                        image_lines.append(line_pixels)
+                        canvas.append(self._decode_line(
+                            line_freq, pixels_per_line))
 
                     # Safety limit
-                    if len(image_lines) >= max_lines:
+                    if canvas.full:
                         logger.warning("WeFax max lines reached, saving image")
                         state = DecoderState.COMPLETE
                         break
 
-                    # Emit progress periodically
-                    current_lines = len(image_lines)
-                    if current_lines > 0 and current_lines != last_partial_line and current_lines % 20 == 0:
-                        last_partial_line = current_lines
+                    # Emit progress periodically with only the rows decoded
+                    # since the previous update, so each preview costs the
+                    # same however long the chart gets. Every so often the
+                    # rows before the strip also go out as a keyframe for
+                    # subscribers that missed strips.
+                    current_lines = canvas.height
+                    if current_lines - last_partial_line >= 20:
                         # Rough progress estimate (typical chart ~800 lines)
                         pct = min(95, int(current_lines / 8))
-                        partial_url = self._encode_partial(
-                            image_lines, pixels_per_line)
+                        strip_url = self._encode_strip(canvas, last_partial_line)
+                        keyframe_url = None
+                        if last_partial_line - last_keyframe_line >= PREVIEW_KEYFRAME_LINES:
+                            keyframe_url = self._encode_keyframe(canvas, last_partial_line)
+                            last_keyframe_line = last_partial_line
                         self._emit_progress(WeFaxProgress(
                             status='receiving',
                             station=self._station,
                             message=f'Receiving: {current_lines} lines',
                             progress_percent=pct,
                             line_count=current_lines,
-                            partial_image=partial_url,
+                            partial_strip=strip_url,
+                            strip_row=last_partial_line,
+                            image_width=canvas.width,
+                            keyframe=keyframe_url,
+                            keyframe_rows=last_partial_line,
                         ))
+                        last_partial_line = current_lines
 
             except Exception as e:
                 logger.error(f"Error in WeFax decode thread: {e}")
@@ -574,13 +715,15 @@ class WeFaxDecoder:
                     break
                 time.sleep(0.1)
 
+        self._preview = None
+
         # Save image if we got data
-        if state == DecoderState.COMPLETE and image_lines:
-            self._save_image(image_lines, pixels_per_line)
-        elif state == DecoderState.RECEIVING and len(image_lines) > 20:
+        if state == DecoderState.COMPLETE and canvas.height:
+            self._save_image(canvas)
+        elif state == DecoderState.RECEIVING and canvas.height > 20:
             # Save partial image if we had significant data
-            logger.info(f"Saving partial WeFax image: {len(image_lines)} lines")
-            self._save_image(image_lines, pixels_per_line)
+            logger.info(f"Saving partial WeFax image: {canvas.height} lines")
+            self._save_image(canvas)
 
         # Clean up
         with self._lock:
@@ -604,64 +747,58 @@ class WeFaxDecoder:
 
         logger.info("WeFax decode thread ended")
 
-    def _decode_line(self, line_samples: np.ndarray,
-                     pixels_per_line: int, sample_rate: int) -> np.ndarray:
-        """Decode one scan line from audio samples to pixel values.
+    def _decode_line(self, line_freq: np.ndarray,
+                     pixels_per_line: int) -> np.ndarray:
+        """Decode one scan line of instantaneous frequency to pixel values.
 
-        Uses instantaneous frequency estimation via the analytic signal
-        (Hilbert transform), then maps frequency to grayscale.
+        ``line_freq`` is the discriminator output for the line; each pixel
+        is the mean frequency over its window, mapped to grayscale.
         """
-        n = len(line_samples)
-        pixels = np.zeros(pixels_per_line, dtype=np.uint8)
-
+        n = len(line_freq)
         if n < pixels_per_line:
-            return pixels
+            return np.zeros(pixels_per_line, dtype=np.uint8)
 
-        samples_per_pixel = n / pixels_per_line
+        inst_freq = np.clip(line_freq, BLACK_FREQ - 200, WHITE_FREQ + 200)
 
-        # Use Hilbert transform for instantaneous frequency
-        try:
-            analytic = np.fft.ifft(
-                np.fft.fft(line_samples) * 2 * (np.arange(n) < n // 2))
-            inst_phase = np.unwrap(np.angle(analytic))
-            inst_freq = np.diff(inst_phase) / (2.0 * math.pi) * sample_rate
-            inst_freq = np.clip(inst_freq, BLACK_FREQ - 200, WHITE_FREQ + 200)
-
-            # Average frequency per pixel
-            for px in range(pixels_per_line):
-                start_idx = int(px * samples_per_pixel)
-                end_idx = int((px + 1) * samples_per_pixel)
-                end_idx = min(end_idx, len(inst_freq))
-                if start_idx >= end_idx:
-                    continue
-                avg_freq = float(np.mean(inst_freq[start_idx:end_idx]))
-                pixels[px] = _freq_to_pixel(avg_freq)
+        # Average frequency per pixel: windows are contiguous, so one
+        # reduceat sums them all
+        bounds = (np.arange(pixels_per_line) * (n / pixels_per_line)).astype(np.intp)
+        sums = np.add.reduceat(inst_freq, bounds)
+        counts = np.diff(np.append(bounds, n))
+        return _freqs_to_pixels(sums / counts)
+
+    def _encode_strip(self, canvas: _ImageCanvas,
+                      start_row: int) -> str | None:
+        """Encode rows from ``start_row`` onward as a JPEG data URL.
 
+        The frontend paints each strip at ``start_row`` on its own canvas,
+        so only newly decoded lines cross the SSE stream.
+        """
+        if PILImage is None or start_row >= canvas.height:
+            return None
+        try:
+            img = PILImage.fromarray(canvas.rows[start_row:])
+            buf = io.BytesIO()
+            img.save(buf, format='JPEG', quality=40)
+            b64 = base64.b64encode(buf.getvalue()).decode('ascii')
+            return f'data:image/jpeg;base64,{b64}'
         except Exception:
-            # Fallback: simple Goertzel per pixel window
-            for px in range(pixels_per_line):
-                start_idx = int(px * samples_per_pixel)
-                end_idx = int((px + 1) * samples_per_pixel)
-                if start_idx >= len(line_samples) or start_idx >= end_idx:
-                    break
-                window = line_samples[start_idx:end_idx]
-                freq = _estimate_frequency(window, sample_rate,
-                                           BLACK_FREQ - 200, WHITE_FREQ + 200)
-                pixels[px] = _freq_to_pixel(freq)
+            return None
 
-        return pixels
+    def _encode_keyframe(self, canvas: _ImageCanvas,
+                         rows: int) -> str | None:
+        """Encode the first ``rows`` rows, downscaled, as a JPEG data URL.
 
-    def _encode_partial(self, image_lines: list[np.ndarray],
-                        width: int) -> str | None:
-        """Encode current image lines as a JPEG data URL for live preview."""
-        if PILImage is None or not image_lines:
+        The frontend stretches it back to ``rows`` x ``canvas.width`` and
+        keeps painting full-width strips from there.
+        """
+        if PILImage is None or rows <= 0:
             return None
         try:
-            height = len(image_lines)
-            img_array = np.zeros((height, width), dtype=np.uint8)
-            for i, line in enumerate(image_lines):
-                img_array[i, :len(line)] = line[:width]
-            img = PILImage.fromarray(img_array, mode='L')
+            img = PILImage.fromarray(canvas.rows[:rows])
+            scale = min(1.0, PREVIEW_KEYFRAME_WIDTH / canvas.width)
+            if scale < 1.0:
+                img = img.resize((max(1, round(canvas.width * scale)), max(1, round(rows * scale))))
             buf = io.BytesIO()
             img.save(buf, format='JPEG', quality=40)
             b64 = base64.b64encode(buf.getvalue()).decode('ascii')
@@ -669,9 +806,32 @@ class WeFaxDecoder:
         except Exception:
             return None
 
-    def _save_image(self, image_lines: list[np.ndarray],
-                    width: int) -> None:
-        """Save completed image to disk."""
+    def preview_keyframe(self) -> dict | None:
+        """Progress event with a keyframe of the image being received.
+
+        Sent to each new stream subscriber so it can show the chart so far
+        instead of only the strips decoded after it connected.
+        """
+        canvas = self._preview
+        if canvas is None:
+            return None
+        rows = canvas.height
+        keyframe = self._encode_keyframe(canvas, rows)
+        if keyframe is None:
+            return None
+        return WeFaxProgress(
+            status='receiving',
+            station=self._station,
+            message=f'Receiving: {rows} lines',
+            progress_percent=min(95, int(rows / 8)),
+            line_count=rows,
+            image_width=canvas.width,
+            keyframe=keyframe,
+            keyframe_rows=rows,
+        ).to_dict()
+
+    def _save_image(self, canvas: _ImageCanvas) -> None:
+        """Save completed image to disk straight from the canvas rows."""
         if PILImage is None:
             logger.error("Cannot save image: Pillow not installed")
             self._emit_progress(WeFaxProgress(
@@ -681,12 +841,8 @@ class WeFaxDecoder:
             return
 
         try:
-            height = len(image_lines)
-            img_array = np.zeros((height, width), dtype=np.uint8)
-            for i, line in enumerate(image_lines):
-                img_array[i, :len(line)] = line[:width]
-
-            img = PILImage.fromarray(img_array, mode='L')
+            height = canvas.height
+            img = PILImage.fromarray(canvas.rows)
             timestamp = datetime.now(timezone.utc)
             station_tag = self._station or 'unknown'
             filename = f"wefax_{timestamp.strftime('%Y%m%d_%H%M%S')}_{station_tag}.png"
@@ -1,17 +1,26 @@
 """
-Deauthentication attack detector using scapy.
+Deauthentication attack detector.
 
 Monitors a WiFi interface in monitor mode for deauthentication and disassociation
 frames, detecting potential deauth flood attacks.
+
+On Linux the detector captures on an AF_PACKET socket with a kernel BPF filter
+that only passes deauth/disassoc management frames, and decodes the radiotap and
+802.11 headers with struct. Elsewhere it falls back to scapy's sniff().
 """
 
 from __future__ import annotations
 
 import contextlib
+import ctypes
 import logging
+import socket
+import struct
+import sys
 import threading
 import time
 from collections import defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Any, Callable
 
@@ -19,11 +28,56 @@ from utils.constants import (
     DEAUTH_ALERT_THRESHOLD,
     DEAUTH_CRITICAL_THRESHOLD,
     DEAUTH_DETECTION_WINDOW,
+    DEAUTH_KNOWN_AP_REFRESH,
     DEAUTH_SNIFF_TIMEOUT,
 )
 
 logger = logging.getLogger(__name__)
 
+# Linux socket constants (not all exposed by the socket module)
+ETH_P_ALL = 0x0003
+SO_ATTACH_FILTER = 26
+
+# pcap link types
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+# First frame-control byte (type/subtype bits, protocol version masked off)
+FC_DISASSOC = 0xA0  # type 0 (management), subtype 10
+FC_DEAUTH = 0xC0  # type 0 (management), subtype 12
+
+# Classic BPF program for radiotap-encapsulated frames: read the little-endian
+# radiotap length, then accept only frames whose first frame-control byte is a
+# deauth or disassoc management frame. Equivalent to
+# "type mgt subtype deauth or type mgt subtype disassoc".
+DEAUTH_BPF_PROGRAM: tuple[tuple[int, int, int, int], ...] = (
+    (0x30, 0, 0, 0x00000003),  # ldb [3]        radiotap len (high byte)
+    (0x64, 0, 0, 0x00000008),  # lsh #8
+    (0x07, 0, 0, 0x00000000),  # tax
+    (0x30, 0, 0, 0x00000002),  # ldb [2]        radiotap len (low byte)
+    (0x4C, 0, 0, 0x00000000),  # or x
+    (0x07, 0, 0, 0x00000000),  # tax            X = radiotap len
+    (0x50, 0, 0, 0x00000000),  # ldb [x + 0]    frame control
+    (0x54, 0, 0, 0x000000FC),  # and #0xfc
+    (0x15, 1, 0, FC_DEAUTH),  # jeq #0xc0      -> accept
+    (0x15, 0, 1, FC_DISASSOC),  # jeq #0xa0      -> accept / drop
+    (0x06, 0, 0, 0x00040000),  # ret #262144    accept
+    (0x06, 0, 0, 0x00000000),  # ret #0         drop
+)
+
+# Radiotap fields preceding dBm antenna signal (bit 5): (alignment, size)
+_RADIOTAP_FIELDS_BEFORE_SIGNAL = (
+    (8, 8),  # 0: TSFT
+    (1, 1),  # 1: Flags
+    (1, 1),  # 2: Rate
+    (2, 4),  # 3: Channel
+    (1, 2),  # 4: FHSS (hop set, hop pattern)
+)
+_RADIOTAP_DBM_ANTSIGNAL = 5
+
+# Frame control (2) + duration (2) + addr1..3 (18) + seq ctrl (2) + reason (2)
+_DOT11_DEAUTH_LEN = 26
+
 # Deauth reason code descriptions
 DEAUTH_REASON_CODES = {
     0: "Reserved",
@@ -54,6 +108,139 @@ DEAUTH_REASON_CODES = {
 }
 
 
+def _format_mac(raw: bytes) -> str:
+    return ':'.join(f'{b:02X}' for b in raw)
+
+
+def parse_radiotap_header(frame: bytes) -> tuple[int, int | None] | None:
+    """
+    Parse the radiotap header of a captured frame.
+
+    Returns:
+        Tuple of (header_length, dbm_antenna_signal), or None if malformed.
+    """
+    if len(frame) < 8 or frame[0] != 0:
+        return None
+
+    rt_len = frame[2] | (frame[3] << 8)
+    if rt_len < 8 or rt_len > len(frame):
+        return None
+
+    # Walk the (possibly extended) present bitmaps
+    present, = struct.unpack_from('<I', frame, 4)
+    offset = 8
+    word = present
+    while word & 0x80000000:
+        if offset + 4 > rt_len:
+            return None
+        word, = struct.unpack_from('<I', frame, offset)
+        offset += 4
+
+    if not present & (1 << _RADIOTAP_DBM_ANTSIGNAL):
+        return rt_len, None
+
+    for bit, (align, size) in enumerate(_RADIOTAP_FIELDS_BEFORE_SIGNAL):
+        if present & (1 << bit):
+            offset = (offset + align - 1) & ~(align - 1)
+            offset += size
+
+    if offset >= rt_len:
+        return rt_len, None
+
+    signal, = struct.unpack_from('<b', frame, offset)
+    return rt_len, signal
+
+
+def parse_deauth_frame(
+    frame: bytes,
+    linktype: int = LINKTYPE_IEEE802_11_RADIOTAP,
+) -> tuple[str, str, str, str, int, int | None] | None:
+    """
+    Decode a deauth/disassoc frame without scapy.
+
+    Args:
+        frame: Raw captured bytes.
+        linktype: pcap link type of the capture (radiotap or bare 802.11).
+
+    Returns:
+        Tuple of (frame_type, src_mac, dst_mac, bssid, reason_code, signal_dbm),
+        or None if the frame is not a well-formed deauth/disassoc frame.
+    """
+    signal_dbm = None
+    if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+        header = parse_radiotap_header(frame)
+        if header is None:
+            return None
+        offset, signal_dbm = header
+    elif linktype == LINKTYPE_IEEE802_11:
+        offset = 0
+    else:
+        return None
+
+    if len(frame) - offset < _DOT11_DEAUTH_LEN:
+        return None
+
+    fc = frame[offset] & 0xFC
+    if fc == FC_DEAUTH:
+        frame_type = 'deauth'
+    elif fc == FC_DISASSOC:
+        frame_type = 'disassoc'
+    else:
+        return None
+
+    dst_mac = _format_mac(frame[offset + 4:offset + 10])
+    src_mac = _format_mac(frame[offset + 10:offset + 16])
+    bssid = _format_mac(frame[offset + 16:offset + 22])
+    reason_code, = struct.unpack_from('<H', frame, offset + 24)
+
+    return frame_type, src_mac, dst_mac, bssid, reason_code, signal_dbm
+
+
+def iter_pcap_frames(path: str) -> Iterator[tuple[float, int, bytes]]:
+    """
+    Iterate over frames in a classic libpcap capture file.
+
+    Yields:
+        Tuples of (timestamp, linktype, frame_bytes).
+    """
+    with open(path, 'rb') as f:
+        global_header = f.read(24)
+        if len(global_header) < 24:
+            raise ValueError(f"{path}: truncated pcap header")
+
+        magic = global_header[:4]
+        if magic in (b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1'):
+            endian = '<'
+        elif magic in (b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d'):
+            endian = '>'
+        else:
+            raise ValueError(f"{path}: not a pcap file (pcapng is not supported)")
+        nanosecond = magic in (b'\x4d\x3c\xb2\xa1', b'\xa1\xb2\x3c\x4d')
+        ts_divisor = 1e9 if nanosecond else 1e6
+
+        linktype, = struct.unpack_from(endian + 'I', global_header, 20)
+        record = struct.Struct(endian + 'IIII')
+
+        while True:
+            header = f.read(record.size)
+            if len(header) < record.size:
+                return
+            ts_sec, ts_frac, incl_len, _orig_len = record.unpack(header)
+            data = f.read(incl_len)
+            if len(data) < incl_len:
+                return
+            yield ts_sec + ts_frac / ts_divisor, linktype, data
+
+
+def _attach_bpf_filter(sock: socket.socket, program=DEAUTH_BPF_PROGRAM) -> None:
+    """Attach a classic BPF program to a socket via SO_ATTACH_FILTER."""
+    insns = b''.join(struct.pack('HBBI', *insn) for insn in program)
+    buf = ctypes.create_string_buffer(insns)
+    # struct sock_fprog { unsigned short len; struct sock_filter *filter; }
+    fprog = struct.pack('HL', len(program), ctypes.addressof(buf))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
 @dataclass
 class DeauthPacketInfo:
     """Information about a captured deauth/disassoc packet."""
@@ -174,7 +361,7 @@ class DeauthAlert:
 
 class DeauthDetector:
     """
-    Detects deauthentication attacks using scapy.
+    Detects deauthentication attacks.
 
     Monitors a WiFi interface in monitor mode for deauth/disassoc frames
     and emits alerts when attack thresholds are exceeded.
@@ -212,10 +399,16 @@ class DeauthDetector:
         self._alerts: list[DeauthAlert] = []
         self._alert_counter = 0
 
+        # Cached known-AP BSSIDs for spoof checks (refreshed on AP changes)
+        self._known_aps: frozenset[str] = frozenset()
+        self._known_aps_refreshed_at = 0.0
+        self._known_aps_dirty = True
+
         # Stats
         self._packets_captured = 0
         self._alerts_generated = 0
         self._started_at: float | None = None
+        self._capture_backend: str | None = None
 
     @property
     def is_running(self) -> bool:
@@ -232,6 +425,7 @@ class DeauthDetector:
             'packets_captured': self._packets_captured,
             'alerts_generated': self._alerts_generated,
             'active_trackers': len(self._trackers),
+            'capture_backend': self._capture_backend,
         }
 
     def start(self) -> bool:
@@ -293,8 +487,81 @@ class DeauthDetector:
             self._trackers.clear()
             self._alert_counter = 0
 
+    def invalidate_known_aps(self):
+        """Mark the cached known-AP set stale (call when APs are added/removed)."""
+        self._known_aps_dirty = True
+
+    def replay_pcap(self, path: str) -> int:
+        """
+        Feed a pcap capture through the raw-frame pipeline.
+
+        Frames are processed as if they arrived now, so alert windows apply
+        to the replay rather than to the original capture timestamps.
+
+        Returns:
+            Number of deauth/disassoc frames processed.
+        """
+        processed = 0
+        for _ts, linktype, frame in iter_pcap_frames(path):
+            if self._process_raw_frame(frame, linktype):
+                processed += 1
+        return processed
+
     def _sniff_loop(self):
-        """Main sniffing loop using scapy."""
+        """Main sniffing loop: kernel-filtered raw socket, scapy as fallback."""
+        if sys.platform.startswith('linux') and hasattr(socket, 'AF_PACKET'):
+            try:
+                self._sniff_raw()
+                return
+            except (PermissionError, OSError) as e:
+                if "No such device" in str(e):
+                    logger.error(f"Interface {self.interface} not found")
+                    self.event_callback({
+                        'type': 'deauth_error',
+                        'error': f'Interface {self.interface} not found',
+                    })
+                    return
+                logger.info(f"Raw socket capture unavailable ({e}), falling back to scapy")
+            except Exception as e:
+                logger.exception(f"Raw capture error: {e}")
+                self.event_callback({
+                    'type': 'deauth_error',
+                    'error': str(e),
+                })
+                return
+
+        self._sniff_scapy()
+
+    def _sniff_raw(self):
+        """Capture on an AF_PACKET socket with the deauth BPF filter attached."""
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            _attach_bpf_filter(sock)
+            sock.bind((self.interface, ETH_P_ALL))
+            sock.settimeout(DEAUTH_SNIFF_TIMEOUT)
+
+            self._capture_backend = 'af_packet'
+            logger.info(f"Starting deauth capture on {self.interface} (AF_PACKET + BPF)")
+
+            last_cleanup = time.monotonic()
+            while not self._stop_event.is_set():
+                try:
+                    frame = sock.recv(65535)
+                except socket.timeout:
+                    frame = None
+
+                if frame:
+                    self._process_raw_frame(frame)
+
+                now = time.monotonic()
+                if now - last_cleanup >= DEAUTH_SNIFF_TIMEOUT:
+                    self._cleanup_old_trackers()
+                    last_cleanup = now
+        finally:
+            sock.close()
+
+    def _sniff_scapy(self):
+        """Sniffing loop using scapy."""
         try:
             from scapy.all import Dot11, Dot11Deauth, Dot11Disas, sniff
         except ImportError:
@@ -305,6 +572,7 @@ class DeauthDetector:
             })
             return
 
+        self._capture_backend = 'scapy'
         logger.info(f"Starting deauth sniff on {self.interface}")
 
         def packet_handler(pkt):
@@ -359,7 +627,7 @@ class DeauthDetector:
             })
 
     def _process_deauth_packet(self, pkt):
-        """Process a deauth/disassoc packet and emit alert if threshold exceeded."""
+        """Process a scapy deauth/disassoc packet."""
         try:
             from scapy.all import Dot11, Dot11Deauth, Dot11Disas, RadioTap
         except ImportError:
@@ -391,7 +659,26 @@ class DeauthDetector:
             with contextlib.suppress(AttributeError):
                 signal_dbm = pkt[RadioTap].dBm_AntSignal
 
-        # Create packet info
+        self._record_packet(frame_type, src_mac, dst_mac, bssid, reason_code, signal_dbm)
+
+    def _process_raw_frame(self, frame: bytes, linktype: int = LINKTYPE_IEEE802_11_RADIOTAP) -> bool:
+        """Process a raw captured frame. Returns True if it was a deauth/disassoc."""
+        parsed = parse_deauth_frame(frame, linktype)
+        if parsed is None:
+            return False
+        self._record_packet(*parsed)
+        return True
+
+    def _record_packet(
+        self,
+        frame_type: str,
+        src_mac: str,
+        dst_mac: str,
+        bssid: str,
+        reason_code: int,
+        signal_dbm: int | None,
+    ):
+        """Track a decoded deauth/disassoc packet and emit alert if threshold exceeded."""
         pkt_info = DeauthPacketInfo(
             timestamp=time.time(),
             frame_type=frame_type,
@@ -570,16 +857,22 @@ class DeauthDetector:
             'known_from_scan': known_from_scan,
         }
 
-    def _get_known_aps(self) -> set[str]:
-        """Get set of known AP BSSIDs."""
+    def _get_known_aps(self) -> frozenset[str]:
+        """Get set of known AP BSSIDs (cached until invalidated or stale)."""
         if not self.get_networks:
-            return set()
+            return frozenset()
 
-        try:
-            networks = self.get_networks()
-            return {bssid.upper() for bssid in networks}
-        except Exception:
-            return set()
+        now = time.monotonic()
+        if self._known_aps_dirty or now - self._known_aps_refreshed_at >= DEAUTH_KNOWN_AP_REFRESH:
+            try:
+                networks = self.get_networks()
+                self._known_aps = frozenset(bssid.upper() for bssid in networks)
+                self._known_aps_dirty = False
+                self._known_aps_refreshed_at = now
+            except Exception as e:
+                logger.debug(f"Error refreshing known APs: {e}")
+
+        return self._known_aps
 
     def _check_spoofed_source(self, src_mac: str) -> bool:
         """Check if source MAC matches a known AP (spoofing indicator)."""
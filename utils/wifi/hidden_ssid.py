@@ -17,6 +17,7 @@ from __future__ import annotations
 
 import logging
 import threading
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Callable
@@ -67,6 +68,10 @@ class HiddenSSIDCorrelator:
     Uses time-based correlation: when a client probes for an SSID and
     then is seen communicating with a hidden AP, the SSID is likely
     that of the hidden network.
+
+    Records are kept in arrival-ordered deques for expiry and indexed by
+    client MAC and BSSID, so each new record is only checked against the
+    records it can pair with rather than every hidden AP.
     """
 
     def __init__(
@@ -85,9 +90,15 @@ class HiddenSSIDCorrelator:
         self.min_confidence = min_confidence
         self._lock = threading.Lock()
 
-        # Storage
-        self._probe_records: list[ProbeRecord] = []
-        self._association_records: list[AssociationRecord] = []
+        # Storage (arrival order, oldest first)
+        self._probe_records: deque[ProbeRecord] = deque()
+        self._association_records: deque[AssociationRecord] = deque()
+
+        # Indexes over the same records, each deque in arrival order
+        self._probes_by_client: dict[str, deque[ProbeRecord]] = {}
+        self._associations_by_client: dict[str, deque[AssociationRecord]] = {}
+        self._associations_by_bssid: dict[str, deque[AssociationRecord]] = {}
+
         self._hidden_aps: dict[str, datetime] = {}  # BSSID -> last_seen
         self._revealed: dict[str, CorrelationResult] = {}  # BSSID -> result
 
@@ -110,17 +121,21 @@ class HiddenSSIDCorrelator:
         client_mac = client_mac.upper()
 
         with self._lock:
-            self._probe_records.append(ProbeRecord(
+            record = ProbeRecord(
                 timestamp=timestamp,
                 client_mac=client_mac,
                 probed_ssid=probed_ssid,
-            ))
+            )
+            self._probe_records.append(record)
+            self._probes_by_client.setdefault(client_mac, deque()).append(record)
 
             # Prune old records
             self._prune_records()
 
-            # Check for correlations with known hidden APs
-            self._check_correlations()
+            # Only hidden APs this client has associated with can change
+            bssids = {a.bssid for a in self._associations_by_client.get(client_mac, ())}
+            for bssid in bssids:
+                self._check_bssid(bssid)
 
     def record_association(self, client_mac: str, bssid: str, timestamp: datetime | None = None):
         """
@@ -139,17 +154,20 @@ class HiddenSSIDCorrelator:
         bssid = bssid.upper()
 
         with self._lock:
-            self._association_records.append(AssociationRecord(
+            record = AssociationRecord(
                 timestamp=timestamp,
                 client_mac=client_mac,
                 bssid=bssid,
-            ))
+            )
+            self._association_records.append(record)
+            self._associations_by_client.setdefault(client_mac, deque()).append(record)
+            self._associations_by_bssid.setdefault(bssid, deque()).append(record)
 
             # Prune old records
             self._prune_records()
 
             # Check for correlations
-            self._check_correlations()
+            self._check_bssid(bssid)
 
     def record_hidden_ap(self, bssid: str, timestamp: datetime | None = None):
         """
@@ -169,7 +187,7 @@ class HiddenSSIDCorrelator:
             self._hidden_aps[bssid] = timestamp
 
             # Check for correlations
-            self._check_correlations()
+            self._check_bssid(bssid)
 
     def get_revealed_ssid(self, bssid: str) -> str | None:
         """
@@ -219,85 +237,89 @@ class HiddenSSIDCorrelator:
         """Remove records older than the correlation window."""
         cutoff = datetime.now() - timedelta(seconds=self.correlation_window * 2)
 
-        self._probe_records = [
-            r for r in self._probe_records
-            if r.timestamp > cutoff
-        ]
-
-        self._association_records = [
-            r for r in self._association_records
-            if r.timestamp > cutoff
-        ]
+        probes = self._probe_records
+        while probes and probes[0].timestamp <= cutoff:
+            record = probes.popleft()
+            self._unindex(self._probes_by_client, record.client_mac, record)
+
+        associations = self._association_records
+        while associations and associations[0].timestamp <= cutoff:
+            record = associations.popleft()
+            self._unindex(self._associations_by_client, record.client_mac, record)
+            self._unindex(self._associations_by_bssid, record.bssid, record)
+
+    @staticmethod
+    def _unindex(index: dict[str, deque], key: str, record) -> None:
+        """Drop an expired record from the front of its index deque."""
+        records = index.get(key)
+        if records and records[0] is record:
+            records.popleft()
+            if not records:
+                del index[key]
+
+    def _check_bssid(self, bssid: str):
+        """Check a hidden AP against the probes of its associated clients."""
+        if bssid not in self._hidden_aps or bssid in self._revealed:
+            return
 
-    def _check_correlations(self):
-        """Check for new SSID correlations."""
         now = datetime.now()
         window = timedelta(seconds=self.correlation_window)
 
-        for bssid in list(self._hidden_aps.keys()):
-            # Skip if already revealed
-            if bssid in self._revealed:
+        # For each recent associated client, look for nearby probes
+        for assoc in self._associations_by_bssid.get(bssid, ()):
+            if (now - assoc.timestamp) > window:
                 continue
 
-            # Find associations with this hidden AP
-            relevant_associations = [
-                a for a in self._association_records
-                if a.bssid == bssid and (now - a.timestamp) <= window
+            client_probes = [
+                p for p in self._probes_by_client.get(assoc.client_mac, ())
+                if abs((p.timestamp - assoc.timestamp).total_seconds()) <= self.correlation_window
             ]
 
-            if not relevant_associations:
+            if not client_probes:
                 continue
 
-            # For each associated client, look for recent probes
-            for assoc in relevant_associations:
-                client_probes = [
-                    p for p in self._probe_records
-                    if p.client_mac == assoc.client_mac
-                    and abs((p.timestamp - assoc.timestamp).total_seconds()) <= self.correlation_window
-                ]
-
-                if not client_probes:
-                    continue
-
-                # Use the most recent probe from this client
-                latest_probe = max(client_probes, key=lambda p: p.timestamp)
-
-                # Calculate confidence based on timing
-                time_diff = abs((latest_probe.timestamp - assoc.timestamp).total_seconds())
-                confidence = 1.0 - (time_diff / self.correlation_window)
-                confidence = max(0.0, min(1.0, confidence))
-
-                if confidence >= self.min_confidence:
-                    result = CorrelationResult(
-                        bssid=bssid,
-                        revealed_ssid=latest_probe.probed_ssid,
-                        client_mac=assoc.client_mac,
-                        confidence=confidence,
-                        correlation_time=now,
-                        method='probe_association',
-                    )
-
-                    self._revealed[bssid] = result
-
-                    logger.info(
-                        f"Hidden SSID revealed: {bssid} -> '{latest_probe.probed_ssid}' "
-                        f"(confidence: {confidence:.2f})"
-                    )
-
-                    # Callback
-                    if self._on_ssid_revealed:
-                        try:
-                            self._on_ssid_revealed(result)
-                        except Exception as e:
-                            logger.debug(f"SSID reveal callback error: {e}")
-
-                    break  # Found correlation, move to next AP
+            # Use the most recent probe from this client
+            latest_probe = max(client_probes, key=lambda p: p.timestamp)
+
+            # Calculate confidence based on timing
+            time_diff = abs((latest_probe.timestamp - assoc.timestamp).total_seconds())
+            confidence = 1.0 - (time_diff / self.correlation_window)
+            confidence = max(0.0, min(1.0, confidence))
+
+            if confidence >= self.min_confidence:
+                result = CorrelationResult(
+                    bssid=bssid,
+                    revealed_ssid=latest_probe.probed_ssid,
+                    client_mac=assoc.client_mac,
+                    confidence=confidence,
+                    correlation_time=now,
+                    method='probe_association',
+                )
+
+                self._revealed[bssid] = result
+
+                logger.info(
+                    f"Hidden SSID revealed: {bssid} -> '{latest_probe.probed_ssid}' "
+                    f"(confidence: {confidence:.2f})"
+                )
+
+                # Callback
+                if self._on_ssid_revealed:
+                    try:
+                        self._on_ssid_revealed(result)
+                    except Exception as e:
+                        logger.debug(f"SSID reveal callback error: {e}")
+
+                break  # Found correlation
 
     def clear(self):
         """Clear all stored data."""
         with self._lock:
             self._probe_records.clear()
             self._association_records.clear()
+            self._probes_by_client.clear()
+            self._associations_by_client.clear()
+            self._associations_by_bssid.clear()
             self._hidden_aps.clear()
             self._revealed.clear()
 
@@ -4,7 +4,7 @@ WiFi scan output parsers.
 Each parser converts tool-specific output into WiFiObservation objects.
 """
 
-from .airodump import parse_airodump_csv
+from .airodump import AirodumpCSVReader, parse_airodump_csv
 from .airport import parse_airport_scan
 from .iw import parse_iw_scan
 from .iwlist import parse_iwlist_scan
@@ -16,4 +16,5 @@ __all__ = [
     'parse_iw_scan',
     'parse_iwlist_scan',
     'parse_airodump_csv',
+    'AirodumpCSVReader',
 ]
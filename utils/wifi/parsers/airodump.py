@@ -20,6 +20,7 @@ from __future__ import annotations
 import csv
 import io
 import logging
+import os
 import re
 from datetime import datetime
 
@@ -47,6 +48,8 @@ from ..models import WiFiObservation
 
 logger = logging.getLogger(__name__)
 
+_MAC_RE = re.compile(r'^[0-9A-F:]{17}$')
+
 
 def parse_airodump_csv(filepath: str) -> tuple[list[WiFiObservation], list[dict]]:
     """
@@ -102,11 +105,25 @@ def _parse_ap_section(lines: list[str]) -> list[WiFiObservation]:
     if len(lines) < 2:
         return networks
 
-    # Parse header to get column indices
-    header = lines[0]
+    col_map = _ap_column_map(lines[0])
+
+    # Parse data rows
+    for line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+
+        obs = _parse_ap_row(_split_ap_line(line), col_map)
+        if obs is not None:
+            networks.append(obs)
+
+    return networks
+
+
+def _ap_column_map(header: str) -> dict[str, int]:
+    """Map access point fields to column indices from the section header."""
     header_parts = [h.strip().lower() for h in header.split(',')]
 
-    # Find column indices
     col_map = {}
     for i, col in enumerate(header_parts):
         if 'bssid' in col:
@@ -132,114 +149,112 @@ def _parse_ap_section(lines: list[str]) -> list[WiFiObservation]:
         elif 'last time seen' in col:
             col_map['last_seen'] = i
 
-    # Parse data rows
-    for line in lines[1:]:
-        line = line.strip()
-        if not line:
-            continue
+    return col_map
 
-        # Handle CSV properly (ESSID might contain commas)
-        try:
-            # Use CSV reader for proper parsing
-            reader = csv.reader(io.StringIO(line))
-            parts = next(reader)
-        except Exception:
-            parts = line.split(',')
 
-        parts = [p.strip() for p in parts]
+def _split_ap_line(line: str) -> list[str]:
+    """Split an access point row (ESSID might contain commas)."""
+    try:
+        # Use CSV reader for proper parsing
+        parts = next(csv.reader(io.StringIO(line)))
+    except Exception:
+        parts = line.split(',')
 
-        if len(parts) < 5:
-            continue
+    return [p.strip() for p in parts]
 
-        try:
-            # Get BSSID
-            bssid_idx = col_map.get('bssid', 0)
-            bssid = parts[bssid_idx].upper() if bssid_idx < len(parts) else None
-            if not bssid or not re.match(r'^[0-9A-F:]{17}$', bssid):
-                continue
 
-            # Get channel
-            channel = None
-            chan_idx = col_map.get('channel', 3)
-            if chan_idx < len(parts):
-                chan_str = parts[chan_idx].strip()
-                if chan_str.lstrip('-').isdigit():
-                    channel = int(chan_str)
-                    if channel < 0:
-                        channel = abs(channel)  # Negative indicates not currently on channel
-
-            # Get power/RSSI
-            rssi = None
-            power_idx = col_map.get('power', 8)
-            if power_idx < len(parts):
-                power_str = parts[power_idx].strip()
-                if power_str.lstrip('-').isdigit():
-                    rssi = int(power_str)
-                    if rssi > 0:
-                        rssi = -rssi  # Should be negative
-
-            # Get security
-            privacy_idx = col_map.get('privacy', 5)
-            privacy = parts[privacy_idx].strip() if privacy_idx < len(parts) else ''
-            security = _parse_airodump_security(privacy)
-
-            # Get cipher
-            cipher_idx = col_map.get('cipher', 6)
-            cipher_str = parts[cipher_idx].strip() if cipher_idx < len(parts) else ''
-            cipher = _parse_airodump_cipher(cipher_str)
-
-            # Get auth
-            auth_idx = col_map.get('auth', 7)
-            auth_str = parts[auth_idx].strip() if auth_idx < len(parts) else ''
-            auth = _parse_airodump_auth(auth_str)
-
-            # Get ESSID (usually last column, might contain commas)
-            essid = None
-            essid_idx = col_map.get('essid', len(parts) - 1)
-            if essid_idx < len(parts):
-                essid = parts[essid_idx].strip()
-                # Handle special markers
-                if essid in ('', '<length: 0>', '<length:  0>'):
-                    essid = None
-
-            # Get beacon count
-            beacon_count = 0
-            beacon_idx = col_map.get('beacons', 9)
-            if beacon_idx < len(parts):
-                beacon_str = parts[beacon_idx].strip()
-                if beacon_str.isdigit():
-                    beacon_count = int(beacon_str)
-
-            # Get data count (IVs)
-            data_count = 0
-            data_idx = col_map.get('data', 10)
-            if data_idx < len(parts):
-                data_str = parts[data_idx].strip()
-                if data_str.isdigit():
-                    data_count = int(data_str)
-
-            # Get frequency from channel
-            frequency_mhz = CHANNEL_FREQUENCIES.get(channel) if channel else None
-
-            obs = WiFiObservation(
-                timestamp=datetime.now(),
-                bssid=bssid,
-                essid=essid,
-                channel=channel,
-                frequency_mhz=frequency_mhz,
-                rssi=rssi,
-                security=security,
-                cipher=cipher,
-                auth=auth,
-                beacon_count=beacon_count,
-                data_count=data_count,
-            )
-            networks.append(obs)
+def _parse_ap_row(parts: list[str], col_map: dict[str, int]) -> WiFiObservation | None:
+    """Convert a split access point row into an observation."""
+    if len(parts) < 5:
+        return None
 
-        except Exception as e:
-            logger.debug(f"Error parsing AP line: {line!r} - {e}")
+    try:
+        # Get BSSID
+        bssid_idx = col_map.get('bssid', 0)
+        bssid = parts[bssid_idx].upper() if bssid_idx < len(parts) else None
+        if not bssid or not _MAC_RE.match(bssid):
+            return None
+
+        # Get channel
+        channel = None
+        chan_idx = col_map.get('channel', 3)
+        if chan_idx < len(parts):
+            chan_str = parts[chan_idx].strip()
+            if chan_str.lstrip('-').isdigit():
+                channel = int(chan_str)
+                if channel < 0:
+                    channel = abs(channel)  # Negative indicates not currently on channel
+
+        # Get power/RSSI
+        rssi = None
+        power_idx = col_map.get('power', 8)
+        if power_idx < len(parts):
+            power_str = parts[power_idx].strip()
+            if power_str.lstrip('-').isdigit():
+                rssi = int(power_str)
+                if rssi > 0:
+                    rssi = -rssi  # Should be negative
+
+        # Get security
+        privacy_idx = col_map.get('privacy', 5)
+        privacy = parts[privacy_idx].strip() if privacy_idx < len(parts) else ''
+        security = _parse_airodump_security(privacy)
+
+        # Get cipher
+        cipher_idx = col_map.get('cipher', 6)
+        cipher_str = parts[cipher_idx].strip() if cipher_idx < len(parts) else ''
+        cipher = _parse_airodump_cipher(cipher_str)
+
+        # Get auth
+        auth_idx = col_map.get('auth', 7)
+        auth_str = parts[auth_idx].strip() if auth_idx < len(parts) else ''
+        auth = _parse_airodump_auth(auth_str)
+
+        # Get ESSID (usually last column, might contain commas)
+        essid = None
+        essid_idx = col_map.get('essid', len(parts) - 1)
+        if essid_idx < len(parts):
+            essid = parts[essid_idx].strip()
+            # Handle special markers
+            if essid in ('', '<length: 0>', '<length:  0>'):
+                essid = None
+
+        # Get beacon count
+        beacon_count = 0
+        beacon_idx = col_map.get('beacons', 9)
+        if beacon_idx < len(parts):
+            beacon_str = parts[beacon_idx].strip()
+            if beacon_str.isdigit():
+                beacon_count = int(beacon_str)
+
+        # Get data count (IVs)
+        data_count = 0
+        data_idx = col_map.get('data', 10)
+        if data_idx < len(parts):
+            data_str = parts[data_idx].strip()
+            if data_str.isdigit():
+                data_count = int(data_str)
+
+        # Get frequency from channel
+        frequency_mhz = CHANNEL_FREQUENCIES.get(channel) if channel else None
+
+        return WiFiObservation(
+            timestamp=datetime.now(),
+            bssid=bssid,
+            essid=essid,
+            channel=channel,
+            frequency_mhz=frequency_mhz,
+            rssi=rssi,
+            security=security,
+            cipher=cipher,
+            auth=auth,
+            beacon_count=beacon_count,
+            data_count=data_count,
+        )
 
-    return networks
+    except Exception as e:
+        logger.debug(f"Error parsing AP line: {parts!r} - {e}")
+        return None
 
 
 def _parse_client_section(lines: list[str]) -> list[dict]:
@@ -249,11 +264,25 @@ def _parse_client_section(lines: list[str]) -> list[dict]:
     if len(lines) < 2:
         return clients
 
-    # Parse header
-    header = lines[0]
+    col_map = _client_column_map(lines[0])
+
+    # Parse data rows
+    for line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+
+        client = _parse_client_row(_split_client_line(line), col_map)
+        if client is not None:
+            clients.append(client)
+
+    return clients
+
+
+def _client_column_map(header: str) -> dict[str, int]:
+    """Map client fields to column indices from the section header."""
     header_parts = [h.strip().lower() for h in header.split(',')]
 
-    # Find column indices
     col_map = {}
     for i, col in enumerate(header_parts):
         if 'station mac' in col:
@@ -271,72 +300,185 @@ def _parse_client_section(lines: list[str]) -> list[dict]:
         elif 'last time seen' in col:
             col_map['last_seen'] = i
 
-    # Parse data rows
-    for line in lines[1:]:
-        line = line.strip()
-        if not line:
-            continue
+    return col_map
 
-        parts = line.split(',')
-        parts = [p.strip() for p in parts]
 
-        if len(parts) < 3:
-            continue
+def _split_client_line(line: str) -> list[str]:
+    """Split a client row (probed ESSIDs are trailing comma-separated columns)."""
+    return [p.strip() for p in line.split(',')]
+
+
+def _parse_client_row(parts: list[str], col_map: dict[str, int]) -> dict | None:
+    """Convert a split client row into a client data dict."""
+    if len(parts) < 3:
+        return None
+
+    try:
+        # Get MAC
+        mac_idx = col_map.get('mac', 0)
+        mac = parts[mac_idx].upper() if mac_idx < len(parts) else None
+        if not mac or not _MAC_RE.match(mac):
+            return None
+
+        # Get power/RSSI
+        rssi = None
+        power_idx = col_map.get('power', 3)
+        if power_idx < len(parts):
+            power_str = parts[power_idx].strip()
+            if power_str.lstrip('-').isdigit():
+                rssi = int(power_str)
+                if rssi > 0:
+                    rssi = -rssi
+
+        # Get packets
+        packets = 0
+        packets_idx = col_map.get('packets', 4)
+        if packets_idx < len(parts):
+            packets_str = parts[packets_idx].strip()
+            if packets_str.isdigit():
+                packets = int(packets_str)
+
+        # Get associated BSSID
+        bssid = None
+        bssid_idx = col_map.get('bssid', 5)
+        if bssid_idx < len(parts):
+            bssid = parts[bssid_idx].strip().upper()
+            if bssid == '(NOT ASSOCIATED)' or not _MAC_RE.match(bssid):
+                bssid = None
+
+        # Get probed ESSIDs (remaining columns)
+        probed_idx = col_map.get('probed', 6)
+        probed_essids = []
+        if probed_idx < len(parts):
+            for essid in parts[probed_idx:]:
+                essid = essid.strip()
+                if essid and essid not in probed_essids:
+                    probed_essids.append(essid)
+
+        return {
+            'mac': mac,
+            'rssi': rssi,
+            'packets': packets,
+            'bssid': bssid,
+            'probed_essids': probed_essids,
+        }
+
+    except Exception as e:
+        logger.debug(f"Error parsing client line: {parts!r} - {e}")
+        return None
+
+
+class AirodumpCSVReader:
+    """
+    Incremental reader for a live airodump-ng CSV file.
+
+    airodump-ng rewrites its CSV in place every second, so the file cannot be
+    tailed like a log. Instead the reader skips the file entirely when its
+    size/mtime are unchanged, and otherwise compares each row against the
+    last version seen for that BSSID / station MAC. Only new or changed rows
+    are fully parsed and returned, so downstream processing scales with the
+    rate of change rather than the survey size.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._file_sig: tuple[int, int] | None = None
+        self._ap_rows: dict[str, str] = {}
+        self._client_rows: dict[str, str] = {}
+        self.ap_columns: dict[str, int] = {}
+        self.client_columns: dict[str, int] = {}
+
+    def reset(self) -> None:
+        """Forget all previously seen rows."""
+        self._file_sig = None
+        self._ap_rows.clear()
+        self._client_rows.clear()
+
+    def read_changed_rows(self) -> tuple[list[list[str]], list[list[str]]]:
+        """
+        Return split rows that are new or changed since the previous call.
+
+        Column positions for the returned rows are in ``ap_columns`` and
+        ``client_columns``.
+
+        Returns:
+            Tuple of (access point rows, client rows).
+        """
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            return [], []
+
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._file_sig:
+            return [], []
 
         try:
-            # Get MAC
-            mac_idx = col_map.get('mac', 0)
-            mac = parts[mac_idx].upper() if mac_idx < len(parts) else None
-            if not mac or not re.match(r'^[0-9A-F:]{17}$', mac):
+            with open(self.filepath, encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError as e:
+            logger.debug(f"Error reading airodump CSV: {e}")
+            return [], []
+
+        self._file_sig = sig
+        return self.diff_rows(content)
+
+    def diff_rows(self, content: str) -> tuple[list[list[str]], list[list[str]]]:
+        """Split CSV content and return only rows that differ from the last seen version."""
+        ap_rows: list[list[str]] = []
+        client_rows: list[list[str]] = []
+
+        section = None
+        for raw_line in content.splitlines():
+            line = raw_line.strip()
+            if not line:
                 continue
 
-            # Get power/RSSI
-            rssi = None
-            power_idx = col_map.get('power', 3)
-            if power_idx < len(parts):
-                power_str = parts[power_idx].strip()
-                if power_str.lstrip('-').isdigit():
-                    rssi = int(power_str)
-                    if rssi > 0:
-                        rssi = -rssi
-
-            # Get packets
-            packets = 0
-            packets_idx = col_map.get('packets', 4)
-            if packets_idx < len(parts):
-                packets_str = parts[packets_idx].strip()
-                if packets_str.isdigit():
-                    packets = int(packets_str)
-
-            # Get associated BSSID
-            bssid = None
-            bssid_idx = col_map.get('bssid', 5)
-            if bssid_idx < len(parts):
-                bssid = parts[bssid_idx].strip().upper()
-                if bssid == '(NOT ASSOCIATED)' or not re.match(r'^[0-9A-F:]{17}$', bssid):
-                    bssid = None
-
-            # Get probed ESSIDs (remaining columns)
-            probed_idx = col_map.get('probed', 6)
-            probed_essids = []
-            if probed_idx < len(parts):
-                for essid in parts[probed_idx:]:
-                    essid = essid.strip()
-                    if essid and essid not in probed_essids:
-                        probed_essids.append(essid)
-
-            clients.append({
-                'mac': mac,
-                'rssi': rssi,
-                'packets': packets,
-                'bssid': bssid,
-                'probed_essids': probed_essids,
-            })
-
-        except Exception as e:
-            logger.debug(f"Error parsing client line: {line!r} - {e}")
+            if line.startswith('BSSID'):
+                section = 'ap'
+                self.ap_columns = _ap_column_map(line)
+                continue
+            if line.startswith('Station MAC'):
+                section = 'client'
+                self.client_columns = _client_column_map(line)
+                continue
 
-    return clients
+            # Key is the leading MAC; compare the raw row before splitting
+            key = line.split(',', 1)[0].strip().upper()
+            if section == 'ap':
+                if self._ap_rows.get(key) != line:
+                    self._ap_rows[key] = line
+                    ap_rows.append(_split_ap_line(line))
+            elif section == 'client':
+                if self._client_rows.get(key) != line:
+                    self._client_rows[key] = line
+                    client_rows.append(_split_client_line(line))
+
+        return ap_rows, client_rows
+
+    def read_changes(self) -> tuple[list[WiFiObservation], list[dict]]:
+        """
+        Parse rows that are new or changed since the previous call.
+
+        Returns:
+            Tuple of (network observations, client data dicts), in the same
+            shape as parse_airodump_csv().
+        """
+        ap_rows, client_rows = self.read_changed_rows()
+
+        networks = []
+        for parts in ap_rows:
+            obs = _parse_ap_row(parts, self.ap_columns)
+            if obs is not None:
+                networks.append(obs)
+
+        clients = []
+        for parts in client_rows:
+            client = _parse_client_row(parts, self.client_columns)
+            if client is not None:
+                clients.append(client)
+
+        return networks, clients
 
 
 def _parse_airodump_security(privacy: str) -> str:
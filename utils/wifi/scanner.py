@@ -805,7 +805,7 @@ class UnifiedWiFiScanner:
         """Background thread for running airodump-ng."""
         import tempfile
 
-        from .parsers.airodump import parse_airodump_csv
+        from .parsers.airodump import AirodumpCSVReader
 
         # Create temp directory for output files
         with tempfile.TemporaryDirectory(prefix='wifi_scan_') as tmpdir:
@@ -852,16 +852,15 @@ class UnifiedWiFiScanner:
                             process.kill()
                     return
 
-                csv_file = f"{output_prefix}-01.csv"
+                csv_reader = AirodumpCSVReader(f"{output_prefix}-01.csv")
 
-                # Poll CSV file for updates
+                # Poll CSV file; only new or changed rows are returned
                 while not self._deep_scan_stop_event.is_set():
                     time.sleep(1.0)
 
-                    if os.path.exists(csv_file):
+                    networks, clients = csv_reader.read_changes()
+                    if networks or clients:
                         try:
-                            networks, clients = parse_airodump_csv(csv_file)
-
                             for obs in networks:
                                 self._process_observation(obs)
 
@@ -874,7 +873,7 @@ class UnifiedWiFiScanner:
                                 self._status.clients_found = len(self._clients)
 
                         except Exception as e:
-                            logger.debug(f"Error parsing airodump CSV: {e}")
+                            logger.debug(f"Error processing airodump CSV: {e}")
 
             except Exception as e:
                 logger.exception(f"Deep scan error: {e}")
@@ -902,6 +901,8 @@ class UnifiedWiFiScanner:
             else:
                 ap = self._create_access_point(obs)
                 self._access_points[bssid] = ap
+                if self._deauth_detector:
+                    self._deauth_detector.invalidate_known_aps()
 
             # Check if new (not in baseline)
             if self._baseline_networks and bssid not in self._baseline_networks:
@@ -1298,6 +1299,8 @@ class UnifiedWiFiScanner:
             self._access_points.clear()
             self._clients.clear()
             self._probe_requests.clear()
+            if self._deauth_detector:
+                self._deauth_detector.invalidate_known_aps()
 
     # =========================================================================
     # TSCM Compatibility